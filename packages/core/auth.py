@@ -1,11 +1,13 @@
 """Authentication — JWT + local network bypass for external tester access."""
 
+import asyncio
+import hashlib
 import ipaddress
 import logging
 import os
+import threading
 import time
-from collections import defaultdict
-from datetime import datetime, timedelta
+from collections import OrderedDict, defaultdict, deque
 from functools import lru_cache
 from typing import Optional
 
@@ -16,6 +18,14 @@ logger = logging.getLogger(__name__)
 
 AUTH_SERVICE_URL = "http://localhost:8088"
 
+# Verified-token cache: bounded LRU keyed by sha256(token)
+TOKEN_CACHE_SIZE = 1024
+# Upper bound on how long a verification is trusted (tokens revoked at the auth
+# service stop working within this window even if their exp is later)
+TOKEN_CACHE_TTL = 300
+# Tokens the auth service rejected are remembered this long
+TOKEN_NEGATIVE_TTL = 30
+
 # Networks that bypass auth entirely
 TRUSTED_NETWORKS = [
     ipaddress.ip_network("192.168.50.0/24"),
@@ -63,22 +73,118 @@ def _verify_jwt_locally(token: str) -> dict | None:
         return None
 
 
-async def _verify_with_auth_service(token: str) -> dict | None:
-    """Verify token with the Tower auth service."""
+async def _verify_with_auth_service(token: str) -> tuple[dict | None, bool]:
+    """Verify token with the Tower auth service.
+
+    Returns (user_data, answered) — answered is False when the service could
+    not be reached, so callers don't cache a transient failure as a rejection.
+    """
     try:
-        import urllib.request
-        req = urllib.request.Request(
-            f"{AUTH_SERVICE_URL}/api/auth/verify",
-            headers={"Authorization": f"Bearer {token}"},
-        )
-        resp = urllib.request.urlopen(req, timeout=5)
-        import json
-        data = json.loads(resp.read())
-        if data.get("valid"):
-            return data
+        import httpx
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            resp = await client.get(
+                f"{AUTH_SERVICE_URL}/api/auth/verify",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        data = resp.json() if resp.status_code == 200 else {}
+        return (data if data.get("valid") else None), resp.status_code < 500
     except Exception as e:
         logger.debug(f"Auth service verification failed: {e}")
-    return None
+    return None, False
+
+
+class TokenCache:
+    """Bounded LRU of verification results keyed by token hash.
+
+    Positive entries live until min(token exp, now + TOKEN_CACHE_TTL); negative
+    entries for TOKEN_NEGATIVE_TTL.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self._entries: OrderedDict[str, tuple[float, dict | None]] = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[bool, dict | None]:
+        """(found, user_data) — found with user_data=None is a cached rejection."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: str, user_data: dict | None) -> None:
+        now = time.time()
+        if user_data is None:
+            expires_at = now + TOKEN_NEGATIVE_TTL
+        else:
+            expires_at = now + TOKEN_CACHE_TTL
+            exp = user_data.get("expires") or user_data.get("exp")
+            if isinstance(exp, (int, float)):
+                expires_at = min(expires_at, float(exp))
+            if expires_at <= now:
+                return
+        with self._lock:
+            self._entries[key] = (expires_at, user_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+# Remote verifications in flight, so concurrent requests with one token share a call
+_pending_remote: dict[str, asyncio.Task] = {}
+
+
+async def verify_token(token: str) -> dict | None:
+    """Verify a bearer token: cache, then local JWT, then the auth service.
+
+    Only a cache miss that local HS256 verification can't settle goes over the
+    network, and that call is async so the event loop keeps serving.
+    """
+    key = TokenCache.key(token)
+    found, user_data = token_cache.get(key)
+    if found:
+        return user_data
+
+    user_data = _verify_jwt_locally(token)
+    if user_data:
+        token_cache.put(key, user_data)
+        return user_data
+
+    task = _pending_remote.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_verify_remote(key, token))
+        _pending_remote[key] = task
+        task.add_done_callback(lambda _t: _pending_remote.pop(key, None))
+    # A cancelled request must not cancel the lookup other requests share
+    return await asyncio.shield(task)
+
+
+async def _verify_remote(key: str, token: str) -> dict | None:
+    user_data, answered = await _verify_with_auth_service(token)
+    if answered:
+        token_cache.put(key, user_data)
+    return user_data
 
 
 async def require_auth(request: Request) -> dict:
@@ -94,10 +200,7 @@ async def require_auth(request: Request) -> dict:
 
     token = auth_header[7:]  # Strip "Bearer "
 
-    # Try auth service first, then local JWT
-    user_data = await _verify_with_auth_service(token)
-    if not user_data:
-        user_data = _verify_jwt_locally(token)
+    user_data = await verify_token(token)
 
     if not user_data or not user_data.get("valid"):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -114,18 +217,24 @@ async def optional_auth(request: Request) -> Optional[dict]:
 
 
 class RateLimiter:
-    """Simple in-memory rate limiter."""
+    """Sliding-window in-memory rate limiter.
+
+    One deque of monotonic timestamps per key; expired entries are popped from
+    the left, so each check costs O(expired) instead of rebuilding the list.
+    """
 
     def __init__(self):
-        self.requests = defaultdict(list)
+        self.requests: defaultdict[str, deque] = defaultdict(deque)
 
     def is_allowed(self, key: str, max_requests: int, window_seconds: int) -> bool:
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=window_seconds)
-        self.requests[key] = [t for t in self.requests[key] if t > cutoff]
-        if len(self.requests[key]) >= max_requests:
+        now = time.monotonic()
+        cutoff = now - window_seconds
+        window = self.requests[key]
+        while window and window[0] <= cutoff:
+            window.popleft()
+        if len(window) >= max_requests:
             return False
-        self.requests[key].append(now)
+        window.append(now)
         return True
 
 
@@ -163,9 +272,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 )
 
             token = auth_header[7:]
-            user_data = await _verify_with_auth_service(token)
-            if not user_data:
-                user_data = _verify_jwt_locally(token)
+            user_data = await verify_token(token)
 
             if not user_data or not user_data.get("valid"):
                 from starlette.responses import JSONResponse
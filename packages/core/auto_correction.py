@@ -458,7 +458,7 @@ async def _handle_rejection_correction(data: dict):
             corrected = await apply_corrections(workflow, categories, slug, quality_score)
             if corrected:
                 from packages.visual_pipeline.comfyui import submit_comfyui_workflow
-                prompt_id = submit_comfyui_workflow(corrected)
+                prompt_id = await submit_comfyui_workflow(corrected)
                 logger.info(f"Auto-correction submitted for {slug}: prompt_id={prompt_id}")
 
     except Exception as e:
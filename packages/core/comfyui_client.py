@@ -0,0 +1,376 @@
+"""Async ComfyUI client — pooled HTTP, /ws completion events, poll fallback.
+
+One shared client per ComfyUI backend. Every generator submits through it so
+prompts carry our client_id, which makes ComfyUI push progress/executing
+events for them over the WebSocket. Completion waits are event-driven; the
+/history poll only runs as a fallback (slowly when the socket is up, every
+few seconds when it isn't).
+
+Usage:
+    from packages.core.comfyui_client import get_comfyui_client, history_error, output_files
+
+    client = get_comfyui_client()
+    prompt_id = await client.submit(workflow)
+    entry = await client.wait_for_completion(prompt_id, timeout=1800)
+    if entry is None: ...                      # timed out
+    elif err := history_error(entry): ...      # ComfyUI execution error
+    else: files = output_files(entry)
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import httpx
+
+from .config import COMFYUI_URL, COMFYUI_URLS
+
+logger = logging.getLogger(__name__)
+
+# Poll /history this often while the WebSocket is down
+POLL_INTERVAL = 5.0
+# ...and this often as a safety net while it is up (events do the real work)
+WS_POLL_INTERVAL = 30.0
+# After a completion event, history lands a moment later — retry quickly
+POST_EVENT_RETRY = 0.25
+# Remember this many recently finished prompts for late waiters
+_DONE_MEMORY = 500
+
+
+def history_error(entry: dict) -> str | None:
+    """Return the error detail if a /history entry failed, else None."""
+    status_info = entry.get("status", {}) or {}
+    if status_info.get("status_str") != "error":
+        return None
+    err_detail = ""
+    for msg in status_info.get("messages", []):
+        if isinstance(msg, list) and len(msg) >= 2 and "error" in str(msg[0]).lower():
+            err_detail = str(msg[1])[:200]
+    return err_detail or "ComfyUI execution error"
+
+
+def output_files(entry: dict, keys: tuple[str, ...] = ("videos", "gifs", "images")) -> list[dict]:
+    """Flatten a /history entry's node outputs into [{filename, subfolder, type}]."""
+    files = []
+    for node_output in (entry.get("outputs", {}) or {}).values():
+        for key in keys:
+            for item in node_output.get(key, []):
+                if isinstance(item, dict) and item.get("filename"):
+                    files.append(item)
+        # Some Wan nodes use 'video' (singular), as a dict or list
+        v = node_output.get("video")
+        for item in (v if isinstance(v, list) else [v] if isinstance(v, dict) else []):
+            if isinstance(item, dict) and item.get("filename"):
+                files.append(item)
+    return files
+
+
+class ComfyUIClient:
+    """Shared async client for one ComfyUI backend."""
+
+    def __init__(self, base_url: str = COMFYUI_URL):
+        self.base_url = base_url.rstrip("/")
+        self.client_id = uuid.uuid4().hex
+        self._http: httpx.AsyncClient | None = None
+        self._http_loop: asyncio.AbstractEventLoop | None = None
+        self._ws_task: asyncio.Task | None = None
+        self._ws_connected = False
+        self._waiters: dict[str, set[asyncio.Event]] = {}
+        self._progress: dict[str, dict] = {}
+        self._done: OrderedDict[str, str] = OrderedDict()
+        self._stats = {
+            "submitted": 0, "completed_via_ws": 0, "completed_via_poll": 0,
+            "timeouts": 0, "ws_reconnects": 0,
+        }
+
+    # --- HTTP ---
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def submit(self, workflow: dict) -> str:
+        """POST a workflow to /prompt and return its prompt_id."""
+        self.start()
+        resp = await self._client().post(
+            "/prompt", json={"prompt": workflow, "client_id": self.client_id},
+        )
+        resp.raise_for_status()
+        prompt_id = resp.json().get("prompt_id", "")
+        if prompt_id:
+            self._stats["submitted"] += 1
+            self._progress[prompt_id] = {"status": "pending", "progress": 0.1}
+        return prompt_id
+
+    async def history(self, prompt_id: str) -> dict | None:
+        """Return the /history entry for a prompt, or None if it hasn't finished."""
+        resp = await self._client().get(f"/history/{prompt_id}", timeout=10.0)
+        resp.raise_for_status()
+        return resp.json().get(prompt_id)
+
+    async def queue(self) -> dict:
+        """Return the raw /queue payload."""
+        resp = await self._client().get("/queue", timeout=10.0)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def delete_queued(self, prompt_ids: list[str]):
+        """Remove pending prompts from the queue (running ones are unaffected)."""
+        if not prompt_ids:
+            return
+        resp = await self._client().post("/queue", json={"delete": prompt_ids}, timeout=10.0)
+        resp.raise_for_status()
+
+    async def queue_position(self, prompt_id: str) -> str | None:
+        """'running', 'pending', or None if the prompt isn't queued.
+
+        Queue items are [number, prompt_id, prompt, extra, outputs]; we match
+        on the prompt_id field instead of stringifying the whole payload.
+        """
+        data = await self.queue()
+        for state, key in (("running", "queue_running"), ("pending", "queue_pending")):
+            for job in data.get(key, []):
+                if isinstance(job, (list, tuple)) and len(job) > 1 and job[1] == prompt_id:
+                    return state
+        return None
+
+    async def progress(self, prompt_id: str) -> dict:
+        """Progress dict: {status, progress, ...} — WS state first, then queue/history."""
+        try:
+            if prompt_id not in self._done:
+                live = self._progress.get(prompt_id)
+                if live and self._ws_connected and live["status"] == "running":
+                    return dict(live)
+                state = await self.queue_position(prompt_id)
+                if state == "running":
+                    return dict(live) if live and live["status"] == "running" else {"status": "running", "progress": 0.5}
+                if state == "pending":
+                    return {"status": "pending", "progress": 0.1}
+
+            entry = await self.history(prompt_id)
+            if entry is not None:
+                err = history_error(entry)
+                if err:
+                    return {"status": "error", "progress": 0.0, "error": err}
+                return {
+                    "status": "completed",
+                    "progress": 1.0,
+                    "images": [f["filename"] for f in output_files(entry, ("images",))],
+                    "output_files": [f["filename"] for f in output_files(entry)],
+                }
+            return {"status": "unknown", "progress": 0.0}
+        except Exception as e:
+            logger.warning(f"ComfyUI progress check failed: {e}")
+            return {"status": "error", "progress": 0.0, "error": str(e)}
+
+    async def wait_for_completion(self, prompt_id: str, timeout: float = 1800) -> dict | None:
+        """Wait until a prompt finishes; return its /history entry or None on timeout.
+
+        Wakes on the WebSocket completion event; /history is checked on each
+        wake and on the fallback interval, so a dropped socket only costs latency.
+        """
+        deadline = time.monotonic() + timeout
+        event = self._add_waiter(prompt_id)
+        try:
+            while True:
+                if prompt_id in self._done:
+                    event.set()
+                try:
+                    entry = await self.history(prompt_id)
+                except Exception as e:
+                    logger.debug(f"ComfyUI history check failed for {prompt_id}: {e}")
+                    entry = None
+                if entry is not None:
+                    key = "completed_via_ws" if event.is_set() else "completed_via_poll"
+                    self._stats[key] += 1
+                    return entry
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    return None
+                if event.is_set():
+                    # Finished — history may lag the event by a moment
+                    await asyncio.sleep(min(POST_EVENT_RETRY, remaining))
+                    continue
+                interval = WS_POLL_INTERVAL if self._ws_connected else POLL_INTERVAL
+                try:
+                    await asyncio.wait_for(event.wait(), min(interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._remove_waiter(prompt_id, event)
+            self._progress.pop(prompt_id, None)
+
+    async def wait_event(self, prompt_id: str, timeout: float) -> bool:
+        """Sleep up to `timeout`, waking early if the prompt's completion event fires.
+
+        For callers that keep their own progress loop (e.g. to update UI state
+        between checks). Returns True if the prompt is known to have finished.
+        """
+        if prompt_id in self._done:
+            await asyncio.sleep(min(POST_EVENT_RETRY, timeout))
+            return True
+        event = self._add_waiter(prompt_id)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._remove_waiter(prompt_id, event)
+
+    def _add_waiter(self, prompt_id: str) -> asyncio.Event:
+        # One Event per waiter: events bind to the loop they're awaited on
+        event = asyncio.Event()
+        self._waiters.setdefault(prompt_id, set()).add(event)
+        return event
+
+    def _remove_waiter(self, prompt_id: str, event: asyncio.Event):
+        waiters = self._waiters.get(prompt_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[prompt_id]
+
+    # --- WebSocket events ---
+
+    def start(self):
+        """Start the /ws listener on the running loop (idempotent)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._ws_task is None or self._ws_task.done() or self._ws_task.get_loop() is not loop:
+            self._ws_task = loop.create_task(self._ws_loop())
+
+    async def stop(self):
+        if self._ws_task and not self._ws_task.done():
+            self._ws_task.cancel()
+            try:
+                await self._ws_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+
+    async def _ws_loop(self):
+        try:
+            import websockets
+        except ImportError:
+            logger.info("websockets not installed — ComfyUI completion falls back to polling")
+            return
+
+        ws_url = self.base_url.replace("http://", "ws://").replace("https://", "wss://")
+        ws_url = f"{ws_url}/ws?clientId={self.client_id}"
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(ws_url, max_size=None, ping_interval=20) as ws:
+                    self._ws_connected = True
+                    backoff = 1.0
+                    logger.info(f"ComfyUI WebSocket connected: {self.base_url}")
+                    async for message in ws:
+                        if isinstance(message, bytes):
+                            continue  # binary preview frames
+                        try:
+                            self._handle_message(json.loads(message))
+                        except (json.JSONDecodeError, TypeError):
+                            continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"ComfyUI WebSocket error ({self.base_url}): {e}")
+            finally:
+                if self._ws_connected:
+                    self._stats["ws_reconnects"] += 1
+                self._ws_connected = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _handle_message(self, msg: dict):
+        msg_type = msg.get("type")
+        data = msg.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if not prompt_id:
+            return
+        if msg_type == "execution_start":
+            self._progress[prompt_id] = {"status": "running", "progress": 0.0}
+        elif msg_type == "progress":
+            maximum = data.get("max") or 1
+            self._progress[prompt_id] = {
+                "status": "running",
+                "progress": round(min(data.get("value", 0) / maximum, 0.99), 3),
+                "current_node": data.get("node"),
+            }
+        elif msg_type == "executing":
+            if data.get("node") is None:
+                self._finish(prompt_id, "success")
+            else:
+                live = self._progress.setdefault(prompt_id, {"status": "running", "progress": 0.0})
+                live["status"] = "running"
+                live["current_node"] = data.get("node")
+        elif msg_type == "execution_success":
+            self._finish(prompt_id, "success")
+        elif msg_type in ("execution_error", "execution_interrupted"):
+            self._finish(prompt_id, "error")
+
+    def _finish(self, prompt_id: str, outcome: str):
+        self._done[prompt_id] = outcome
+        self._done.move_to_end(prompt_id)
+        while len(self._done) > _DONE_MEMORY:
+            self._done.popitem(last=False)
+        for event in self._waiters.pop(prompt_id, ()):
+            event.set()
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "ws_connected": self._ws_connected,
+            "waiting": len(self._waiters),
+            **self._stats,
+        }
+
+
+_clients: dict[str, ComfyUIClient] = {}
+
+
+def get_comfyui_client(base_url: str | None = None) -> ComfyUIClient:
+    """Return the shared client for a ComfyUI backend (default: COMFYUI_URL)."""
+    url = (base_url or COMFYUI_URL).rstrip("/")
+    client = _clients.get(url)
+    if client is None:
+        client = ComfyUIClient(url)
+        _clients[url] = client
+    return client
+
+
+_inflight: dict[str, int] = {}
+
+
+@asynccontextmanager
+async def backend_slot(urls: list[str] | None = None):
+    """Lease the least-loaded ComfyUI backend for one job; yields its base URL."""
+    candidates = urls or COMFYUI_URLS
+    url = min(candidates, key=lambda u: _inflight.get(u, 0))
+    _inflight[url] = _inflight.get(url, 0) + 1
+    try:
+        yield url
+    finally:
+        _inflight[url] -= 1
+
+
+def inflight() -> dict[str, int]:
+    """Jobs currently leased per backend via backend_slot()."""
+    return {url: _inflight.get(url, 0) for url in COMFYUI_URLS}
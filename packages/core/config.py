@@ -17,18 +17,75 @@ _SCRIPT_DIR = _PROJECT_DIR / "server"                    # server/
 BASE_PATH = _PROJECT_DIR / "datasets"
 MOVIES_DIR = BASE_PATH / "_movies"
 MOVIES_DIR.mkdir(parents=True, exist_ok=True)
+# On-demand HLS packages of scene/shot/episode videos (safe to delete)
+HLS_CACHE_DIR = Path(os.getenv("HLS_CACHE_DIR", str(BASE_PATH / "_hls")))
+# Normalized scene/shot pieces and transition segments reused across
+# re-assemblies (safe to delete; entries unused for ASSEMBLY_CACHE_MAX_AGE_DAYS are pruned)
+ASSEMBLY_CACHE_DIR = Path(os.getenv("ASSEMBLY_CACHE_DIR", str(BASE_PATH.parent / "output" / "_assembly")))
+ASSEMBLY_CACHE_MAX_AGE_DAYS = float(os.getenv("ASSEMBLY_CACHE_MAX_AGE_DAYS", "14"))
 
 # ComfyUI endpoints & paths
 COMFYUI_URL = "http://127.0.0.1:8188"
 COMFYUI_OUTPUT_DIR = Path("/opt/ComfyUI/output")
 COMFYUI_INPUT_DIR = Path("/opt/ComfyUI/input")
 
+# All ComfyUI backends scene shots may be spread across (comma-separated URLs,
+# e.g. one instance per GPU). They must share the input/output dirs above.
+COMFYUI_URLS = [
+    u.strip().rstrip("/") for u in os.getenv("COMFYUI_URLS", COMFYUI_URL).split(",") if u.strip()
+] or [COMFYUI_URL]
+# Shots of one scene in flight per backend — 2 keeps each ComfyUI queue fed
+SCENE_SHOTS_PER_BACKEND = int(os.getenv("SCENE_SHOTS_PER_BACKEND", "2"))
+
+# Durable job queue: workers in this process (0 = API-only) and lease length;
+# workers heartbeat every lease/3 and a job is re-queued once its lease lapses.
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "1"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+
 # Default vision model for all VLM tasks
 VISION_MODEL = "gemma3:12b"
 
 # Ollama endpoint
 OLLAMA_URL = "http://localhost:11434"
 
+# LLM gateway (packages/core/llm_gateway.py): requests in flight against Ollama,
+# max queue wait, how long a request can be passed over for the loaded model,
+# and the response cache (in-memory LRU entries + SQLite file, entry lifetime)
+OLLAMA_CONCURRENCY = int(os.getenv("OLLAMA_CONCURRENCY", "2"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "900"))
+LLM_AFFINITY_MAX_WAIT = float(os.getenv("LLM_AFFINITY_MAX_WAIT", "10"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(BASE_PATH.parent / "output" / "llm_cache.sqlite3")))
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+
+# CPU pre-screen before vision review (packages/visual_pipeline/prescreen.py).
+# Metric floors use server/quality_scorer.py units: blur = Laplacian variance / 1000,
+# contrast = grayscale std / 255, brightness = grayscale mean / 255.
+# PRESCREEN_MIN_CLIP: CLIP similarity to the character's references below which
+# an image is rejected as the wrong character (0 disables the CLIP check).
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "1") != "0"
+PRESCREEN_MIN_BLUR = float(os.getenv("PRESCREEN_MIN_BLUR", "0.01"))
+PRESCREEN_MIN_CONTRAST = float(os.getenv("PRESCREEN_MIN_CONTRAST", "0.02"))
+PRESCREEN_MIN_BRIGHTNESS = float(os.getenv("PRESCREEN_MIN_BRIGHTNESS", "0.04"))
+PRESCREEN_MAX_BRIGHTNESS = float(os.getenv("PRESCREEN_MAX_BRIGHTNESS", "0.96"))
+PRESCREEN_MIN_CLIP = float(os.getenv("PRESCREEN_MIN_CLIP", "0.55"))
+
+# Video QC frame review (scene_generation/video_vision.py): "batch" sends every sampled
+# frame in one multi-image request, "sheet" sends one contact-sheet image, "per_frame"
+# makes one request per frame. Batch/sheet fall back to per_frame if the reply can't be parsed.
+VIDEO_QC_REVIEW_MODE = os.getenv("VIDEO_QC_REVIEW_MODE", "batch")
+
+# Production orchestrator tick: projects evaluated in parallel, and how often an
+# entry with no change event or updated_at bump is re-checked anyway (LoRA files
+# appearing on disk, external edits).
+ORCHESTRATOR_CONCURRENCY = int(os.getenv("ORCHESTRATOR_CONCURRENCY", "4"))
+ORCHESTRATOR_RECHECK_SECONDS = float(os.getenv("ORCHESTRATOR_RECHECK_SECONDS", "600"))
+
+# Learning rollups (packages/core/learning_rollups.py): periodic refresh interval and
+# how long a review event waits so a burst of reviews shares one refresh.
+LEARNING_ROLLUP_INTERVAL = float(os.getenv("LEARNING_ROLLUP_INTERVAL", "300"))
+LEARNING_ROLLUP_DEBOUNCE = float(os.getenv("LEARNING_ROLLUP_DEBOUNCE", "5"))
+
 # Sampler name mapping: human-readable → ComfyUI internal (sampler_name, scheduler)
 SAMPLER_MAP = {
     "DPM++ 2M Karras": ("dpmpp_2m", "karras"),
@@ -90,6 +147,19 @@ def _load_db_config() -> dict:
 
 DB_CONFIG = _load_db_config()
 
+# asyncpg pool sizing — every package shares this pool (graph sync excepted)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+# Seconds to wait for a free pooled connection before raising
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "30"))
+# Prepared statements cached per pooled connection
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+# Interactive sessions — durable SQLite tier shared by every uvicorn worker on the host
+INTERACTIVE_SESSION_DB = Path(os.getenv("INTERACTIVE_SESSION_DB", str(BASE_PATH / ".interactive_sessions.sqlite3")))
+# Sessions kept deserialized in memory per worker (LRU); the rest load on demand
+INTERACTIVE_MAX_HOT_SESSIONS = int(os.getenv("INTERACTIVE_MAX_HOT_SESSIONS", "256"))
+
 
 async def load_config():
     """Async config initialization hook for app startup."""
@@ -2,15 +2,29 @@
 
 Migrations have been split into db_migrations.py for modularity.
 This module re-exports run_migrations for backward compatibility.
+
+All packages share one asyncpg pool. connect_pooled() hands out a pooled
+connection whose close() returns it to the pool; inside an HTTP request
+(request_db_scope dependency) sequential calls reuse one connection.
+connect_direct() remains for Apache AGE graph sync, which needs a fresh session.
 """
 
+import asyncio
+import contextvars
 import json
 import logging
 import time as _time
+from contextlib import asynccontextmanager
 
 import asyncpg
 
-from .config import DB_CONFIG
+from .config import (
+    DB_CONFIG,
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MIN_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +35,20 @@ _pool: asyncpg.Pool | None = None
 _char_project_cache: dict = {}
 _cache_time: float = 0
 
+# Acquisitions slower than this count as pool saturation
+_SATURATION_WAIT_MS = 50.0
+
+_pool_metrics = {
+    "acquired": 0,
+    "released": 0,
+    "request_reuse": 0,
+    "saturated": 0,
+    "timeouts": 0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+    "waiting": 0,
+}
+
 
 async def init_pool():
     """Create the asyncpg connection pool. Call once at startup."""
@@ -30,10 +58,14 @@ async def init_pool():
         database=DB_CONFIG["database"],
         user=DB_CONFIG["user"],
         password=DB_CONFIG["password"],
-        min_size=2,
-        max_size=10,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+    )
+    logger.info(
+        f"DB pool created: {DB_CONFIG['database']}@{DB_CONFIG['host']} "
+        f"(size {DB_POOL_MIN_SIZE}-{DB_POOL_MAX_SIZE})"
     )
-    logger.info(f"DB pool created: {DB_CONFIG['database']}@{DB_CONFIG['host']}")
 
 
 async def get_pool() -> asyncpg.Pool:
@@ -50,13 +82,176 @@ async def get_connection():
     return pool.acquire()
 
 
-async def connect_direct() -> asyncpg.Connection:
-    """Open a direct (non-pooled) connection. Caller must close it."""
+class PooledConnection:
+    """A pooled asyncpg connection with connect_direct()-style close().
+
+    Attribute access is delegated to the underlying connection; close()
+    releases it back to the pool (or back to the request scope) exactly once.
+    Also usable as `async with await connect_pooled() as conn:`.
+    """
+
+    __slots__ = ("_conn", "_release", "_closed")
+
+    def __init__(self, conn, release):
+        self._conn = conn
+        self._release = release
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def is_closed(self) -> bool:
+        return self._closed or self._conn.is_closed()
+
+    async def close(self, *, timeout: float | None = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await self._release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+
+class _RequestScope:
+    """Holds one lazily acquired pooled connection for the duration of a request."""
+
+    __slots__ = ("conn", "busy", "closed", "task")
+
+    def __init__(self):
+        self.conn = None
+        self.busy = False
+        self.closed = False
+        self.task = asyncio.current_task()
+
+
+_request_scope: contextvars.ContextVar[_RequestScope | None] = contextvars.ContextVar(
+    "db_request_scope", default=None,
+)
+
+
+async def _acquire_from_pool():
+    pool = await get_pool()
+    _pool_metrics["waiting"] += 1
+    t0 = _time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT)
+    except TimeoutError:
+        _pool_metrics["timeouts"] += 1
+        logger.error(f"DB pool exhausted: no connection within {DB_POOL_ACQUIRE_TIMEOUT}s")
+        raise
+    finally:
+        _pool_metrics["waiting"] -= 1
+    wait_ms = (_time.perf_counter() - t0) * 1000
+    _pool_metrics["acquired"] += 1
+    _pool_metrics["total_wait_ms"] += wait_ms
+    _pool_metrics["max_wait_ms"] = max(_pool_metrics["max_wait_ms"], wait_ms)
+    if wait_ms > _SATURATION_WAIT_MS:
+        _pool_metrics["saturated"] += 1
+    return pool, conn
+
+
+async def connect_pooled() -> PooledConnection:
+    """Get a pooled connection. Caller must close() it (returns it to the pool).
+
+    Within a request scope, the request handler's own task reuses the
+    request's connection when it is not already in use. Concurrent users
+    (asyncio.gather, spawned tasks) get their own pooled connection.
+    """
+    scope = _request_scope.get()
+    if (
+        scope is not None and not scope.closed and not scope.busy
+        and scope.task is asyncio.current_task()
+    ):
+        scope.busy = True
+        if scope.conn is None:
+            try:
+                _, scope.conn = await _acquire_from_pool()
+            except BaseException:
+                scope.busy = False
+                raise
+        else:
+            _pool_metrics["request_reuse"] += 1
+
+        async def _release_to_scope():
+            scope.busy = False
+
+        return PooledConnection(scope.conn, _release_to_scope)
+
+    pool, conn = await _acquire_from_pool()
+
+    async def _release_to_pool():
+        _pool_metrics["released"] += 1
+        await pool.release(conn)
+
+    return PooledConnection(conn, _release_to_pool)
+
+
+@asynccontextmanager
+async def pooled_connection():
+    """`async with pooled_connection() as conn:` — connect_pooled() as a context."""
+    conn = await connect_pooled()
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+async def request_db_scope():
+    """FastAPI dependency: reuse one pooled connection per request.
+
+    The connection is acquired lazily on first use and released when the
+    request finishes — also if the handler raised before closing it.
+    Registered app-wide in server/app.py.
+    """
+    scope = _RequestScope()
+    token = _request_scope.set(scope)
+    try:
+        yield
+    finally:
+        scope.closed = True
+        _request_scope.reset(token)
+        if scope.conn is not None:
+            conn, scope.conn = scope.conn, None
+            _pool_metrics["released"] += 1
+            await (await get_pool()).release(conn)
+
+
+def pool_stats() -> dict:
+    """Pool size, utilisation and acquire-wait metrics."""
+    m = dict(_pool_metrics)
+    m["avg_wait_ms"] = round(m["total_wait_ms"] / m["acquired"], 2) if m["acquired"] else 0.0
+    m["total_wait_ms"] = round(m["total_wait_ms"], 1)
+    m["max_wait_ms"] = round(m["max_wait_ms"], 1)
+    if _pool is not None:
+        size, idle = _pool.get_size(), _pool.get_idle_size()
+        m.update({
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": _pool.get_min_size(),
+            "max_size": _pool.get_max_size(),
+            "utilisation": round((size - idle) / _pool.get_max_size(), 2),
+        })
+    return m
+
+
+async def connect_direct(**kwargs) -> asyncpg.Connection:
+    """Open a direct (non-pooled) connection. Caller must close it.
+
+    Only for sessions that must not be shared (Apache AGE graph sync);
+    everything else should use connect_pooled().
+    """
     return await asyncpg.connect(
         host=DB_CONFIG["host"],
         database=DB_CONFIG["database"],
         user=DB_CONFIG["user"],
         password=DB_CONFIG["password"],
+        **kwargs,
     )
 
 
@@ -81,19 +276,17 @@ async def log_model_change(
     Actions: 'switch', 'download', 'remove', 'config_update', 'profile_add'
     """
     try:
-        conn = await connect_direct()
-        await conn.execute("SET search_path TO public")
-        row = await conn.fetchrow(
-            """INSERT INTO model_audit_log
-               (action, checkpoint_model, previous_model, project_name,
-                style_name, reason, changed_by, metadata)
-               VALUES ($1, $2, $3, $4, $5, $6, $7, $8::jsonb)
-               RETURNING id""",
-            action, checkpoint_model, previous_model, project_name,
-            style_name, reason, changed_by,
-            json.dumps(metadata or {}),
-        )
-        await conn.close()
+        async with pooled_connection() as conn:
+            row = await conn.fetchrow(
+                """INSERT INTO public.model_audit_log
+                   (action, checkpoint_model, previous_model, project_name,
+                    style_name, reason, changed_by, metadata)
+                   VALUES ($1, $2, $3, $4, $5, $6, $7, $8::jsonb)
+                   RETURNING id""",
+                action, checkpoint_model, previous_model, project_name,
+                style_name, reason, changed_by,
+                json.dumps(metadata or {}),
+            )
         logger.info(f"Model audit: {action} {checkpoint_model} (project={project_name})")
         return row["id"] if row else None
     except Exception as e:
@@ -108,24 +301,23 @@ async def get_char_project_map() -> dict:
         return _char_project_cache
 
     try:
-        conn = await connect_direct()
-        rows = await conn.fetch("""
-            SELECT c.name,
-                   REGEXP_REPLACE(LOWER(REPLACE(c.name, ' ', '_')), '[^a-z0-9_-]', '', 'g') as slug,
-                   c.design_prompt, c.appearance_data, p.name as project_name,
-                   p.default_style,
-                   gs.checkpoint_model, gs.cfg_scale, gs.steps,
-                   gs.width, gs.height, gs.sampler, gs.scheduler,
-                   gs.positive_prompt_template, gs.negative_prompt_template,
-                   gs.model_architecture, gs.prompt_format,
-                   ws.style_preamble
-            FROM characters c
-            JOIN projects p ON c.project_id = p.id
-            LEFT JOIN generation_styles gs ON gs.style_name = p.default_style
-            LEFT JOIN world_settings ws ON ws.project_id = p.id
-            WHERE COALESCE(c.archived, false) = false
-        """)
-        await conn.close()
+        async with pooled_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT c.name,
+                       REGEXP_REPLACE(LOWER(REPLACE(c.name, ' ', '_')), '[^a-z0-9_-]', '', 'g') as slug,
+                       c.design_prompt, c.appearance_data, p.name as project_name,
+                       p.default_style,
+                       gs.checkpoint_model, gs.cfg_scale, gs.steps,
+                       gs.width, gs.height, gs.sampler, gs.scheduler,
+                       gs.positive_prompt_template, gs.negative_prompt_template,
+                       gs.model_architecture, gs.prompt_format,
+                       ws.style_preamble
+                FROM characters c
+                JOIN projects p ON c.project_id = p.id
+                LEFT JOIN generation_styles gs ON gs.style_name = p.default_style
+                LEFT JOIN world_settings ws ON ws.project_id = p.id
+                WHERE COALESCE(c.archived, false) = false
+            """)
 
         mapping = {}
         for row in rows:
@@ -174,7 +366,7 @@ async def get_approved_images_for_project(project_id: int) -> dict[str, list[str
     """
     from .config import BASE_PATH
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT a.character_slug, a.image_name, COALESCE(a.quality_score, 0.5) as quality_score
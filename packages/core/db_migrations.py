@@ -11,15 +11,16 @@ consider switching to numbered migration files with a version table.
 
 import logging
 
-from .db import connect_direct
+from .db import connect_pooled
 
 logger = logging.getLogger(__name__)
 
 
 async def run_migrations():
     """Run schema migrations at startup. Idempotent (uses IF NOT EXISTS)."""
+    conn = None
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         await conn.execute("SET search_path TO public")
 
         # world_settings table
@@ -674,9 +675,73 @@ async def run_migrations():
             "CREATE INDEX IF NOT EXISTS idx_autonomy_type ON autonomy_decisions(decision_type)",
             "CREATE INDEX IF NOT EXISTS idx_autonomy_date ON autonomy_decisions(created_at)",
             "CREATE INDEX IF NOT EXISTS idx_autonomy_character ON autonomy_decisions(character_slug)",
+            # Learning rollup refresh: changed rows since the watermark, one partition at a time
+            "CREATE INDEX IF NOT EXISTS idx_gen_history_reviewed ON generation_history(reviewed_at)",
+            "CREATE INDEX IF NOT EXISTS idx_gen_history_char_date ON generation_history(character_slug, generated_at)",
         ]:
             await conn.execute(idx_sql)
 
+        # --- Learning rollups (packages/core/learning_rollups.py) ---
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS generation_rollups (
+                day DATE NOT NULL,
+                character_slug VARCHAR(255),
+                project_name VARCHAR(255),
+                checkpoint_model VARCHAR(255),
+                sampler VARCHAR(100),
+                scheduler VARCHAR(100),
+                status VARCHAR(50),
+                quality_band SMALLINT,
+                n INTEGER NOT NULL,
+                quality_sum DOUBLE PRECISION,
+                quality_min DOUBLE PRECISION,
+                quality_max DOUBLE PRECISION,
+                last_generated TIMESTAMP,
+                cfg_sketch JSONB NOT NULL DEFAULT '{}',
+                steps_sketch JSONB NOT NULL DEFAULT '{}',
+                width_sketch JSONB NOT NULL DEFAULT '{}',
+                height_sketch JSONB NOT NULL DEFAULT '{}'
+            )
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS rejection_rollups (
+                character_slug VARCHAR(255) NOT NULL,
+                category TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                latest_at TIMESTAMP,
+                PRIMARY KEY (character_slug, category)
+            )
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS character_recent_quality (
+                character_slug VARCHAR(255) PRIMARY KEY,
+                scores DOUBLE PRECISION[] NOT NULL DEFAULT '{}',
+                updated_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        for idx_sql in [
+            "CREATE INDEX IF NOT EXISTS idx_gen_rollups_character ON generation_rollups(character_slug, day)",
+            "CREATE INDEX IF NOT EXISTS idx_gen_rollups_project ON generation_rollups(project_name, day)",
+            "CREATE INDEX IF NOT EXISTS idx_gen_rollups_day ON generation_rollups(day)",
+        ]:
+            await conn.execute(idx_sql)
+        # Quantile of merged value -> count sketches: smallest value whose
+        # cumulative count reaches q of the total (QuantileSketch.quantile)
+        await conn.execute("""
+            CREATE OR REPLACE FUNCTION sketch_quantile(sketches JSONB[], q DOUBLE PRECISION)
+            RETURNS DOUBLE PRECISION LANGUAGE sql IMMUTABLE AS $$
+                WITH merged AS (
+                    SELECT kv.key::DOUBLE PRECISION AS value, SUM(kv.value::BIGINT) AS n
+                    FROM unnest(sketches) AS s(sketch), jsonb_each_text(s.sketch) AS kv
+                    GROUP BY 1
+                ), cumulative AS (
+                    SELECT value, SUM(n) OVER (ORDER BY value) AS running, SUM(n) OVER () AS total
+                    FROM merged
+                )
+                SELECT value FROM cumulative WHERE running >= q * total ORDER BY value LIMIT 1
+            $$
+        """)
+
         # --- Narrative State Machine (NSM) ---
 
         # Character state per scene
@@ -775,7 +840,86 @@ async def run_migrations():
             "CREATE INDEX IF NOT EXISTS idx_regen_queue_scene ON regeneration_queue(scene_id)"
         )
 
-        await conn.close()
+        # --- Incremental graph sync ---
+        # updated_at + touch trigger on mutable tables mirrored into the AGE graph,
+        # so graph_sync only re-reads rows changed since its per-table watermark.
+        await conn.execute("""
+            CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at = NOW();
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql
+        """)
+        for table in ("generation_history", "scenes", "shots"):
+            await conn.execute(f"""
+                DO $$ BEGIN
+                    ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP DEFAULT NOW();
+                EXCEPTION WHEN duplicate_column THEN NULL;
+                END $$
+            """)
+            await conn.execute(f"""
+                DO $$ BEGIN
+                    CREATE TRIGGER trg_{table}_touch BEFORE UPDATE ON {table}
+                        FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+                EXCEPTION WHEN duplicate_object THEN NULL;
+                END $$
+            """)
+            await conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_updated_at ON {table}(updated_at)"
+            )
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS graph_sync_state (
+                table_name VARCHAR(100) PRIMARY KEY,
+                watermark TIMESTAMP,
+                rows_synced BIGINT NOT NULL DEFAULT 0,
+                last_synced_at TIMESTAMP
+            )
+        """)
+
+        # --- Durable job queue (packages/core/job_queue.py) ---
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_queue (
+                id BIGSERIAL PRIMARY KEY,
+                kind VARCHAR(50) NOT NULL,
+                dedupe_key TEXT,
+                payload JSONB NOT NULL DEFAULT '{}',
+                priority INTEGER NOT NULL DEFAULT 100,
+                status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+                locked_by TEXT,
+                lease_expires_at TIMESTAMPTZ,
+                stage TEXT,
+                stage_timings JSONB NOT NULL DEFAULT '{}',
+                last_error TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                started_at TIMESTAMPTZ,
+                finished_at TIMESTAMPTZ
+            )
+        """)
+        # Claim order: lower priority value first, then due time, then FIFO
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_queue_claim
+                ON job_queue (kind, priority, run_after, id) WHERE status = 'queued'
+        """)
+        # One queued/running job per (kind, dedupe_key)
+        await conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_job_queue_dedupe
+                ON job_queue (kind, dedupe_key) WHERE status IN ('queued', 'running')
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_queue_lease
+                ON job_queue (lease_expires_at) WHERE status = 'running'
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_queue_finished
+                ON job_queue (finished_at) WHERE finished_at IS NOT NULL
+        """)
+
         logger.info("Schema migrations completed successfully (incl. Phase 1 autonomy + NSM tables)")
     except Exception as e:
         logger.warning(f"Schema migration failed (non-fatal): {e}")
+    finally:
+        if conn is not None:
+            await conn.close()
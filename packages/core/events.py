@@ -72,6 +72,8 @@ class EventBus:
         self._handlers: dict[str, list[Callable]] = defaultdict(list)
         self._emit_count: int = 0
         self._error_count: int = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
 
     def on(self, event: str):
         """Decorator to register an async handler for an event type."""
@@ -85,6 +87,30 @@ class EventBus:
         """Imperative handler registration (alternative to decorator)."""
         self._handlers[event].append(handler)
 
+    def bind_loop(self, loop: asyncio.AbstractEventLoop | None = None):
+        """Remember the app's event loop so emit_nowait() works from worker threads."""
+        self._loop = loop or asyncio.get_running_loop()
+
+    def emit_nowait(self, event: str, data: dict[str, Any] | None = None):
+        """Fire-and-forget emit for sync code, including asyncio.to_thread() workers.
+
+        On the loop thread the emit is scheduled as a task; from other threads
+        it is handed to the bound loop. Dropped if there is no loop to run on.
+        """
+        if not self._handlers.get(event):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                return
+            asyncio.run_coroutine_threadsafe(self.emit(event, data), loop)
+            return
+        task = loop.create_task(self.emit(event, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
     async def emit(self, event: str, data: dict[str, Any] | None = None):
         """Emit an event to all registered handlers. Errors logged, not raised."""
         handlers = self._handlers.get(event, [])
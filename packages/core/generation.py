@@ -28,7 +28,9 @@ from packages.core.events import event_bus, GENERATION_SUBMITTED
 from packages.core.audit import log_generation
 from packages.core.model_selector import recommend_params
 from packages.core.model_profiles import get_model_profile, translate_prompt
+from packages.lora_training.approval_index import get_index
 from packages.lora_training.feedback import get_feedback_negatives, register_pending_image
+from packages.core.comfyui_client import get_comfyui_client
 from packages.visual_pipeline.comfyui import (
     build_comfyui_workflow,
     submit_comfyui_workflow,
@@ -178,13 +180,12 @@ def build_character_negatives(appearance_data, design_prompt: str = "") -> str:
 
 async def _get_style_override(style_name: str) -> dict | None:
     """Fetch a generation style by name from the DB."""
-    from packages.core.db import connect_direct
+    from packages.core.db import pooled_connection
     try:
-        conn = await connect_direct()
-        row = await conn.fetchrow(
-            "SELECT * FROM generation_styles WHERE style_name = $1", style_name
-        )
-        await conn.close()
+        async with pooled_connection() as conn:
+            row = await conn.fetchrow(
+                "SELECT * FROM generation_styles WHERE style_name = $1", style_name
+            )
         if not row:
             logger.warning(f"style_override '{style_name}' not found in generation_styles")
             return None
@@ -389,7 +390,7 @@ async def generate_batch(
         # Acquire semaphore slot before submitting — limits ComfyUI queue depth
         async with _comfyui_slot:
             try:
-                prompt_id = submit_comfyui_workflow(workflow)
+                prompt_id = await submit_comfyui_workflow(workflow)
             except Exception as e:
                 logger.error(f"generate_batch: ComfyUI submission failed for {character_slug}: {e}")
                 continue
@@ -578,43 +579,46 @@ async def generate_scene_shot_image(
 
     async with _comfyui_slot:
         try:
-            prompt_id = submit_comfyui_workflow(workflow)
+            prompt_id = await submit_comfyui_workflow(workflow)
         except Exception as e:
             logger.error(f"Scene shot submission failed: {e}")
             return {"status": "error", "error": str(e)}
 
-    # Poll for completion
-    for _ in range(120):  # 2 min timeout
-        await asyncio.sleep(1)
-        progress = get_comfyui_progress(prompt_id)
-        if progress["status"] == "completed":
-            return {
-                "prompt_id": prompt_id,
-                "seed": seed,
-                "status": "completed",
-                "images": progress.get("images", []),
-                "multi_character": is_multi,
-            }
+    # Wait for completion (2 min timeout)
+    images = await _poll_until_complete(prompt_id, timeout=120, interval=1.0)
+    if images is None:
+        progress = await get_comfyui_progress(prompt_id)
         if progress["status"] == "error":
             return {"status": "error", "error": progress.get("error", "unknown")}
-
-    return {"status": "timeout", "prompt_id": prompt_id}
+        return {"status": "timeout", "prompt_id": prompt_id}
+    return {
+        "prompt_id": prompt_id,
+        "seed": seed,
+        "status": "completed",
+        "images": images,
+        "multi_character": is_multi,
+    }
 
 
 async def _poll_until_complete(
     prompt_id: str, timeout: int = 300, interval: float = 3.0
 ) -> list[str] | None:
-    """Poll ComfyUI until a job completes. Returns output filenames or None on timeout."""
+    """Wait for a ComfyUI job to complete. Returns output filenames or None on timeout.
+
+    Between progress checks we wait on the client's WebSocket completion event,
+    so a finished job is picked up immediately instead of on the next tick.
+    """
     import time
+    client = get_comfyui_client()
     start = time.time()
     while time.time() - start < timeout:
-        progress = get_comfyui_progress(prompt_id)
+        progress = await get_comfyui_progress(prompt_id)
         if progress.get("status") == "completed":
             return progress.get("images", [])
         if progress.get("status") == "error":
             logger.warning(f"ComfyUI error for {prompt_id}: {progress.get('error')}")
             return None
-        await asyncio.sleep(interval)
+        await client.wait_event(prompt_id, interval)
     return None
 
 
@@ -663,6 +667,8 @@ def _copy_to_dataset(
             "generated_at": datetime.now(timezone.utc).isoformat(),
         }
         dest.with_suffix(".meta.json").write_text(json.dumps(meta, indent=2))
+        # A scan between the PNG copy and the sidecar writes indexed it bare
+        get_index(BASE_PATH).refresh_image(character_slug, unique_name)
 
         copied.append(unique_name)
 
@@ -9,7 +9,7 @@ import logging
 
 import asyncpg
 
-from .config import DB_CONFIG
+from .db import connect_direct
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +17,7 @@ GRAPH_NAME = "anime_graph"
 
 
 async def _get_conn() -> asyncpg.Connection:
-    conn = await asyncpg.connect(
-        host=DB_CONFIG["host"],
-        database=DB_CONFIG["database"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        statement_cache_size=0,
-    )
+    conn = await connect_direct(statement_cache_size=0)
     await conn.execute('SET search_path = ag_catalog, "$user", public')
     return conn
 
@@ -16,16 +16,29 @@ router = APIRouter()
 
 
 @router.post("/sync")
-async def trigger_sync():
-    """Trigger full graph sync from relational tables. Idempotent."""
+async def trigger_sync(full: bool = False):
+    """Sync the graph from relational tables. Idempotent.
+
+    Incremental by default; full=true re-reads every row regardless of watermarks.
+    """
     try:
-        results = await graph_sync.full_sync()
-        return {"status": "ok", "synced": results}
+        results = await graph_sync.full_sync(incremental=not full)
+        return {"status": "ok", "mode": "full" if full else "incremental", "synced": results}
     except Exception as e:
         logger.error(f"Graph sync failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/sync/metrics")
+async def get_sync_metrics():
+    """Rows synced, batch latency and replication lag per source table."""
+    try:
+        return await graph_sync.sync_metrics()
+    except Exception as e:
+        logger.error(f"Graph sync metrics failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/stats")
 async def get_graph_stats():
     """Vertex and edge counts for the anime graph."""
@@ -10,11 +10,14 @@ asyncpg requires SET search_path per connection to include ag_catalog.
 
 import json
 import logging
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import asyncpg
 
-from .config import DB_CONFIG, BASE_PATH
+from .config import BASE_PATH
+from .db import connect_direct
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +30,7 @@ async def _get_conn() -> asyncpg.Connection:
     statement_cache_size=0 is required because AGE uses custom types (agtype)
     that asyncpg's prepared statement cache can't handle.
     """
-    conn = await asyncpg.connect(
-        host=DB_CONFIG["host"],
-        database=DB_CONFIG["database"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        statement_cache_size=0,
-    )
+    conn = await connect_direct(statement_cache_size=0)
     await conn.execute('SET search_path = ag_catalog, "$user", public')
     return conn
 
@@ -86,7 +83,123 @@ def _esc(value) -> str:
     return f"'{s}'"
 
 
+def _literal(value) -> str:
+    """Render a value (incl. nested dicts/lists) as a Cypher literal."""
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}: {_literal(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_literal(v) for v in value) + "]"
+    return _esc(value)
+
+
+# ── Batching, watermarks & metrics ──────────────────────────────────────
+
+# Rows per UNWIND statement — keeps each Cypher text well under a few hundred KB
+BATCH_SIZE = 200
+
+# Re-read this far behind each watermark so rows committed late by a long
+# transaction are still picked up. MERGE makes the re-read rows harmless.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+# Watermarked sources: state key → (table, change column)
+_TRACKED = {
+    "generation_history": ("generation_history", "updated_at"),
+    "approvals": ("approvals", "created_at"),
+    "rejections": ("rejections", "created_at"),
+    "feedback": ("rejections", "created_at"),
+    "scenes": ("scenes", "updated_at"),
+    "shots": ("shots", "updated_at"),
+}
+
+_metrics: dict[str, dict] = {}
+
+
+def _record_batch(key: str, rows: int, elapsed_ms: float):
+    m = _metrics.setdefault(key, {
+        "rows_synced": 0, "batches": 0, "total_batch_ms": 0.0,
+        "last_batch_ms": None, "max_batch_ms": 0.0, "last_run_rows": 0, "last_run_at": None,
+    })
+    m["rows_synced"] += rows
+    m["batches"] += 1
+    m["total_batch_ms"] += elapsed_ms
+    m["last_batch_ms"] = round(elapsed_ms, 1)
+    m["max_batch_ms"] = round(max(m["max_batch_ms"], elapsed_ms), 1)
+
+
+def _record_run(key: str, rows: int):
+    m = _metrics.setdefault(key, {
+        "rows_synced": 0, "batches": 0, "total_batch_ms": 0.0,
+        "last_batch_ms": None, "max_batch_ms": 0.0, "last_run_rows": 0, "last_run_at": None,
+    })
+    m["last_run_rows"] = rows
+    m["last_run_at"] = datetime.now().isoformat(timespec="seconds")
+
+
+async def _unwind(
+    conn: asyncpg.Connection, key: str, rows: list[dict], body: str, tolerate_errors: bool = False,
+) -> int:
+    """Run `UNWIND [rows] AS row <body>` in BATCH_SIZE chunks. Returns rows written.
+
+    With tolerate_errors, a failing batch (e.g. edge endpoints missing) is
+    logged and skipped instead of aborting the sync.
+    """
+    written = 0
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        t0 = time.perf_counter()
+        try:
+            await _cypher_void(conn, f"UNWIND {_literal(batch)} AS row {body}")
+        except Exception as e:
+            if not tolerate_errors:
+                raise
+            logger.warning(f"graph_sync: {key} batch of {len(batch)} skipped: {e}")
+            continue
+        _record_batch(key, len(batch), (time.perf_counter() - t0) * 1000)
+        written += len(batch)
+    return written
+
+
+async def _get_watermark(conn: asyncpg.Connection, key: str) -> datetime | None:
+    try:
+        return await conn.fetchval(
+            "SELECT watermark FROM graph_sync_state WHERE table_name = $1", key,
+        )
+    except asyncpg.UndefinedTableError:
+        return None
+
+
+async def _since(conn: asyncpg.Connection, key: str, incremental: bool) -> datetime | None:
+    """Lower bound for the change column, or None for a full pass."""
+    if not incremental:
+        return None
+    watermark = await _get_watermark(conn, key)
+    return watermark - WATERMARK_OVERLAP if watermark else None
+
+
+async def _advance_watermark(conn: asyncpg.Connection, key: str, rows: list, column: str):
+    """Move the watermark to the newest change seen (never backwards)."""
+    _record_run(key, len(rows))
+    newest = max((r[column] for r in rows if r[column] is not None), default=None)
+    if newest is None:
+        return
+    try:
+        await conn.execute("""
+            INSERT INTO graph_sync_state (table_name, watermark, rows_synced, last_synced_at)
+            VALUES ($1, $2, $3, NOW())
+            ON CONFLICT (table_name) DO UPDATE SET
+                watermark = GREATEST(graph_sync_state.watermark, EXCLUDED.watermark),
+                rows_synced = graph_sync_state.rows_synced + EXCLUDED.rows_synced,
+                last_synced_at = NOW()
+        """, key, newest, len(rows))
+    except asyncpg.UndefinedTableError:
+        logger.debug("graph_sync: graph_sync_state missing — watermark not persisted")
+
+
 # ── Sync Functions ──────────────────────────────────────────────────────
+#
+# Reference tables (projects, characters, checkpoints, episodes) are small and
+# re-read in full each run, but written in batches. History tables are
+# watermarked: only rows changed since the last sync are read.
 
 
 async def sync_projects(conn: asyncpg.Connection | None = None) -> int:
@@ -100,27 +213,22 @@ async def sync_projects(conn: asyncpg.Connection | None = None) -> int:
             SELECT p.id, p.name, p.default_style, p.content_rating, p.premise
             FROM projects p
         """)
-
-        count = 0
-        for row in rows:
-            props = {
-                "db_id": row["id"],
-                "name": row["name"],
-                "default_style": row["default_style"],
-                "content_rating": row["content_rating"],
-                "premise": row["premise"],
-            }
-            prop_sets = ", ".join(
-                f"p.{k} = {_esc(v)}" for k, v in props.items() if k != "name" and v is not None
-            )
-            query = f"""
-                MERGE (p:Project {{name: {_esc(row['name'])}}})
-                SET {prop_sets}
-                RETURN p
-            """
-            await _cypher(conn, query)
-            count += 1
-
+        batch = [{
+            "name": row["name"],
+            "db_id": row["id"],
+            "default_style": row["default_style"],
+            "content_rating": row["content_rating"],
+            "premise": row["premise"],
+        } for row in rows]
+        # coalesce keeps existing values when a column is NULL (as before)
+        count = await _unwind(conn, "projects", batch, """
+            MERGE (p:Project {name: row.name})
+            SET p.db_id = coalesce(row.db_id, p.db_id),
+                p.default_style = coalesce(row.default_style, p.default_style),
+                p.content_rating = coalesce(row.content_rating, p.content_rating),
+                p.premise = coalesce(row.premise, p.premise)
+        """)
+        _record_run("projects", count)
         logger.info(f"graph_sync: synced {count} projects")
         return count
     finally:
@@ -143,7 +251,7 @@ async def sync_characters(conn: asyncpg.Connection | None = None) -> int:
             JOIN projects p ON c.project_id = p.id
         """)
 
-        count = 0
+        batch = []
         for row in rows:
             appearance = row["appearance_data"]
             if isinstance(appearance, str):
@@ -152,37 +260,34 @@ async def sync_characters(conn: asyncpg.Connection | None = None) -> int:
                 except (json.JSONDecodeError, TypeError):
                     appearance = {}
             appearance = appearance or {}
-
-            species = appearance.get("species", "")
-            body_type = appearance.get("body_type", "")
-            key_colors = appearance.get("key_colors", "")
-            key_features = appearance.get("key_features", "")
-
-            # Merge Character vertex
-            query = f"""
-                MERGE (c:Character {{slug: {_esc(row['slug'])}}})
-                SET c.name = {_esc(row['name'])},
-                    c.db_id = {_esc(row['id'])},
-                    c.species = {_esc(species)},
-                    c.body_type = {_esc(body_type)},
-                    c.key_colors = {_esc(key_colors)},
-                    c.key_features = {_esc(key_features)},
-                    c.role = {_esc(row['role'])}
-                RETURN c
-            """
-            await _cypher(conn, query)
-
-            # Merge BELONGS_TO edge
-            query = f"""
-                MATCH (c:Character {{slug: {_esc(row['slug'])}}}),
-                      (p:Project {{name: {_esc(row['project_name'])}}})
-                MERGE (c)-[r:BELONGS_TO]->(p)
-                SET r.role = {_esc(row['role'])}
-                RETURN r
-            """
-            await _cypher(conn, query)
-            count += 1
-
+            batch.append({
+                "slug": row["slug"],
+                "name": row["name"],
+                "db_id": row["id"],
+                "species": appearance.get("species", ""),
+                "body_type": appearance.get("body_type", ""),
+                "key_colors": appearance.get("key_colors", ""),
+                "key_features": appearance.get("key_features", ""),
+                "role": row["role"],
+                "project_name": row["project_name"],
+            })
+
+        count = await _unwind(conn, "characters", batch, """
+            MERGE (c:Character {slug: row.slug})
+            SET c.name = row.name,
+                c.db_id = row.db_id,
+                c.species = row.species,
+                c.body_type = row.body_type,
+                c.key_colors = row.key_colors,
+                c.key_features = row.key_features,
+                c.role = row.role
+        """)
+        await _unwind(conn, "characters", batch, """
+            MATCH (c:Character {slug: row.slug}), (p:Project {name: row.project_name})
+            MERGE (c)-[r:BELONGS_TO]->(p)
+            SET r.role = row.role
+        """)
+        _record_run("characters", count)
         logger.info(f"graph_sync: synced {count} characters")
         return count
     finally:
@@ -204,36 +309,40 @@ async def sync_checkpoints(conn: asyncpg.Connection | None = None) -> int:
             FROM generation_styles gs
             LEFT JOIN projects p ON p.default_style = gs.style_name
         """)
-
-        count = 0
-        for row in rows:
-            # Merge Checkpoint vertex (keyed on checkpoint_model)
-            query = f"""
-                MERGE (ck:Checkpoint {{checkpoint_model: {_esc(row['checkpoint_model'])}}})
-                SET ck.style_name = {_esc(row['style_name'])},
-                    ck.architecture = {_esc(row['model_architecture'])},
-                    ck.prompt_format = {_esc(row['prompt_format'])},
-                    ck.cfg = {_esc(row['cfg_scale'] or 7)},
-                    ck.steps = {_esc(row['steps'] or 25)},
-                    ck.sampler = {_esc(row['sampler'])},
-                    ck.width = {_esc(row['width'] or 768)},
-                    ck.height = {_esc(row['height'] or 768)}
-                RETURN ck
-            """
-            await _cypher(conn, query)
-
-            # Link to project if exists
-            if row["project_name"]:
-                query = f"""
-                    MATCH (ck:Checkpoint {{checkpoint_model: {_esc(row['checkpoint_model'])}}}),
-                          (p:Project {{name: {_esc(row['project_name'])}}})
-                    MERGE (p)-[r:USES_CHECKPOINT]->(ck)
-                    RETURN r
-                """
-                await _cypher(conn, query)
-
-            count += 1
-
+        batch = [{
+            "checkpoint_model": row["checkpoint_model"],
+            "style_name": row["style_name"],
+            "architecture": row["model_architecture"],
+            "prompt_format": row["prompt_format"],
+            "cfg": row["cfg_scale"] or 7,
+            "steps": row["steps"] or 25,
+            "sampler": row["sampler"],
+            "width": row["width"] or 768,
+            "height": row["height"] or 768,
+        } for row in rows]
+
+        # Checkpoint vertices keyed on checkpoint_model
+        count = await _unwind(conn, "checkpoints", batch, """
+            MERGE (ck:Checkpoint {checkpoint_model: row.checkpoint_model})
+            SET ck.style_name = row.style_name,
+                ck.architecture = row.architecture,
+                ck.prompt_format = row.prompt_format,
+                ck.cfg = row.cfg,
+                ck.steps = row.steps,
+                ck.sampler = row.sampler,
+                ck.width = row.width,
+                ck.height = row.height
+        """)
+        links = [
+            {"checkpoint_model": row["checkpoint_model"], "project_name": row["project_name"]}
+            for row in rows if row["project_name"]
+        ]
+        await _unwind(conn, "checkpoints", links, """
+            MATCH (ck:Checkpoint {checkpoint_model: row.checkpoint_model}),
+                  (p:Project {name: row.project_name})
+            MERGE (p)-[r:USES_CHECKPOINT]->(ck)
+        """)
+        _record_run("checkpoints", count)
         logger.info(f"graph_sync: synced {count} checkpoints")
         return count
     finally:
@@ -241,86 +350,84 @@ async def sync_checkpoints(conn: asyncpg.Connection | None = None) -> int:
             await conn.close()
 
 
-async def sync_generation_history(conn: asyncpg.Connection | None = None) -> int:
-    """Sync generation_history → Image vertices + DEPICTS/GENERATED_WITH/REVIEWED_AS edges."""
+async def sync_generation_history(conn: asyncpg.Connection | None = None, incremental: bool = True) -> int:
+    """Sync generation_history → Image vertices + DEPICTS/GENERATED_WITH/REGENERATED_FROM edges.
+
+    Only rows changed since the last watermark are read unless incremental=False.
+    """
     close_conn = conn is None
     if conn is None:
         conn = await _get_conn()
 
     try:
+        since = await _since(conn, "generation_history", incremental)
         rows = await conn.fetch("""
             SELECT gh.id, gh.character_slug, gh.project_name, gh.checkpoint_model,
                    gh.quality_score, gh.status, gh.artifact_path, gh.cfg_scale,
                    gh.steps, gh.sampler, gh.solo, gh.generated_at,
-                   gh.correction_of
+                   gh.correction_of, gh.updated_at
             FROM generation_history gh
             WHERE gh.character_slug IS NOT NULL
-        """)
+              AND ($1::timestamp IS NULL OR gh.updated_at > $1)
+            ORDER BY gh.updated_at NULLS FIRST, gh.id
+        """, since)
 
-        count = 0
+        images = []
         for row in rows:
             img_id = f"gh_{row['id']}"
-            filename = Path(row["artifact_path"]).name if row["artifact_path"] else img_id
-
-            # Merge Image vertex
-            query = f"""
-                MERGE (i:Image {{img_id: {_esc(img_id)}}})
-                SET i.filename = {_esc(filename)},
-                    i.status = {_esc(row['status'])},
-                    i.quality_score = {_esc(row['quality_score'])},
-                    i.checkpoint_model = {_esc(row['checkpoint_model'])},
-                    i.character_slug = {_esc(row['character_slug'])},
-                    i.solo = {_esc(row['solo'])},
-                    i.generated_at = {_esc(str(row['generated_at']) if row['generated_at'] else None)}
-                RETURN i
-            """
-            await _cypher(conn, query)
-
-            # DEPICTS edge → Character
-            if row["character_slug"]:
-                query = f"""
-                    MATCH (i:Image {{img_id: {_esc(img_id)}}}),
-                          (c:Character {{slug: {_esc(row['character_slug'])}}})
-                    MERGE (i)-[r:DEPICTS]->(c)
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass  # character may not exist in graph yet
-
-            # GENERATED_WITH edge → Checkpoint
-            if row["checkpoint_model"]:
-                query = f"""
-                    MATCH (i:Image {{img_id: {_esc(img_id)}}}),
-                          (ck:Checkpoint {{checkpoint_model: {_esc(row['checkpoint_model'])}}})
-                    MERGE (i)-[r:GENERATED_WITH]->(ck)
-                    SET r.cfg = {_esc(row['cfg_scale'])},
-                        r.steps = {_esc(row['steps'])},
-                        r.sampler = {_esc(row['sampler'])}
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass  # checkpoint may not exist in graph yet
-
-            # REGENERATED_FROM edge (correction chain)
-            if row["correction_of"]:
-                parent_id = f"gh_{row['correction_of']}"
-                query = f"""
-                    MATCH (child:Image {{img_id: {_esc(img_id)}}}),
-                          (parent:Image {{img_id: {_esc(parent_id)}}})
-                    MERGE (child)-[r:REGENERATED_FROM]->(parent)
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass  # parent may not exist
-
-            count += 1
+            images.append({
+                "img_id": img_id,
+                "filename": Path(row["artifact_path"]).name if row["artifact_path"] else img_id,
+                "status": row["status"],
+                "quality_score": row["quality_score"],
+                "checkpoint_model": row["checkpoint_model"],
+                "character_slug": row["character_slug"],
+                "solo": row["solo"],
+                "generated_at": str(row["generated_at"]) if row["generated_at"] else None,
+            })
+
+        # Vertices for the whole change set first, so correction chains within
+        # it find their parent Image
+        count = await _unwind(conn, "generation_history", images, """
+            MERGE (i:Image {img_id: row.img_id})
+            SET i.filename = row.filename,
+                i.status = row.status,
+                i.quality_score = row.quality_score,
+                i.checkpoint_model = row.checkpoint_model,
+                i.character_slug = row.character_slug,
+                i.solo = row.solo,
+                i.generated_at = row.generated_at
+        """)
 
+        # DEPICTS edge → Character (character may not exist in graph yet)
+        await _unwind(conn, "generation_history", [
+            {"img_id": f"gh_{r['id']}", "slug": r["character_slug"]} for r in rows
+        ], """
+            MATCH (i:Image {img_id: row.img_id}), (c:Character {slug: row.slug})
+            MERGE (i)-[r:DEPICTS]->(c)
+        """, tolerate_errors=True)
+
+        # GENERATED_WITH edge → Checkpoint
+        await _unwind(conn, "generation_history", [
+            {"img_id": f"gh_{r['id']}", "checkpoint_model": r["checkpoint_model"],
+             "cfg": r["cfg_scale"], "steps": r["steps"], "sampler": r["sampler"]}
+            for r in rows if r["checkpoint_model"]
+        ], """
+            MATCH (i:Image {img_id: row.img_id}), (ck:Checkpoint {checkpoint_model: row.checkpoint_model})
+            MERGE (i)-[r:GENERATED_WITH]->(ck)
+            SET r.cfg = row.cfg, r.steps = row.steps, r.sampler = row.sampler
+        """, tolerate_errors=True)
+
+        # REGENERATED_FROM edge (correction chain)
+        await _unwind(conn, "generation_history", [
+            {"img_id": f"gh_{r['id']}", "parent_id": f"gh_{r['correction_of']}"}
+            for r in rows if r["correction_of"]
+        ], """
+            MATCH (child:Image {img_id: row.img_id}), (parent:Image {img_id: row.parent_id})
+            MERGE (child)-[r:REGENERATED_FROM]->(parent)
+        """, tolerate_errors=True)
+
+        await _advance_watermark(conn, "generation_history", rows, "updated_at")
         logger.info(f"graph_sync: synced {count} generation history images")
         return count
     finally:
@@ -328,102 +435,97 @@ async def sync_generation_history(conn: asyncpg.Connection | None = None) -> int
             await conn.close()
 
 
-async def sync_scenes(conn: asyncpg.Connection | None = None) -> int:
-    """Sync scenes + shots → Scene/Shot vertices + edges."""
+async def sync_scenes(conn: asyncpg.Connection | None = None, incremental: bool = True) -> int:
+    """Sync scenes + shots → Scene/Shot vertices + edges (changed rows only by default)."""
     close_conn = conn is None
     if conn is None:
         conn = await _get_conn()
 
     try:
         # Scenes
+        since = await _since(conn, "scenes", incremental)
         scene_rows = await conn.fetch("""
             SELECT s.id::text as scene_id, s.title, s.mood, s.location, s.scene_number,
-                   p.name as project_name
+                   p.name as project_name, s.updated_at
             FROM scenes s
             JOIN projects p ON s.project_id = p.id
+            WHERE ($1::timestamp IS NULL OR s.updated_at > $1)
+        """, since)
+        scene_count = await _unwind(conn, "scenes", [{
+            "scene_id": row["scene_id"],
+            "title": row["title"],
+            "mood": row["mood"],
+            "location": row["location"],
+            "scene_number": row["scene_number"],
+        } for row in scene_rows], """
+            MERGE (s:Scene {scene_id: row.scene_id})
+            SET s.title = row.title,
+                s.mood = row.mood,
+                s.location = row.location,
+                s.scene_number = row.scene_number
         """)
 
-        scene_count = 0
-        for row in scene_rows:
-            query = f"""
-                MERGE (s:Scene {{scene_id: {_esc(row['scene_id'])}}})
-                SET s.title = {_esc(row['title'])},
-                    s.mood = {_esc(row['mood'])},
-                    s.location = {_esc(row['location'])},
-                    s.scene_number = {_esc(row['scene_number'])}
-                RETURN s
-            """
-            await _cypher(conn, query)
-            scene_count += 1
-
         # Shots
+        shot_since = await _since(conn, "shots", incremental)
         shot_rows = await conn.fetch("""
             SELECT sh.id::text as shot_id, sh.scene_id::text as scene_id,
                    sh.shot_number, sh.shot_type, sh.duration_seconds,
                    sh.generation_prompt, sh.quality_score, sh.status,
-                   sh.dialogue_character_slug
+                   sh.dialogue_character_slug, sh.updated_at
             FROM shots sh
+            WHERE ($1::timestamp IS NULL OR sh.updated_at > $1)
+        """, shot_since)
+        shot_count = await _unwind(conn, "shots", [{
+            "shot_id": row["shot_id"],
+            "shot_number": row["shot_number"],
+            "shot_type": row["shot_type"],
+            "duration": row["duration_seconds"],
+            "prompt": row["generation_prompt"],
+            "quality_score": row["quality_score"],
+            "status": row["status"],
+        } for row in shot_rows], """
+            MERGE (sh:Shot {shot_id: row.shot_id})
+            SET sh.shot_number = row.shot_number,
+                sh.shot_type = row.shot_type,
+                sh.duration = row.duration,
+                sh.prompt = row.prompt,
+                sh.quality_score = row.quality_score,
+                sh.status = row.status
         """)
 
-        shot_count = 0
-        for row in shot_rows:
-            query = f"""
-                MERGE (sh:Shot {{shot_id: {_esc(row['shot_id'])}}})
-                SET sh.shot_number = {_esc(row['shot_number'])},
-                    sh.shot_type = {_esc(row['shot_type'])},
-                    sh.duration = {_esc(row['duration_seconds'])},
-                    sh.prompt = {_esc(row['generation_prompt'])},
-                    sh.quality_score = {_esc(row['quality_score'])},
-                    sh.status = {_esc(row['status'])}
-                RETURN sh
-            """
-            await _cypher(conn, query)
-
-            # PART_OF edge → Scene
-            if row["scene_id"]:
-                query = f"""
-                    MATCH (sh:Shot {{shot_id: {_esc(row['shot_id'])}}}),
-                          (s:Scene {{scene_id: {_esc(row['scene_id'])}}})
-                    MERGE (sh)-[r:PART_OF]->(s)
-                    SET r.shot_order = {_esc(row['shot_number'])}
-                    RETURN r
-                """
-                await _cypher(conn, query)
-
-            # APPEARS_IN edge for dialogue character
-            if row["dialogue_character_slug"]:
-                query = f"""
-                    MATCH (c:Character {{slug: {_esc(row['dialogue_character_slug'])}}}),
-                          (sh:Shot {{shot_id: {_esc(row['shot_id'])}}})
-                    MERGE (c)-[r:APPEARS_IN]->(sh)
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass
+        # PART_OF edge → Scene
+        await _unwind(conn, "shots", [
+            {"shot_id": r["shot_id"], "scene_id": r["scene_id"], "shot_order": r["shot_number"]}
+            for r in shot_rows if r["scene_id"]
+        ], """
+            MATCH (sh:Shot {shot_id: row.shot_id}), (s:Scene {scene_id: row.scene_id})
+            MERGE (sh)-[r:PART_OF]->(s)
+            SET r.shot_order = row.shot_order
+        """)
 
-            shot_count += 1
+        # APPEARS_IN edge for dialogue character
+        await _unwind(conn, "shots", [
+            {"shot_id": r["shot_id"], "slug": r["dialogue_character_slug"]}
+            for r in shot_rows if r["dialogue_character_slug"]
+        ], """
+            MATCH (c:Character {slug: row.slug}), (sh:Shot {shot_id: row.shot_id})
+            MERGE (c)-[r:APPEARS_IN]->(sh)
+        """, tolerate_errors=True)
 
-        # SCENE_IN edges for episodes
+        # SCENE_IN edges for episodes (small join table — always full)
         ep_scene_rows = await conn.fetch("""
             SELECT es.scene_id::text as scene_id, e.id::text as episode_id, es.position
             FROM episode_scenes es
             JOIN episodes e ON es.episode_id = e.id
         """)
-        for row in ep_scene_rows:
-            query = f"""
-                MATCH (s:Scene {{scene_id: {_esc(row['scene_id'])}}}),
-                      (ep:Episode {{episode_id: {_esc(row['episode_id'])}}})
-                MERGE (s)-[r:SCENE_IN]->(ep)
-                SET r.position = {_esc(row['position'])}
-                RETURN r
-            """
-            try:
-                await _cypher(conn, query)
-            except Exception:
-                pass  # episode vertex may not exist yet
-
+        await _unwind(conn, "episode_scenes", [dict(r) for r in ep_scene_rows], """
+            MATCH (s:Scene {scene_id: row.scene_id}), (ep:Episode {episode_id: row.episode_id})
+            MERGE (s)-[r:SCENE_IN]->(ep)
+            SET r.position = row.position
+        """, tolerate_errors=True)
+
+        await _advance_watermark(conn, "scenes", scene_rows, "updated_at")
+        await _advance_watermark(conn, "shots", shot_rows, "updated_at")
         logger.info(f"graph_sync: synced {scene_count} scenes, {shot_count} shots")
         return scene_count + shot_count
     finally:
@@ -444,19 +546,18 @@ async def sync_episodes(conn: asyncpg.Connection | None = None) -> int:
             FROM episodes e
             JOIN projects p ON e.project_id = p.id
         """)
-
-        count = 0
-        for row in rows:
-            query = f"""
-                MERGE (ep:Episode {{episode_id: {_esc(row['episode_id'])}}})
-                SET ep.title = {_esc(row['title'])},
-                    ep.episode_number = {_esc(row['episode_number'])},
-                    ep.status = {_esc(row['status'])}
-                RETURN ep
-            """
-            await _cypher(conn, query)
-            count += 1
-
+        count = await _unwind(conn, "episodes", [{
+            "episode_id": row["episode_id"],
+            "title": row["title"],
+            "episode_number": row["episode_number"],
+            "status": row["status"],
+        } for row in rows], """
+            MERGE (ep:Episode {episode_id: row.episode_id})
+            SET ep.title = row.title,
+                ep.episode_number = row.episode_number,
+                ep.status = row.status
+        """)
+        _record_run("episodes", count)
         logger.info(f"graph_sync: synced {count} episodes")
         return count
     finally:
@@ -464,47 +565,40 @@ async def sync_episodes(conn: asyncpg.Connection | None = None) -> int:
             await conn.close()
 
 
-async def sync_feedback(conn: asyncpg.Connection | None = None) -> int:
-    """Sync rejections → FeedbackCategory vertices + FEEDBACK_FOR edges."""
+async def sync_feedback(conn: asyncpg.Connection | None = None, incremental: bool = True) -> int:
+    """Sync rejections → FeedbackCategory vertices + FEEDBACK_FOR edges (new rows only by default)."""
     close_conn = conn is None
     if conn is None:
         conn = await _get_conn()
 
     try:
+        since = await _since(conn, "feedback", incremental)
         rows = await conn.fetch("""
             SELECT r.id, r.character_slug, r.image_name, r.categories,
-                   r.feedback_text, r.quality_score, r.generation_history_id
+                   r.feedback_text, r.quality_score, r.generation_history_id, r.created_at
             FROM rejections r
-        """)
+            WHERE ($1::timestamp IS NULL OR r.created_at > $1)
+        """, since)
 
-        count = 0
-        for row in rows:
-            categories = row["categories"] or []
-            for cat in categories:
-                # Merge FeedbackCategory vertex
-                query = f"""
-                    MERGE (fc:FeedbackCategory {{category: {_esc(cat)}}})
-                    RETURN fc
-                """
-                await _cypher(conn, query)
-
-                # Link to Image if generation_history_id exists
-                if row["generation_history_id"]:
-                    img_id = f"gh_{row['generation_history_id']}"
-                    query = f"""
-                        MATCH (fc:FeedbackCategory {{category: {_esc(cat)}}}),
-                              (i:Image {{img_id: {_esc(img_id)}}})
-                        MERGE (fc)-[r:FEEDBACK_FOR]->(i)
-                        SET r.free_text = {_esc(row['feedback_text'])}
-                        RETURN r
-                    """
-                    try:
-                        await _cypher(conn, query)
-                    except Exception:
-                        pass  # image may not exist in graph
-
-            count += 1
+        categories = sorted({cat for row in rows for cat in (row["categories"] or [])})
+        await _unwind(conn, "feedback", [{"category": c} for c in categories], """
+            MERGE (fc:FeedbackCategory {category: row.category})
+        """)
 
+        # Link to Image if generation_history_id exists (image may not be in graph)
+        await _unwind(conn, "feedback", [
+            {"category": cat, "img_id": f"gh_{row['generation_history_id']}",
+             "free_text": row["feedback_text"]}
+            for row in rows if row["generation_history_id"]
+            for cat in (row["categories"] or [])
+        ], """
+            MATCH (fc:FeedbackCategory {category: row.category}), (i:Image {img_id: row.img_id})
+            MERGE (fc)-[r:FEEDBACK_FOR]->(i)
+            SET r.free_text = row.free_text
+        """, tolerate_errors=True)
+
+        count = len(rows)
+        await _advance_watermark(conn, "feedback", rows, "created_at")
         logger.info(f"graph_sync: synced {count} feedback records")
         return count
     finally:
@@ -512,101 +606,63 @@ async def sync_feedback(conn: asyncpg.Connection | None = None) -> int:
             await conn.close()
 
 
-async def sync_approvals_rejections(conn: asyncpg.Connection | None = None) -> int:
+async def sync_approvals_rejections(conn: asyncpg.Connection | None = None, incremental: bool = True) -> int:
     """Sync approvals + rejections into Image vertices with status + quality_score.
 
     These tables track image-level review outcomes independently of generation_history.
     Creates Image nodes keyed on image_name and links them to Characters + Checkpoints.
+    Both tables are append-only, so only rows newer than the watermark are read.
     """
     close_conn = conn is None
     if conn is None:
         conn = await _get_conn()
 
     try:
-        # Approvals
-        approved_rows = await conn.fetch("""
-            SELECT a.id, a.character_slug, a.image_name, a.quality_score,
-                   a.checkpoint_model, a.created_at
-            FROM approvals a
-            WHERE a.image_name IS NOT NULL
-        """)
-
         count = 0
-        for row in approved_rows:
-            img_id = f"approved_{row['id']}"
-            query = f"""
-                MERGE (i:Image {{img_id: {_esc(img_id)}}})
-                SET i.filename = {_esc(row['image_name'])},
-                    i.status = 'approved',
-                    i.quality_score = {_esc(row['quality_score'])},
-                    i.character_slug = {_esc(row['character_slug'])},
-                    i.checkpoint_model = {_esc(row['checkpoint_model'])}
-                RETURN i
-            """
-            await _cypher(conn, query)
+        for key, status, prefix in (
+            ("approvals", "approved", "approved"),
+            ("rejections", "rejected", "rejected"),
+        ):
+            since = await _since(conn, key, incremental)
+            rows = await conn.fetch(f"""
+                SELECT t.id, t.character_slug, t.image_name, t.quality_score,
+                       t.checkpoint_model, t.created_at
+                FROM {key} t
+                WHERE t.image_name IS NOT NULL
+                  AND ($1::timestamp IS NULL OR t.created_at > $1)
+            """, since)
+            images = [{
+                "img_id": f"{prefix}_{row['id']}",
+                "filename": row["image_name"],
+                "quality_score": row["quality_score"],
+                "character_slug": row["character_slug"],
+                "checkpoint_model": row["checkpoint_model"],
+            } for row in rows]
+
+            count += await _unwind(conn, key, images, f"""
+                MERGE (i:Image {{img_id: row.img_id}})
+                SET i.filename = row.filename,
+                    i.status = '{status}',
+                    i.quality_score = row.quality_score,
+                    i.character_slug = row.character_slug,
+                    i.checkpoint_model = row.checkpoint_model
+            """)
 
             # DEPICTS edge
-            if row["character_slug"]:
-                query = f"""
-                    MATCH (i:Image {{img_id: {_esc(img_id)}}}),
-                          (c:Character {{slug: {_esc(row['character_slug'])}}})
-                    MERGE (i)-[r:DEPICTS]->(c)
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass
-
-            # GENERATED_WITH edge if checkpoint known
-            if row["checkpoint_model"]:
-                query = f"""
-                    MATCH (i:Image {{img_id: {_esc(img_id)}}}),
-                          (ck:Checkpoint {{checkpoint_model: {_esc(row['checkpoint_model'])}}})
+            await _unwind(conn, key, [i for i in images if i["character_slug"]], """
+                MATCH (i:Image {img_id: row.img_id}), (c:Character {slug: row.character_slug})
+                MERGE (i)-[r:DEPICTS]->(c)
+            """, tolerate_errors=True)
+
+            # GENERATED_WITH edge if checkpoint known (approvals only, as before)
+            if key == "approvals":
+                await _unwind(conn, key, [i for i in images if i["checkpoint_model"]], """
+                    MATCH (i:Image {img_id: row.img_id}),
+                          (ck:Checkpoint {checkpoint_model: row.checkpoint_model})
                     MERGE (i)-[r:GENERATED_WITH]->(ck)
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass
+                """, tolerate_errors=True)
 
-            count += 1
-
-        # Rejections as Image nodes
-        rejected_rows = await conn.fetch("""
-            SELECT r.id, r.character_slug, r.image_name, r.quality_score,
-                   r.checkpoint_model, r.created_at
-            FROM rejections r
-            WHERE r.image_name IS NOT NULL
-        """)
-
-        for row in rejected_rows:
-            img_id = f"rejected_{row['id']}"
-            query = f"""
-                MERGE (i:Image {{img_id: {_esc(img_id)}}})
-                SET i.filename = {_esc(row['image_name'])},
-                    i.status = 'rejected',
-                    i.quality_score = {_esc(row['quality_score'])},
-                    i.character_slug = {_esc(row['character_slug'])},
-                    i.checkpoint_model = {_esc(row['checkpoint_model'])}
-                RETURN i
-            """
-            await _cypher(conn, query)
-
-            if row["character_slug"]:
-                query = f"""
-                    MATCH (i:Image {{img_id: {_esc(img_id)}}}),
-                          (c:Character {{slug: {_esc(row['character_slug'])}}})
-                    MERGE (i)-[r:DEPICTS]->(c)
-                    RETURN r
-                """
-                try:
-                    await _cypher(conn, query)
-                except Exception:
-                    pass
-
-            count += 1
+            await _advance_watermark(conn, key, rows, "created_at")
 
         logger.info(f"graph_sync: synced {count} approval/rejection images")
         return count
@@ -615,29 +671,75 @@ async def sync_approvals_rejections(conn: asyncpg.Connection | None = None) -> i
             await conn.close()
 
 
-async def full_sync() -> dict:
+async def full_sync(incremental: bool = True) -> dict:
     """Run all sync functions. Idempotent — safe to call repeatedly.
 
+    History tables only re-read rows changed since their watermark; pass
+    incremental=False to re-read everything (e.g. after a graph rebuild).
+
     Each sync function gets a fresh connection because AGE's internal planner
     accumulates state across many MERGE queries on different labels, leading
     to 'could not find rte for None' errors on long-lived connections.
     """
     results = {}
-    for name, fn in [
-        ("projects", sync_projects),
-        ("characters", sync_characters),
-        ("checkpoints", sync_checkpoints),
-        ("episodes", sync_episodes),
-        ("scenes", sync_scenes),
-        ("generation_history", sync_generation_history),
-        ("approvals_rejections", sync_approvals_rejections),
-        ("feedback", sync_feedback),
+    for name, fn, watermarked in [
+        ("projects", sync_projects, False),
+        ("characters", sync_characters, False),
+        ("checkpoints", sync_checkpoints, False),
+        ("episodes", sync_episodes, False),
+        ("scenes", sync_scenes, True),
+        ("generation_history", sync_generation_history, True),
+        ("approvals_rejections", sync_approvals_rejections, True),
+        ("feedback", sync_feedback, True),
     ]:
-        results[name] = await fn()  # each creates+closes its own connection
-    logger.info(f"graph_sync: full sync complete — {results}")
+        # each creates+closes its own connection
+        results[name] = await (fn(incremental=incremental) if watermarked else fn())
+    logger.info(f"graph_sync: {'incremental' if incremental else 'full'} sync complete — {results}")
     return results
 
 
+async def sync_metrics() -> dict:
+    """Per-table sync metrics: rows synced, batch latency, watermark and lag.
+
+    lag_seconds is the age of the oldest change not yet mirrored into the graph
+    (0 when caught up); pending_rows is how many rows the next run will read.
+    """
+    tables = {}
+    for key, m in _metrics.items():
+        tables[key] = {
+            "rows_synced": m["rows_synced"],
+            "batches": m["batches"],
+            "avg_batch_ms": round(m["total_batch_ms"] / m["batches"], 1) if m["batches"] else None,
+            "last_batch_ms": m["last_batch_ms"],
+            "max_batch_ms": m["max_batch_ms"],
+            "last_run_rows": m["last_run_rows"],
+            "last_run_at": m["last_run_at"],
+        }
+
+    conn = await _get_conn()
+    try:
+        for key, (table, column) in _TRACKED.items():
+            watermark = await _get_watermark(conn, key)
+            row = await conn.fetchrow(f"""
+                SELECT COUNT(*) AS pending,
+                       EXTRACT(EPOCH FROM NOW() - MIN({column})) AS lag
+                FROM {table}
+                WHERE ($1::timestamp IS NULL OR {column} > $1)
+            """, watermark)
+            entry = tables.setdefault(key, {})
+            entry["watermark"] = watermark.isoformat() if watermark else None
+            entry["pending_rows"] = row["pending"]
+            entry["lag_seconds"] = round(float(row["lag"]), 1) if row["lag"] is not None else 0.0
+    finally:
+        await conn.close()
+
+    return {
+        "batch_size": BATCH_SIZE,
+        "tables": tables,
+        "max_lag_seconds": max((t.get("lag_seconds") or 0.0 for t in tables.values()), default=0.0),
+    }
+
+
 async def graph_stats() -> dict:
     """Return vertex and edge counts for the graph."""
     conn = await _get_conn()
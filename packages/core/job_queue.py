@@ -0,0 +1,453 @@
+"""Durable Postgres job queue for long-running GPU work (scene generation).
+
+Jobs live in the job_queue table (created in db_migrations), so queued and
+running work survives a restart and any number of app processes can drain the
+same queue:
+
+- enqueue() inserts a job; a (kind, dedupe_key) pair can only be queued or
+  running once (partial unique index), so double-clicks and overlapping
+  orchestrator ticks collapse into one job.
+- Workers claim the highest-priority due job with FOR UPDATE SKIP LOCKED and
+  hold a lease they renew with heartbeats while the handler runs.
+- A failing handler is retried with exponential backoff until max_attempts;
+  a worker that dies simply stops heartbeating and reap_expired() re-queues
+  its job once the lease runs out. A worker whose heartbeat finds the lease
+  gone cancels its handler, so a job never runs on two workers at once.
+- stop_workers() (app shutdown) cancels running handlers and release()s their
+  jobs straight back to the queue without spending an attempt.
+- Handlers mark stages with job_stage("shots") etc.; per-stage durations are
+  stored on the job and queue_stats() reports depth plus p50/p95 per stage.
+
+Usage:
+    register_handler(SCENE_GENERATION, run_scene_job)
+    await start_workers()
+
+    job_id = await enqueue(conn, SCENE_GENERATION, {"scene_id": sid}, dedupe_key=sid)
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from .config import JOB_LEASE_SECONDS, JOB_WORKER_CONCURRENCY
+from .db import connect_pooled
+
+logger = logging.getLogger(__name__)
+
+SCENE_GENERATION = "scene_generation"
+
+# Lower runs first: user/recovery work ahead of bulk queues ahead of the orchestrator
+PRIORITY_HIGH = 50
+PRIORITY_NORMAL = 100
+PRIORITY_LOW = 150
+
+BACKOFF_BASE_SECONDS = 30.0
+BACKOFF_MAX_SECONDS = 30 * 60.0
+POLL_INTERVAL = 5.0
+FINISHED_RETENTION_DAYS = 7
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts` (1-based): 30s, 60s, 120s ... capped at 30min."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+# --- producer side ---
+
+async def enqueue(
+    conn, kind: str, payload: dict | None = None, *,
+    dedupe_key: str | None = None, priority: int = PRIORITY_NORMAL, max_attempts: int = 3,
+    delay_seconds: float = 0.0,
+) -> int | None:
+    """Queue a job; returns its id, or None if (kind, dedupe_key) is already queued/running."""
+    return await conn.fetchval("""
+        INSERT INTO job_queue (kind, dedupe_key, payload, priority, max_attempts, run_after)
+        VALUES ($1, $2, $3::jsonb, $4, $5, now() + make_interval(secs => $6))
+        ON CONFLICT (kind, dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+        RETURNING id
+    """, kind, dedupe_key, json.dumps(payload or {}), priority, max_attempts, delay_seconds)
+
+
+async def active_job(conn, kind: str, dedupe_key: str) -> dict | None:
+    """The queued/running job for (kind, dedupe_key), if any."""
+    row = await conn.fetchrow("""
+        SELECT id, status, stage, attempts, locked_by, created_at, started_at
+        FROM job_queue
+        WHERE kind = $1 AND dedupe_key = $2 AND status IN ('queued', 'running')
+    """, kind, dedupe_key)
+    return dict(row) if row else None
+
+
+async def cancel(conn, kind: str, dedupe_key: str) -> bool:
+    """Cancel a job that hasn't started yet. Running jobs are left to finish."""
+    result = await conn.execute("""
+        UPDATE job_queue SET status = 'cancelled', finished_at = now()
+        WHERE kind = $1 AND dedupe_key = $2 AND status = 'queued'
+    """, kind, dedupe_key)
+    return result.endswith(" 1")
+
+
+# --- worker side ---
+
+async def claim(conn, kinds: list[str], worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> dict | None:
+    """Atomically take the next due job of one of `kinds`, or None."""
+    row = await conn.fetchrow("""
+        UPDATE job_queue j SET
+            status = 'running', locked_by = $2, attempts = j.attempts + 1,
+            lease_expires_at = now() + make_interval(secs => $3),
+            started_at = now(), stage = NULL,
+            stage_timings = CASE WHEN j.stage_timings ? 'queue_wait' THEN j.stage_timings
+                ELSE j.stage_timings || jsonb_build_object(
+                    'queue_wait', EXTRACT(EPOCH FROM now() - j.created_at)) END
+        WHERE j.id = (
+            SELECT id FROM job_queue
+            WHERE status = 'queued' AND kind = ANY($1::text[]) AND run_after <= now()
+            ORDER BY priority, run_after, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING j.*
+    """, kinds, worker_id, lease_seconds)
+    if row is None:
+        return None
+    job = dict(row)
+    if isinstance(job.get("payload"), str):
+        job["payload"] = json.loads(job["payload"])
+    return job
+
+
+async def heartbeat(
+    conn, job_id: int, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS,
+    stage: str | None = None, timings: dict | None = None,
+) -> bool:
+    """Extend the lease (and record progress). False if the lease was lost to reap_expired()."""
+    result = await conn.execute("""
+        UPDATE job_queue SET
+            lease_expires_at = now() + make_interval(secs => $3),
+            stage = COALESCE($4, stage),
+            stage_timings = stage_timings || $5::jsonb
+        WHERE id = $1 AND locked_by = $2 AND status = 'running'
+    """, job_id, worker_id, lease_seconds, stage, json.dumps(timings or {}))
+    return result.endswith(" 1")
+
+
+async def complete(conn, job_id: int, worker_id: str, timings: dict | None = None) -> None:
+    await conn.execute("""
+        UPDATE job_queue SET status = 'completed', finished_at = now(), lease_expires_at = NULL,
+               stage = NULL, stage_timings = stage_timings || $3::jsonb
+        WHERE id = $1 AND locked_by = $2 AND status = 'running'
+    """, job_id, worker_id, json.dumps(timings or {}))
+
+
+async def fail(conn, job_id: int, worker_id: str, error: str, timings: dict | None = None) -> str | None:
+    """Record a failed attempt: re-queue with backoff, or 'failed' once attempts run out."""
+    row = await conn.fetchrow("""
+        SELECT attempts, max_attempts FROM job_queue
+        WHERE id = $1 AND locked_by = $2 AND status = 'running'
+    """, job_id, worker_id)
+    if row is None:
+        return None
+    retry = row["attempts"] < row["max_attempts"]
+    status = "queued" if retry else "failed"
+    await conn.execute("""
+        UPDATE job_queue SET
+            status = $3, last_error = $4, lease_expires_at = NULL, locked_by = NULL,
+            run_after = now() + make_interval(secs => $5),
+            finished_at = CASE WHEN $3 = 'failed' THEN now() END,
+            stage_timings = stage_timings || $6::jsonb
+        WHERE id = $1 AND locked_by = $2 AND status = 'running'
+    """, job_id, worker_id, status, error[:2000], backoff_seconds(row["attempts"]), json.dumps(timings or {}))
+    return status
+
+
+async def release(conn, job_id: int, worker_id: str, timings: dict | None = None) -> None:
+    """Hand a running job back to the queue without using up an attempt (worker shutdown)."""
+    await conn.execute("""
+        UPDATE job_queue SET
+            status = 'queued', attempts = GREATEST(attempts - 1, 0), run_after = now(),
+            locked_by = NULL, lease_expires_at = NULL, stage = NULL,
+            stage_timings = stage_timings || $3::jsonb
+        WHERE id = $1 AND locked_by = $2 AND status = 'running'
+    """, job_id, worker_id, json.dumps(timings or {}))
+
+
+async def reap_expired(conn) -> int:
+    """Re-queue (or fail) running jobs whose worker stopped heartbeating; prune old finished jobs."""
+    rows = await conn.fetch("""
+        UPDATE job_queue SET
+            status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+            finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END,
+            last_error = 'lease expired (worker ' || COALESCE(locked_by, '?') || ' stopped heartbeating)',
+            locked_by = NULL, lease_expires_at = NULL
+        WHERE status = 'running' AND lease_expires_at < now()
+        RETURNING id, kind, status
+    """)
+    for r in rows:
+        logger.warning(f"Job queue: job {r['id']} ({r['kind']}) lease expired -> {r['status']}")
+    await conn.execute(
+        "DELETE FROM job_queue WHERE finished_at < now() - make_interval(days => $1)",
+        FINISHED_RETENTION_DAYS,
+    )
+    return len(rows)
+
+
+async def queue_stats(conn) -> dict:
+    """Queue depth per kind/status and per-stage latency over the last 24h."""
+    depth = await conn.fetch("""
+        SELECT kind, status, COUNT(*) AS n,
+               EXTRACT(EPOCH FROM now() - MIN(created_at)) AS oldest_seconds,
+               COUNT(*) FILTER (WHERE run_after > now()) AS backing_off
+        FROM job_queue WHERE status IN ('queued', 'running')
+        GROUP BY kind, status
+    """)
+    latency = await conn.fetch("""
+        SELECT j.kind, t.key AS stage, COUNT(*) AS n,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY t.value::float) AS p50,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY t.value::float) AS p95
+        FROM job_queue j, jsonb_each_text(j.stage_timings) t
+        WHERE j.finished_at > now() - interval '24 hours'
+        GROUP BY j.kind, t.key
+    """)
+    outcomes = await conn.fetch("""
+        SELECT kind, status, COUNT(*) AS n FROM job_queue
+        WHERE finished_at > now() - interval '24 hours'
+        GROUP BY kind, status
+    """)
+    stats: dict[str, dict] = {}
+
+    def _kind(k):
+        return stats.setdefault(k, {"depth": {}, "finished_24h": {}, "stages": {}})
+
+    for r in depth:
+        _kind(r["kind"])["depth"][r["status"]] = {
+            "count": r["n"], "oldest_seconds": round(float(r["oldest_seconds"] or 0), 1),
+            "backing_off": r["backing_off"],
+        }
+    for r in outcomes:
+        _kind(r["kind"])["finished_24h"][r["status"]] = r["n"]
+    for r in latency:
+        _kind(r["kind"])["stages"][r["stage"]] = {
+            "count": r["n"], "p50_seconds": round(float(r["p50"]), 2), "p95_seconds": round(float(r["p95"]), 2),
+        }
+    return {"kinds": stats, "workers": [w.stats() for w in _workers]}
+
+
+# --- stage tracking ---
+
+@dataclass
+class JobContext:
+    """Per-job progress, reachable from anywhere in the handler via job_stage()."""
+    job: dict
+    stage: str | None = None
+    stage_started: float = field(default_factory=time.monotonic)
+    timings: dict[str, float] = field(default_factory=dict)
+    lease_lost: bool = False
+
+    def set_stage(self, name: str | None) -> None:
+        now = time.monotonic()
+        if self.stage is not None:
+            self.timings[self.stage] = round(self.timings.get(self.stage, 0.0) + now - self.stage_started, 3)
+        self.stage = name
+        self.stage_started = now
+
+
+_current_job: contextvars.ContextVar[JobContext | None] = contextvars.ContextVar("current_job", default=None)
+
+
+def job_stage(name: str) -> None:
+    """Mark the start of a named stage in the current job (no-op outside a job)."""
+    ctx = _current_job.get()
+    if ctx is not None:
+        ctx.set_stage(name)
+
+
+# --- worker loop ---
+
+Handler = Callable[[dict], Awaitable[Any]]
+_handlers: dict[str, Handler] = {}
+_workers: list["JobWorker"] = []
+
+
+def register_handler(kind: str, handler: Handler) -> None:
+    _handlers[kind] = handler
+
+
+class JobWorker:
+    """Claims and runs jobs of the registered kinds, one at a time."""
+
+    def __init__(self, kinds: list[str] | None = None, lease_seconds: float = JOB_LEASE_SECONDS,
+                 poll_interval: float = POLL_INTERVAL):
+        self.kinds = kinds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.current: dict | None = None
+        self.processed = 0
+        self.failed = 0
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def wake(self) -> None:
+        """Poll immediately (called after a local enqueue)."""
+        self._wakeup.set()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                ran = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id}: {e}")
+                ran = False
+            if not ran:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> bool:
+        """Reap, claim one job and run it. Returns False when nothing was due."""
+        kinds = self.kinds or list(_handlers)
+        conn = await connect_pooled()
+        try:
+            await reap_expired(conn)
+            job = await claim(conn, kinds, self.worker_id, self.lease_seconds)
+        finally:
+            await conn.close()
+        if job is None:
+            return False
+        await self._run(job)
+        return True
+
+    async def _run(self, job: dict) -> None:
+        handler = _handlers.get(job["kind"])
+        ctx = JobContext(job)
+        self.current = job
+        token = _current_job.set(ctx)
+        # The handler runs as its own task so the heartbeat can cancel it if the lease is lost
+        work = asyncio.create_task(self._call(handler, job))
+        beat = asyncio.create_task(self._heartbeat(ctx, work))
+        logger.info(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']} started")
+        error = None
+        try:
+            await work
+        except asyncio.CancelledError:
+            ctx.set_stage(None)
+            if ctx.lease_lost:
+                # Another worker owns the job now; it is no longer ours to complete or fail
+                logger.warning(f"Job {job['id']} ({job['kind']}) cancelled: lease lost")
+                return
+            # Shutdown: stop the handler, then hand the job back without using up an attempt
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            try:
+                await self._finish(release, job, ctx.timings)
+                logger.info(f"Job {job['id']} ({job['kind']}) released on shutdown: {ctx.timings}")
+            except Exception as e:
+                logger.warning(f"Job {job['id']}: release on shutdown failed, lease will expire: {e}")
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            beat.cancel()
+            _current_job.reset(token)
+            self.current = None
+        ctx.set_stage(None)
+
+        if error is None:
+            await self._finish(complete, job, ctx.timings)
+            self.processed += 1
+            logger.info(f"Job {job['id']} ({job['kind']}) completed: {ctx.timings}")
+        else:
+            outcome = await self._finish(fail, job, error, ctx.timings)
+            self.failed += 1
+            logger.error(f"Job {job['id']} ({job['kind']}) failed ({outcome}): {error}")
+
+    @staticmethod
+    async def _call(handler: Handler | None, job: dict) -> Any:
+        if handler is None:
+            raise RuntimeError(f"No handler registered for job kind {job['kind']!r}")
+        return await handler(job["payload"])
+
+    async def _finish(self, op: Callable[..., Awaitable[Any]], job: dict, *args) -> Any:
+        conn = await connect_pooled()
+        try:
+            return await op(conn, job["id"], self.worker_id, *args)
+        finally:
+            await conn.close()
+
+    async def _heartbeat(self, ctx: JobContext, work: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                conn = await connect_pooled()
+                try:
+                    # Persist the running stage's elapsed time too, so a dead worker leaves partial timings
+                    timings = dict(ctx.timings)
+                    if ctx.stage:
+                        timings[ctx.stage] = round(
+                            timings.get(ctx.stage, 0.0) + time.monotonic() - ctx.stage_started, 3)
+                    ok = await heartbeat(conn, ctx.job["id"], self.worker_id, self.lease_seconds,
+                                         ctx.stage, timings)
+                finally:
+                    await conn.close()
+            except Exception as e:
+                logger.warning(f"Job {ctx.job['id']}: heartbeat failed: {e}")
+                continue
+            if not ok:
+                # Reaped and possibly re-claimed elsewhere: stop before the job runs twice at once
+                logger.warning(f"Job {ctx.job['id']}: lease lost (reaped by another worker), cancelling handler")
+                ctx.lease_lost = True
+                work.cancel()
+                return
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "current_job": self.current["id"] if self.current else None,
+            "current_kind": self.current["kind"] if self.current else None,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+async def start_workers(concurrency: int = JOB_WORKER_CONCURRENCY) -> None:
+    """Start this process's workers (0 = API-only process, jobs are left to other processes)."""
+    while len(_workers) < concurrency:
+        worker = JobWorker()
+        _workers.append(worker)
+        worker.start()
+    logger.info(f"Job queue: {len(_workers)} worker(s) started for kinds {sorted(_handlers)}")
+
+
+async def stop_workers() -> None:
+    """Stop this process's workers, handing any running jobs back to the queue."""
+    for worker in _workers:
+        await worker.stop()
+    _workers.clear()
+
+
+def wake_workers() -> None:
+    for worker in _workers:
+        worker.wake()
@@ -3,7 +3,9 @@
 Adapted from /opt/anime-studio/quality/learning_system.py (800 LOC standalone)
 into a streamlined module that uses our asyncpg pool and new Phase 1 tables.
 
-No sklearn/numpy dependency — pattern analysis done via SQL aggregation.
+No sklearn/numpy dependency — pattern analysis done via SQL aggregation over
+the rollup tables maintained by learning_rollups.py (per character/checkpoint/
+sampler/day aggregates with parameter sketches), never the raw history.
 
 Key functions:
     suggest_params(slug)   → dict of optimal params for a character
@@ -17,6 +19,7 @@ from typing import Any
 
 from .db import get_pool
 from .events import event_bus, IMAGE_REJECTED, IMAGE_APPROVED
+from .learning_rollups import band_floor, rollup_stats
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +33,7 @@ SUCCESS_THRESHOLD = 0.7
 async def suggest_params(character_slug: str) -> dict[str, Any]:
     """Suggest optimal generation parameters based on historical quality data.
 
-    Queries generation_history for this character's successful generations
+    Reads this character's successful generations from generation_rollups
     and returns median values for cfg_scale, steps, plus best sampler.
     Returns empty dict if insufficient data.
     """
@@ -40,35 +43,32 @@ async def suggest_params(character_slug: str) -> dict[str, Any]:
             # Get median params from successful generations
             row = await conn.fetchrow("""
                 SELECT
-                    COUNT(*) as sample_count,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY cfg_scale) as median_cfg,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY steps) as median_steps,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY width) as median_width,
-                    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY height) as median_height,
-                    AVG(quality_score) as avg_quality
-                FROM generation_history
+                    COALESCE(SUM(n), 0) as sample_count,
+                    sketch_quantile(array_agg(cfg_sketch), 0.5) as median_cfg,
+                    sketch_quantile(array_agg(steps_sketch), 0.5) as median_steps,
+                    sketch_quantile(array_agg(width_sketch), 0.5) as median_width,
+                    sketch_quantile(array_agg(height_sketch), 0.5) as median_height,
+                    SUM(quality_sum) / NULLIF(SUM(n), 0) as avg_quality
+                FROM generation_rollups
                 WHERE character_slug = $1
-                  AND quality_score >= $2
-                  AND quality_score IS NOT NULL
-                  AND cfg_scale IS NOT NULL
-            """, character_slug, SUCCESS_THRESHOLD)
+                  AND quality_band >= $2
+            """, character_slug, band_floor(SUCCESS_THRESHOLD))
 
             if not row or row["sample_count"] < MIN_SAMPLES:
                 return {}
 
             # Best sampler (by avg quality)
             sampler_row = await conn.fetchrow("""
-                SELECT sampler, AVG(quality_score) as avg_q, COUNT(*) as n
-                FROM generation_history
+                SELECT sampler, SUM(quality_sum) / SUM(n) as avg_q, SUM(n) as n
+                FROM generation_rollups
                 WHERE character_slug = $1
-                  AND quality_score >= $2
-                  AND quality_score IS NOT NULL
+                  AND quality_band >= $2
                   AND sampler IS NOT NULL
                 GROUP BY sampler
-                HAVING COUNT(*) >= 3
+                HAVING SUM(n) >= 3
                 ORDER BY avg_q DESC
                 LIMIT 1
-            """, character_slug, SUCCESS_THRESHOLD)
+            """, character_slug, band_floor(SUCCESS_THRESHOLD))
 
             suggestions = {
                 "sample_count": row["sample_count"],
@@ -99,13 +99,9 @@ async def rejection_patterns(character_slug: str, limit: int = 10) -> list[dict]
         pool = await get_pool()
         async with pool.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT
-                    unnest(categories) as category,
-                    COUNT(*) as count,
-                    MAX(created_at) as latest_at
-                FROM rejections
+                SELECT category, count, latest_at
+                FROM rejection_rollups
                 WHERE character_slug = $1
-                GROUP BY category
                 ORDER BY count DESC
                 LIMIT $2
             """, character_slug, limit)
@@ -135,13 +131,13 @@ async def checkpoint_rankings(project_name: str) -> list[dict]:
             rows = await conn.fetch("""
                 SELECT
                     checkpoint_model,
-                    AVG(quality_score) as avg_quality,
-                    COUNT(*) as total,
-                    COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                    COUNT(*) FILTER (WHERE status = 'rejected') as rejected
-                FROM generation_history
+                    SUM(quality_sum) / SUM(n) as avg_quality,
+                    SUM(n) as total,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected
+                FROM generation_rollups
                 WHERE project_name = $1
-                  AND quality_score IS NOT NULL
+                  AND quality_band IS NOT NULL
                   AND checkpoint_model IS NOT NULL
                 GROUP BY checkpoint_model
                 ORDER BY avg_quality DESC
@@ -175,33 +171,33 @@ async def quality_trend(character_slug: str = None, project_name: str = None, da
             if character_slug:
                 rows = await conn.fetch("""
                     SELECT
-                        DATE(generated_at) as gen_date,
-                        AVG(quality_score) as avg_quality,
-                        COUNT(*) as total,
-                        COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                        COUNT(*) FILTER (WHERE status = 'rejected') as rejected
-                    FROM generation_history
+                        day as gen_date,
+                        SUM(quality_sum) / SUM(n) as avg_quality,
+                        SUM(n) as total,
+                        COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                        COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected
+                    FROM generation_rollups
                     WHERE character_slug = $1
-                      AND quality_score IS NOT NULL
-                      AND generated_at > NOW() - ($2 || ' days')::INTERVAL
-                    GROUP BY gen_date
-                    ORDER BY gen_date
-                """, character_slug, str(days))
+                      AND quality_band IS NOT NULL
+                      AND day >= CURRENT_DATE - $2::int
+                    GROUP BY day
+                    ORDER BY day
+                """, character_slug, int(days))
             elif project_name:
                 rows = await conn.fetch("""
                     SELECT
-                        DATE(generated_at) as gen_date,
-                        AVG(quality_score) as avg_quality,
-                        COUNT(*) as total,
-                        COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                        COUNT(*) FILTER (WHERE status = 'rejected') as rejected
-                    FROM generation_history
+                        day as gen_date,
+                        SUM(quality_sum) / SUM(n) as avg_quality,
+                        SUM(n) as total,
+                        COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                        COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected
+                    FROM generation_rollups
                     WHERE project_name = $1
-                      AND quality_score IS NOT NULL
-                      AND generated_at > NOW() - ($2 || ' days')::INTERVAL
-                    GROUP BY gen_date
-                    ORDER BY gen_date
-                """, project_name, str(days))
+                      AND quality_band IS NOT NULL
+                      AND day >= CURRENT_DATE - $2::int
+                    GROUP BY day
+                    ORDER BY day
+                """, project_name, int(days))
             else:
                 return []
 
@@ -228,15 +224,15 @@ async def learning_stats() -> dict:
         async with pool.acquire() as conn:
             row = await conn.fetchrow("""
                 SELECT
-                    COUNT(*) as total_generations,
-                    COUNT(*) FILTER (WHERE quality_score IS NOT NULL) as reviewed,
-                    AVG(quality_score) FILTER (WHERE quality_score IS NOT NULL) as avg_quality,
-                    COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                    COUNT(*) FILTER (WHERE status = 'rejected') as rejected,
-                    COUNT(DISTINCT character_slug) FILTER (WHERE character_slug IS NOT NULL) as characters_tracked,
-                    COUNT(DISTINCT checkpoint_model) FILTER (WHERE checkpoint_model IS NOT NULL) as checkpoints_used
-                FROM generation_history
-                WHERE generated_at > NOW() - INTERVAL '30 days'
+                    COALESCE(SUM(n), 0) as total_generations,
+                    COALESCE(SUM(n) FILTER (WHERE quality_band IS NOT NULL), 0) as reviewed,
+                    SUM(quality_sum) / NULLIF(SUM(n) FILTER (WHERE quality_band IS NOT NULL), 0) as avg_quality,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected,
+                    COUNT(DISTINCT character_slug) as characters_tracked,
+                    COUNT(DISTINCT checkpoint_model) as checkpoints_used
+                FROM generation_rollups
+                WHERE day >= CURRENT_DATE - 30
             """)
 
             rej_row = await conn.fetchrow("""
@@ -282,6 +278,7 @@ async def learning_stats() -> dict:
                     "regenerations": decisions_row["regenerations"],
                 },
                 "period": "last_30_days",
+                "rollups": rollup_stats(),
             }
 
     except Exception as e:
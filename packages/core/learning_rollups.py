@@ -0,0 +1,321 @@
+"""Learning rollups — pre-aggregated generation history for learning and model selection.
+
+learning.py and model_selector.py used to run PERCENTILE_CONT / GROUP BY scans over
+all of generation_history (and rejections) on every call, including inside
+generate_batch via recommend_params(). They now read small tables kept here:
+
+    generation_rollups         one row per (day, character, project, checkpoint, sampler,
+                               scheduler, status, quality band): count, quality sum/min/max,
+                               last generation time and cfg/steps/width/height sketches
+    rejection_rollups          per (character, category): rejection count, latest time
+    character_recent_quality   each character's last RECENT_SCORES quality scores, newest first
+
+Quality bands are 0.05 wide (band 13 = [0.65, 0.70)), so "quality >= threshold"
+filters become band comparisons via band_floor(). Sketches are value -> count
+histograms at a fixed resolution per parameter (QuantileSketch); they merge by
+addition and the SQL function sketch_quantile() (created in db_migrations) reads a
+quantile off the merged histograms. cfg/steps/size values are discrete already, so
+medians are exact up to the resolution (lower median instead of interpolated).
+
+Refresh: (character, day) partitions with rows whose updated_at (kept current by
+the touch trigger from db_migrations, so inserts, reviews and manual UPDATEs all
+count) is past the stored watermark are rebuilt from generation_history;
+characters with new rejections get their rejection_rollups rebuilt. Each refresh
+re-reads WATERMARK_OVERLAP behind the watermark so rows committed late by a long
+transaction aren't skipped. IMAGE_APPROVED / IMAGE_REJECTED schedule a refresh a
+few seconds after the review lands, and a background loop refreshes every
+LEARNING_ROLLUP_INTERVAL seconds to catch manual edits.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import date, datetime, timedelta
+
+from .config import LEARNING_ROLLUP_DEBOUNCE, LEARNING_ROLLUP_INTERVAL
+from .db import get_pool
+from .events import event_bus, IMAGE_APPROVED, IMAGE_REJECTED
+
+logger = logging.getLogger(__name__)
+
+QUALITY_BANDS = 20          # bands per 1.0 of quality score (0.05 wide)
+RECENT_SCORES = 100         # recent scores kept per character for drift detection
+
+# Sketch resolution per generation parameter
+SKETCH_RESOLUTION = {"cfg_scale": 0.1, "steps": 1, "width": 8, "height": 8}
+
+ROLLUP_COLUMNS = (
+    "day", "character_slug", "project_name", "checkpoint_model", "sampler", "scheduler",
+    "status", "quality_band", "n", "quality_sum", "quality_min", "quality_max", "last_generated",
+    "cfg_sketch", "steps_sketch", "width_sketch", "height_sketch",
+)
+
+_WATERMARK_KEY = "learning_rollup_watermark"
+
+# Re-read this far behind the watermark so rows committed late by a long
+# transaction are still picked up. Rebuilding a partition twice is harmless.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+_lock = asyncio.Lock()
+_loop_task = None           # asyncio.Task for the periodic refresh
+_debounce_task = None       # asyncio.Task for an event-triggered refresh
+_refresh_requested = False
+_last_refresh: dict = {}
+
+
+def quality_band(score: float | None) -> int | None:
+    """Band index of a quality score (None stays None)."""
+    if score is None:
+        return None
+    return min(QUALITY_BANDS, max(0, math.floor(score * QUALITY_BANDS + 1e-9)))
+
+
+def band_floor(threshold: float) -> int:
+    """Lowest band whose scores all satisfy quality >= threshold."""
+    return math.ceil(threshold * QUALITY_BANDS - 1e-9)
+
+
+class QuantileSketch:
+    """Value -> count histogram at a fixed resolution; merges by adding counts."""
+
+    def __init__(self, resolution: float, counts: dict[str, int] | None = None):
+        self.resolution = resolution
+        self.counts: dict[str, int] = dict(counts or {})
+
+    def _key(self, value: float) -> str:
+        return f"{round(round(value / self.resolution) * self.resolution, 6):g}"
+
+    def add(self, value: float | None):
+        if value is not None:
+            key = self._key(float(value))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def quantile(self, q: float) -> float | None:
+        """Smallest value whose cumulative count reaches q of the total (as sketch_quantile())."""
+        total = sum(self.counts.values())
+        if not total:
+            return None
+        cumulative = 0
+        for value, n in sorted((float(k), n) for k, n in self.counts.items()):
+            cumulative += n
+            if cumulative >= q * total:
+                return value
+        return None
+
+    def to_json(self) -> str:
+        return json.dumps(self.counts, sort_keys=True)
+
+
+def build_rollups(rows: list[dict]) -> list[tuple]:
+    """Aggregate generation_history rows into generation_rollups tuples (ROLLUP_COLUMNS order)."""
+    groups: dict[tuple, dict] = {}
+    for r in rows:
+        score = r["quality_score"]
+        key = (
+            r["generated_at"].date(), r["character_slug"], r["project_name"],
+            r["checkpoint_model"], r["sampler"], r["scheduler"], r["status"],
+            quality_band(score),
+        )
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = {
+                "n": 0, "sum": None, "min": None, "max": None, "last": None,
+                "sketches": {p: QuantileSketch(res) for p, res in SKETCH_RESOLUTION.items()},
+            }
+        g["n"] += 1
+        if score is not None:
+            g["sum"] = (g["sum"] or 0.0) + score
+            g["min"] = score if g["min"] is None else min(g["min"], score)
+            g["max"] = score if g["max"] is None else max(g["max"], score)
+        if g["last"] is None or r["generated_at"] > g["last"]:
+            g["last"] = r["generated_at"]
+        for param, sketch in g["sketches"].items():
+            sketch.add(r[param])
+
+    return [
+        (*key, g["n"], g["sum"], g["min"], g["max"], g["last"],
+         *(g["sketches"][p].to_json() for p in SKETCH_RESOLUTION))
+        for key, g in groups.items()
+    ]
+
+
+# ── Refresh ─────────────────────────────────────────────────────────────
+
+async def _rebuild_partition(conn, character_slug: str | None, day: date) -> int:
+    """Recompute the generation_rollups rows of one (character, day) partition."""
+    if character_slug is None:
+        slug_clause, args = "character_slug IS NULL", [day]
+    else:
+        slug_clause, args = "character_slug = $2", [day, character_slug]
+
+    rows = await conn.fetch(f"""
+        SELECT generated_at, character_slug, project_name, checkpoint_model, sampler,
+               scheduler, status, quality_score, cfg_scale, steps, width, height
+        FROM generation_history
+        WHERE {slug_clause} AND generated_at >= $1::date AND generated_at < $1::date + 1
+    """, *args)
+    rollups = build_rollups([dict(r) for r in rows])
+
+    placeholders = ", ".join(
+        f"${i}::jsonb" if col.endswith("_sketch") else f"${i}"
+        for i, col in enumerate(ROLLUP_COLUMNS, 1)
+    )
+    async with conn.transaction():
+        await conn.execute(
+            f"DELETE FROM generation_rollups WHERE {slug_clause} AND day = $1", *args
+        )
+        if rollups:
+            await conn.executemany(
+                f"INSERT INTO generation_rollups ({', '.join(ROLLUP_COLUMNS)}) VALUES ({placeholders})",
+                rollups,
+            )
+    return len(rollups)
+
+
+async def _rebuild_recent(conn, character_slug: str):
+    await conn.execute("""
+        INSERT INTO character_recent_quality (character_slug, scores, updated_at)
+        VALUES ($1, ARRAY(
+            SELECT quality_score FROM generation_history
+            WHERE character_slug = $1 AND quality_score IS NOT NULL
+            ORDER BY generated_at DESC
+            LIMIT $2
+        ), NOW())
+        ON CONFLICT (character_slug) DO UPDATE
+        SET scores = EXCLUDED.scores, updated_at = EXCLUDED.updated_at
+    """, character_slug, RECENT_SCORES)
+
+
+async def _rebuild_rejections(conn, character_slug: str):
+    async with conn.transaction():
+        await conn.execute("DELETE FROM rejection_rollups WHERE character_slug = $1", character_slug)
+        await conn.execute("""
+            INSERT INTO rejection_rollups (character_slug, category, count, latest_at)
+            SELECT r.character_slug, c.category, COUNT(*), MAX(r.created_at)
+            FROM rejections r
+            CROSS JOIN LATERAL unnest(r.categories) AS c(category)
+            WHERE r.character_slug = $1
+            GROUP BY r.character_slug, c.category
+        """, character_slug)
+
+
+async def refresh(full: bool = False) -> dict:
+    """Rebuild rollup partitions changed since the last refresh (everything if full)."""
+    async with _lock:
+        started = time.perf_counter()
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            now = await conn.fetchval("SELECT LOCALTIMESTAMP")
+            since = datetime(1970, 1, 1)
+            if not full:
+                stored = await conn.fetchval(
+                    "SELECT value FROM system_config WHERE key = $1", _WATERMARK_KEY
+                )
+                if stored:
+                    since = datetime.fromisoformat(stored) - WATERMARK_OVERLAP
+
+            partitions = await conn.fetch("""
+                SELECT DISTINCT character_slug, generated_at::date AS day
+                FROM generation_history
+                WHERE updated_at > $1
+            """, since)
+            rows = 0
+            for p in partitions:
+                rows += await _rebuild_partition(conn, p["character_slug"], p["day"])
+
+            characters = {p["character_slug"] for p in partitions if p["character_slug"]}
+            for slug in characters:
+                await _rebuild_recent(conn, slug)
+
+            rejected = await conn.fetch(
+                "SELECT DISTINCT character_slug FROM rejections WHERE created_at > $1", since
+            )
+            for r in rejected:
+                await _rebuild_rejections(conn, r["character_slug"])
+
+            await conn.execute("""
+                INSERT INTO system_config (key, value, description, category, updated_at)
+                VALUES ($1, $2, 'Learning rollups refreshed up to this time', 'learning', NOW())
+                ON CONFLICT (key) DO UPDATE SET value = $2, updated_at = NOW()
+            """, _WATERMARK_KEY, now.isoformat())
+
+    _last_refresh.clear()
+    _last_refresh.update({
+        "full": full,
+        "partitions": len(partitions),
+        "rollup_rows": rows,
+        "characters": len(characters),
+        "rejection_characters": len(rejected),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "watermark": now.isoformat(),
+        "timestamp": datetime.utcnow().isoformat(),
+    })
+    if partitions or rejected:
+        logger.info(
+            f"Learning rollups refreshed: {len(partitions)} partitions, "
+            f"{len(rejected)} rejection sets in {_last_refresh['duration_ms']:.0f}ms"
+        )
+    return dict(_last_refresh)
+
+
+def rollup_stats() -> dict:
+    """Last refresh breakdown and refresh settings."""
+    return {
+        "interval": LEARNING_ROLLUP_INTERVAL,
+        "debounce": LEARNING_ROLLUP_DEBOUNCE,
+        "refresh_pending": _debounce_task is not None and not _debounce_task.done(),
+        "last_refresh": dict(_last_refresh),
+    }
+
+
+async def _debounced_refresh():
+    global _refresh_requested
+    while _refresh_requested:
+        await asyncio.sleep(LEARNING_ROLLUP_DEBOUNCE)
+        _refresh_requested = False
+        try:
+            await refresh()
+        except Exception as e:
+            logger.warning(f"Learning rollup refresh failed: {e}")
+
+
+def request_refresh():
+    """Refresh soon; reviews arriving within the debounce window share one refresh."""
+    global _debounce_task, _refresh_requested
+    _refresh_requested = True
+    if _debounce_task is None or _debounce_task.done():
+        _debounce_task = asyncio.create_task(_debounced_refresh())
+
+
+async def _refresh_loop():
+    """Catch up at startup, then refresh every LEARNING_ROLLUP_INTERVAL seconds."""
+    while True:
+        try:
+            await refresh()
+        except Exception as e:
+            logger.warning(f"Learning rollup refresh failed: {e}")
+        await asyncio.sleep(LEARNING_ROLLUP_INTERVAL)
+
+
+def start_refresh_loop():
+    """Start the periodic refresh. Called once at app startup, after migrations."""
+    global _loop_task
+    if _loop_task is not None and not _loop_task.done():
+        return
+    _loop_task = asyncio.create_task(_refresh_loop())
+    logger.info(f"Learning rollup refresh loop started (interval={LEARNING_ROLLUP_INTERVAL}s)")
+
+
+# ---- EventBus Handlers ----
+
+@event_bus.on(IMAGE_APPROVED)
+@event_bus.on(IMAGE_REJECTED)
+async def _handle_review(data: dict):
+    """A review changed generation_history — pick it up shortly."""
+    request_refresh()
@@ -0,0 +1,439 @@
+"""LLM gateway — one scheduler in front of Ollama for every caller in the app.
+
+Ollama serves one model at a time on one GPU, so callers with their own
+clients queue behind each other blindly (a player waits behind a batch of
+vision reviews) and mixed traffic forces model swaps. Requests go through
+the llm_gateway singleton instead:
+
+- Priority classes: INTERACTIVE (players) > REVIEW (vision review, video QC)
+  > BATCH (tagging, analysis, story/state generation). A free slot always
+  goes to the highest class that is waiting.
+- Bounded concurrency: at most OLLAMA_CONCURRENCY requests in flight.
+- Model affinity: within a class, requests for the model that ran last go
+  first so a mixed burst doesn't swap models back and forth;
+  LLM_AFFINITY_MAX_WAIT caps how long a request can be passed over.
+- Response cache: cacheable requests are keyed by endpoint + model + prompt /
+  messages + image hashes + options + format. Identical requests in flight
+  share one upstream call; results live in an LRU backed by SQLite.
+- Per-caller metrics: requests, errors, cache hits, queue wait and latency
+  (GET /api/system/llm/stats).
+
+Usage:
+    from packages.core.llm_gateway import llm_gateway, PRIORITY_REVIEW
+
+    text = await llm_gateway.generate(
+        VISION_MODEL, prompt, images=[b64], caller="video_qc",
+        priority=PRIORITY_REVIEW, options={"temperature": 0.1},
+    )
+    # Sync code in a worker thread (asyncio.to_thread):
+    text = llm_gateway.generate_sync(VISION_MODEL, prompt, caller="vision_review")
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from packages.core.config import (
+    LLM_AFFINITY_MAX_WAIT,
+    LLM_CACHE_PATH,
+    LLM_CACHE_SIZE,
+    LLM_CACHE_TTL_DAYS,
+    LLM_QUEUE_TIMEOUT,
+    OLLAMA_CONCURRENCY,
+    OLLAMA_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_REVIEW = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_REVIEW: "review", PRIORITY_BATCH: "batch"}
+
+# Latency samples kept per caller for percentiles
+_RECENT_SAMPLES = 200
+
+
+def request_key(endpoint: str, payload: dict) -> str:
+    """Cache key for a request: images are reduced to their content hashes."""
+    body = dict(payload)
+    body.pop("stream", None)
+    if body.get("images"):
+        body["images"] = [hashlib.sha256(img.encode()).hexdigest() for img in body["images"]]
+    raw = json.dumps([endpoint, body], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseStore:
+    """LRU of responses in front of a SQLite table; path=None keeps it in memory only."""
+
+    def __init__(self, path: Path | None = LLM_CACHE_PATH, maxsize: int = LLM_CACHE_SIZE,
+                 ttl_days: float = LLM_CACHE_TTL_DAYS):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl_days * 86400
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection | None:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY, model TEXT, response_json TEXT NOT NULL,
+                       created_at REAL NOT NULL)"""
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, value: dict):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                return value
+            try:
+                db = self._db()
+                row = db.execute(
+                    "SELECT response_json FROM responses WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl),
+                ).fetchone() if db else None
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                return None
+            if row is None:
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, model: str | None, value: dict):
+        with self._lock:
+            self._remember(key, value)
+            try:
+                db = self._db()
+                if db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses (key, model, response_json, created_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, model, json.dumps(value), time.time()),
+                    )
+                    db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self, model: str | None = None) -> int:
+        """Drop cached responses (for one model, or all)."""
+        with self._lock:
+            self._lru.clear()
+            db = self._db()
+            if not db:
+                return 0
+            cur = (db.execute("DELETE FROM responses WHERE model = ?", (model,)) if model
+                   else db.execute("DELETE FROM responses"))
+            db.commit()
+            return cur.rowcount
+
+
+class CallerStats:
+    """Counters and timings for one caller."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.calls = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._recent: deque[float] = deque(maxlen=_RECENT_SAMPLES)
+
+    def record(self, wait: float, latency: float):
+        self.calls += 1
+        self.queue_wait_total += wait
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self._recent.append(latency)
+
+    def as_dict(self) -> dict:
+        recent = sorted(self._recent)
+
+        def pct(q: float) -> float | None:
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))], 3) if recent else None
+
+        calls = self.calls or 1
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "queue_wait_avg": round(self.queue_wait_total / calls, 3),
+            "queue_wait_max": round(self.queue_wait_max, 3),
+            "latency_avg": round(self.latency_total / calls, 3),
+            "latency_p50": pct(0.5),
+            "latency_p95": pct(0.95),
+            "latency_max": round(self.latency_max, 3),
+        }
+
+
+@dataclass
+class _Waiter:
+    priority: int
+    model: str
+    seq: int
+    enqueued: float = field(default_factory=time.monotonic)
+    event: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class OllamaGateway:
+    """Priority scheduler, response cache and metrics for Ollama requests."""
+
+    def __init__(self, base_url: str = OLLAMA_URL, concurrency: int = OLLAMA_CONCURRENCY,
+                 store: ResponseStore | None = None, affinity_max_wait: float = LLM_AFFINITY_MAX_WAIT):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.affinity_max_wait = affinity_max_wait
+        self.store = store if store is not None else ResponseStore()
+        self._waiting: list[_Waiter] = []
+        self._active = 0
+        self._current_model: str | None = None
+        self._seq = itertools.count()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._callers: dict[str, CallerStats] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop | None = None):
+        """Remember the app's event loop so *_sync() calls from threads run on it."""
+        self._loop = loop or asyncio.get_running_loop()
+
+    # --- scheduling ---
+
+    def _pick(self) -> _Waiter:
+        top = min(w.priority for w in self._waiting)
+        candidates = [w for w in self._waiting if w.priority == top]
+        oldest = min(candidates, key=lambda w: w.seq)
+        if time.monotonic() - oldest.enqueued >= self.affinity_max_wait:
+            return oldest
+        same_model = [w for w in candidates if w.model == self._current_model]
+        return min(same_model, key=lambda w: w.seq) if same_model else oldest
+
+    def _dispatch(self):
+        while self._waiting and self._active < self.concurrency:
+            waiter = self._pick()
+            self._waiting.remove(waiter)
+            self._active += 1
+            self._current_model = waiter.model
+            waiter.event.set()
+
+    async def _acquire(self, priority: int, model: str) -> float:
+        """Wait for a slot; returns seconds spent queued."""
+        waiter = _Waiter(priority, model, next(self._seq))
+        self._waiting.append(waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter.event.wait(), LLM_QUEUE_TIMEOUT)
+        except BaseException:
+            if waiter.event.is_set():
+                self._release()
+            else:
+                self._waiting.remove(waiter)
+            raise
+        return time.monotonic() - waiter.enqueued
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    # --- transport ---
+
+    async def _post(self, endpoint: str, payload: dict, timeout: float) -> dict:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(base_url=self.base_url)
+            self._client_loop = loop
+        resp = await self._client.post(endpoint, json={**payload, "stream": False}, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _caller(self, caller: str) -> CallerStats:
+        stats = self._callers.get(caller)
+        if stats is None:
+            stats = self._callers[caller] = CallerStats()
+        return stats
+
+    async def request(
+        self,
+        endpoint: str,
+        payload: dict,
+        *,
+        caller: str,
+        priority: int = PRIORITY_BATCH,
+        timeout: float = 120.0,
+        cache: bool = True,
+    ) -> dict:
+        """POST a non-streaming request to Ollama through the scheduler and cache."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        stats = self._caller(caller)
+        stats.requests += 1
+
+        key = request_key(endpoint, payload) if cache else None
+        future = None
+        if key:
+            cached = self.store.get(key)
+            if cached is not None:
+                stats.cache_hits += 1
+                return cached
+            pending = self._inflight.get(key)
+            if pending is not None:
+                stats.coalesced += 1
+                return await asyncio.shield(pending)
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+
+        model = payload.get("model", "")
+        try:
+            wait = await self._acquire(priority, model)
+            started = time.monotonic()
+            try:
+                result = await self._post(endpoint, payload, timeout)
+            finally:
+                self._release()
+            stats.record(wait, time.monotonic() - started)
+        except BaseException as e:
+            stats.errors += 1
+            if future is not None:
+                self._inflight.pop(key, None)
+                future.set_exception(e if isinstance(e, Exception) else RuntimeError("LLM request cancelled"))
+                future.exception()  # retrieved: coalesced waiters (if any) re-raise it
+            raise
+
+        if future is not None:
+            self._inflight.pop(key, None)
+            self.store.put(key, model, result)
+            future.set_result(result)
+        return result
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        *,
+        caller: str,
+        priority: int = PRIORITY_BATCH,
+        images: list[str] | None = None,
+        system: str | None = None,
+        format: str | None = None,
+        options: dict | None = None,
+        timeout: float = 120.0,
+        cache: bool = True,
+    ) -> str:
+        """/api/generate; returns the response text (images are base64 strings)."""
+        payload: dict = {"model": model, "prompt": prompt}
+        if images:
+            payload["images"] = images
+        if system:
+            payload["system"] = system
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        data = await self.request(
+            "/api/generate", payload, caller=caller, priority=priority, timeout=timeout, cache=cache,
+        )
+        return data.get("response", "")
+
+    async def chat(
+        self,
+        model: str,
+        messages: list[dict],
+        *,
+        caller: str,
+        priority: int = PRIORITY_BATCH,
+        format: str | None = None,
+        options: dict | None = None,
+        timeout: float = 120.0,
+        cache: bool = True,
+    ) -> str:
+        """/api/chat; returns the assistant message content."""
+        payload: dict = {"model": model, "messages": messages}
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        data = await self.request(
+            "/api/chat", payload, caller=caller, priority=priority, timeout=timeout, cache=cache,
+        )
+        return data.get("message", {}).get("content", "")
+
+    # --- sync bridge ---
+
+    def _run_sync(self, coro):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coro.close()
+            raise RuntimeError("Sync LLM call made on the event loop thread; await the async method")
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        # No app loop (CLI scripts): run standalone
+        return asyncio.run(coro)
+
+    def generate_sync(self, model: str, prompt: str, **kwargs) -> str:
+        """generate() for sync code running in a worker thread."""
+        return self._run_sync(self.generate(model, prompt, **kwargs))
+
+    # --- metrics ---
+
+    def stats(self) -> dict:
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for w in self._waiting:
+            waiting[PRIORITY_NAMES.get(w.priority, str(w.priority))] += 1
+        callers = {name: s.as_dict() for name, s in sorted(self._callers.items())}
+        requests = sum(s.requests for s in self._callers.values())
+        hits = sum(s.cache_hits + s.coalesced for s in self._callers.values())
+        return {
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "waiting": waiting,
+            "current_model": self._current_model,
+            "cache_hit_rate": round(hits / requests, 3) if requests else None,
+            "callers": callers,
+        }
+
+
+# Module-level singleton
+llm_gateway = OllamaGateway()
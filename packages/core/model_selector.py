@@ -1,6 +1,6 @@
 """Model selector — checkpoint and parameter recommendation from learned data.
 
-Uses generation_history and learned_patterns to:
+Uses the generation/rejection rollups (learning_rollups.py) to:
 - Recommend the best checkpoint for a character/project
 - Suggest parameter overrides based on historical success
 - Detect quality drift and flag characters needing attention
@@ -16,6 +16,7 @@ from pathlib import Path
 from typing import Any
 
 from .db import get_pool
+from .learning_rollups import RECENT_SCORES, band_floor
 from .model_profiles import MODEL_PROFILES, get_model_profile
 
 logger = logging.getLogger(__name__)
@@ -49,37 +50,26 @@ async def recommend_params(character_slug: str, project_name: str = None,
         async with pool.acquire() as conn:
             # 1. Get successful generation stats for this character
             # Filter by checkpoint_model when provided to prevent cross-model contamination
-            if checkpoint_model:
-                param_row = await conn.fetchrow("""
-                    SELECT
-                        COUNT(*) as sample_count,
-                        AVG(quality_score) as avg_quality,
-                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY cfg_scale) as median_cfg,
-                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY steps) as median_steps,
-                        MODE() WITHIN GROUP (ORDER BY sampler) as best_sampler,
-                        MODE() WITHIN GROUP (ORDER BY scheduler) as best_scheduler
-                    FROM generation_history
-                    WHERE character_slug = $1
-                      AND quality_score >= $2
-                      AND quality_score IS NOT NULL
-                      AND cfg_scale IS NOT NULL
-                      AND checkpoint_model = $3
-                """, character_slug, QUALITY_FLOOR, checkpoint_model)
-            else:
-                param_row = await conn.fetchrow("""
-                    SELECT
-                        COUNT(*) as sample_count,
-                        AVG(quality_score) as avg_quality,
-                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY cfg_scale) as median_cfg,
-                        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY steps) as median_steps,
-                        MODE() WITHIN GROUP (ORDER BY sampler) as best_sampler,
-                        MODE() WITHIN GROUP (ORDER BY scheduler) as best_scheduler
-                    FROM generation_history
+            ckpt_clause = "AND checkpoint_model = $3" if checkpoint_model else ""
+            args = [character_slug, band_floor(QUALITY_FLOOR)] + ([checkpoint_model] if checkpoint_model else [])
+            param_row = await conn.fetchrow(f"""
+                WITH r AS (
+                    SELECT * FROM generation_rollups
                     WHERE character_slug = $1
-                      AND quality_score >= $2
-                      AND quality_score IS NOT NULL
-                      AND cfg_scale IS NOT NULL
-                """, character_slug, QUALITY_FLOOR)
+                      AND quality_band >= $2
+                      {ckpt_clause}
+                )
+                SELECT
+                    COALESCE(SUM(n), 0) as sample_count,
+                    SUM(quality_sum) / NULLIF(SUM(n), 0) as avg_quality,
+                    sketch_quantile(array_agg(cfg_sketch), 0.5) as median_cfg,
+                    sketch_quantile(array_agg(steps_sketch), 0.5) as median_steps,
+                    (SELECT sampler FROM r WHERE sampler IS NOT NULL
+                     GROUP BY sampler ORDER BY SUM(n) DESC, sampler LIMIT 1) as best_sampler,
+                    (SELECT scheduler FROM r WHERE scheduler IS NOT NULL
+                     GROUP BY scheduler ORDER BY SUM(n) DESC, scheduler LIMIT 1) as best_scheduler
+                FROM r
+            """, *args)
 
             if not param_row or param_row["sample_count"] < MIN_CONFIDENCE_SAMPLES:
                 # Not enough data — return learned negatives only
@@ -97,17 +87,16 @@ async def recommend_params(character_slug: str, project_name: str = None,
             checkpoint_rec = None
             if project_name:
                 ckpt_row = await conn.fetchrow("""
-                    SELECT checkpoint_model, AVG(quality_score) as avg_q, COUNT(*) as n
-                    FROM generation_history
+                    SELECT checkpoint_model, SUM(quality_sum) / SUM(n) as avg_q, SUM(n) as n
+                    FROM generation_rollups
                     WHERE project_name = $1
-                      AND quality_score >= $2
-                      AND quality_score IS NOT NULL
+                      AND quality_band >= $2
                       AND checkpoint_model IS NOT NULL
                     GROUP BY checkpoint_model
-                    HAVING COUNT(*) >= 3
+                    HAVING SUM(n) >= 3
                     ORDER BY avg_q DESC
                     LIMIT 1
-                """, project_name, QUALITY_FLOOR)
+                """, project_name, band_floor(QUALITY_FLOOR))
                 if ckpt_row:
                     checkpoint_rec = {
                         "model": ckpt_row["checkpoint_model"],
@@ -140,17 +129,16 @@ async def recommend_params(character_slug: str, project_name: str = None,
 async def _get_learned_negatives(conn, character_slug: str) -> str:
     """Build negative prompt additions from DB rejection categories.
 
-    Queries the rejections table for this character's top rejection categories
+    Reads this character's top rejection categories from rejection_rollups
     and maps them to negative prompt terms via REJECTION_NEGATIVE_MAP.
     """
     from packages.lora_training.feedback import REJECTION_NEGATIVE_MAP
 
     rows = await conn.fetch("""
-        SELECT unnest(categories) as category, COUNT(*) as freq
-        FROM rejections
+        SELECT category, count as freq
+        FROM rejection_rollups
         WHERE character_slug = $1
-        GROUP BY category
-        ORDER BY freq DESC
+        ORDER BY count DESC
         LIMIT 10
     """, character_slug)
 
@@ -170,41 +158,44 @@ async def detect_drift(character_slug: str = None, project_name: str = None,
                        window: int = 20) -> list[dict]:
     """Detect quality drift — characters whose recent quality is declining.
 
-    Compares last `window` generations against the historical average.
-    Returns list of characters with significant drops.
+    Compares the last `window` scored generations (at most RECENT_SCORES)
+    against the historical average. Returns list of characters with significant drops.
     """
+    window = max(1, min(window, RECENT_SCORES))
     try:
         pool = await get_pool()
         async with pool.acquire() as conn:
             if character_slug:
-                where_clause = "WHERE gh.character_slug = $1 AND gh.quality_score IS NOT NULL"
+                where_clause = "WHERE r.character_slug = $1 AND r.quality_band IS NOT NULL"
                 args = [character_slug]
             elif project_name:
-                where_clause = "WHERE gh.project_name = $1 AND gh.quality_score IS NOT NULL"
+                where_clause = "WHERE r.project_name = $1 AND r.quality_band IS NOT NULL"
                 args = [project_name]
             else:
-                where_clause = "WHERE gh.quality_score IS NOT NULL"
+                where_clause = "WHERE r.quality_band IS NOT NULL"
                 args = []
 
-            # Get per-character rolling averages
+            # Overall averages from the rollups, recent ones from each character's last scores
             query = f"""
-                WITH recent AS (
-                    SELECT character_slug,
-                           quality_score,
-                           ROW_NUMBER() OVER (PARTITION BY character_slug ORDER BY generated_at DESC) as rn
-                    FROM generation_history gh
+                WITH overall AS (
+                    SELECT
+                        character_slug,
+                        SUM(quality_sum) / SUM(n) as overall_avg,
+                        SUM(n) as total_count
+                    FROM generation_rollups r
                     {where_clause}
+                    GROUP BY character_slug
+                    HAVING SUM(n) >= {MIN_CONFIDENCE_SAMPLES}
                 ),
                 stats AS (
                     SELECT
-                        character_slug,
-                        AVG(quality_score) FILTER (WHERE rn <= {window}) as recent_avg,
-                        AVG(quality_score) as overall_avg,
-                        COUNT(*) FILTER (WHERE rn <= {window}) as recent_count,
-                        COUNT(*) as total_count
-                    FROM recent
-                    GROUP BY character_slug
-                    HAVING COUNT(*) >= {MIN_CONFIDENCE_SAMPLES}
+                        o.character_slug,
+                        (SELECT AVG(s) FROM unnest(q.scores[1:{window}]) AS s) as recent_avg,
+                        o.overall_avg,
+                        LEAST(cardinality(q.scores), {window}) as recent_count,
+                        o.total_count
+                    FROM overall o
+                    JOIN character_recent_quality q ON q.character_slug = o.character_slug
                 )
                 SELECT * FROM stats
                 WHERE recent_avg < overall_avg - 0.1
@@ -240,14 +231,14 @@ async def character_quality_summary(project_name: str) -> list[dict]:
             rows = await conn.fetch("""
                 SELECT
                     character_slug,
-                    COUNT(*) as total,
-                    COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                    COUNT(*) FILTER (WHERE status = 'rejected') as rejected,
-                    AVG(quality_score) FILTER (WHERE quality_score IS NOT NULL) as avg_quality,
-                    MAX(quality_score) as best_quality,
-                    MIN(quality_score) FILTER (WHERE quality_score IS NOT NULL) as worst_quality,
-                    MAX(generated_at) as last_generated
-                FROM generation_history
+                    SUM(n) as total,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected,
+                    SUM(quality_sum) / NULLIF(SUM(n) FILTER (WHERE quality_band IS NOT NULL), 0) as avg_quality,
+                    MAX(quality_max) as best_quality,
+                    MIN(quality_min) as worst_quality,
+                    MAX(last_generated) as last_generated
+                FROM generation_rollups
                 WHERE project_name = $1
                   AND character_slug IS NOT NULL
                 GROUP BY character_slug
@@ -319,18 +310,18 @@ async def checkpoint_comparison(project_name: str) -> list[dict]:
             rows = await conn.fetch("""
                 SELECT
                     checkpoint_model,
-                    COUNT(*) as total,
-                    COUNT(*) FILTER (WHERE quality_score IS NOT NULL) as scored,
-                    AVG(quality_score) FILTER (WHERE quality_score IS NOT NULL) as avg_quality,
-                    MAX(quality_score) as best_quality,
-                    COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                    COUNT(*) FILTER (WHERE status = 'rejected') as rejected,
-                    MAX(generated_at) as last_used
-                FROM generation_history
+                    SUM(n) as total,
+                    COALESCE(SUM(n) FILTER (WHERE quality_band IS NOT NULL), 0) as scored,
+                    SUM(quality_sum) / NULLIF(SUM(n) FILTER (WHERE quality_band IS NOT NULL), 0) as avg_quality,
+                    MAX(quality_max) as best_quality,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected,
+                    MAX(last_generated) as last_used
+                FROM generation_rollups
                 WHERE project_name = $1
                   AND checkpoint_model IS NOT NULL
                 GROUP BY checkpoint_model
-                ORDER BY AVG(quality_score) FILTER (WHERE quality_score IS NOT NULL) DESC NULLS LAST
+                ORDER BY avg_quality DESC NULLS LAST
             """, project_name)
 
             return [
@@ -387,11 +378,11 @@ async def suggest_exploration(
             tried_rows = await conn.fetch("""
                 SELECT
                     checkpoint_model,
-                    COUNT(*) as n,
-                    AVG(quality_score) FILTER (WHERE quality_score IS NOT NULL) as avg_q,
-                    COUNT(*) FILTER (WHERE status = 'approved') as approved,
-                    COUNT(*) FILTER (WHERE status = 'rejected') as rejected
-                FROM generation_history
+                    SUM(n) as n,
+                    SUM(quality_sum) / NULLIF(SUM(n) FILTER (WHERE quality_band IS NOT NULL), 0) as avg_q,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'approved'), 0) as approved,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'rejected'), 0) as rejected
+                FROM generation_rollups
                 WHERE character_slug = $1
                   AND checkpoint_model IS NOT NULL
                 GROUP BY checkpoint_model
@@ -52,6 +52,9 @@ class TrainingRequest(BaseModel):
     learning_rate: Optional[float] = 1e-4
     resolution: Optional[int] = 512
     lora_rank: Optional[int] = None  # Auto-set by router: 64 for SDXL, 32 for SD1.5
+    batch_size: Optional[int] = 1
+    bucket: Optional[bool] = False  # aspect-ratio buckets instead of square crops
+    cache_latents: Optional[bool] = False  # pre-encode latents/text once, offload encoders
 
 
 class DatasetStatus(BaseModel):
@@ -125,6 +128,7 @@ class VisionReviewRequest(BaseModel):
     model: Optional[str] = None  # override VISION_MODEL
     include_approved: bool = False
     include_rejected: bool = False  # re-review rejected images (scores only, no auto-reject)
+    prescreen: bool = True  # CPU pre-screen pending images; obvious rejects skip the vision model
 
 
 class ProjectCreate(BaseModel):
@@ -12,6 +12,14 @@ Safety:
   - FramePack: one scene at a time (GPU memory constraint)
   - All autonomous actions logged to autonomy_decisions via log_decision()
 
+Tick cost:
+  - Projects are evaluated in parallel (ORCHESTRATOR_CONCURRENCY), each on its
+    own pooled connection, so one slow gate doesn't hold up other projects
+  - An entry is only re-evaluated when something may have changed: its row's
+    updated_at moved, an EventBus event named its project or character, its
+    work task finished, or ORCHESTRATOR_RECHECK_SECONDS passed
+  - tick_stats() reports skipped entries and per-gate evaluation time
+
 Sub-modules:
   - orchestrator_gates.py: gate check functions
   - orchestrator_work.py: work dispatch functions
@@ -20,20 +28,25 @@ Sub-modules:
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime
 
-from .config import BASE_PATH
-from .db import get_pool, connect_direct
+from .config import BASE_PATH, ORCHESTRATOR_CONCURRENCY, ORCHESTRATOR_RECHECK_SECONDS
+from .db import get_pool, connect_pooled
 from .events import (
     event_bus,
     IMAGE_APPROVED,
     PIPELINE_PHASE_ADVANCED,
     TRAINING_STARTED,
+    TRAINING_COMPLETE,
     SCENE_PLANNING_COMPLETE,
     SCENE_READY,
+    SCENE_UPDATED,
     SHOT_GENERATED,
+    SHOT_UPDATED,
     EPISODE_ASSEMBLED,
     EPISODE_PUBLISHED,
+    EPISODE_UPDATED,
 )
 from .audit import log_decision
 
@@ -77,12 +90,21 @@ logger = logging.getLogger(__name__)
 
 _enabled = False
 _tick_interval = 60        # seconds between ticks
-_graph_sync_interval = 1800  # 30 min between graph syncs
+_graph_sync_interval = 300  # 5 min between incremental graph syncs
 _tick_task = None           # asyncio.Task for the background loop
 _graph_sync_task = None     # asyncio.Task for periodic graph sync
 _training_target = 100     # approved images needed to advance past training_data
 _active_work: dict[str, asyncio.Task] = {}  # tracks running work tasks
 
+# Change tracking: pipeline row id -> (updated_at as last left, monotonic time checked)
+_entry_marks: dict[int, tuple[datetime | None, float]] = {}
+_dirty_projects: set[int] = set()
+_dirty_characters: set[str] = set()
+_dirty_all = True           # first tick after startup evaluates everything
+_gate_timings: dict[str, dict] = {}
+_tick_totals = {"ticks": 0, "evaluated": 0, "skipped": 0, "errors": 0}
+_last_tick: dict = {}
+
 # Phase definitions
 CHARACTER_PHASES = ["training_data", "lora_training", "ready"]
 PROJECT_PHASES = [
@@ -96,6 +118,8 @@ PROJECT_PHASES = [
 async def enable(on: bool = True):
     global _enabled
     _enabled = on
+    if on:
+        mark_dirty()
     logger.info(f"Orchestrator {'enabled' if on else 'disabled'}")
     # Persist to DB so state survives restarts
     try:
@@ -135,6 +159,7 @@ async def _load_enabled_state():
 def set_training_target(target: int):
     global _training_target
     _training_target = max(1, target)
+    mark_dirty()
     logger.info(f"Orchestrator training target set to {_training_target}")
 
 
@@ -222,7 +247,10 @@ async def _all_characters_ready(conn, project_id: int) -> bool:
 
 
 async def _evaluate_entry(conn, entry: dict):
-    """Evaluate a single pipeline entry: check gate, advance or initiate work."""
+    """Evaluate a single pipeline entry: check gate, advance or initiate work.
+
+    Returns the updated_at the row was left with, the watermark for change detection.
+    """
     entity_type = entry["entity_type"]
     entity_id = entry["entity_id"]
     project_id = entry["project_id"]
@@ -242,7 +270,8 @@ async def _evaluate_entry(conn, entry: dict):
                         last_checked_at = $1, updated_at = $1
                     WHERE id = $2
                 """, now, entry["id"])
-            return
+                return now
+            return entry.get("updated_at")
 
         if status == "blocked":
             await conn.execute("""
@@ -254,9 +283,11 @@ async def _evaluate_entry(conn, entry: dict):
             status = "pending"
 
     # Run the gate check
+    started = time.perf_counter()
     gate_result = await _check_gate_impl(
         conn, entity_type, entity_id, project_id, phase, _training_target,
     )
+    _record_gate_time(phase, time.perf_counter() - started)
 
     await conn.execute("""
         UPDATE production_pipeline
@@ -284,28 +315,152 @@ async def _evaluate_entry(conn, entry: dict):
                     gate_result, _enabled, _training_target,
                 )
             )
+            task.add_done_callback(lambda _t, pid=project_id: mark_dirty(project_id=pid))
             _active_work[work_key] = task
 
+    return now
+
+
+def mark_dirty(project_id: int | None = None, character_slug: str | None = None):
+    """Have the next tick re-evaluate a project's or character's entries (no args: all)."""
+    global _dirty_all
+    if project_id is None and not character_slug:
+        _dirty_all = True
+    if project_id is not None:
+        _dirty_projects.add(project_id)
+    if character_slug:
+        _dirty_characters.add(character_slug)
+
+
+def _needs_evaluation(entry: dict, projects: set[int], characters: set[str], now: float) -> bool:
+    """True when an entry's inputs may have changed since it was last evaluated."""
+    mark = _entry_marks.get(entry["id"])
+    if mark is None:
+        return True
+    updated_at, checked = mark
+    return (
+        entry.get("updated_at") != updated_at
+        or now - checked >= ORCHESTRATOR_RECHECK_SECONDS
+        or entry["project_id"] in projects
+        or (entry["entity_type"] == "character" and entry["entity_id"] in characters)
+    )
+
+
+def _record_gate_time(phase: str, seconds: float):
+    t = _gate_timings.setdefault(phase, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+    ms = seconds * 1000
+    t["calls"] += 1
+    t["total_ms"] += ms
+    t["max_ms"] = max(t["max_ms"], ms)
+    t["last_ms"] = ms
 
-async def tick():
-    """Single evaluation pass — check all non-completed pipeline entries."""
+
+async def _evaluate_project(project_id: int, entries: list[dict], sem: asyncio.Semaphore) -> int:
+    """Evaluate one project's due entries in order on its own connection."""
+    async with sem:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            for entry in entries:
+                updated_at = await _evaluate_entry(conn, entry)
+                _entry_marks[entry["id"]] = (updated_at, time.monotonic())
+    return len(entries)
+
+
+async def tick(force: bool = False):
+    """Single evaluation pass over non-completed pipeline entries.
+
+    Entries are grouped by project and evaluated concurrently; entries whose
+    inputs haven't changed since their last evaluation are skipped unless force.
+    """
+    global _dirty_all
     if not _enabled:
         return {"skipped": True, "reason": "orchestrator disabled"}
 
+    started = time.perf_counter()
+    # Take the wakeups now so events arriving during the tick count for the next one
+    force = force or _dirty_all
+    projects, characters = set(_dirty_projects), set(_dirty_characters)
+    _dirty_all = False
+    _dirty_projects.clear()
+    _dirty_characters.clear()
+
     pool = await get_pool()
     async with pool.acquire() as conn:
-        entries = await conn.fetch("""
+        rows = await conn.fetch("""
             SELECT * FROM production_pipeline
             WHERE status NOT IN ('completed', 'skipped')
             ORDER BY project_id, entity_type DESC, phase
         """)
 
-        evaluated = 0
-        for entry in entries:
-            await _evaluate_entry(conn, dict(entry))
-            evaluated += 1
+    entries = [dict(r) for r in rows]
+    live_ids = {e["id"] for e in entries}
+    for entry_id in [i for i in _entry_marks if i not in live_ids]:
+        del _entry_marks[entry_id]
+
+    now = time.monotonic()
+    by_project: dict[int, list[dict]] = {}
+    for entry in entries:
+        if force or _needs_evaluation(entry, projects, characters, now):
+            by_project.setdefault(entry["project_id"], []).append(entry)
+
+    sem = asyncio.Semaphore(max(1, ORCHESTRATOR_CONCURRENCY))
+    project_ids = list(by_project)
+    results = await asyncio.gather(
+        *(_evaluate_project(pid, by_project[pid], sem) for pid in project_ids),
+        return_exceptions=True,
+    )
 
-    return {"evaluated": evaluated, "timestamp": datetime.utcnow().isoformat()}
+    evaluated = errors = 0
+    for pid, result in zip(project_ids, results):
+        if isinstance(result, Exception):
+            errors += 1
+            mark_dirty(project_id=pid)
+            logger.error(f"Orchestrator tick failed for project {pid}: {result}")
+        else:
+            evaluated += result
+    skipped = len(entries) - sum(len(v) for v in by_project.values())
+
+    _tick_totals["ticks"] += 1
+    _tick_totals["evaluated"] += evaluated
+    _tick_totals["skipped"] += skipped
+    _tick_totals["errors"] += errors
+    _last_tick.clear()
+    _last_tick.update({
+        "evaluated": evaluated,
+        "skipped": skipped,
+        "projects": len(project_ids),
+        "errors": errors,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "timestamp": datetime.utcnow().isoformat(),
+    })
+    return dict(_last_tick)
+
+
+def tick_stats() -> dict:
+    """Tick counters, the last tick's breakdown and per-gate evaluation time."""
+    gates = {
+        phase: {
+            "calls": t["calls"],
+            "avg_ms": round(t["total_ms"] / t["calls"], 2),
+            "max_ms": round(t["max_ms"], 2),
+            "last_ms": round(t["last_ms"], 2),
+            "total_ms": round(t["total_ms"], 1),
+        }
+        for phase, t in sorted(_gate_timings.items())
+    }
+    return {
+        "concurrency": ORCHESTRATOR_CONCURRENCY,
+        "recheck_seconds": ORCHESTRATOR_RECHECK_SECONDS,
+        "tracked_entries": len(_entry_marks),
+        "pending_wakeups": {
+            "all": _dirty_all,
+            "projects": sorted(_dirty_projects),
+            "characters": sorted(_dirty_characters),
+        },
+        "totals": dict(_tick_totals),
+        "last_tick": dict(_last_tick),
+        "gates": gates,
+    }
 
 
 # ── Background Tick Loop ───────────────────────────────────────────────
@@ -322,7 +477,7 @@ async def _tick_loop():
 
 
 async def _graph_sync_loop():
-    """Background loop that runs graph full_sync() every _graph_sync_interval seconds.
+    """Background loop that runs an incremental graph sync every _graph_sync_interval seconds.
 
     Non-fatal — if graph sync fails, it logs and retries next interval.
     Runs regardless of orchestrator enabled state (graph data is useful even when paused).
@@ -754,6 +909,21 @@ async def _handle_episode_published(data: dict):
         logger.debug(f"Telegram notification failed (non-fatal): {e}")
 
 
+async def _handle_input_changed(data: dict):
+    """Wake the entries an event may affect for the next tick."""
+    project_id = data.get("project_id")
+    slug = data.get("character_slug")
+    if project_id is not None:
+        try:
+            project_id = int(project_id)
+        except (TypeError, ValueError):
+            project_id = None
+    if project_id is None and not slug:
+        mark_dirty()  # scene/shot/episode edits carry no project id
+    else:
+        mark_dirty(project_id=project_id, character_slug=slug)
+
+
 def register_orchestrator_handlers():
     """Register EventBus handlers. Called once at startup."""
     event_bus.subscribe(IMAGE_APPROVED, _handle_image_approved)
@@ -764,4 +934,10 @@ def register_orchestrator_handlers():
     event_bus.subscribe(SHOT_GENERATED, _handle_shot_generated)
     event_bus.subscribe(EPISODE_ASSEMBLED, _handle_episode_assembled)
     event_bus.subscribe(EPISODE_PUBLISHED, _handle_episode_published)
-    logger.info("Orchestrator EventBus handlers registered (8 events)")
+    for event in (
+        IMAGE_APPROVED, PIPELINE_PHASE_ADVANCED, TRAINING_STARTED, TRAINING_COMPLETE,
+        SCENE_PLANNING_COMPLETE, SCENE_READY, SCENE_UPDATED, SHOT_GENERATED, SHOT_UPDATED,
+        EPISODE_ASSEMBLED, EPISODE_PUBLISHED, EPISODE_UPDATED,
+    ):
+        event_bus.subscribe(event, _handle_input_changed)
+    logger.info("Orchestrator EventBus handlers registered (8 events + tick wakeups)")
@@ -4,7 +4,6 @@ Split from orchestrator.py for readability. All gates are imported and
 re-exported by orchestrator.py so external callers are unaffected.
 """
 
-import json
 import logging
 from pathlib import Path
 
@@ -14,15 +13,9 @@ logger = logging.getLogger(__name__)
 
 
 def _count_approved_from_file(slug: str) -> int:
-    """Count approved images from approval_status.json."""
-    approval_file = BASE_PATH / slug / "approval_status.json"
-    if not approval_file.exists():
-        return 0
-    try:
-        statuses = json.loads(approval_file.read_text())
-        return sum(1 for v in statuses.values() if v == "approved")
-    except (json.JSONDecodeError, IOError):
-        return 0
+    """Count approved images via the approval index."""
+    from packages.lora_training.approval_index import get_index
+    return get_index(BASE_PATH).count(slug, "approved")
 
 
 def _gate_training_data(slug: str, training_target: int) -> dict:
@@ -72,11 +72,17 @@ async def pipeline_summary(project_id: int):
 
 @router.post("/orchestrator/tick")
 async def manual_tick():
-    """Trigger a single evaluation pass."""
-    result = await orchestrator.tick()
+    """Trigger a single evaluation pass over every entry (ignores change tracking)."""
+    result = await orchestrator.tick(force=True)
     return result
 
 
+@router.get("/orchestrator/stats")
+async def tick_stats():
+    """Tick counters: entries evaluated vs skipped, per-gate evaluation time."""
+    return orchestrator.tick_stats()
+
+
 @router.post("/orchestrator/override")
 async def override(req: OverrideRequest):
     """Force a phase status (skip, reset, complete)."""
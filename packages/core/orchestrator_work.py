@@ -19,7 +19,6 @@ from .events import (
     TRAINING_STARTED,
     TRAINING_COMPLETE,
     SCENE_PLANNING_COMPLETE,
-    SCENE_READY,
     EPISODE_ASSEMBLED,
     EPISODE_PUBLISHED,
     PIPELINE_PHASE_ADVANCED,
@@ -506,8 +505,13 @@ async def work_shot_preparation(conn, project_id: int):
 
 
 async def work_video_generation(conn, project_id: int):
-    """Generate video for one scene at a time (GPU constraint)."""
-    from packages.scene_generation.builder import generate_scene, _scene_generation_tasks
+    """Queue video generation for the next unfinished scene.
+
+    The scene_generation job queue serializes GPU work; SCENE_READY is emitted
+    by the job handler once the scene finishes.
+    """
+    from packages.core.job_queue import PRIORITY_LOW, SCENE_GENERATION, enqueue, wake_workers
+    from packages.scene_generation.builder import scene_generation_active
 
     scene = await conn.fetchrow("""
         SELECT id FROM scenes
@@ -521,38 +525,27 @@ async def work_video_generation(conn, project_id: int):
 
     scene_id = str(scene["id"])
 
-    if scene_id in _scene_generation_tasks:
-        existing = _scene_generation_tasks[scene_id]
-        if not existing.done():
-            logger.info(f"Orchestrator: scene {scene_id} already generating (via API), skipping")
-            return
-
-    logger.info(f"Orchestrator: starting video generation for scene {scene_id}")
-
-    sentinel = asyncio.get_event_loop().create_future()
-    _scene_generation_tasks[scene_id] = sentinel
+    if await scene_generation_active(conn, scene_id):
+        logger.info(f"Orchestrator: scene {scene_id} already generating or queued, skipping")
+        return
 
-    try:
-        await generate_scene(scene_id)
-        await event_bus.emit(SCENE_READY, {
-            "project_id": project_id,
-            "scene_id": scene_id,
-        })
-        logger.info(f"Orchestrator: scene {scene_id} generation complete")
-    except Exception as e:
-        logger.error(f"Orchestrator: video generation failed for scene {scene_id}: {e}")
-    finally:
-        _scene_generation_tasks.pop(scene_id, None)
-        if not sentinel.done():
-            sentinel.set_result(None)
+    job_id = await enqueue(
+        conn, SCENE_GENERATION,
+        {"scene_id": scene_id, "project_id": project_id, "notify_ready": True},
+        dedupe_key=scene_id, priority=PRIORITY_LOW,
+    )
+    if job_id is None:
+        return
+    wake_workers()
+    logger.info(f"Orchestrator: queued video generation for scene {scene_id} (job {job_id})")
 
     await log_decision(
         decision_type="orchestrator_video_gen",
         project_name=str(project_id),
-        input_context={"scene_id": scene_id},
-        decision_made="generated_scene_video",
+        input_context={"scene_id": scene_id, "job_id": job_id},
+        decision_made="queued_scene_video",
         confidence_score=0.8,
-        reasoning="Generated video for next incomplete scene",
+        reasoning="Queued video generation for next incomplete scene",
     )
 
 
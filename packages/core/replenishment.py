@@ -93,27 +93,15 @@ def _reset_daily_if_needed():
 
 
 def _count_approved(character_slug: str) -> int:
-    """Count approved images from approval_status.json."""
-    approval_file = BASE_PATH / character_slug / "approval_status.json"
-    if not approval_file.exists():
-        return 0
-    try:
-        statuses = json.loads(approval_file.read_text())
-        return sum(1 for v in statuses.values() if v == "approved")
-    except (json.JSONDecodeError, IOError):
-        return 0
+    """Count approved images via the approval index."""
+    from packages.lora_training.approval_index import get_index
+    return get_index(BASE_PATH).count(character_slug, "approved")
 
 
 def _count_pending(character_slug: str) -> int:
-    """Count pending images from approval_status.json."""
-    approval_file = BASE_PATH / character_slug / "approval_status.json"
-    if not approval_file.exists():
-        return 0
-    try:
-        statuses = json.loads(approval_file.read_text())
-        return sum(1 for v in statuses.values() if v == "pending")
-    except (json.JSONDecodeError, IOError):
-        return 0
+    """Count pending images via the approval index."""
+    from packages.lora_training.approval_index import get_index
+    return get_index(BASE_PATH).count(character_slug, "pending")
 
 
 def _image_brightness(img_path: Path) -> float:
@@ -143,15 +131,8 @@ def _sync_reference_images(character_slug: str, max_refs: int = 5) -> int:
     ref_dir = BASE_PATH / character_slug / "reference_images"
     ref_dir.mkdir(parents=True, exist_ok=True)
 
-    approval_file = BASE_PATH / character_slug / "approval_status.json"
-    if not approval_file.exists():
-        return 0
-    try:
-        approvals = json.loads(approval_file.read_text())
-    except (json.JSONDecodeError, IOError):
-        return 0
-
-    approved = [k for k, v in approvals.items() if v == "approved"]
+    from packages.lora_training.approval_index import get_index
+    approved = get_index(BASE_PATH).names_with_status(character_slug, "approved")
     if not approved:
         return 0
 
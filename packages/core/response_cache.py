@@ -0,0 +1,134 @@
+"""ETag response cache and keyset cursors for hot list endpoints.
+
+Bodies are serialized once and kept as bytes with a strong ETag, grouped by a
+scope (usually the project id) so writers can drop exactly what they touched.
+Clients sending a matching If-None-Match get a bodiless 304.
+
+An invalidate() that lands while respond() is building a body bumps the
+scope's generation, and the (now stale) body is served but not cached.
+
+Entries also expire after a short TTL — some writers (e.g. the generation
+pipeline updating scene status) don't emit events, so invalidation alone
+would leave dashboards stale.
+
+Usage:
+    scene_list_cache = ResponseCache("scenes")
+
+    return await scene_list_cache.respond(request, project_id, (after, limit), build)
+    scene_list_cache.invalidate(project_id)   # after a write
+
+Keyset cursors are opaque base64 tokens of the last row's sort key
+(encode_cursor/decode_cursor), so pages stay stable while rows are added.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import HTTPException, Request, Response
+
+LIST_CACHE_TTL = 15.0
+LIST_CACHE_SIZE = 256
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class ResponseCache:
+    """Bounded LRU of (etag, json bytes) per (scope, key)."""
+
+    def __init__(self, name: str, ttl: float = LIST_CACHE_TTL, maxsize: int = LIST_CACHE_SIZE):
+        self.name = name
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[float, str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate(): per scope, and _epoch for invalidate(None)
+        self._generations: dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, scope: Hashable, key: Hashable) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end((scope, key))
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def generation(self, scope: Hashable) -> tuple[int, int]:
+        """Token that changes whenever scope is invalidated."""
+        with self._lock:
+            return self._epoch, self._generations.get(scope, 0)
+
+    def put(self, scope: Hashable, key: Hashable, body: Any,
+            generation: tuple[int, int] | None = None) -> tuple[str, bytes]:
+        """Serialize and cache body; skipped (still returned) if scope moved past generation."""
+        payload = json.dumps(body, separators=(",", ":"), default=str).encode()
+        etag = f'"{hashlib.sha1(payload).hexdigest()[:20]}"'
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(scope, 0)):
+                return etag, payload
+            self._entries[(scope, key)] = (time.monotonic() + self._ttl, etag, payload)
+            self._entries.move_to_end((scope, key))
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return etag, payload
+
+    def invalidate(self, scope: Hashable | None = None) -> None:
+        """Drop every entry for scope, or everything when scope is None."""
+        with self._lock:
+            if scope is None:
+                self._epoch += 1
+                self._entries.clear()
+            else:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+                for k in [k for k in self._entries if k[0] == scope]:
+                    del self._entries[k]
+
+    async def respond(
+        self, request: Request, scope: Hashable, key: Hashable,
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """Serve from cache (304 when the client's ETag matches) or build and cache."""
+        entry = self.get(scope, key)
+        if entry is None:
+            generation = self.generation(scope)
+            entry = self.put(scope, key, await build(), generation)
+        etag, payload = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=payload, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,387 @@
+"""Segment-level video assembly — crossfaded concatenation without full re-encodes.
+
+A single xfade/acrossfade filter graph re-encodes every frame of every input,
+so changing one scene re-encodes the whole episode. Instead:
+
+1. Each input is normalized once (common size/fps/pixel format, stereo 48k
+   audio or silence) with keyframes forced at its transition windows, and
+   split there into head / body / tail pieces. Pieces are cached under
+   ASSEMBLY_CACHE_DIR, keyed by the input's content hash and the output
+   profile, so unchanged inputs are never re-encoded.
+2. Each join re-encodes only tail(i) + head(i+1) through xfade/acrossfade
+   (a "cut" just lists both pieces). Transition segments are cached too.
+3. The final file is head(0), body(0), T(0), body(1), ..., body(n-1),
+   tail(n-1) through the concat demuxer with -c copy.
+
+Window sizes follow the old filter-graph maths: an input contributes at most
+40% of its length to a transition, and the crossfade is the shortest of the
+requested duration and the two windows, so running times are unchanged.
+
+Usage:
+    stats = await assemble(paths, output_path, [Join("fadeblack", 0.5)] * (len(paths) - 1))
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from packages.core.config import ASSEMBLY_CACHE_DIR, ASSEMBLY_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Bump when encode settings or the piece layout change — old entries are ignored
+ASSEMBLY_VERSION = 1
+# Share of an input's length it can give up to a transition window
+MAX_WINDOW_FRACTION = 0.4
+# Normalization encodes running at once (each ffmpeg is already multi-threaded)
+ENCODE_CONCURRENCY = 2
+
+VIDEO_ARGS = [
+    "-c:v", "libx264", "-preset", "fast", "-crf", "19",
+    "-pix_fmt", "yuv420p", "-video_track_timescale", "90000",
+]
+AUDIO_ARGS = ["-c:a", "aac", "-b:a", "192k", "-ar", "48000", "-ac", "2"]
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class ClipInfo:
+    path: str
+    duration: float
+    has_audio: bool
+    width: int
+    height: int
+    fps: str  # ffmpeg rate, e.g. "24/1"
+
+
+@dataclass
+class Join:
+    """Transition between two consecutive inputs (xfade name, or "cut")."""
+    type: str = "dissolve"
+    duration: float = 0.3
+
+
+@dataclass
+class Pieces:
+    """Normalized head/body/tail of one input; head/tail are None without a window."""
+    key: str
+    head: Path | None
+    body: Path
+    tail: Path | None
+    durations: dict[str, float]
+
+
+async def _run(cmd: list[str]) -> tuple[int, str]:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    return proc.returncode, stderr.decode(errors="replace")
+
+
+async def probe_clip(path: str) -> ClipInfo:
+    """Duration, audio presence, size and frame rate in one ffprobe call."""
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "quiet", "-print_format", "json",
+        "-show_entries", "format=duration:stream=codec_type,width,height,r_frame_rate,duration",
+        path,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await proc.communicate()
+    try:
+        info = json.loads(stdout.decode() or "{}")
+    except json.JSONDecodeError:
+        info = {}
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise RuntimeError(f"No video stream in {path}")
+
+    def _float(value) -> float | None:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    # The video stream's own length: trailing audio must not push the tail cut past the last frame
+    duration = _float(video.get("duration")) or _float(info.get("format", {}).get("duration")) or 0.0
+    return ClipInfo(
+        path=path,
+        duration=duration,
+        has_audio=any(s.get("codec_type") == "audio" for s in streams),
+        width=int(video.get("width") or 0),
+        height=int(video.get("height") or 0),
+        fps=video.get("r_frame_rate") or "24/1",
+    )
+
+
+async def _probe_duration(path: str) -> float:
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
+        "-of", "csv=p=0", path,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await proc.communicate()
+    try:
+        return float(stdout.decode().strip())
+    except ValueError:
+        return 0.0
+
+
+_hash_memo: dict[tuple[str, int, int], str] = {}
+
+
+def content_hash(path: str) -> str:
+    """sha1 of a file's bytes, memoized on (path, size, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _hash_memo.get(memo_key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha1").hexdigest()
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def _cache_key(*parts) -> str:
+    raw = "|".join(str(p) for p in (ASSEMBLY_VERSION, *parts))
+    return hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+
+def clip_window(duration: float, window: float) -> float:
+    """Transition window an input of this length gives at each end."""
+    return round(max(0.0, min(window, duration * MAX_WINDOW_FRACTION)), 3)
+
+
+def crossfade(tail_duration: float, head_duration: float, join: Join) -> tuple[float, float]:
+    """(duration, offset) of the xfade between a tail and the next head piece."""
+    duration = round(max(0.0, min(join.duration, tail_duration, head_duration)), 3)
+    return duration, round(max(0.0, tail_duration - duration), 3)
+
+
+def concat_order(pieces: list[Pieces], transitions: list[list[Path]]) -> list[Path]:
+    """Final stream-copy order: head(0), body(0), T(0), body(1), ..., tail(n-1)."""
+    order = [pieces[0].head, pieces[0].body]
+    for i, segment in enumerate(transitions):
+        order.extend(segment)
+        order.append(pieces[i + 1].body)
+    order.append(pieces[-1].tail)
+    return [p for p in order if p is not None]
+
+
+def _normalize_cmd(clip: ClipInfo, target: tuple[int, int, str], with_audio: bool,
+                   window: float, out_dir: Path) -> list[str]:
+    width, height, fps = target
+    cmd = ["ffmpeg", "-y", "-i", clip.path]
+    if with_audio and not clip.has_audio:
+        cmd += ["-f", "lavfi", "-t", f"{clip.duration:.3f}", "-i", "anullsrc=r=48000:cl=stereo"]
+    cmd += [
+        "-map", "0:v:0",
+        "-vf", (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps}"),
+        *VIDEO_ARGS,
+    ]
+    if with_audio:
+        cmd += ["-map", "0:a:0" if clip.has_audio else "1:a:0", *AUDIO_ARGS, "-shortest"]
+    else:
+        cmd += ["-an"]
+    if window > 0:
+        cuts = f"{window:.3f},{clip.duration - window:.3f}"
+        cmd += [
+            "-force_key_frames", cuts,
+            "-f", "segment", "-segment_times", cuts, "-segment_format", "mp4",
+            "-reset_timestamps", "1", str(out_dir / "part_%03d.mp4"),
+        ]
+    else:
+        cmd.append(str(out_dir / "part_000.mp4"))
+    return cmd
+
+
+def _load_pieces(key: str) -> Pieces | None:
+    entry = ASSEMBLY_CACHE_DIR / key
+    try:
+        manifest = json.loads((entry / MANIFEST).read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    durations = manifest["durations"]
+    paths = {name: entry / f"{name}.mp4" for name in durations}
+    if not all(p.exists() for p in paths.values()):
+        return None
+    os.utime(entry / MANIFEST)  # last-used marker for prune_cache()
+    return Pieces(key, paths.get("head"), paths["body"], paths.get("tail"), durations)
+
+
+async def _clip_pieces(clip: ClipInfo, target: tuple[int, int, str], with_audio: bool,
+                       window: float, sem: asyncio.Semaphore, stats: dict) -> Pieces:
+    digest = await asyncio.to_thread(content_hash, clip.path)
+    w = clip_window(clip.duration, window)
+    key = _cache_key("clip", digest, *target, with_audio, f"{w:.3f}")
+    cached = _load_pieces(key)
+    if cached:
+        stats["clips_reused"] += 1
+        return cached
+
+    async with sem:
+        started = time.monotonic()
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=ASSEMBLY_CACHE_DIR))
+        try:
+            rc, stderr = await _run(_normalize_cmd(clip, target, with_audio, w, tmp))
+            if rc != 0:
+                raise RuntimeError(f"Normalizing {clip.path} failed: {stderr[-300:]}")
+            names = ["head", "body", "tail"] if w > 0 else ["body"]
+            parts = sorted(tmp.glob("part_*.mp4"))
+            if len(parts) != len(names):
+                raise RuntimeError(f"Normalizing {clip.path}: expected {len(names)} pieces, got {len(parts)}")
+            durations = {}
+            for name, part in zip(names, parts):
+                os.replace(part, tmp / f"{name}.mp4")
+                durations[name] = await _probe_duration(str(tmp / f"{name}.mp4"))
+            (tmp / MANIFEST).write_text(json.dumps({"source": clip.path, "durations": durations}))
+            try:
+                os.rename(tmp, ASSEMBLY_CACHE_DIR / key)
+            except OSError:
+                pass  # a concurrent assembly stored the same entry first
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        stats["clips_encoded"] += 1
+        stats["encode_seconds"] += time.monotonic() - started
+
+    pieces = _load_pieces(key)
+    if pieces is None:
+        raise RuntimeError(f"Normalized pieces for {clip.path} missing from cache")
+    return pieces
+
+
+async def _transition(a: Pieces, b: Pieces, join: Join, with_audio: bool,
+                      sem: asyncio.Semaphore, stats: dict) -> list[Path]:
+    pair = [p for p in (a.tail, b.head) if p is not None]
+    if join.type == "cut" or a.tail is None or b.head is None:
+        return pair
+    duration, offset = crossfade(a.durations["tail"], b.durations["head"], join)
+    if duration <= 0:
+        return pair
+
+    path = ASSEMBLY_CACHE_DIR / "transitions" / f"{_cache_key('xfade', a.key, b.key, join.type, duration)}.mp4"
+    if path.exists():
+        os.utime(path)
+        stats["transitions_reused"] += 1
+        return [path]
+
+    graph = (f"[0:v][1:v]xfade=transition={join.type}:"
+             f"duration={duration:.3f}:offset={offset:.3f}[v]")
+    cmd = ["ffmpeg", "-y", "-i", str(a.tail), "-i", str(b.head)]
+    if with_audio:
+        graph += f";[0:a][1:a]acrossfade=d={duration:.3f}:c1=tri:c2=tri[a]"
+        cmd += ["-filter_complex", graph, "-map", "[v]", "-map", "[a]", *AUDIO_ARGS]
+    else:
+        cmd += ["-filter_complex", graph, "-map", "[v]", "-an"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.stem}-{os.getpid()}-{id(a)}.mp4")
+    cmd += [*VIDEO_ARGS, str(tmp)]
+
+    async with sem:
+        started = time.monotonic()
+        rc, stderr = await _run(cmd)
+        stats["encode_seconds"] += time.monotonic() - started
+    if rc != 0:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"Transition {join.type} failed: {stderr[-300:]}")
+    os.replace(tmp, path)
+    stats["transitions_encoded"] += 1
+    return [path]
+
+
+def _concat_line(path: Path) -> str:
+    return "file '" + str(path).replace("'", "'\\''") + "'\n"
+
+
+async def assemble(
+    video_paths: list[str],
+    output_path: str,
+    joins: list[Join],
+    audio: bool | None = None,
+) -> dict:
+    """Concatenate videos with per-join transitions; returns timing/cache stats.
+
+    joins has len(video_paths) - 1 entries. audio=None keeps audio when any
+    input has it (silence fills the rest); False drops it. Raises RuntimeError
+    if an ffmpeg step fails.
+    """
+    started = time.monotonic()
+    stats = {
+        "clips": len(video_paths), "clips_encoded": 0, "clips_reused": 0,
+        "transitions_encoded": 0, "transitions_reused": 0,
+        "encode_seconds": 0.0, "concat_seconds": 0.0, "total_seconds": 0.0,
+    }
+    ASSEMBLY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    clips = await asyncio.gather(*(probe_clip(p) for p in video_paths))
+    with_audio = any(c.has_audio for c in clips) if audio is None else audio
+    target = (clips[0].width, clips[0].height, clips[0].fps)
+    window = max((j.duration for j in joins if j.type != "cut"), default=0.0)
+
+    sem = asyncio.Semaphore(ENCODE_CONCURRENCY)
+    pieces = await asyncio.gather(*(
+        _clip_pieces(c, target, with_audio, window, sem, stats) for c in clips
+    ))
+    transitions = await asyncio.gather(*(
+        _transition(pieces[i], pieces[i + 1], joins[i], with_audio, sem, stats)
+        for i in range(len(pieces) - 1)
+    ))
+
+    concat_started = time.monotonic()
+    fd, list_path = tempfile.mkstemp(suffix="_concat.txt", dir=ASSEMBLY_CACHE_DIR)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.writelines(_concat_line(p) for p in concat_order(pieces, transitions))
+        rc, stderr = await _run([
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", "-movflags", "+faststart", output_path,
+        ])
+    finally:
+        os.unlink(list_path)
+    if rc != 0:
+        raise RuntimeError(f"Segment concat failed: {stderr[-300:]}")
+
+    now = time.monotonic()
+    stats["concat_seconds"] = round(now - concat_started, 2)
+    stats["encode_seconds"] = round(stats["encode_seconds"], 2)
+    stats["total_seconds"] = round(now - started, 2)
+    logger.info(
+        f"Assembled {output_path}: {stats['clips']} clips "
+        f"({stats['clips_encoded']} encoded, {stats['clips_reused']} cached), "
+        f"{stats['transitions_encoded']} transitions encoded, "
+        f"{stats['transitions_reused']} cached — encode {stats['encode_seconds']}s, "
+        f"total {stats['total_seconds']}s"
+    )
+    await asyncio.to_thread(prune_cache)
+    return stats
+
+
+def prune_cache(max_age_days: float = ASSEMBLY_CACHE_MAX_AGE_DAYS) -> int:
+    """Delete cache entries not used for max_age_days. Returns how many were removed."""
+    if not ASSEMBLY_CACHE_DIR.exists():
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for entry in ASSEMBLY_CACHE_DIR.iterdir():
+        try:
+            if entry.name == "transitions":
+                for seg in entry.iterdir():
+                    if seg.stat().st_mtime < cutoff:
+                        seg.unlink()
+                        removed += 1
+            elif entry.is_dir():
+                marker = entry / MANIFEST
+                if (marker.stat().st_mtime if marker.exists() else entry.stat().st_mtime) < cutoff:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    removed += 1
+        except OSError:
+            continue
+    return removed
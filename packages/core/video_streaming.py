@@ -0,0 +1,211 @@
+"""Video delivery for scene, shot and episode players.
+
+- Byte-range responses (206 Partial Content) so the review UI can seek
+  without re-downloading the whole MP4.
+- A short-lived path lookup cache: a scrubbing session fires dozens of range
+  requests for the same video, and only the first needs the DB.
+- Optional HLS packaging: the MP4 is segmented once with ffmpeg `-c copy`
+  (no re-encode) into HLS_CACHE_DIR, keyed by path + mtime, so a re-assembled
+  video gets a fresh package and stale ones are removed.
+
+Usage:
+    path = await video_path_cache.lookup(("scene", scene_id), fetch_path)
+    return range_file_response(request, path, filename="scene_x.mp4")
+
+    return await hls_response(path, "index.m3u8")
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Hashable
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from packages.core.config import HLS_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+PATH_CACHE_TTL = 30.0
+PATH_CACHE_SIZE = 1024
+HLS_SEGMENT_SECONDS = 4
+HLS_NAME_RE = re.compile(r"^(index\.m3u8|seg_\d{5}\.ts)$")
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class VideoPathCache:
+    """TTL + LRU cache of (kind, id) -> video path. Only existing files are cached."""
+
+    def __init__(self, ttl: float = PATH_CACHE_TTL, maxsize: int = PATH_CACHE_SIZE):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def lookup(self, key: Hashable, fetch: Callable[[], Awaitable[str | None]]) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic() and os.path.exists(entry[1]):
+                self._entries.move_to_end(key)
+                return entry[1]
+        path = await fetch()
+        if path and os.path.exists(path):
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self._ttl, path)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._maxsize:
+                    self._entries.popitem(last=False)
+        return path
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+video_path_cache = VideoPathCache()
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single-range `bytes=` header into an inclusive (start, end).
+
+    Returns None when the header should be ignored (multi-range or malformed —
+    the full file is served). Raises 416 when the range lies past the end.
+    """
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else size - 1
+    else:
+        # Suffix range: last N bytes
+        start = max(size - int(m.group(2)), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416, detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+async def _iter_file(path: str, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def range_file_response(
+    request: Request, path: str, media_type: str = "video/mp4", filename: str | None = None,
+) -> Response:
+    """Serve path honoring Range/If-Range; plain 200 with Accept-Ranges otherwise."""
+    st = os.stat(path)
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = {"Accept-Ranges": "bytes", "ETag": etag}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = parse_range(range_header, st.st_size)
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{st.st_size}",
+        "Content-Length": str(length),
+    })
+    return StreamingResponse(
+        _iter_file(path, start, length), status_code=206, media_type=media_type, headers=headers,
+    )
+
+
+# --- HLS ---
+
+_hls_locks: dict[str, asyncio.Lock] = {}
+
+
+def _hls_dir(video_path: str) -> Path:
+    st = os.stat(video_path)
+    digest = hashlib.sha1(os.path.abspath(video_path).encode()).hexdigest()[:16]
+    return HLS_CACHE_DIR / f"{digest}_{st.st_mtime_ns:x}"
+
+
+async def package_hls(video_path: str) -> Path:
+    """Segment video_path into HLS (stream copy) once per mtime; returns the package dir."""
+    out_dir = _hls_dir(video_path)
+    if (out_dir / "index.m3u8").exists():
+        return out_dir
+
+    key = out_dir.name.split("_")[0]
+    lock = _hls_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        if (out_dir / "index.m3u8").exists():
+            return out_dir
+        tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-y", "-i", video_path, "-c", "copy",
+            "-f", "hls", "-hls_time", str(HLS_SEGMENT_SECONDS),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_filename", str(tmp_dir / "seg_%05d.ts"),
+            str(tmp_dir / "index.m3u8"),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise RuntimeError(f"HLS packaging failed: {stderr.decode()[-300:]}")
+        # Packages for older versions of this file are dead weight now
+        for stale in HLS_CACHE_DIR.glob(f"{key}_*"):
+            if stale != tmp_dir:
+                shutil.rmtree(stale, ignore_errors=True)
+        os.replace(tmp_dir, out_dir)
+        logger.info(f"Packaged HLS for {video_path} -> {out_dir}")
+    return out_dir
+
+
+async def hls_response(video_path: str, name: str) -> Response:
+    """Serve the playlist or a segment of video_path's HLS package."""
+    if not HLS_NAME_RE.match(name):
+        raise HTTPException(status_code=404, detail="Unknown HLS resource")
+    try:
+        out_dir = await package_hls(video_path)
+    except (RuntimeError, OSError) as e:
+        logger.error(f"HLS packaging of {video_path} failed: {e}")
+        raise HTTPException(status_code=500, detail="HLS packaging failed")
+    target = out_dir / name
+    if not target.exists():
+        raise HTTPException(status_code=404, detail="HLS segment not found")
+    if name.endswith(".m3u8"):
+        return FileResponse(target, media_type="application/vnd.apple.mpegurl",
+                            headers={"Cache-Control": "no-cache"})
+    # Segment URLs are reused when the video is re-assembled, so keep client caching short
+    return FileResponse(target, media_type="video/mp2t",
+                        headers={"Cache-Control": "public, max-age=300"})
@@ -4,11 +4,12 @@ import logging
 import uuid
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request
 
-from packages.core.db import connect_direct
-from packages.core.events import event_bus, EPISODE_UPDATED
+from packages.core.db import connect_pooled
+from packages.core.events import event_bus, EPISODE_UPDATED, SCENE_UPDATED
+from packages.core.response_cache import ResponseCache, decode_cursor, encode_cursor
+from packages.core.video_streaming import hls_response, range_file_response, video_path_cache
 from packages.core.models import (
     EpisodeCreateRequest, EpisodeUpdateRequest,
     EpisodeAddSceneRequest, EpisodeReorderRequest,
@@ -21,6 +22,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Episode listing responses — dropped on episode writes, EPISODE_UPDATED and
+# SCENE_UPDATED (scene edits can change what an episode shows)
+episode_list_cache = ResponseCache("episodes")
+
+
+def _invalidate_episode_lists(data: dict | None = None):
+    episode_list_cache.invalidate((data or {}).get("project_id"))
+
+
+event_bus.subscribe(EPISODE_UPDATED, _invalidate_episode_lists)
+event_bus.subscribe(SCENE_UPDATED, _invalidate_episode_lists)
+
 # Mood keywords for deriving episode mood from story_arc text
 _MOOD_KEYWORDS = {
     "action": ["fight", "battle", "chase", "attack", "war", "combat", "escape"],
@@ -114,19 +127,53 @@ async def _apply_episode_music(
 
 
 @router.get("/episodes")
-async def list_episodes(project_id: int):
-    """List episodes for a project."""
-    conn = await connect_direct()
-    try:
-        rows = await conn.fetch("""
-            SELECT e.*, p.name as project_name,
-                   (SELECT COUNT(*) FROM episode_scenes es WHERE es.episode_id = e.id) as scene_count
-            FROM episodes e
-            JOIN projects p ON e.project_id = p.id
-            WHERE e.project_id = $1
-            ORDER BY e.episode_number
-        """, project_id)
-        return {"episodes": [
+async def list_episodes(
+    request: Request, project_id: int,
+    limit: int | None = Query(None, ge=1, le=500), after: str | None = None,
+):
+    """List episodes for a project.
+
+    Scene counts come from one grouped join; with limit, pages are keyset
+    paginated on (episode_number, id) via next_cursor. Responses carry an ETag.
+    """
+    cursor = decode_cursor(after) if after else None
+    if cursor is not None and len(cursor) != 2:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def build():
+        conn = await connect_pooled()
+        try:
+            params: list = [project_id]
+            where = "e.project_id = $1"
+            if cursor:
+                where += " AND (e.episode_number, e.id) > ($2::int, $3::uuid)"
+                params += [int(cursor[0]), uuid.UUID(cursor[1])]
+            page = ""
+            if limit:
+                params.append(limit + 1)
+                page = f"LIMIT ${len(params)}"
+            rows = await conn.fetch(f"""
+                SELECT e.*, p.name as project_name, COALESCE(sc.scene_count, 0) as scene_count
+                FROM episodes e
+                JOIN projects p ON e.project_id = p.id
+                LEFT JOIN (
+                    SELECT es.episode_id, COUNT(*) AS scene_count
+                    FROM episode_scenes es
+                    JOIN episodes pe ON pe.id = es.episode_id AND pe.project_id = $1
+                    GROUP BY es.episode_id
+                ) sc ON sc.episode_id = e.id
+                WHERE {where}
+                ORDER BY e.episode_number, e.id
+                {page}
+            """, *params)
+        finally:
+            await conn.close()
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]["episode_number"], str(rows[-1]["id"])])
+        result = {"episodes": [
             {
                 "id": str(r["id"]),
                 "project_id": r["project_id"],
@@ -144,14 +191,17 @@ async def list_episodes(project_id: int):
             }
             for r in rows
         ]}
-    finally:
-        await conn.close()
+        if limit:
+            result["next_cursor"] = next_cursor
+        return result
+
+    return await episode_list_cache.respond(request, project_id, (after, limit), build)
 
 
 @router.post("/episodes")
 async def create_episode(body: EpisodeCreateRequest):
     """Create a new episode."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow("""
             INSERT INTO episodes (project_id, episode_number, title, description, story_arc)
@@ -159,6 +209,7 @@ async def create_episode(body: EpisodeCreateRequest):
             RETURNING id, created_at
         """, body.project_id, body.episode_number, body.title,
             body.description, body.story_arc)
+        episode_list_cache.invalidate(body.project_id)
         return {
             "id": str(row["id"]),
             "episode_number": body.episode_number,
@@ -172,7 +223,7 @@ async def create_episode(body: EpisodeCreateRequest):
 async def get_episode(episode_id: str):
     """Get episode detail with its scenes."""
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         ep = await conn.fetchrow("""
             SELECT e.*, p.name as project_name
@@ -229,7 +280,7 @@ async def get_episode(episode_id: str):
 async def update_episode(episode_id: str, body: EpisodeUpdateRequest):
     """Update episode metadata."""
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         updates, params, idx = [], [], 2
         for field in ["episode_number", "title", "description", "story_arc"]:
@@ -258,10 +309,11 @@ async def update_episode(episode_id: str, body: EpisodeUpdateRequest):
 async def delete_episode(episode_id: str):
     """Delete an episode (scenes are NOT deleted, only unlinked)."""
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("DELETE FROM episode_scenes WHERE episode_id = $1", eid)
         await conn.execute("DELETE FROM episodes WHERE id = $1", eid)
+        episode_list_cache.invalidate()
         return {"message": "Episode deleted"}
     finally:
         await conn.close()
@@ -272,7 +324,7 @@ async def add_scene_to_episode(episode_id: str, body: EpisodeAddSceneRequest):
     """Add a scene to an episode at a given position."""
     eid = uuid.UUID(episode_id)
     scene_id = uuid.UUID(body.scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Verify episode exists
         exists = await conn.fetchval("SELECT 1 FROM episodes WHERE id = $1", eid)
@@ -297,6 +349,7 @@ async def add_scene_to_episode(episode_id: str, body: EpisodeAddSceneRequest):
             SET position = $3, transition = $4
         """, eid, scene_id, body.position, body.transition)
 
+        episode_list_cache.invalidate()
         return {"message": "Scene added to episode", "position": body.position}
     finally:
         await conn.close()
@@ -307,7 +360,7 @@ async def remove_scene_from_episode(episode_id: str, scene_id: str):
     """Remove a scene from an episode (scene itself is preserved)."""
     eid = uuid.UUID(episode_id)
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         pos = await conn.fetchval(
             "SELECT position FROM episode_scenes WHERE episode_id = $1 AND scene_id = $2",
@@ -324,6 +377,7 @@ async def remove_scene_from_episode(episode_id: str, scene_id: str):
             WHERE episode_id = $1 AND position > $2
         """, eid, pos)
 
+        episode_list_cache.invalidate()
         return {"message": "Scene removed from episode"}
     finally:
         await conn.close()
@@ -333,14 +387,14 @@ async def remove_scene_from_episode(episode_id: str, scene_id: str):
 async def reorder_episode_scenes(episode_id: str, body: EpisodeReorderRequest):
     """Reorder scenes in an episode."""
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
-        for pos, scene_id_str in enumerate(body.scene_order, start=1):
-            sid = uuid.UUID(scene_id_str)
-            await conn.execute("""
-                UPDATE episode_scenes SET position = $3
-                WHERE episode_id = $1 AND scene_id = $2
-            """, eid, sid, pos)
+        # One statement for the whole order instead of an UPDATE per scene
+        await conn.execute("""
+            UPDATE episode_scenes es SET position = o.pos
+            FROM unnest($2::uuid[]) WITH ORDINALITY AS o(scene_id, pos)
+            WHERE es.episode_id = $1 AND es.scene_id = o.scene_id
+        """, eid, [uuid.UUID(s) for s in body.scene_order])
         return {"message": "Episode scenes reordered", "count": len(body.scene_order)}
     finally:
         await conn.close()
@@ -350,7 +404,7 @@ async def reorder_episode_scenes(episode_id: str, body: EpisodeReorderRequest):
 async def assemble_episode_endpoint(episode_id: str):
     """Assemble all completed scenes into an episode video."""
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Get scenes in order
         scene_rows = await conn.fetch("""
@@ -380,8 +434,9 @@ async def assemble_episode_endpoint(episode_id: str):
                 status_code=400,
                 detail=f"No completed scene videos found. Missing: {', '.join(missing)}")
 
-        # Assemble
-        episode_path = await assemble_episode(episode_id, video_paths, transitions)
+        # Assemble (unchanged scenes come from the segment cache)
+        assembly_stats: dict = {}
+        episode_path = await assemble_episode(episode_id, video_paths, transitions, stats=assembly_stats)
 
         # Optionally add episode-level background music
         ep_row = await conn.fetchrow("SELECT story_arc FROM episodes WHERE id = $1", eid)
@@ -401,6 +456,8 @@ async def assemble_episode_endpoint(episode_id: str):
                    actual_duration_seconds = $3, thumbnail_path = $4, updated_at = NOW()
             WHERE id = $1
         """, eid, episode_path, duration, thumb_path if Path(thumb_path).exists() else None)
+        episode_list_cache.invalidate()
+        video_path_cache.invalidate(("episode", eid))
 
         return {
             "message": "Episode assembled",
@@ -408,30 +465,46 @@ async def assemble_episode_endpoint(episode_id: str):
             "duration_seconds": duration,
             "scenes_included": len(video_paths),
             "scenes_missing": missing,
+            "assembly": assembly_stats,
         }
     finally:
         await conn.close()
 
 
-@router.get("/episodes/{episode_id}/video")
-async def serve_episode_video(episode_id: str):
-    """Serve assembled episode video."""
+async def _episode_video_path(episode_id: str) -> str:
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
-    try:
-        path = await conn.fetchval("SELECT final_video_path FROM episodes WHERE id = $1", eid)
-    finally:
-        await conn.close()
+
+    async def fetch():
+        conn = await connect_pooled()
+        try:
+            return await conn.fetchval("SELECT final_video_path FROM episodes WHERE id = $1", eid)
+        finally:
+            await conn.close()
+
+    path = await video_path_cache.lookup(("episode", eid), fetch)
     if not path or not Path(path).exists():
         raise HTTPException(status_code=404, detail="Episode video not found")
-    return FileResponse(path, media_type="video/mp4", filename=f"episode_{episode_id}.mp4")
+    return path
+
+
+@router.get("/episodes/{episode_id}/video")
+async def serve_episode_video(episode_id: str, request: Request):
+    """Serve assembled episode video (supports Range requests for seeking)."""
+    path = await _episode_video_path(episode_id)
+    return range_file_response(request, path, filename=f"episode_{episode_id}.mp4")
+
+
+@router.get("/episodes/{episode_id}/video/hls/{name}")
+async def serve_episode_video_hls(episode_id: str, name: str):
+    """HLS playlist (index.m3u8) or segment so long episodes start playing immediately."""
+    return await hls_response(await _episode_video_path(episode_id), name)
 
 
 @router.post("/episodes/{episode_id}/publish")
 async def publish_episode_endpoint(episode_id: str, season: int = 1):
     """Publish episode to Jellyfin-compatible directory structure."""
     eid = uuid.UUID(episode_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         ep = await conn.fetchrow("""
             SELECT e.*, p.name as project_name
@@ -454,6 +527,7 @@ async def publish_episode_endpoint(episode_id: str, season: int = 1):
 
         await conn.execute(
             "UPDATE episodes SET status = 'published', updated_at = NOW() WHERE id = $1", eid)
+        episode_list_cache.invalidate()
 
         return {
             "message": "Episode published to Jellyfin",
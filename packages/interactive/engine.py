@@ -2,10 +2,8 @@
 import json
 import logging
 
-import httpx
-
-from packages.core.config import OLLAMA_URL
 from packages.core.db import get_connection
+from packages.core.llm_gateway import PRIORITY_INTERACTIVE, llm_gateway
 
 from .models import SceneData, DialogueLine, StoryChoice, StoryEffect
 from .prompts import SYSTEM_PROMPT, build_scene_prompt, build_appearance_summary
@@ -163,32 +161,24 @@ async def generate_scene(session: SessionState, choice_text: str | None = None)
         session.is_ended = True
 
     session.touch()
+    store.save(session)
     return scene
 
 
 async def _call_ollama(user_prompt: str) -> dict:
     """Call Ollama and parse JSON response."""
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        resp = await client.post(
-            f"{OLLAMA_URL}/api/chat",
-            json={
-                "model": OLLAMA_MODEL,
-                "messages": [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "format": "json",
-                "stream": False,
-                "options": {
-                    "temperature": 0.8,
-                    "num_predict": 4096,
-                },
-            },
-        )
-        resp.raise_for_status()
-        data = resp.json()
-
-    content = data.get("message", {}).get("content", "{}")
+    content = await llm_gateway.chat(
+        OLLAMA_MODEL,
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        caller="interactive",
+        priority=PRIORITY_INTERACTIVE,
+        format="json",
+        options={"temperature": 0.8, "num_predict": 4096},
+        cache=False,
+    ) or "{}"
     try:
         return json.loads(content)
     except json.JSONDecodeError:
@@ -3,6 +3,7 @@ import asyncio
 import logging
 from pathlib import Path
 
+from packages.core.comfyui_client import get_comfyui_client
 from packages.core.config import COMFYUI_OUTPUT_DIR
 from packages.core.generation import _comfyui_slot
 from packages.core.model_profiles import get_model_profile, translate_prompt
@@ -12,7 +13,7 @@ from packages.visual_pipeline.comfyui import (
     get_comfyui_progress,
 )
 
-from .session_store import SessionState
+from .session_store import SessionState, store
 
 logger = logging.getLogger(__name__)
 
@@ -54,8 +55,9 @@ async def generate_scene_image(session: SessionState, scene_index: int, image_pr
         # Acquire shared ComfyUI slot
         async with _comfyui_slot:
             session.images[scene_index]["status"] = "generating"
-            prompt_id = submit_comfyui_workflow(workflow)
+            prompt_id = await submit_comfyui_workflow(workflow)
             session.images[scene_index]["prompt_id"] = prompt_id
+            store.save_image(session, scene_index)
 
             # Poll until complete
             image_path = await _poll_image(prompt_id, session, scene_index)
@@ -73,23 +75,31 @@ async def generate_scene_image(session: SessionState, scene_index: int, image_pr
         logger.exception("Image generation failed for session %s scene %d", session.session_id, scene_index)
         session.images[scene_index]["status"] = "failed"
 
+    # Terminal status is visible to every worker; in-flight progress stays local
+    store.save_image(session, scene_index)
+
 
 async def _poll_image(prompt_id: str, session: SessionState, scene_index: int, timeout: float = 120.0) -> Path | None:
-    """Poll ComfyUI until image is done. Returns output path or None."""
-    elapsed = 0.0
+    """Wait for ComfyUI to finish the image. Returns output path or None."""
+    client = get_comfyui_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
     interval = 2.0
-    while elapsed < timeout:
-        await asyncio.sleep(interval)
-        elapsed += interval
+    while loop.time() < deadline:
+        # Wakes early on the WebSocket completion event
+        await client.wait_event(prompt_id, min(interval, max(deadline - loop.time(), 0)))
 
-        progress = get_comfyui_progress(prompt_id)
+        progress = await get_comfyui_progress(prompt_id)
         status = progress.get("status", "unknown")
 
         if status == "completed":
             images = progress.get("images", [])
             if images:
-                # ComfyUI returns relative paths under output dir
-                return Path(images[0].get("abs_path") or _resolve_image_path(images[0]))
+                # ComfyUI returns filenames relative to the output dir
+                image = images[0]
+                if isinstance(image, str):
+                    image = {"filename": image}
+                return Path(image.get("abs_path") or _resolve_image_path(image))
             return None
         elif status == "error":
             logger.error("ComfyUI error for prompt %s", prompt_id)
@@ -152,7 +152,7 @@ async def get_history(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return {
-        "scenes": session.scenes,
+        "scenes": session.scenes.to_list(),
         "relationships": session.relationships,
         "variables": session.variables,
         "is_ended": session.is_ended,
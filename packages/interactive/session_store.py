@@ -1,8 +1,119 @@
-"""In-memory session store with TTL eviction for interactive visual novel."""
+"""Session store for the interactive visual novel.
+
+Two tiers:
+    - hot: an LRU-bounded dict of deserialized SessionState objects per worker
+    - durable: a SQLite file (WAL) shared by every worker on the host, so sessions
+      survive restarts and any worker behind the load balancer can serve them
+
+Each session is one header row (compact JSON of everything except the scene
+history) plus one row per scene. Saving appends only the scenes that are new,
+and loading a session reads just the last few scenes — older ones are fetched
+the first time something indexes into them (e.g. the history endpoint).
+
+Every save bumps a per-session version; get() compares it with the hot copy
+(one indexed lookup) and reloads when another worker changed the session.
+Concurrent writers to the same session are last-writer-wins, except image
+status updates, which are merged into the stored header (save_image).
+"""
 import asyncio
+import json
+import logging
+import sqlite3
+import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Callable
+
+from packages.core.config import INTERACTIVE_MAX_HOT_SESSIONS, INTERACTIVE_SESSION_DB
+
+logger = logging.getLogger(__name__)
+
+# Scenes read eagerly when a session is loaded (story_summary needs the last 5)
+SCENE_TAIL = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id   TEXT PRIMARY KEY,
+    project_id   INTEGER NOT NULL,
+    project_name TEXT NOT NULL,
+    scene_count  INTEGER NOT NULL DEFAULT 0,
+    is_ended     INTEGER NOT NULL DEFAULT 0,
+    created_at   REAL NOT NULL,
+    last_active  REAL NOT NULL,
+    version      INTEGER NOT NULL DEFAULT 1,
+    state        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions (last_active);
+CREATE TABLE IF NOT EXISTS session_scenes (
+    session_id  TEXT NOT NULL,
+    scene_index INTEGER NOT NULL,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (session_id, scene_index)
+);
+"""
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class SceneHistory(Sequence):
+    """Scene list holding a recent tail in memory; older scenes load on first access.
+
+    persisted is how many scenes (from index 0) the durable tier already has.
+    """
+
+    def __init__(
+        self, scenes: list[dict] | None = None, offset: int = 0,
+        loader: Callable[[int, int], list[dict]] | None = None,
+    ):
+        self._offset = offset
+        self._tail = list(scenes or [])
+        self._loader = loader
+        self.persisted = offset + len(self._tail) if loader else 0
+
+    def __len__(self) -> int:
+        return self._offset + len(self._tail)
+
+    def _load_older(self) -> None:
+        if self._offset and self._loader:
+            self._tail = self._loader(0, self._offset) + self._tail
+            self._offset = 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(len(self))[index]
+            if indices and min(indices) < self._offset:
+                self._load_older()
+            return [self._tail[i - self._offset] for i in indices]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("scene index out of range")
+        if index < self._offset:
+            self._load_older()
+        return self._tail[index - self._offset]
+
+    def __iter__(self):
+        self._load_older()
+        return iter(self._tail)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, (list, SceneHistory)) and list(self) == list(other)
+
+    def append(self, scene: dict) -> None:
+        self._tail.append(scene)
+
+    def unsaved(self) -> list[tuple[int, dict]]:
+        """(index, scene) pairs not yet in the durable tier."""
+        return [(i, self[i]) for i in range(self.persisted, len(self))]
+
+    def to_list(self) -> list[dict]:
+        return list(self)
 
 
 @dataclass
@@ -17,7 +128,7 @@ class SessionState:
     generation_params: dict  # cfg, steps, sampler, scheduler, width, height
 
     # Story state
-    scenes: list[dict] = field(default_factory=list)
+    scenes: SceneHistory = field(default_factory=SceneHistory)
     relationships: dict[str, int] = field(default_factory=dict)
     variables: dict[str, str | int | float | bool] = field(default_factory=dict)
     is_ended: bool = False
@@ -32,6 +143,10 @@ class SessionState:
     created_at: float = field(default_factory=time.time)
     last_active: float = field(default_factory=time.time)
 
+    def __post_init__(self):
+        if not isinstance(self.scenes, SceneHistory):
+            self.scenes = SceneHistory(self.scenes)
+
     def touch(self):
         self.last_active = time.time()
 
@@ -55,31 +170,297 @@ class SessionState:
             lines.append(line)
         return " -> ".join(lines)
 
+    def header(self) -> dict:
+        """Everything except the scene history, JSON-ready."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "scenes"}
+
+    @classmethod
+    def from_header(cls, header: dict, scenes: SceneHistory) -> "SessionState":
+        header = dict(header)
+        header["images"] = {int(k): v for k, v in header.get("images", {}).items()}
+        return cls(scenes=scenes, **header)
+
+
+class SqliteSessionBackend:
+    """Durable session tier in one SQLite file.
+
+    Interface used by SessionStore: version, load, load_scenes, save,
+    update_image, delete, list_sessions, touch_many, expire.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def version(self, session_id: str) -> int | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row["version"] if row else None
+
+    def load(self, session_id: str, tail: int = SCENE_TAIL) -> tuple[dict, int, int, list[dict]] | None:
+        """(header, version, scene_count, last `tail` scenes) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, version, scene_count FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if not row:
+                return None
+            start = max(row["scene_count"] - tail, 0)
+            scenes = self._conn.execute(
+                "SELECT data FROM session_scenes WHERE session_id = ? AND scene_index >= ? "
+                "ORDER BY scene_index",
+                (session_id, start),
+            ).fetchall()
+        return json.loads(row["state"]), row["version"], row["scene_count"], [json.loads(s["data"]) for s in scenes]
+
+    def load_scenes(self, session_id: str, start: int, end: int) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM session_scenes WHERE session_id = ? "
+                "AND scene_index >= ? AND scene_index < ? ORDER BY scene_index",
+                (session_id, start, end),
+            ).fetchall()
+        return [json.loads(r["data"]) for r in rows]
+
+    def save(self, session: SessionState) -> int:
+        """Write the header and any new scenes in one transaction; returns the new version."""
+        new_scenes = session.scenes.unsaved()
+        with self._lock, self._conn:
+            if new_scenes:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO session_scenes (session_id, scene_index, data) VALUES (?, ?, ?)",
+                    [(session.session_id, i, _dumps(s)) for i, s in new_scenes],
+                )
+            self._conn.execute(
+                """INSERT INTO sessions (session_id, project_id, project_name, scene_count,
+                                         is_ended, created_at, last_active, version, state)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+                   ON CONFLICT (session_id) DO UPDATE SET
+                       scene_count = MAX(sessions.scene_count, excluded.scene_count),
+                       is_ended = excluded.is_ended,
+                       last_active = excluded.last_active,
+                       version = sessions.version + 1,
+                       state = excluded.state""",
+                (session.session_id, session.project_id, session.project_name,
+                 len(session.scenes), int(session.is_ended), session.created_at,
+                 session.last_active, _dumps(session.header())),
+            )
+            version = self._conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session.session_id,)
+            ).fetchone()["version"]
+        session.scenes.persisted = len(session.scenes)
+        return version
+
+    def update_image(self, session_id: str, scene_index: int, info: dict) -> int | None:
+        """Merge one image entry into the stored header; returns the new version.
+
+        Image tasks hold their session object for minutes, so they must not
+        write back a header that another worker has since moved on from.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if not row:
+                return None
+            state = json.loads(row["state"])
+            state.setdefault("images", {})[str(scene_index)] = info
+            self._conn.execute(
+                "UPDATE sessions SET state = ?, version = version + 1 WHERE session_id = ?",
+                (_dumps(state), session_id),
+            )
+            return self._conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()["version"]
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM session_scenes WHERE session_id = ?", (session_id,))
+        return cur.rowcount > 0
+
+    def list_sessions(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, project_id, project_name, scene_count, is_ended, created_at "
+                "FROM sessions ORDER BY created_at"
+            ).fetchall()
+        return [
+            {
+                "session_id": r["session_id"],
+                "project_id": r["project_id"],
+                "project_name": r["project_name"],
+                "scene_count": r["scene_count"],
+                "current_scene_index": r["scene_count"] - 1,
+                "is_ended": bool(r["is_ended"]),
+                "created_at": r["created_at"],
+            }
+            for r in rows
+        ]
+
+    def touch_many(self, last_active: dict[str, float]) -> None:
+        """Persist last_active without bumping versions (reads don't invalidate other workers)."""
+        if not last_active:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE sessions SET last_active = MAX(last_active, ?) WHERE session_id = ?",
+                [(ts, sid) for sid, ts in last_active.items()],
+            )
+
+    def expire(self, cutoff: float) -> list[str]:
+        """Delete sessions idle since before cutoff; returns their ids."""
+        with self._lock, self._conn:
+            ids = [r["session_id"] for r in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE last_active < ?", (cutoff,)
+            )]
+            if ids:
+                marks = ",".join("?" * len(ids))
+                self._conn.execute(f"DELETE FROM sessions WHERE session_id IN ({marks})", ids)
+                self._conn.execute(f"DELETE FROM session_scenes WHERE session_id IN ({marks})", ids)
+        return ids
+
 
 class SessionStore:
-    """In-memory store for active game sessions."""
+    """LRU hot tier over a durable backend for active game sessions.
+
+    db_path=None keeps sessions in memory only (single worker, lost on restart).
+    """
 
-    def __init__(self, ttl_seconds: int = 3600):
-        self._sessions: dict[str, SessionState] = {}
+    def __init__(
+        self, ttl_seconds: int = 3600, max_hot: int = INTERACTIVE_MAX_HOT_SESSIONS,
+        db_path: Path | None = INTERACTIVE_SESSION_DB, backend=None,
+    ):
+        self._sessions: OrderedDict[str, SessionState] = OrderedDict()
+        self._versions: dict[str, int] = {}
         self._ttl = ttl_seconds
+        self._max_hot = max_hot
+        self._db_path = db_path
+        self._backend = backend
+        self._lock = threading.RLock()
         self._cleanup_task: asyncio.Task | None = None
 
+    @property
+    def backend(self):
+        """Durable tier, opened on first use."""
+        if self._backend is None and self._db_path is not None:
+            self._backend = SqliteSessionBackend(self._db_path)
+        return self._backend
+
+    def _remember(self, session: SessionState, version: int | None) -> None:
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        if version is not None:
+            self._versions[session.session_id] = version
+        if self.backend is None:
+            return  # memory-only: nothing to fall back on, never evict live sessions
+        while len(self._sessions) > self._max_hot:
+            sid, old = self._sessions.popitem(last=False)
+            self._versions.pop(sid, None)
+            self.backend.touch_many({sid: old.last_active})
+
     def create(self, **kwargs) -> SessionState:
         session_id = uuid.uuid4().hex[:12]
         session = SessionState(session_id=session_id, **kwargs)
-        self._sessions[session_id] = session
+        with self._lock:
+            version = self.backend.save(session) if self.backend else None
+            self._remember(session, version)
         return session
 
+    def save(self, session: SessionState) -> None:
+        """Persist a mutated session (new scenes, effects, image status)."""
+        backend = self.backend
+        if backend is None:
+            return
+        with self._lock:
+            try:
+                version = backend.save(session)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist session {session.session_id}: {e}")
+                return
+            if session.session_id in self._sessions:
+                self._versions[session.session_id] = version
+
+    def save_image(self, session: SessionState, scene_index: int) -> None:
+        """Persist one scene's image status without rewriting the rest of the session."""
+        backend = self.backend
+        if backend is None:
+            return
+        with self._lock:
+            try:
+                version = backend.update_image(
+                    session.session_id, scene_index, session.images.get(scene_index, {}),
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist image status for {session.session_id}: {e}")
+                return
+            hot = self._sessions.get(session.session_id)
+            if version is not None and hot is not None:
+                # Keep the hot copy current when it isn't the object the task holds
+                hot.images[scene_index] = session.images.get(scene_index, {})
+                if self._versions.get(session.session_id) == version - 1:
+                    self._versions[session.session_id] = version
+
     def get(self, session_id: str) -> SessionState | None:
-        session = self._sessions.get(session_id)
-        if session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            backend = self.backend
+            if backend is None:
+                if session:
+                    session.touch()
+                return session
+
+            version = backend.version(session_id)
+            if version is None:
+                # Deleted or expired by another worker
+                self._sessions.pop(session_id, None)
+                self._versions.pop(session_id, None)
+                return None
+            if session is None or self._versions.get(session_id) != version:
+                session = self._load(session_id)
+                if session is None:
+                    return None
+            else:
+                self._sessions.move_to_end(session_id)
             session.touch()
+            return session
+
+    def _load(self, session_id: str) -> SessionState | None:
+        loaded = self.backend.load(session_id)
+        if loaded is None:
+            return None
+        header, version, count, tail = loaded
+        backend = self.backend
+        scenes = SceneHistory(
+            tail, offset=count - len(tail),
+            loader=lambda start, end: backend.load_scenes(session_id, start, end),
+        )
+        session = SessionState.from_header(header, scenes)
+        self._remember(session, version)
         return session
 
     def delete(self, session_id: str) -> bool:
-        return self._sessions.pop(session_id, None) is not None
+        with self._lock:
+            in_memory = self._sessions.pop(session_id, None) is not None
+            self._versions.pop(session_id, None)
+            if self.backend is None:
+                return in_memory
+            return self.backend.delete(session_id)
 
     def list_sessions(self) -> list[dict]:
+        if self.backend is not None:
+            return self.backend.list_sessions()
         return [
             {
                 "session_id": s.session_id,
@@ -97,16 +478,32 @@ class SessionStore:
         if self._cleanup_task is None or self._cleanup_task.done():
             self._cleanup_task = asyncio.create_task(self._eviction_loop())
 
-    async def _eviction_loop(self):
-        while True:
-            await asyncio.sleep(300)  # Check every 5 minutes
-            now = time.time()
-            expired = [
+    def evict_expired(self, now: float | None = None) -> int:
+        """Drop sessions idle longer than the TTL from both tiers."""
+        now = now or time.time()
+        with self._lock:
+            expired = {
                 sid for sid, s in self._sessions.items()
                 if now - s.last_active > self._ttl
-            ]
+            }
+            if self.backend is not None:
+                # Reads only touched the hot copies — flush those first
+                self.backend.touch_many({sid: s.last_active for sid, s in self._sessions.items()})
+                expired.update(self.backend.expire(now - self._ttl))
             for sid in expired:
                 self._sessions.pop(sid, None)
+                self._versions.pop(sid, None)
+        return len(expired)
+
+    async def _eviction_loop(self):
+        while True:
+            await asyncio.sleep(300)  # Check every 5 minutes
+            try:
+                removed = self.evict_expired()
+                if removed:
+                    logger.info(f"Interactive sessions: expired {removed}")
+            except Exception as e:
+                logger.warning(f"Session eviction failed: {e}")
 
 
 # Singleton
@@ -0,0 +1,739 @@
+"""Approval index — SQLite-backed per-image status/metadata index over the datasets tree.
+
+approval_status.json stays the on-disk record (out-of-tree scripts and training
+still read it), but every read inside the app goes through this index so the
+approval, library and stats endpoints become indexed queries instead of full
+filesystem crawls.
+
+Consistency model:
+    - Writes go through set_status()/set_statuses()/remove(): the JSON file is
+      rewritten first, then the index rows are updated in the same call.
+    - Reads call _refresh(slug), which stats approval_status.json and the
+      images/ directory (two stats per character). If either mtime moved since
+      the last scan — an external writer, a new PNG, a deleted file — that
+      character is rescanned. Otherwise the cached rows are served as-is.
+    - Each image row stores its sidecars' (.meta.json/.txt) newest mtime; a
+      rescan re-reads an indexed image's sidecars when that moved, so sidecars
+      written after the PNG are picked up. Sidecars edited in place don't bump
+      the directory mtime; writers call refresh_image() after editing them.
+    - query()/slug_stats() serve rows for up to REFRESH_MAX_AGE seconds after a
+      character was last checked, so polling endpoints don't stat every
+      character directory per request. Writes through the index show up
+      immediately; external changes within that window.
+
+Usage:
+    from packages.lora_training.approval_index import get_index
+
+    idx = get_index()
+    idx.set_status("luigi", "gen_luigi_001.png", "approved")
+    rows, total = idx.query(status="pending", project_name="Mario Galaxy", limit=50)
+
+The same database also caches image quality scores (server/quality_scorer.py)
+keyed by content hash, with a path+mtime+size shortcut so unchanged files
+aren't re-hashed. Scores survive renames/moves between character dirs and are
+kept across images-table rebuilds. Vision-model reviews are cached there too
+(packages/visual_pipeline/review_cache.py), keyed by image content hash, prompt
+template version, character context hash and model.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from packages.core.config import BASE_PATH
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".approval_index.sqlite3"
+STATUS_FILENAME = "approval_status.json"
+
+# Bump when the row layout changes — the index is a cache and is rebuilt from disk
+SCHEMA_VERSION = 2
+
+# Seconds query()/slug_stats() reuse the last directory listing and per-character check
+REFRESH_MAX_AGE = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    slug             TEXT NOT NULL,
+    name             TEXT NOT NULL,
+    status           TEXT NOT NULL DEFAULT 'pending',
+    explicit         INTEGER NOT NULL DEFAULT 0,   -- present in approval_status.json
+    on_disk          INTEGER NOT NULL DEFAULT 0,   -- PNG exists in images/
+    ctime            REAL NOT NULL DEFAULT 0,
+    source           TEXT,
+    checkpoint_model TEXT,
+    project_name     TEXT,
+    caption          TEXT,
+    has_meta         INTEGER NOT NULL DEFAULT 0,
+    meta_json        TEXT,
+    sidecar_mtime    REAL NOT NULL DEFAULT 0,      -- newest .meta.json/.txt mtime when read
+    updated_at       REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (slug, name)
+);
+CREATE INDEX IF NOT EXISTS idx_images_status_ctime ON images (status, ctime DESC);
+CREATE INDEX IF NOT EXISTS idx_images_slug_status ON images (slug, status);
+CREATE INDEX IF NOT EXISTS idx_images_project ON images (project_name, status);
+CREATE TABLE IF NOT EXISTS slugs (
+    slug          TEXT PRIMARY KEY,
+    status_mtime  REAL NOT NULL DEFAULT 0,
+    images_mtime  REAL NOT NULL DEFAULT 0,
+    scanned_at    REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS quality_files (
+    path          TEXT PRIMARY KEY,
+    mtime_ns      INTEGER NOT NULL,
+    size          INTEGER NOT NULL,
+    content_hash  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quality_scores (
+    content_hash  TEXT NOT NULL,
+    version       INTEGER NOT NULL,
+    scores_json   TEXT NOT NULL,
+    updated_at    REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_hash, version)
+);
+CREATE TABLE IF NOT EXISTS vision_reviews (
+    kind              TEXT NOT NULL,
+    content_hash      TEXT NOT NULL,
+    template_version  INTEGER NOT NULL,
+    context_hash      TEXT NOT NULL,
+    model             TEXT NOT NULL,
+    slug              TEXT,
+    result_json       TEXT NOT NULL,
+    created_at        REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, content_hash, template_version, context_hash, model)
+);
+CREATE INDEX IF NOT EXISTS idx_vision_reviews_slug ON vision_reviews (slug);
+"""
+
+# SQLite caps bound parameters per statement
+_IN_CHUNK = 500
+
+
+def classify_source(name: str) -> str:
+    """Infer an image's origin from its filename prefix."""
+    if name.startswith("yt_unclassified"):
+        return "unclassified"
+    if name.startswith("yt_ref"):
+        return "youtube"
+    if name.startswith("upload_"):
+        return "upload"
+    if name.startswith("ref_"):
+        return "reference"
+    return "generated"
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _read_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text())
+        return data if isinstance(data, dict) else {}
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def _normalize_statuses(raw: dict) -> dict[str, str]:
+    """Flatten legacy {"name": {"status": ...}} entries to plain status strings."""
+    out = {}
+    for name, st in raw.items():
+        if isinstance(st, dict):
+            st = st.get("status", "pending")
+        out[name] = str(st)
+    return out
+
+
+def _read_sidecars(img_path: Path) -> dict:
+    """Read .meta.json and .txt sidecars into index column values."""
+    fields = {"checkpoint_model": None, "meta_project": None, "caption": None,
+              "has_meta": 0, "meta_json": None}
+    meta_path = img_path.with_suffix(".meta.json")
+    if meta_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text())
+            fields["has_meta"] = 1
+            fields["meta_json"] = json.dumps(meta)
+            fields["checkpoint_model"] = meta.get("checkpoint_model")
+            fields["meta_project"] = meta.get("project_name")
+        except (json.JSONDecodeError, IOError):
+            fields["has_meta"] = 1
+    caption_path = img_path.with_suffix(".txt")
+    if caption_path.exists():
+        try:
+            fields["caption"] = caption_path.read_text().strip()
+        except IOError:
+            pass
+    return fields
+
+
+def _sidecar_mtime(img_path: Path) -> float:
+    """Newest mtime of an image's .meta.json/.txt sidecars (0 if neither exists)."""
+    return max(_mtime(img_path.with_suffix(".meta.json")), _mtime(img_path.with_suffix(".txt")))
+
+
+def _sidecar_owner(name: str) -> str | None:
+    """PNG name a sidecar filename belongs to, or None for other files."""
+    for suffix in (".meta.json", ".txt"):
+        if name.endswith(suffix):
+            return name[:-len(suffix)] + ".png"
+    return None
+
+
+class ApprovalIndex:
+    """Index of every dataset image under one datasets root."""
+
+    def __init__(self, root: Path, db_path: Path | None = None):
+        self.root = Path(root)
+        self.db_path = db_path or (self.root / INDEX_FILENAME)
+        self._lock = threading.RLock()
+        self._project_for_slug: dict[str, str] = {}
+        self._checked_at: dict[str, float] = {}   # slug -> monotonic time of last mtime check
+        self._listing: tuple[float, list[str]] | None = None  # (monotonic time, slug dirs)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.executescript("DROP TABLE IF EXISTS images; DROP TABLE IF EXISTS slugs;")
+                self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # --- project mapping ---
+
+    def set_project_map(self, slug_to_project: dict[str, str]):
+        """Record the DB project for each slug so project filters are indexed.
+
+        Called with get_char_project_map() output by the endpoints; rows whose
+        project changed are rewritten in one statement per slug.
+        """
+        with self._lock:
+            changed = {
+                slug: proj for slug, proj in slug_to_project.items()
+                if self._project_for_slug.get(slug) != proj
+            }
+            if not changed:
+                return
+            self._project_for_slug.update(changed)
+            self._conn.executemany(
+                "UPDATE images SET project_name = ? WHERE slug = ? AND slug != '_unclassified'",
+                [(proj, slug) for slug, proj in changed.items()],
+            )
+            self._conn.commit()
+
+    # --- sync with disk ---
+
+    def _slug_dirs(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            e.name for e in os.scandir(self.root)
+            if e.is_dir() and not e.name.startswith(".")
+            and os.path.isdir(os.path.join(e.path, "images"))
+        )
+
+    def _refresh(self, slug: str, force: bool = False, max_age: float = 0):
+        """Rescan one character if its status file or images dir changed.
+
+        With max_age, a character checked less than max_age seconds ago isn't
+        stat'ed again.
+        """
+        now = time.monotonic()
+        if not force and max_age and now - self._checked_at.get(slug, float("-inf")) < max_age:
+            return
+        self._checked_at[slug] = now
+        char_dir = self.root / slug
+        status_mtime = _mtime(char_dir / STATUS_FILENAME)
+        images_mtime = _mtime(char_dir / "images")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_mtime, images_mtime FROM slugs WHERE slug = ?", (slug,)
+            ).fetchone()
+            if (not force and row
+                    and row["status_mtime"] == status_mtime
+                    and row["images_mtime"] == images_mtime):
+                return
+            self._scan_slug(slug, status_mtime, images_mtime, images_changed=(
+                force or not row or row["images_mtime"] != images_mtime
+            ))
+
+    def _scan_slug(self, slug: str, status_mtime: float, images_mtime: float,
+                   images_changed: bool = True):
+        char_dir = self.root / slug
+        images_dir = char_dir / "images"
+        statuses = _normalize_statuses(_read_json(char_dir / STATUS_FILENAME))
+        now = time.time()
+
+        existing = {
+            r["name"]: r for r in self._conn.execute(
+                "SELECT name, on_disk, sidecar_mtime FROM images WHERE slug = ?", (slug,)
+            )
+        }
+
+        sidecar_mtimes: dict[str, float] = {}
+        if images_changed or not existing:
+            on_disk: dict[str, float] = {}
+            if images_dir.exists():
+                with os.scandir(images_dir) as entries:
+                    for e in entries:
+                        if e.name.endswith(".png"):
+                            try:
+                                on_disk[e.name] = e.stat().st_ctime
+                            except OSError:
+                                on_disk[e.name] = 0.0
+                        elif (owner := _sidecar_owner(e.name)) is not None:
+                            try:
+                                mtime = e.stat().st_mtime
+                            except OSError:
+                                continue
+                            sidecar_mtimes[owner] = max(sidecar_mtimes.get(owner, 0.0), mtime)
+        else:
+            on_disk = None  # unchanged — only statuses need rewriting
+
+        project = self._project_for_slug.get(slug)
+        upserts = []
+        if on_disk is not None:
+            for name, ctime in on_disk.items():
+                prev = existing.get(name)
+                side_mtime = sidecar_mtimes.get(name, 0.0)
+                if prev is not None and prev["on_disk"] and prev["sidecar_mtime"] == side_mtime:
+                    continue  # sidecars already indexed and unchanged
+                side = _read_sidecars(images_dir / name)
+                proj = side["meta_project"] if slug == "_unclassified" else (project or side["meta_project"])
+                upserts.append((
+                    slug, name, statuses.get(name, "pending"), int(name in statuses), 1,
+                    ctime, classify_source(name), side["checkpoint_model"], proj,
+                    side["caption"], side["has_meta"], side["meta_json"], side_mtime, now,
+                ))
+            gone = [n for n, r in existing.items() if r["on_disk"] and n not in on_disk]
+            if gone:
+                self._conn.executemany(
+                    "UPDATE images SET on_disk = 0 WHERE slug = ? AND name = ?",
+                    [(slug, n) for n in gone],
+                )
+
+        if upserts:
+            self._conn.executemany(
+                """INSERT INTO images (slug, name, status, explicit, on_disk, ctime, source,
+                                       checkpoint_model, project_name, caption, has_meta,
+                                       meta_json, sidecar_mtime, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (slug, name) DO UPDATE SET
+                       on_disk = 1, ctime = excluded.ctime, source = excluded.source,
+                       checkpoint_model = excluded.checkpoint_model,
+                       project_name = excluded.project_name, caption = excluded.caption,
+                       has_meta = excluded.has_meta, meta_json = excluded.meta_json,
+                       sidecar_mtime = excluded.sidecar_mtime, updated_at = excluded.updated_at""",
+                upserts,
+            )
+
+        # Statuses: explicit entries from JSON, everything else defaults to pending
+        self._conn.execute(
+            "UPDATE images SET status = 'pending', explicit = 0 WHERE slug = ?", (slug,)
+        )
+        if statuses:
+            self._conn.executemany(
+                """INSERT INTO images (slug, name, status, explicit, on_disk, source, updated_at)
+                   VALUES (?, ?, ?, 1, 0, ?, ?)
+                   ON CONFLICT (slug, name) DO UPDATE SET
+                       status = excluded.status, explicit = 1, updated_at = excluded.updated_at""",
+                [(slug, n, st, classify_source(n), now) for n, st in statuses.items()],
+            )
+        # Drop rows that are neither on disk nor referenced by the status file
+        self._conn.execute(
+            "DELETE FROM images WHERE slug = ? AND on_disk = 0 AND explicit = 0", (slug,)
+        )
+        self._conn.execute(
+            """INSERT INTO slugs (slug, status_mtime, images_mtime, scanned_at)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT (slug) DO UPDATE SET status_mtime = excluded.status_mtime,
+                   images_mtime = excluded.images_mtime, scanned_at = excluded.scanned_at""",
+            (slug, status_mtime, images_mtime, now),
+        )
+        self._conn.commit()
+
+    def refresh_all(self, force: bool = False, max_age: float = 0) -> list[str]:
+        """Sync every character directory; drop slugs whose directory is gone.
+
+        With max_age, a directory listing (and per-character checks) younger
+        than max_age seconds is reused.
+        """
+        now = time.monotonic()
+        if not force and max_age and self._listing and now - self._listing[0] < max_age:
+            slugs = self._listing[1]
+        else:
+            slugs = self._slug_dirs()
+            self._listing = (now, slugs)
+        for slug in slugs:
+            self._refresh(slug, force=force, max_age=max_age)
+        with self._lock:
+            known = {r["slug"] for r in self._conn.execute("SELECT slug FROM slugs")}
+            stale = known - set(slugs)
+            if stale:
+                self._conn.executemany("DELETE FROM images WHERE slug = ?", [(s,) for s in stale])
+                self._conn.executemany("DELETE FROM slugs WHERE slug = ?", [(s,) for s in stale])
+                self._conn.commit()
+        return slugs
+
+    def refresh_image(self, slug: str, image_name: str):
+        """Re-read one image's sidecars after they were edited in place."""
+        self._refresh(slug)
+        img_path = self.root / slug / "images" / image_name
+        if not img_path.exists():
+            return
+        side_mtime = _sidecar_mtime(img_path)
+        side = _read_sidecars(img_path)
+        with self._lock:
+            self._conn.execute(
+                """UPDATE images SET checkpoint_model = ?, caption = ?, has_meta = ?,
+                          meta_json = ?, sidecar_mtime = ?, updated_at = ?
+                   WHERE slug = ? AND name = ?""",
+                (side["checkpoint_model"], side["caption"], side["has_meta"],
+                 side["meta_json"], side_mtime, time.time(), slug, image_name),
+            )
+            if slug == "_unclassified":
+                self._conn.execute(
+                    "UPDATE images SET project_name = ? WHERE slug = ? AND name = ?",
+                    (side["meta_project"], slug, image_name),
+                )
+            self._conn.commit()
+
+    # --- writes ---
+
+    def set_statuses(self, slug: str, updates: dict[str, str]):
+        """Write several statuses for one character (JSON file, then index)."""
+        if not updates:
+            return
+        status_file = self.root / slug / STATUS_FILENAME
+        with self._lock:
+            # Pick up external edits before merging so they aren't overwritten
+            self._refresh(slug)
+            statuses = _read_json(status_file)
+            statuses.update(updates)
+            status_file.parent.mkdir(parents=True, exist_ok=True)
+            status_file.write_text(json.dumps(statuses, indent=2))
+            now = time.time()
+            self._conn.executemany(
+                """INSERT INTO images (slug, name, status, explicit, on_disk, source, updated_at)
+                   VALUES (?, ?, ?, 1, 0, ?, ?)
+                   ON CONFLICT (slug, name) DO UPDATE SET
+                       status = excluded.status, explicit = 1, updated_at = excluded.updated_at""",
+                [(slug, n, st, classify_source(n), now) for n, st in updates.items()],
+            )
+            self._conn.execute(
+                "UPDATE slugs SET status_mtime = ? WHERE slug = ?",
+                (_mtime(status_file), slug),
+            )
+            self._conn.commit()
+
+    def set_status(self, slug: str, image_name: str, status: str):
+        """Write a single image status."""
+        self.set_statuses(slug, {image_name: status})
+
+    def remove(self, slug: str, image_names: list[str] | str):
+        """Drop images from a character's status file (e.g. after a move)."""
+        if isinstance(image_names, str):
+            image_names = [image_names]
+        status_file = self.root / slug / STATUS_FILENAME
+        with self._lock:
+            if not status_file.exists():
+                return
+            statuses = _read_json(status_file)
+            for name in image_names:
+                statuses.pop(name, None)
+            status_file.write_text(json.dumps(statuses, indent=2))
+            self._refresh(slug)
+
+    def ensure_status_file(self, slug: str):
+        """Create an empty approval_status.json for a new character."""
+        status_file = self.root / slug / STATUS_FILENAME
+        if not status_file.exists():
+            status_file.parent.mkdir(parents=True, exist_ok=True)
+            status_file.write_text("{}")
+
+    # --- reads ---
+
+    def get_statuses(self, slug: str) -> dict[str, str]:
+        """Explicit statuses for one character (same shape as approval_status.json)."""
+        self._refresh(slug)
+        with self._lock:
+            return {
+                r["name"]: r["status"] for r in self._conn.execute(
+                    "SELECT name, status FROM images WHERE slug = ? AND explicit = 1", (slug,)
+                )
+            }
+
+    def names_with_status(self, slug: str, status: str = "approved",
+                          on_disk: bool = False) -> list[str]:
+        """Sorted image names with a given status, optionally only files that exist."""
+        self._refresh(slug)
+        sql = "SELECT name FROM images WHERE slug = ? AND status = ?"
+        if on_disk:
+            sql += " AND on_disk = 1"
+        with self._lock:
+            return [r["name"] for r in self._conn.execute(sql + " ORDER BY name", (slug, status))]
+
+    def count(self, slug: str, status: str = "approved", on_disk: bool = False) -> int:
+        """Number of images with a given status for one character."""
+        self._refresh(slug)
+        sql = "SELECT COUNT(*) FROM images WHERE slug = ? AND status = ?"
+        if on_disk:
+            sql += " AND on_disk = 1"
+        with self._lock:
+            return self._conn.execute(sql, (slug, status)).fetchone()[0]
+
+    def status_counts(self, slug: str, on_disk: bool = False) -> dict[str, int]:
+        """{status: count} for one character, explicit entries only unless on_disk."""
+        self._refresh(slug)
+        where = "on_disk = 1" if on_disk else "explicit = 1"
+        with self._lock:
+            return {
+                r["status"]: r["n"] for r in self._conn.execute(
+                    f"SELECT status, COUNT(*) AS n FROM images WHERE slug = ? AND {where} GROUP BY status",
+                    (slug,),
+                )
+            }
+
+    def query(
+        self,
+        status: str | None = None,
+        slugs: list[str] | None = None,
+        project_name: str | None = None,
+        source: str | None = None,
+        before: tuple[float, str, str] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        with_total: bool = True,
+    ) -> tuple[list[dict], int]:
+        """Filtered, ctime-descending page of on-disk images.
+
+        `before` is a keyset cursor (ctime, slug, name): only rows strictly older
+        than it are returned, so successive pages stay stable while new images
+        arrive. Returns (rows, total matching the filters ignoring the cursor).
+        """
+        if slugs is None:
+            self.refresh_all(max_age=REFRESH_MAX_AGE)
+        else:
+            for slug in slugs:
+                self._refresh(slug, max_age=REFRESH_MAX_AGE)
+
+        where = ["on_disk = 1"]
+        params: list = []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if slugs is not None:
+            if not slugs:
+                return [], 0
+            where.append(f"slug IN ({','.join('?' * len(slugs))})")
+            params.extend(slugs)
+        if project_name:
+            where.append("project_name = ?")
+            params.append(project_name)
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        base_where = " AND ".join(where)
+
+        page_where, page_params = base_where, list(params)
+        if before:
+            page_where += " AND (ctime, slug, name) < (?, ?, ?)"
+            page_params.extend(before)
+        sql = f"SELECT * FROM images WHERE {page_where} ORDER BY ctime DESC, slug DESC, name DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            page_params.extend([limit, offset])
+
+        with self._lock:
+            rows = [dict(r) for r in self._conn.execute(sql, page_params)]
+            total = (
+                self._conn.execute(f"SELECT COUNT(*) FROM images WHERE {base_where}", params).fetchone()[0]
+                if with_total else len(rows)
+            )
+        for r in rows:
+            r["metadata"] = json.loads(r.pop("meta_json")) if r.get("meta_json") else None
+        return rows, total
+
+    def image_row(self, slug: str, image_name: str) -> dict | None:
+        """One image's row (query() shape) without rescanning its character.
+
+        A file written since the last scan isn't indexed yet; its row is built
+        from the file and its sidecars instead. None if the file is gone.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM images WHERE slug = ? AND name = ?", (slug, image_name)
+            ).fetchone()
+        if row is not None and row["on_disk"]:
+            r = dict(row)
+            r["metadata"] = json.loads(r.pop("meta_json")) if r.get("meta_json") else None
+            return r
+
+        img_path = self.root / slug / "images" / image_name
+        try:
+            ctime = img_path.stat().st_ctime
+        except OSError:
+            return None
+        side = _read_sidecars(img_path)
+        project = side["meta_project"] if slug == "_unclassified" else (
+            self._project_for_slug.get(slug) or side["meta_project"]
+        )
+        return {
+            "slug": slug, "name": image_name,
+            "status": row["status"] if row is not None else "pending",
+            "ctime": ctime, "source": classify_source(image_name),
+            "checkpoint_model": side["checkpoint_model"], "project_name": project,
+            "caption": side["caption"],
+            "metadata": json.loads(side["meta_json"]) if side["meta_json"] else None,
+        }
+
+    def slug_stats(self, slugs: list[str] | None = None) -> dict[str, dict]:
+        """Per-character on-disk counts and approved-image checkpoint breakdown."""
+        if slugs is None:
+            slugs = self.refresh_all(max_age=REFRESH_MAX_AGE)
+        else:
+            for slug in slugs:
+                self._refresh(slug, max_age=REFRESH_MAX_AGE)
+        if not slugs:
+            return {}
+        marks = ",".join("?" * len(slugs))
+        stats: dict[str, dict] = {}
+        with self._lock:
+            for r in self._conn.execute(
+                f"""SELECT slug, status, COUNT(*) AS n FROM images
+                    WHERE on_disk = 1 AND slug IN ({marks}) GROUP BY slug, status""",
+                slugs,
+            ):
+                stats.setdefault(r["slug"], {"counts": {}, "models": {}})["counts"][r["status"]] = r["n"]
+            for r in self._conn.execute(
+                f"""SELECT slug,
+                           CASE WHEN has_meta = 0 THEN 'no_meta'
+                                ELSE COALESCE(checkpoint_model, 'unknown') END AS model,
+                           COUNT(*) AS n
+                    FROM images WHERE on_disk = 1 AND status = 'approved' AND slug IN ({marks})
+                    GROUP BY slug, model""",
+                slugs,
+            ):
+                stats.setdefault(r["slug"], {"counts": {}, "models": {}})["models"][r["model"]] = r["n"]
+        return stats
+
+    # --- quality score cache ---
+
+    def content_hashes(self, files: list[tuple[str, int, int]]) -> dict[str, str]:
+        """path -> content hash for (path, mtime_ns, size) entries whose stat still matches."""
+        out: dict[str, str] = {}
+        with self._lock:
+            for i in range(0, len(files), _IN_CHUNK):
+                chunk = files[i:i + _IN_CHUNK]
+                want = {path: (mtime, size) for path, mtime, size in chunk}
+                for r in self._conn.execute(
+                    f"SELECT * FROM quality_files WHERE path IN ({','.join('?' * len(chunk))})",
+                    [path for path, _, _ in chunk],
+                ):
+                    if want[r["path"]] == (r["mtime_ns"], r["size"]):
+                        out[r["path"]] = r["content_hash"]
+        return out
+
+    def get_quality_scores(self, hashes: list[str], version: int) -> dict[str, dict]:
+        """content hash -> cached score dict for one scorer version."""
+        hashes = list(dict.fromkeys(hashes))
+        out: dict[str, dict] = {}
+        with self._lock:
+            for i in range(0, len(hashes), _IN_CHUNK):
+                chunk = hashes[i:i + _IN_CHUNK]
+                for r in self._conn.execute(
+                    f"""SELECT content_hash, scores_json FROM quality_scores
+                        WHERE version = ? AND content_hash IN ({','.join('?' * len(chunk))})""",
+                    [version, *chunk],
+                ):
+                    out[r["content_hash"]] = json.loads(r["scores_json"])
+        return out
+
+    def put_quality_scores(
+        self, files: list[tuple[str, int, int, str]], scores: dict[str, dict], version: int,
+    ):
+        """Record (path, mtime_ns, size, content_hash) entries and per-hash scores."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """INSERT INTO quality_files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns,
+                       size = excluded.size, content_hash = excluded.content_hash""",
+                files,
+            )
+            self._conn.executemany(
+                """INSERT OR REPLACE INTO quality_scores (content_hash, version, scores_json, updated_at)
+                   VALUES (?, ?, ?, ?)""",
+                [(h, version, json.dumps(s), now) for h, s in scores.items()],
+            )
+            self._conn.commit()
+
+    # --- vision review cache ---
+
+    def get_vision_review(self, key: tuple[str, str, int, str, str]) -> dict | None:
+        """Cached result for (kind, content_hash, template_version, context_hash, model)."""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT result_json FROM vision_reviews WHERE kind = ? AND content_hash = ?
+                   AND template_version = ? AND context_hash = ? AND model = ?""",
+                key,
+            ).fetchone()
+        return json.loads(row["result_json"]) if row else None
+
+    def put_vision_review(self, key: tuple[str, str, int, str, str], slug: str | None, result: dict):
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO vision_reviews
+                   (kind, content_hash, template_version, context_hash, model, slug, result_json, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (*key, slug, json.dumps(result), time.time()),
+            )
+            self._conn.commit()
+
+    def invalidate_vision_reviews(self, slug: str) -> int:
+        """Drop every cached review made against a character; returns rows removed."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM vision_reviews WHERE slug = ?", (slug,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def vision_review_counts(self) -> dict[str, int]:
+        with self._lock:
+            return {r["kind"]: r["n"] for r in self._conn.execute(
+                "SELECT kind, COUNT(*) AS n FROM vision_reviews GROUP BY kind")}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# One index per datasets root (tests and tools point modules at other roots)
+_indexes: dict[str, ApprovalIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root: Path | None = None) -> ApprovalIndex:
+    """Return the shared index for a datasets root (default: BASE_PATH)."""
+    root = Path(root or BASE_PATH)
+    key = str(root.resolve())
+    with _indexes_lock:
+        idx = _indexes.get(key)
+        if idx is None:
+            idx = ApprovalIndex(root)
+            _indexes[key] = idx
+        return idx
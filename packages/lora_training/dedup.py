@@ -1,64 +1,314 @@
 """Perceptual hash deduplication for ingestion paths.
 
-Uses the average-hash implementation from packages.visual_pipeline.vision to detect
-near-duplicate images before they enter a character's dataset.
+Each image gets three 64-bit hashes (average, difference and DCT/perceptual)
+stored as uint64 NumPy arrays. A candidate is a duplicate when all three are
+within a small Hamming distance of an existing image, so re-encodes, rescales
+and one-bit jitter are caught, not only exact hash matches.
+
+Per-character indexes are persisted to <slug>/.hash_index.npz next to the
+dataset and refreshed incrementally (only new or modified PNGs are hashed).
+register_hash() only marks the index dirty; dirty indexes are written once
+SAVE_DELAY seconds after the first registration of a burst, and on shutdown
+(flush_indexes()), so an ingest batch rewrites each .npz once.
 """
 
 import logging
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+
 from packages.core.config import BASE_PATH
-from packages.visual_pipeline.vision import perceptual_hash
 
 logger = logging.getLogger(__name__)
 
-# In-memory hash caches: slug -> set of hex hash strings.
-# Populated lazily on first check per character.
-_hash_caches: dict[str, set[str]] = {}
+INDEX_FILENAME = ".hash_index.npz"
+
+# Seconds after a registration before dirty indexes are written to disk
+SAVE_DELAY = 5.0
+
+# Max Hamming distance per hash (aHash, dHash, pHash) for a near-duplicate
+DUP_THRESHOLDS = np.array([4, 6, 6], dtype=np.uint8)
+
+# Bits set per byte value — popcount over uint64 via a uint8 view
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# 32-point DCT-II basis for pHash
+_DCT_N = 32
+_DCT = np.cos(
+    np.pi * (2 * np.arange(_DCT_N)[None, :] + 1) * np.arange(_DCT_N)[:, None] / (2 * _DCT_N)
+).astype(np.float32)
+
+
+def _pack_bits(bits: np.ndarray) -> int:
+    return int(np.packbits(bits.astype(np.uint8).ravel()).view(">u8")[0])
+
+
+# Side of the grayscale thumbnail all three hashes are derived from
+HASH_BASE_SIZE = 64
+
+
+def hashes_from_gray(gray: np.ndarray) -> tuple[int, int, int]:
+    """Return (aHash, dHash, pHash) for an already decoded grayscale uint8 frame."""
+    from PIL import Image
+
+    base = Image.fromarray(np.ascontiguousarray(gray, dtype=np.uint8))
+    if base.size != (HASH_BASE_SIZE, HASH_BASE_SIZE):
+        base = base.resize((HASH_BASE_SIZE, HASH_BASE_SIZE), Image.LANCZOS)
+    a = np.asarray(base.resize((8, 8), Image.LANCZOS), dtype=np.float32)
+    d = np.asarray(base.resize((9, 8), Image.LANCZOS), dtype=np.float32)
+    p = np.asarray(base.resize((_DCT_N, _DCT_N), Image.LANCZOS), dtype=np.float32)
+
+    ahash = _pack_bits(a > a.mean())
+    dhash = _pack_bits(d[:, 1:] > d[:, :-1])
+    low = (_DCT @ p @ _DCT.T)[:8, :8].ravel()
+    phash = _pack_bits(low > np.median(low[1:]))
+    return ahash, dhash, phash
+
+
+def compute_hashes(image_path: Path) -> tuple[int, int, int]:
+    """Return (aHash, dHash, pHash) for an image file as 64-bit ints."""
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        # One downscale from full resolution, the three hash inputs come from it
+        base = img.convert("L").resize((HASH_BASE_SIZE, HASH_BASE_SIZE), Image.LANCZOS)
+    return hashes_from_gray(np.asarray(base))
+
+
+@lru_cache(maxsize=2048)
+def _cached_hashes(path: str, mtime_ns: int, size: int) -> tuple[int, int, int]:
+    return compute_hashes(Path(path))
+
+
+def image_hashes(image_path: Path) -> tuple[int, int, int]:
+    """compute_hashes() memoised on (path, mtime, size).
+
+    A frame checked against several characters is only decoded once.
+    """
+    st = os.stat(image_path)
+    return _cached_hashes(str(image_path), st.st_mtime_ns, st.st_size)
+
+
+def hamming_distances(hashes: np.ndarray, query: tuple[int, int, int]) -> np.ndarray:
+    """Per-row, per-hash Hamming distance between an (N, 3) uint64 array and query."""
+    x = np.bitwise_xor(hashes, np.asarray(query, dtype=np.uint64))
+    return _POPCOUNT[x.view(np.uint8)].reshape(len(hashes), 3, 8).sum(axis=2)
 
 
-def build_hash_index(slug: str) -> set[str]:
-    """Build (or return cached) perceptual hash index for a character's existing dataset."""
-    if slug in _hash_caches:
-        return _hash_caches[slug]
+class HashIndex:
+    """Growable (N, 3) uint64 hash array with names and mtimes.
 
-    hashes: set[str] = set()
-    images_dir = BASE_PATH / slug / "images"
-    if images_dir.is_dir():
-        for img in images_dir.glob("*.png"):
+    path=None keeps the index in memory only (e.g. per-video dedup).
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._names: list[str] = []
+        self._mtimes = np.empty(0, dtype=np.float64)
+        self._hashes = np.empty((0, 3), dtype=np.uint64)
+        self._n = 0
+        self._lock = threading.Lock()
+        self.dirty = False   # rows changed since the last load()/save()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def find(self, hashes: tuple[int, int, int], thresholds: np.ndarray = DUP_THRESHOLDS) -> str | None:
+        """Name of the first indexed image within thresholds of hashes, or None."""
+        with self._lock:
+            if not self._n:
+                return None
+            dist = hamming_distances(self._hashes[:self._n], hashes)
+            hits = np.flatnonzero((dist <= thresholds).all(axis=1))
+            return self._names[hits[0]] if hits.size else None
+
+    def find_all(self, hashes: tuple[int, int, int], thresholds: np.ndarray = DUP_THRESHOLDS) -> list[str]:
+        """Names of every indexed image within thresholds of hashes."""
+        with self._lock:
+            if not self._n:
+                return []
+            dist = hamming_distances(self._hashes[:self._n], hashes)
+            return [self._names[i] for i in np.flatnonzero((dist <= thresholds).all(axis=1))]
+
+    def add(self, name: str, hashes: tuple[int, int, int], mtime: float = 0.0) -> None:
+        with self._lock:
+            if self._n == len(self._hashes):
+                cap = max(64, 2 * self._n)
+                grown = np.empty((cap, 3), dtype=np.uint64)
+                grown[:self._n] = self._hashes[:self._n]
+                self._hashes = grown
+                mtimes = np.empty(cap, dtype=np.float64)
+                mtimes[:self._n] = self._mtimes[:self._n]
+                self._mtimes = mtimes
+            self._hashes[self._n] = hashes
+            self._mtimes[self._n] = mtime
+            self._names.append(name)
+            self._n += 1
+            self.dirty = True
+
+    def _keep(self, mask: np.ndarray) -> None:
+        self._names = [n for n, k in zip(self._names, mask) if k]
+        self._hashes = self._hashes[:self._n][mask]
+        self._mtimes = self._mtimes[:self._n][mask]
+        self._n = len(self._names)
+        self.dirty = True
+
+    # -- persistence --------------------------------------------------------
+
+    def load(self) -> bool:
+        if self.path is None or not self.path.is_file():
+            return False
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                names, hashes, mtimes = data["names"], data["hashes"], data["mtimes"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable hash index {self.path}: {e}")
+            return False
+        self._names = [str(n) for n in names]
+        self._hashes = hashes.astype(np.uint64).reshape(-1, 3)
+        self._mtimes = mtimes.astype(np.float64)
+        self._n = len(self._names)
+        self.dirty = False
+        return True
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            tmp = self.path.with_name(self.path.name + ".tmp.npz")
+            try:
+                np.savez(
+                    tmp,
+                    names=np.array(self._names, dtype=str),
+                    hashes=self._hashes[:self._n],
+                    mtimes=self._mtimes[:self._n],
+                )
+                os.replace(tmp, self.path)
+                self.dirty = False
+            except OSError as e:
+                logger.warning(f"Could not persist hash index {self.path}: {e}")
+
+    def refresh(self, images_dir: Path) -> int:
+        """Sync the index with images_dir: hash new/modified PNGs, drop deleted ones.
+
+        Returns the number of rows that changed.
+        """
+        on_disk: dict[str, float] = {}
+        if images_dir.is_dir():
+            with os.scandir(images_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".png") and entry.is_file():
+                        on_disk[entry.name] = entry.stat().st_mtime
+
+        known = {n: self._mtimes[i] for i, n in enumerate(self._names)}
+        keep = np.array([on_disk.get(n) == known[n] for n in self._names], dtype=bool)
+        changed = int((~keep).sum())
+        if changed:
+            self._keep(keep)
+
+        present = set(self._names)
+        for name, mtime in on_disk.items():
+            if name in present:
+                continue
             try:
-                h = perceptual_hash(img)
-                hashes.add(h)
+                self.add(name, image_hashes(images_dir / name), mtime)
+                changed += 1
             except Exception:
                 pass
-    _hash_caches[slug] = hashes
-    logger.debug(f"Built hash index for {slug}: {len(hashes)} images")
-    return hashes
+        return changed
+
+
+# In-memory index cache: slug -> HashIndex, populated lazily on first check per character.
+_hash_caches: dict[str, HashIndex] = {}
+_caches_lock = threading.Lock()
+# Held while one character's index is loaded/refreshed, so other characters aren't blocked
+_build_locks: dict[str, threading.Lock] = {}
+_save_timer: threading.Timer | None = None
+
+
+def build_hash_index(slug: str) -> HashIndex:
+    """Load (or return cached) perceptual hash index for a character's existing dataset."""
+    with _caches_lock:
+        index = _hash_caches.get(slug)
+        if index is not None:
+            return index
+        build_lock = _build_locks.setdefault(slug, threading.Lock())
+
+    with build_lock:
+        with _caches_lock:
+            index = _hash_caches.get(slug)
+        if index is not None:
+            return index  # built by another thread while we waited
+
+        slug_dir = BASE_PATH / slug
+        index = HashIndex(slug_dir / INDEX_FILENAME if slug_dir.is_dir() else None)
+        index.load()
+        changed = index.refresh(slug_dir / "images")
+        if changed:
+            index.save()
+        with _caches_lock:
+            _hash_caches[slug] = index
+    logger.debug(f"Built hash index for {slug}: {len(index)} images ({changed} rehashed)")
+    return index
+
+
+def flush_indexes() -> int:
+    """Write every dirty cached index to disk. Returns the number written."""
+    global _save_timer
+    with _caches_lock:
+        _save_timer = None
+        dirty = [idx for idx in _hash_caches.values() if idx.dirty and idx.path is not None]
+    for index in dirty:
+        index.save()
+    return len(dirty)
+
+
+def _schedule_save() -> None:
+    """Flush dirty indexes SAVE_DELAY seconds from now unless a flush is already pending."""
+    global _save_timer
+    with _caches_lock:
+        if _save_timer is not None:
+            return
+        _save_timer = threading.Timer(SAVE_DELAY, flush_indexes)
+        _save_timer.daemon = True
+        _save_timer.start()
 
 
 def is_duplicate(image_path: Path, slug: str) -> bool:
-    """Check whether image_path is a perceptual duplicate of anything in slug's dataset."""
+    """Check whether image_path is a perceptual near-duplicate of anything in slug's dataset."""
     index = build_hash_index(slug)
     try:
-        h = perceptual_hash(image_path)
+        h = image_hashes(image_path)
     except Exception:
         return False
-    return h in index
+    return index.find(h) is not None
 
 
 def register_hash(image_path: Path, slug: str) -> None:
-    """Add image_path's hash to the in-memory cache after a successful copy."""
+    """Add image_path's hashes to the slug's index after a successful copy."""
     index = build_hash_index(slug)
     try:
-        h = perceptual_hash(image_path)
-        index.add(h)
+        h = image_hashes(image_path)
     except Exception:
-        pass
+        return
+    if index.path is None and (BASE_PATH / slug).is_dir():
+        # Dataset dir was created after the index was built
+        index.path = BASE_PATH / slug / INDEX_FILENAME
+    index.add(image_path.name, h, image_path.stat().st_mtime)
+    _schedule_save()
 
 
 def invalidate_cache(slug: str | None = None) -> None:
-    """Drop cached hashes. If slug is None, drop all."""
-    if slug is None:
-        _hash_caches.clear()
-    else:
-        _hash_caches.pop(slug, None)
+    """Drop cached indexes (the on-disk copies stay). If slug is None, drop all."""
+    with _caches_lock:
+        if slug is None:
+            dropped = list(_hash_caches.values())
+            _hash_caches.clear()
+        else:
+            dropped = [idx for idx in (_hash_caches.pop(slug, None),) if idx is not None]
+    for index in dropped:
+        if index.dirty:
+            index.save()  # keep registrations that haven't been flushed yet
@@ -242,17 +242,11 @@ def open_gen_log():
 def queue_regeneration(character_slug: str):
     """Queue a feedback-aware background regeneration for a character."""
     # Check if character already has enough approved images
-    dataset_path = BASE_PATH / character_slug
-    approval_file = dataset_path / "approval_status.json"
-    if approval_file.exists():
-        try:
-            statuses = json.loads(approval_file.read_text())
-            approved_count = sum(1 for v in statuses.values() if v == "approved")
-            if approved_count >= 10:
-                logger.info(f"Skipping regeneration for {character_slug}: already has {approved_count} approved")
-                return
-        except (json.JSONDecodeError, IOError):
-            pass
+    from .approval_index import get_index
+    approved_count = get_index(BASE_PATH).count(character_slug, "approved")
+    if approved_count >= 10:
+        logger.info(f"Skipping regeneration for {character_slug}: already has {approved_count} approved")
+        return
 
     # Echo Brain analysis (runs periodically, not on every rejection)
     try:
@@ -274,20 +268,15 @@ def queue_regeneration(character_slug: str):
 # --- Image status registration helpers ---
 
 def register_pending_image(character_slug: str, image_name: str):
-    """Register a single image as pending in approval_status.json (thread-safe enough for single writer)."""
+    """Register a single image as pending and announce it (IMAGE_GENERATED)."""
     register_image_status(character_slug, image_name, "pending")
+    from packages.core.events import event_bus, IMAGE_GENERATED
+    event_bus.emit_nowait(IMAGE_GENERATED, {"character_slug": character_slug, "image_name": image_name})
 
 
 def register_image_status(character_slug: str, image_name: str, status: str):
-    """Register a single image with given status in approval_status.json."""
+    """Register a single image with given status (approval_status.json + index)."""
     if status not in IMAGE_STATUSES:
         raise ValueError(f"Invalid image status '{status}'. Must be one of: {sorted(IMAGE_STATUSES)}")
-    approval_file = BASE_PATH / character_slug / "approval_status.json"
-    approval_status = {}
-    if approval_file.exists():
-        try:
-            approval_status = json.loads(approval_file.read_text())
-        except (json.JSONDecodeError, IOError):
-            pass
-    approval_status[image_name] = status
-    approval_file.write_text(json.dumps(approval_status, indent=2))
+    from .approval_index import get_index
+    get_index(BASE_PATH).set_status(character_slug, image_name, status)
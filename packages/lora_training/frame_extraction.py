@@ -2,15 +2,20 @@
 
 Ported from archived/dataset_approval_api.py.archived (lines 2613-2724).
 Replaces flat fps extraction with a 3-phase strategy that produces more
-diverse, higher-quality training frames.
+diverse, higher-quality training frames. The video is decoded once into
+small in-memory thumbnails for scoring and hashing; only the frames that
+survive dedup and trimming are encoded to disk.
 """
 
 import logging
-import shutil
 import subprocess
+import threading
 from pathlib import Path
+from typing import Iterable, Iterator
 
-from packages.visual_pipeline.vision import perceptual_hash
+import numpy as np
+
+from packages.lora_training.dedup import HASH_BASE_SIZE, HashIndex, hashes_from_gray
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +34,29 @@ def get_video_duration(video_path: Path) -> float:
         return 0
 
 
+# Analysis pass: every decoded frame is resampled to this rate and a tiny
+# grayscale thumbnail and piped to us raw — nothing is written to disk.
+ANALYSIS_FPS = 8
+ANALYSIS_SIZE = HASH_BASE_SIZE
+# ffmpeg is killed if the analysis decode runs longer than this (seconds)
+ANALYSIS_TIMEOUT = 300
+
+# Same metric and threshold as ffmpeg's select='gt(scene,0.3)'
+SCENE_THRESHOLD = 0.3
+
+# Survivors are encoded with one ffmpeg process per batch of seek points
+ENCODE_BATCH = 16
+
+
 def extract_smart_frames(video_path: Path, max_frames: int, tmpdir: str) -> list[Path]:
     """Extract diverse frames using scene detection + uniform sampling + dedup.
 
-    Strategy:
-    1. Scene-change detection (threshold 0.3) to find visually distinct moments
-    2. Uniform temporal sampling to fill gaps across the full video
-    3. Perceptual-hash dedup to eliminate near-identical frames
-    4. Even-spaced trim to max_frames
+    Strategy (single decode of the video):
+    1. Stream small grayscale frames from one ffmpeg process
+    2. Score scene changes in memory (threshold 0.3) and pick uniform samples
+       across the full video
+    3. Multi-hash Hamming-distance dedup to eliminate near-identical frames
+    4. Even-spaced trim to max_frames, then encode only the survivors to PNG
 
     Falls back to flat 0.5fps if duration is unknown.
 
@@ -59,75 +79,128 @@ def extract_smart_frames(video_path: Path, max_frames: int, tmpdir: str) -> list
 
     logger.info(f"Video duration: {duration:.1f}s, target: {max_frames} frames")
 
-    # --- Phase 1: Scene-change detection ---
-    scene_dir = Path(tmpdir) / "scene_frames"
-    scene_dir.mkdir(exist_ok=True)
-    scene_pattern = str(scene_dir / "scene_%04d.png")
-    scene_limit = max_frames * 3
+    plan = _plan_frames(_iter_analysis_frames(video_path), duration, max_frames)
+    if not plan:
+        logger.warning("No frames extracted at all")
+        return []
 
-    subprocess.run(
-        ["ffmpeg", "-i", str(video_path),
-         "-vf", "select='gt(scene,0.3)',scale=768:-1",
-         "-vsync", "vfr", "-q:v", "1",
-         "-frames:v", str(scene_limit),
-         scene_pattern, "-y"],
-        capture_output=True, timeout=300,
-    )
-    scene_frames = sorted(scene_dir.glob("scene_*.png"))
-    logger.info(f"Scene detection found {len(scene_frames)} distinct scenes")
+    dests = [frames_dir / f"frame_{i + 1:04d}.png" for i in range(len(plan))]
+    _encode_frames(video_path, [p["timestamp"] for p in plan], dests)
+    frames = [d for d in dests if d.exists()]
 
-    # --- Phase 2: Uniform temporal sampling ---
-    uniform_dir = Path(tmpdir) / "uniform_frames"
-    uniform_dir.mkdir(exist_ok=True)
-    uniform_pattern = str(uniform_dir / "uniform_%04d.png")
+    logger.info(f"Final: {len(frames)} frames for classification")
+    return frames
 
-    uniform_count = max_frames * 2
-    interval = duration / uniform_count if uniform_count > 0 else 1.0
-    uniform_fps = 1.0 / max(interval, 0.1)
 
-    subprocess.run(
-        ["ffmpeg", "-i", str(video_path),
-         "-vf", f"fps={uniform_fps:.4f},scale=768:-1",
-         "-q:v", "1", "-frames:v", str(uniform_count),
-         uniform_pattern, "-y"],
-        capture_output=True, timeout=300,
-    )
-    uniform_frames = sorted(uniform_dir.glob("uniform_*.png"))
-    logger.info(f"Uniform sampling extracted {len(uniform_frames)} frames across {duration:.0f}s")
+def _iter_analysis_frames(video_path: Path) -> Iterator[np.ndarray]:
+    """Decode the video once, yielding ANALYSIS_SIZE² grayscale frames at ANALYSIS_FPS."""
+    size = ANALYSIS_SIZE
+    cmd = ["ffmpeg", "-v", "error", "-i", str(video_path),
+           "-vf", f"fps={ANALYSIS_FPS},scale={size}:{size}:flags=area",
+           "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    # A blocked read can't check a deadline itself; the timer kills ffmpeg, which ends the read
+    timed_out = threading.Event()
 
-    # --- Phase 3: Merge + perceptual hash dedup ---
-    # Scene frames get priority (they're at actual content changes)
-    all_candidates = [(f, "scene") for f in scene_frames] + [(f, "uniform") for f in uniform_frames]
+    def _kill():
+        timed_out.set()
+        proc.kill()
 
-    if not all_candidates:
-        logger.warning("No frames extracted at all")
-        return []
+    timer = threading.Timer(ANALYSIS_TIMEOUT, _kill)
+    timer.start()
+    frame_bytes = size * size
+    try:
+        while True:
+            buf = proc.stdout.read(frame_bytes)
+            if len(buf) < frame_bytes:
+                break
+            yield np.frombuffer(buf, dtype=np.uint8).reshape(size, size)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, ANALYSIS_TIMEOUT)
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def _plan_frames(frames: Iterable[np.ndarray], duration: float, max_frames: int) -> list[dict]:
+    """Choose which timestamps to keep from one pass over the analysis frames.
+
+    Scene-change frames (up to max_frames*3) and uniform samples (max_frames*2)
+    are hashed in memory; scene frames win dedup ties. Survivors are returned in
+    time order, evenly trimmed to max_frames, as {"timestamp", "source"} dicts.
+    """
+    scene_limit = max_frames * 3
+    uniform_count = max_frames * 2
+    interval = duration / uniform_count if uniform_count > 0 else 1.0
 
-    seen_hashes: set[str] = set()
-    unique_frames: list[Path] = []
+    scene_cands: list[tuple[float, str, tuple]] = []
+    uniform_cands: list[tuple[float, str, tuple]] = []
+    next_uniform = 0.0
+    prev = None
+    prev_mafd = 0.0
+
+    for n, frame in enumerate(frames):
+        t = n / ANALYSIS_FPS
+        cur = frame.astype(np.int16)
+        score = 0.0
+        if prev is not None:
+            # ffmpeg scene score: mean abs frame difference, damped by the previous one
+            mafd = float(np.abs(cur - prev).mean())
+            score = min(mafd, abs(mafd - prev_mafd)) / 100.0
+            prev_mafd = mafd
+        prev = cur
+
+        is_uniform = t >= next_uniform
+        while next_uniform <= t:
+            next_uniform += interval
+
+        if score > SCENE_THRESHOLD and len(scene_cands) < scene_limit:
+            scene_cands.append((t, "scene", hashes_from_gray(frame)))
+        elif is_uniform and len(uniform_cands) < uniform_count:
+            uniform_cands.append((t, "uniform", hashes_from_gray(frame)))
+
+    logger.info(
+        f"Analysis pass: {len(scene_cands)} scene changes, {len(uniform_cands)} uniform samples"
+    )
 
-    for frame_path, source in all_candidates:
-        phash = perceptual_hash(frame_path)
-        if phash in seen_hashes:
+    seen = HashIndex()
+    kept: list[dict] = []
+    for t, source, hashes in scene_cands + uniform_cands:
+        if seen.find(hashes) is not None:
             continue
-        seen_hashes.add(phash)
-        dest = frames_dir / f"frame_{len(unique_frames) + 1:04d}.png"
-        shutil.copy2(frame_path, dest)
-        unique_frames.append(dest)
+        seen.add(f"{t:.3f}", hashes)
+        kept.append({"timestamp": t, "source": source})
+    kept.sort(key=lambda k: k["timestamp"])
 
-    logger.info(f"After dedup: {len(unique_frames)} unique from {len(all_candidates)} candidates")
+    total = len(scene_cands) + len(uniform_cands)
+    logger.info(f"After dedup: {len(kept)} unique from {total} candidates")
 
     # Trim to max_frames — take evenly spaced subset if we have too many
-    if len(unique_frames) > max_frames:
-        step = len(unique_frames) / max_frames
-        selected = [unique_frames[int(i * step)] for i in range(max_frames)]
-        for f in unique_frames:
-            if f not in selected:
-                f.unlink(missing_ok=True)
-        unique_frames = selected
+    if len(kept) > max_frames:
+        step = len(kept) / max_frames
+        kept = [kept[int(i * step)] for i in range(max_frames)]
+    return kept
 
-    logger.info(f"Final: {len(unique_frames)} frames for classification")
-    return unique_frames
+
+def _encode_frames(video_path: Path, timestamps: list[float], dests: list[Path]) -> None:
+    """Write the frame at each timestamp to its dest PNG (768px wide).
+
+    Uses accurate input seeking, so only the GOP around each survivor is decoded.
+    """
+    for start in range(0, len(timestamps), ENCODE_BATCH):
+        batch = list(zip(timestamps[start:start + ENCODE_BATCH], dests[start:start + ENCODE_BATCH]))
+        cmd = ["ffmpeg", "-v", "error", "-y"]
+        for t, _ in batch:
+            cmd += ["-ss", f"{t:.3f}", "-i", str(video_path)]
+        for i, (_, dest) in enumerate(batch):
+            cmd += ["-map", f"{i}:v:0", "-frames:v", "1", "-vf", "scale=768:-1", "-q:v", "1", str(dest)]
+        try:
+            subprocess.run(cmd, capture_output=True, timeout=300)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Frame encode batch at {batch[0][0]:.1f}s timed out")
 
 
 def _flat_extract(video_path: Path, max_frames: int, frames_dir: Path) -> list[Path]:
@@ -147,8 +220,8 @@ def extract_frames_with_timestamps(
 ) -> list[dict]:
     """Extract diverse frames with their timestamps from the source video.
 
-    Same 3-phase strategy as extract_smart_frames() (scene detect -> uniform -> dedup)
-    but captures pts_time for each frame via ffmpeg showinfo filter.
+    Same single-pass strategy as extract_smart_frames() (scene detect + uniform
+    -> dedup -> encode survivors); the timestamps come from the analysis pass.
 
     Args:
         video_path: Path to the video file.
@@ -157,8 +230,6 @@ def extract_frames_with_timestamps(
 
     Returns: List of {"path": Path, "timestamp": float, "source": "scene"|"uniform"} dicts.
     """
-    import re as _re
-
     duration = get_video_duration(video_path)
     frames_dir = Path(tmpdir) / "frames"
     frames_dir.mkdir(exist_ok=True)
@@ -169,72 +240,14 @@ def extract_frames_with_timestamps(
 
     logger.info(f"Video duration: {duration:.1f}s, target: {max_frames} frames (with timestamps)")
 
-    # --- Phase 1: Scene-change detection with showinfo ---
-    scene_dir = Path(tmpdir) / "scene_ts_frames"
-    scene_dir.mkdir(exist_ok=True)
-    scene_pattern = str(scene_dir / "scene_%04d.png")
-    scene_limit = max_frames * 3
-
-    scene_proc = subprocess.run(
-        ["ffmpeg", "-i", str(video_path),
-         "-vf", "select='gt(scene,0.3)',showinfo,scale=768:-1",
-         "-vsync", "vfr", "-q:v", "1",
-         "-frames:v", str(scene_limit),
-         scene_pattern, "-y"],
-        capture_output=True, text=True, timeout=300,
-    )
-    scene_frames = sorted(scene_dir.glob("scene_*.png"))
-    scene_timestamps = _parse_timestamps(scene_proc.stderr, len(scene_frames))
-    logger.info(f"Scene detection found {len(scene_frames)} distinct scenes")
-
-    # --- Phase 2: Uniform temporal sampling with showinfo ---
-    uniform_dir = Path(tmpdir) / "uniform_ts_frames"
-    uniform_dir.mkdir(exist_ok=True)
-    uniform_pattern = str(uniform_dir / "uniform_%04d.png")
-
-    uniform_count = max_frames * 2
-    interval = duration / uniform_count if uniform_count > 0 else 1.0
-    uniform_fps = 1.0 / max(interval, 0.1)
-
-    uniform_proc = subprocess.run(
-        ["ffmpeg", "-i", str(video_path),
-         "-vf", f"fps={uniform_fps:.4f},showinfo,scale=768:-1",
-         "-q:v", "1", "-frames:v", str(uniform_count),
-         uniform_pattern, "-y"],
-        capture_output=True, text=True, timeout=300,
-    )
-    uniform_frames = sorted(uniform_dir.glob("uniform_*.png"))
-    uniform_timestamps = _parse_timestamps(uniform_proc.stderr, len(uniform_frames))
-    logger.info(f"Uniform sampling extracted {len(uniform_frames)} frames")
-
-    # --- Phase 3: Merge + dedup ---
-    all_candidates = (
-        [(f, "scene", ts) for f, ts in zip(scene_frames, scene_timestamps)]
-        + [(f, "uniform", ts) for f, ts in zip(uniform_frames, uniform_timestamps)]
-    )
-
-    if not all_candidates:
-        return []
-
-    seen_hashes: set[str] = set()
-    results: list[dict] = []
-
-    for frame_path, source, timestamp in all_candidates:
-        phash = perceptual_hash(frame_path)
-        if phash in seen_hashes:
-            continue
-        seen_hashes.add(phash)
-        dest = frames_dir / f"frame_{len(results) + 1:04d}.png"
-        shutil.copy2(frame_path, dest)
-        results.append({"path": dest, "timestamp": timestamp, "source": source})
-
-    logger.info(f"After dedup: {len(results)} unique from {len(all_candidates)} candidates")
-
-    # Trim to max_frames — take evenly spaced subset
-    if len(results) > max_frames:
-        step = len(results) / max_frames
-        results = [results[int(i * step)] for i in range(max_frames)]
+    plan = _plan_frames(_iter_analysis_frames(video_path), duration, max_frames)
+    dests = [frames_dir / f"frame_{i + 1:04d}.png" for i in range(len(plan))]
+    _encode_frames(video_path, [p["timestamp"] for p in plan], dests)
 
+    results = [
+        {"path": dest, "timestamp": p["timestamp"], "source": p["source"]}
+        for p, dest in zip(plan, dests) if dest.exists()
+    ]
     logger.info(f"Final: {len(results)} frames with timestamps")
     return results
 
@@ -14,8 +14,10 @@ from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.config import BASE_PATH, MOVIES_DIR, OLLAMA_URL
-from packages.core.db import connect_direct, get_char_project_map
+from packages.core.config import BASE_PATH, MOVIES_DIR
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
+from packages.core.db import connect_pooled, get_char_project_map
+from .approval_index import get_index
 
 logger = logging.getLogger(__name__)
 analysis_router = APIRouter()
@@ -26,7 +28,7 @@ analysis_router = APIRouter()
 
 async def _resolve_project(project_name: str) -> dict:
     """Resolve project name → project metadata from DB."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "SELECT id, name, genre, premise, default_style FROM projects WHERE name = $1",
@@ -41,7 +43,7 @@ async def _resolve_project(project_name: str) -> dict:
 
 async def _get_project_characters(project_name: str) -> list[dict]:
     """Get all characters for a project with their dataset stats."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT c.id, c.name, c.design_prompt, c.role,
@@ -58,17 +60,13 @@ async def _get_project_characters(project_name: str) -> list[dict]:
 
 def _count_dataset_images(slug: str) -> dict:
     """Count images by status for a character slug."""
-    approval_file = BASE_PATH / slug / "approval_status.json"
-    if not approval_file.exists():
-        return {"total": 0, "approved": 0, "rejected": 0, "pending": 0}
-    try:
-        statuses = json.loads(approval_file.read_text())
-        approved = sum(1 for v in statuses.values() if v == "approved")
-        rejected = sum(1 for v in statuses.values() if v == "rejected")
-        pending = sum(1 for v in statuses.values() if v == "pending")
-        return {"total": len(statuses), "approved": approved, "rejected": rejected, "pending": pending}
-    except (json.JSONDecodeError, IOError):
-        return {"total": 0, "approved": 0, "rejected": 0, "pending": 0}
+    counts = get_index(BASE_PATH).status_counts(slug)
+    return {
+        "total": sum(counts.values()),
+        "approved": counts.get("approved", 0),
+        "rejected": counts.get("rejected", 0),
+        "pending": counts.get("pending", 0),
+    }
 
 
 def _find_source_videos(project_name: str) -> list[dict]:
@@ -113,22 +111,13 @@ async def _get_video_duration(path: str) -> float | None:
 
 async def _ollama_generate(prompt: str, model: str = "mistral:7b", max_tokens: int = 2000) -> str:
     """Call Ollama generate API and return the response text."""
-    import urllib.request
-    payload = json.dumps({
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {"num_predict": max_tokens, "temperature": 0.3},
-    }).encode()
-    req = urllib.request.Request(
-        f"{OLLAMA_URL}/api/generate",
-        data=payload,
-        headers={"Content-Type": "application/json"},
+    return await llm_gateway.generate(
+        model,
+        prompt,
+        caller="ingest_analysis",
+        priority=PRIORITY_BATCH,
+        options={"num_predict": max_tokens, "temperature": 0.3},
     )
-    loop = asyncio.get_event_loop()
-    resp = await loop.run_in_executor(None, lambda: urllib.request.urlopen(req, timeout=120))
-    data = json.loads(resp.read())
-    return data.get("response", "")
 
 
 # ── 1. Source Analysis ───────────────────────────────────────────────────
@@ -168,7 +157,7 @@ async def source_analysis(project_name: str):
         sv["duration_seconds"] = dur
 
     # Clip extraction stats from DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         clip_counts = await conn.fetch("""
             SELECT character_slug, COUNT(*) as clip_count,
@@ -333,7 +322,7 @@ async def scene_timeline(project_name: str):
     source_videos = _find_source_videos(project_name)
     source_url = source_videos[0]["path"] if source_videos else ""
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scenes = await conn.fetch("""
             SELECT s.id, s.scene_number, s.title, s.description, s.mood,
@@ -409,7 +398,7 @@ async def voice_map(project_name: str):
     source_videos = _find_source_videos(project_name)
     source_url = source_videos[0]["path"] if source_videos else ""
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Get dialogue segments from shots
         segments_raw = await conn.fetch("""
@@ -495,7 +484,7 @@ async def text_extraction(project_name: str):
 
     entries = []
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Scene descriptions
         scenes = await conn.fetch("""
@@ -9,16 +9,17 @@ import json
 import logging
 import random
 import shutil
-import urllib.request as _ur
 from datetime import datetime
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel
 
-from packages.core.config import BASE_PATH, COMFYUI_URL, COMFYUI_OUTPUT_DIR
-from packages.core.db import get_char_project_map, connect_direct
+from packages.core.config import BASE_PATH, COMFYUI_OUTPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client
+from packages.core.db import get_char_project_map, connect_pooled
 from packages.lora_training.dedup import is_duplicate, register_hash
+from .approval_index import get_index
 from .ingest_helpers import (
     _ingest_progress,
     _classify_image,
@@ -108,15 +109,7 @@ async def ingest_image(file: UploadFile = File(...), character_slug: str = ""):
     caption = db_info.get("design_prompt", f"a portrait of {character_slug.replace('_', ' ')}")
     dest.with_suffix(".txt").write_text(caption)
 
-    approval_file = dataset_path / "approval_status.json"
-    approval_status = {}
-    if approval_file.exists():
-        try:
-            approval_status = json.loads(approval_file.read_text())
-        except (json.JSONDecodeError, IOError):
-            pass
-    approval_status[dest_name] = "pending"
-    approval_file.write_text(json.dumps(approval_status, indent=2))
+    get_index(BASE_PATH).set_status(character_slug, dest_name, "pending")
     register_hash(dest, character_slug)
 
     return {
@@ -280,13 +273,7 @@ async def refine_image(body: dict):
         )
 
         try:
-            payload = json.dumps({"prompt": workflow}).encode()
-            req = _ur.Request(
-                f"{COMFYUI_URL}/prompt", data=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            resp = _ur.urlopen(req)
-            prompt_id = json.loads(resp.read()).get("prompt_id", "")
+            prompt_id = await get_comfyui_client().submit(workflow)
             results.append({"prompt_id": prompt_id, "seed": seed})
             logger.info(f"IPAdapter refine queued: {character_slug} seed={seed} prompt_id={prompt_id}")
         except Exception as e:
@@ -304,26 +291,16 @@ async def refine_image(body: dict):
 async def clear_stuck_generations():
     """Clear stuck ComfyUI generation jobs."""
     try:
-        req = _ur.Request(f"{COMFYUI_URL}/queue")
-        resp = _ur.urlopen(req, timeout=10)
-        queue_data = json.loads(resp.read())
+        client = get_comfyui_client()
+        queue_data = await client.queue()
 
         running = queue_data.get("queue_running", [])
         pending = queue_data.get("queue_pending", [])
 
-        cancelled = 0
-        for job in pending:
-            try:
-                cancel_payload = json.dumps({"delete": [job[1]]}).encode()
-                cancel_req = _ur.Request(
-                    f"{COMFYUI_URL}/queue",
-                    data=cancel_payload,
-                    headers={"Content-Type": "application/json"},
-                )
-                _ur.urlopen(cancel_req, timeout=5)
-                cancelled += 1
-            except Exception:
-                pass
+        # One delete for the whole pending queue instead of a request per job
+        prompt_ids = [job[1] for job in pending if isinstance(job, (list, tuple)) and len(job) > 1]
+        await client.delete_queued(prompt_ids)
+        cancelled = len(prompt_ids)
 
         return {
             "message": f"Cleared {cancelled} pending jobs",
@@ -338,7 +315,7 @@ async def clear_stuck_generations():
 @ingest_router.get("/ingest/clips/{character_slug}")
 async def list_character_clips(character_slug: str, limit: int = 50):
     """List extracted video clips for a character from the character_clips table."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch(
             "SELECT id, character_slug, clip_path, source_video, timestamp_seconds, "
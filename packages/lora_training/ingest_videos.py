@@ -28,7 +28,7 @@ from .ingest_helpers import (
     ClipClassifyLocalRequest,
 )
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -44,7 +44,7 @@ async def _persist_clips_to_db(clips: list[dict], source_video: str | None = Non
     """
     if not clips:
         return 0
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         inserted = 0
         for clip in clips:
@@ -0,0 +1,120 @@
+"""Pending feed — in-process fan-out of approval-queue deltas to SSE clients.
+
+The approval UI loads the queue page by page (/approval/pending with a cursor)
+and then subscribes to /approval/pending/stream for changes instead of
+re-fetching the whole list. Two kinds of delta are published:
+
+    pending  a new image entered the queue (full entry, same shape as a page row)
+    status   an image's status changed (approved/rejected/...; drop it from the view)
+
+Every event gets an id "<epoch>-<seq>". A reconnecting client sends it back as
+Last-Event-ID and is replayed whatever it missed from a bounded backlog. If the
+id is from another process run, or older than the backlog, or the client fell
+so far behind that its queue overflowed, it gets a single `resync` event and
+should reload the first page.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Events kept for Last-Event-ID replay
+FEED_BACKLOG = 2000
+# Undelivered events per client before it is told to resync
+FEED_QUEUE_SIZE = 500
+# Seconds between keepalive comments on an idle stream
+FEED_KEEPALIVE = 15.0
+
+RESYNC = {"event": "resync", "data": {}}
+
+
+class PendingFeed:
+    """Sequence-numbered broadcast of pending-queue deltas with a replay backlog."""
+
+    def __init__(self, backlog: int = FEED_BACKLOG, queue_size: int = FEED_QUEUE_SIZE):
+        self.epoch = str(int(time.time()))
+        self.queue_size = queue_size
+        self._seq = 0
+        self._recent: deque[dict] = deque(maxlen=backlog)
+        self._subscribers: set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_id(self) -> str:
+        """Id of the newest event; a client resuming from it gets only later ones."""
+        return f"{self.epoch}-{self._seq}"
+
+    def publish(self, event: str, data: dict) -> dict:
+        """Append an event to the backlog and hand it to every subscriber."""
+        self._seq += 1
+        item = {"id": f"{self.epoch}-{self._seq}", "seq": self._seq, "event": event, "data": data}
+        self._recent.append(item)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Slow consumer: replace its backlog with one resync marker
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                logger.info("Pending feed: subscriber overflowed, sent resync")
+        return item
+
+    def subscribe(self, last_event_id: str | None = None) -> tuple[asyncio.Queue, list[dict]]:
+        """Register a client; returns its queue and the events it missed.
+
+        The missed list is [RESYNC] when last_event_id can't be replayed.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue, self._missed(last_event_id)
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _missed(self, last_event_id: str | None) -> list[dict]:
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return [RESYNC]
+        seq = int(seq)
+        if seq == self._seq:
+            return []
+        oldest = self._recent[0]["seq"] if self._recent else self._seq + 1
+        if seq + 1 < oldest:
+            return [RESYNC]
+        return [item for item in self._recent if item["seq"] > seq]
+
+
+def passes_filters(data: dict, project_name: str | None = None,
+                   character_slug: str | None = None, source: str | None = None) -> bool:
+    """Whether an event passes the same filters as the paginated feed."""
+    if character_slug and data.get("character_slug") != character_slug:
+        return False
+    if project_name and data.get("project_name") != project_name:
+        return False
+    if source and data.get("source") != source:
+        return False
+    return True
+
+
+def format_sse(item: dict) -> str:
+    """Serialize a feed item as one server-sent event."""
+    lines = []
+    if item.get("id"):
+        lines.append(f"id: {item['id']}")
+    lines.append(f"event: {item['event']}")
+    lines.append(f"data: {json.dumps(item['data'], separators=(',', ':'), default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+# Module-level singleton
+pending_feed = PendingFeed()
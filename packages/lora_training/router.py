@@ -5,15 +5,15 @@ import json
 import logging
 import os
 import shutil
-import urllib.request as _ur
 from datetime import datetime
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 
-from packages.core.config import BASE_PATH, _PROJECT_DIR, OLLAMA_URL, VISION_MODEL
+from packages.core.config import BASE_PATH, _PROJECT_DIR, VISION_MODEL
 from packages.core.db import get_char_project_map
+from packages.core.llm_gateway import PRIORITY_REVIEW, llm_gateway
 from packages.core.models import DatasetImageCreate, ReplenishRequest
 from .feedback import (
     record_rejection,
@@ -22,6 +22,7 @@ from .feedback import (
 from .ingest_router import ingest_router
 from .training_router import training_router
 from .router_approval import router as approval_router
+from .approval_index import REFRESH_MAX_AGE, get_index
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -43,34 +44,16 @@ async def get_dataset_info(character_name: str):
     if not images_path.exists():
         return {"character": character_name, "images": []}
 
-    approval_file = dataset_path / "approval_status.json"
-    approval_status = {}
-    if approval_file.exists():
-        with open(approval_file) as f:
-            approval_status = json.load(f)
-
+    rows, _ = get_index(BASE_PATH).query(slugs=[safe_name], with_total=False)
     images = []
-    for img in sorted(images_path.glob("*.png")):
-        status = approval_status.get(img.name, "pending")
-        caption_file = img.with_suffix(".txt")
-        prompt = ""
-        if caption_file.exists():
-            prompt = caption_file.read_text().strip()
-        meta_file = img.with_suffix(".meta.json")
-        checkpoint_model = None
-        if meta_file.exists():
-            try:
-                with open(meta_file) as mf:
-                    checkpoint_model = json.load(mf).get("checkpoint_model")
-            except Exception:
-                pass
+    for row in sorted(rows, key=lambda r: r["name"]):
         images.append({
-            "id": f"{safe_name}/{img.name}",
-            "name": img.name,
-            "status": status,
-            "prompt": prompt,
-            "created_at": datetime.fromtimestamp(img.stat().st_ctime).isoformat(),
-            "checkpoint_model": checkpoint_model,
+            "id": f"{safe_name}/{row['name']}",
+            "name": row["name"],
+            "status": row["status"],
+            "prompt": row["caption"] or "",
+            "created_at": datetime.fromtimestamp(row["ctime"]).isoformat(),
+            "checkpoint_model": (row["metadata"] or {}).get("checkpoint_model"),
         })
 
     return {"character": character_name, "images": images}
@@ -178,17 +161,11 @@ async def get_library():
         return {"images": [], "characters": []}
 
     char_map = await get_char_project_map()
+    index = get_index(BASE_PATH)
     images = []
     char_counts: dict[str, dict] = {}
 
-    for char_dir in sorted(BASE_PATH.iterdir()):
-        if not char_dir.is_dir():
-            continue
-        images_path = char_dir / "images"
-        if not images_path.exists():
-            continue
-
-        slug = char_dir.name
+    for slug in index.refresh_all(max_age=REFRESH_MAX_AGE):
         if slug == "_unclassified":
             db_info = {"name": "Unclassified"}
         else:
@@ -196,19 +173,8 @@ async def get_library():
             if not db_info:
                 continue
 
-        approval_file = char_dir / "approval_status.json"
-        if not approval_file.exists():
-            continue
-        with open(approval_file) as f:
-            approval_status = json.load(f)
-
-        approved_names = {name for name, st in approval_status.items() if st == "approved"}
-        if not approved_names:
-            continue
-
-        # Filter out stale entries (files moved/deleted but still in approval_status)
-        existing_files = set(f.name for f in images_path.iterdir() if f.suffix == ".png")
-        approved_names &= existing_files
+        # on_disk filters stale entries (files moved/deleted but still in approval_status)
+        approved_names = index.names_with_status(slug, "approved", on_disk=True)
         if not approved_names:
             continue
 
@@ -220,7 +186,7 @@ async def get_library():
             "project_name": project_name, "checkpoint_model": checkpoint_model,
         }
 
-        for name in sorted(approved_names):
+        for name in approved_names:
             images.append({
                 "slug": slug,
                 "characterName": char_name,
@@ -244,7 +210,7 @@ async def get_library():
 
 @router.get("/dataset-stats")
 async def dataset_stats(project_name: str = None):
-    """Aggregate real dataset stats from filesystem approval_status.json files.
+    """Aggregate dataset stats from the approval index.
 
     Returns per-character approved/pending/rejected counts and totals.
     Optionally filtered by project_name.
@@ -256,14 +222,8 @@ async def dataset_stats(project_name: str = None):
     characters = []
     totals = {"approved": 0, "pending": 0, "rejected": 0, "total": 0}
 
-    for char_dir in sorted(BASE_PATH.iterdir()):
-        if not char_dir.is_dir():
-            continue
-        images_path = char_dir / "images"
-        if not images_path.exists():
-            continue
-
-        slug = char_dir.name
+    slug_stats = get_index(BASE_PATH).slug_stats()
+    for slug in sorted(slug_stats):
         if slug == "_unclassified":
             db_info = {"name": "Unclassified", "project_name": ""}
             # For project filter, skip _unclassified unless no filter
@@ -276,39 +236,13 @@ async def dataset_stats(project_name: str = None):
             if project_name and db_info.get("project_name") != project_name:
                 continue
 
-        approval_file = char_dir / "approval_status.json"
-        approval_status = {}
-        if approval_file.exists():
-            try:
-                with open(approval_file) as f:
-                    approval_status = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
-
-        image_files = list(images_path.glob("*.png"))
-        approved = 0
-        pending = 0
-        rejected = 0
-        model_counts: dict[str, int] = {}  # checkpoint → count of approved images
-        for img in image_files:
-            status = approval_status.get(img.name, "pending")
-            if status == "approved":
-                approved += 1
-                # Track which checkpoint model generated each approved image
-                meta_file = img.with_suffix(".meta.json")
-                if meta_file.exists():
-                    try:
-                        with open(meta_file) as mf:
-                            ck = json.load(mf).get("checkpoint_model")
-                            model_counts[ck or "unknown"] = model_counts.get(ck or "unknown", 0) + 1
-                    except Exception:
-                        model_counts["unknown"] = model_counts.get("unknown", 0) + 1
-                else:
-                    model_counts["no_meta"] = model_counts.get("no_meta", 0) + 1
-            elif status == "rejected":
-                rejected += 1
-            else:
-                pending += 1
+        counts = slug_stats[slug]["counts"]
+        # checkpoint → count of approved images
+        model_counts: dict[str, int] = dict(slug_stats[slug]["models"])
+        approved = counts.get("approved", 0)
+        rejected = counts.get("rejected", 0)
+        # flagged/hidden count as pending, as before
+        pending = sum(n for st, n in counts.items() if st not in ("approved", "rejected"))
 
         total = approved + pending + rejected
         if total == 0:
@@ -359,20 +293,15 @@ async def identify_character(character_slug: str, image_name: str):
         'Reply with JSON: {"description": "...", "suggested_name": "..."}'
     )
 
-    payload = json.dumps({
-        "model": VISION_MODEL,
-        "messages": [{"role": "user", "content": prompt, "images": [img_b64]}],
-        "stream": False,
-        "options": {"temperature": 0.3, "num_predict": 300},
-    }).encode()
-
     try:
-        req = _ur.Request(
-            f"{OLLAMA_URL}/api/chat", data=payload,
-            headers={"Content-Type": "application/json"},
-        )
-        resp = json.loads(_ur.urlopen(req, timeout=30).read())
-        raw = resp.get("message", {}).get("content", "").strip()
+        raw = (await llm_gateway.chat(
+            VISION_MODEL,
+            [{"role": "user", "content": prompt, "images": [img_b64]}],
+            caller="vision_identify",
+            priority=PRIORITY_REVIEW,
+            options={"temperature": 0.3, "num_predict": 300},
+            timeout=30,
+        )).strip()
     except Exception as e:
         logger.error(f"Vision identify failed for {character_slug}/{image_name}: {e}")
         raise HTTPException(status_code=502, detail=f"Vision model error: {e}")
@@ -1,17 +1,20 @@
 """Approval sub-router -- pending images, approve/reject, reassign, bulk operations."""
 
+import asyncio
 import json
 import logging
-import os
 import re
 import shutil
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from packages.core.config import BASE_PATH
-from packages.core.db import get_char_project_map, invalidate_char_cache, connect_direct
+from packages.core.db import get_char_project_map, invalidate_char_cache, connect_pooled
+from packages.core.events import event_bus, IMAGE_GENERATED, IMAGE_APPROVED, IMAGE_REJECTED
+from packages.core.response_cache import decode_cursor, encode_cursor
 from packages.core.models import (
     ApprovalRequest,
     ReassignRequest,
@@ -19,143 +22,189 @@ from packages.core.models import (
     BulkRejectRequest,
     BulkStatusRequest,
 )
+from packages.visual_pipeline.review_cache import review_cache
 from .feedback import (
     record_rejection,
     queue_regeneration,
     register_image_status,
     IMAGE_STATUSES,
 )
+from .approval_index import REFRESH_MAX_AGE, classify_source, get_index
+from .pending_feed import FEED_KEEPALIVE, RESYNC, format_sse, passes_filters, pending_feed
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _pending_entry(row: dict, char_map: dict) -> dict:
+    """One pending-queue entry from an approval index row."""
+    slug = row["slug"]
+    db_info = char_map.get(slug) or {"name": "Unclassified", "checkpoint_model": "", "default_style": ""}
+    entry = {
+        "id": f"{slug}/{row['name']}",
+        "character_name": db_info["name"],
+        "character_slug": slug,
+        "name": row["name"],
+        "project_name": row["project_name"] or "",
+        "checkpoint_model": row["checkpoint_model"] or db_info.get("checkpoint_model", ""),
+        "default_style": db_info.get("default_style", ""),
+        "status": "pending",
+        "source": row["source"],
+        "created_at": datetime.fromtimestamp(row["ctime"]).isoformat(),
+    }
+    if row["metadata"] is not None:
+        entry["metadata"] = row["metadata"]
+    if row["caption"] is not None:
+        entry["prompt"] = row["caption"]
+    return entry
+
+
+# --- Pending feed deltas (see pending_feed.py) ---
+
+def _publish_status(slug: str, image_name: str, status: str, project_name: str | None = None):
+    """Tell stream subscribers an image's status changed (it leaves the pending view)."""
+    if project_name is None:
+        row = get_index(BASE_PATH).image_row(slug, image_name)
+        project_name = (row or {}).get("project_name") or ""
+    pending_feed.publish("status", {
+        "id": f"{slug}/{image_name}",
+        "character_slug": slug,
+        "name": image_name,
+        "status": status,
+        "project_name": project_name,
+        "source": classify_source(image_name),
+    })
+
+
+async def _publish_pending(slug: str, image_name: str):
+    row = get_index(BASE_PATH).image_row(slug, image_name)
+    if row is None:
+        return
+    pending_feed.publish("pending", _pending_entry(row, await get_char_project_map()))
+
+
+async def _on_image_generated(data: dict):
+    await _publish_pending(data["character_slug"], data["image_name"])
+
+
+async def _on_image_reviewed(data: dict):
+    status = "approved" if data.get("_event") == IMAGE_APPROVED else "rejected"
+    _publish_status(data["character_slug"], data["image_name"], status, data.get("project_name"))
+
+
+event_bus.subscribe(IMAGE_GENERATED, _on_image_generated)
+event_bus.subscribe(IMAGE_APPROVED, _on_image_reviewed)
+event_bus.subscribe(IMAGE_REJECTED, _on_image_reviewed)
+
+
 # ===================================================================
 # Approval endpoints
 # ===================================================================
 
 @router.get("/approval/pending")
-async def get_pending_approvals():
-    """Get all pending images across all characters, with project info."""
-    pending = []
+async def get_pending_approvals(
+    project_name: str | None = None,
+    character_slug: str | None = None,
+    source: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+    after: str | None = None,
+):
+    """Get pending images across all characters, with project info.
+
+    Served from the approval index (newest first). Optional filters by
+    project/character/source; `limit`/`offset` page through the result, or
+    `limit` + `after` (the previous page's next_cursor) for keyset pages that
+    don't shift as images arrive. `stream_id` is the feed position to pass to
+    /approval/pending/stream as Last-Event-ID to receive only later changes.
+    """
+    cursor = decode_cursor(after) if after else None
+    if cursor is not None and len(cursor) != 3:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    stream_id = pending_feed.last_id
     if not BASE_PATH.exists():
-        return {"pending_images": pending}
+        return {"pending_images": [], "total": 0, "next_cursor": None, "stream_id": stream_id}
 
     char_map = await get_char_project_map()
+    index = get_index(BASE_PATH)
+    index.set_project_map({slug: info.get("project_name", "") for slug, info in char_map.items()})
+
+    # Only characters known to the DB (plus _unclassified) show up in the queue
+    known = [s for s in index.refresh_all(max_age=REFRESH_MAX_AGE) if s == "_unclassified" or s in char_map]
+    slugs = [character_slug] if character_slug else known
+    slugs = [s for s in slugs if s in known]
+    before = (float(cursor[0]), str(cursor[1]), str(cursor[2])) if cursor else None
+    rows, total = index.query(
+        status="pending", slugs=slugs, project_name=project_name, source=source,
+        before=before, limit=limit + 1 if limit else limit, offset=0 if before else offset,
+    )
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["ctime"], rows[-1]["slug"], rows[-1]["name"]])
 
-    for char_dir in sorted(BASE_PATH.iterdir()):
-        if not char_dir.is_dir():
-            continue
-        images_path = char_dir / "images"
-        if not images_path.exists():
-            continue
-
-        slug = char_dir.name
-        if slug == "_unclassified":
-            db_info = {
-                "name": "Unclassified",
-                "project_name": "",
-                "design_prompt": "",
-                "checkpoint_model": "",
-                "default_style": "",
-            }
-        else:
-            db_info = char_map.get(slug)
-            if not db_info:
-                continue
-
-        approval_file = char_dir / "approval_status.json"
-        approval_status = {}
-        if approval_file.exists():
-            with open(approval_file) as f:
-                approval_status = json.load(f)
-
-        # Build set of pending filenames first, then only stat those
-        pending_names = {name for name, st in approval_status.items() if st == "pending"}
-        # Also include files not in approval_status at all (default pending)
-        all_pngs = [img.name for img in images_path.glob("*.png")]
-        for name in all_pngs:
-            if name not in approval_status:
-                pending_names.add(name)
-
-        if not pending_names:
-            continue
-
-        # Single stat call batch via scandir (much faster than per-file stat)
-        file_ctimes = {}
-        with os.scandir(images_path) as entries:
-            for e in entries:
-                if e.name in pending_names and e.name.endswith(".png"):
-                    try:
-                        file_ctimes[e.name] = e.stat().st_ctime
-                    except OSError:
-                        file_ctimes[e.name] = 0
-
-        proj_name = db_info.get("project_name", "")
-        char_name = db_info["name"]
-        design_prompt = db_info.get("design_prompt", "")
-        checkpoint = db_info.get("checkpoint_model", "")
-        style = db_info.get("default_style", "")
-
-        for name, ctime in file_ctimes.items():
-            source = "generated"
-            if name.startswith("yt_unclassified"):
-                source = "unclassified"
-            elif name.startswith("yt_ref"):
-                source = "youtube"
-            elif name.startswith("upload_"):
-                source = "upload"
-            elif name.startswith("ref_"):
-                source = "reference"
-
-            # For unclassified images, read project_name from per-image metadata
-            img_proj_name = proj_name
-            entry = {
-                "id": f"{slug}/{name}",
-                "character_name": char_name,
-                "character_slug": slug,
-                "name": name,
-                "project_name": img_proj_name,
-                "checkpoint_model": checkpoint,
-                "default_style": style,
-                "status": "pending",
-                "source": source,
-                "created_at": datetime.fromtimestamp(ctime).isoformat(),
-                "_sort_ts": ctime,
-            }
-
-            # Read metadata (skip only old yt_ref YouTube frames that have no .meta.json)
-            img_path = images_path / name
-            meta_path = img_path.with_suffix(".meta.json")
-            if meta_path.exists():
-                try:
-                    with open(meta_path) as f:
-                        meta = json.load(f)
-                    entry["metadata"] = meta
-                    # Override checkpoint from per-image meta if present
-                    if meta.get("checkpoint_model"):
-                        entry["checkpoint_model"] = meta["checkpoint_model"]
-                    # For unclassified images, use per-image project_name
-                    if slug == "_unclassified" and meta.get("project_name"):
-                        entry["project_name"] = meta["project_name"]
-                except (json.JSONDecodeError, IOError):
-                    pass
-            caption_path = img_path.with_suffix(".txt")
-            if caption_path.exists():
-                try:
-                    entry["prompt"] = caption_path.read_text().strip()
-                except IOError:
-                    pass
-
-            pending.append(entry)
+    pending = [_pending_entry(row, char_map) for row in rows]
 
-    pending.sort(key=lambda x: x.pop("_sort_ts", 0), reverse=True)
     # Send design prompts once per character (not per image)
     character_designs = {
         slug: info.get("design_prompt", "")
         for slug, info in char_map.items()
     }
-    return {"pending_images": pending, "character_designs": character_designs}
+    return {
+        "pending_images": pending, "total": total, "character_designs": character_designs,
+        "next_cursor": next_cursor, "stream_id": stream_id,
+    }
+
+
+@router.get("/approval/pending/stream")
+async def stream_pending_approvals(
+    request: Request,
+    project_name: str | None = None,
+    character_slug: str | None = None,
+    source: str | None = None,
+    last_event_id: str | None = None,
+):
+    """Server-sent events with changes to the pending queue.
+
+    `pending` events carry a new entry (same shape as /approval/pending rows),
+    `status` events mean the image left the queue. Resume with the
+    Last-Event-ID header (or `last_event_id`, e.g. a page's stream_id); a
+    `resync` event means the gap can't be replayed and page 1 should be reloaded.
+    """
+    resume = request.headers.get("last-event-id") or last_event_id
+
+    async def events():
+        queue, missed = pending_feed.subscribe(resume)
+        try:
+            yield "retry: 3000\n\n"
+            for item in missed:
+                if item is RESYNC or passes_filters(item["data"], project_name, character_slug, source):
+                    yield format_sse(item)
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=FEED_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if item is RESYNC or passes_filters(item["data"], project_name, character_slug, source):
+                    yield format_sse(item)
+        finally:
+            pending_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/approval/index/rebuild")
+async def rebuild_approval_index():
+    """Force a full rescan of every character into the approval index."""
+    index = get_index(BASE_PATH)
+    slugs = await asyncio.to_thread(index.refresh_all, True)
+    return {"message": f"Approval index rebuilt for {len(slugs)} character(s)", "characters": len(slugs)}
+
 
 @router.post("/approval/approve")
 async def approve_image(approval: ApprovalRequest):
@@ -166,20 +215,13 @@ async def approve_image(approval: ApprovalRequest):
         safe_name = re.sub(r'[^a-z0-9_-]', '', approval.character_name.lower().replace(' ', '_'))
 
     dataset_path = BASE_PATH / safe_name
-    approval_file = dataset_path / "approval_status.json"
 
     if not dataset_path.exists():
         raise HTTPException(status_code=404, detail=f"Character dataset not found: {safe_name}")
 
-    approval_status = {}
-    if approval_file.exists():
-        with open(approval_file) as f:
-            approval_status = json.load(f)
-
-    approval_status[approval.image_name] = "approved" if approval.approved else "rejected"
-
-    with open(approval_file, "w") as f:
-        json.dump(approval_status, f, indent=2)
+    index = get_index(BASE_PATH)
+    index.set_status(safe_name, approval.image_name, "approved" if approval.approved else "rejected")
+    _publish_status(safe_name, approval.image_name, "approved" if approval.approved else "rejected")
 
     # If user provided an edited prompt, update BOTH the .txt sidecar AND the DB design_prompt (SSOT)
     prompt_updated = False
@@ -187,9 +229,10 @@ async def approve_image(approval: ApprovalRequest):
         image_path = dataset_path / "images" / approval.image_name
         caption_path = image_path.with_suffix(".txt")
         caption_path.write_text(approval.edited_prompt)
+        index.refresh_image(safe_name, approval.image_name)
 
         try:
-            conn = await connect_direct()
+            conn = await connect_pooled()
             row = await conn.fetchrow("""
                 SELECT c.id, c.name, c.design_prompt
                 FROM characters c
@@ -209,6 +252,7 @@ async def approve_image(approval: ApprovalRequest):
                     prompt_updated = True
                     logger.info(f"SSOT updated: {row['name']} design_prompt changed ({len(old_prompt)} -> {len(new_prompt)} chars)")
                     invalidate_char_cache()
+                    review_cache.invalidate(safe_name)
             await conn.close()
         except Exception as e:
             logger.warning(f"Failed to update DB design_prompt for {safe_name}: {e}")
@@ -284,22 +328,11 @@ async def reassign_image(req: ReassignRequest):
         except Exception as e:
             logger.warning(f"Failed to update meta.json for {new_name}: {e}")
 
-    source_approval_file = source_dir / "approval_status.json"
-    if source_approval_file.exists():
-        with open(source_approval_file) as f:
-            source_status = json.load(f)
-        source_status.pop(old_name, None)
-        with open(source_approval_file, "w") as f:
-            json.dump(source_status, f, indent=2)
-
-    target_approval_file = target_dir / "approval_status.json"
-    target_status = {}
-    if target_approval_file.exists():
-        with open(target_approval_file) as f:
-            target_status = json.load(f)
-    target_status[new_name] = "pending"
-    with open(target_approval_file, "w") as f:
-        json.dump(target_status, f, indent=2)
+    index = get_index(BASE_PATH)
+    index.remove(req.character_slug, old_name)
+    index.set_status(req.target_character_slug, new_name, "pending")
+    _publish_status(req.character_slug, old_name, "reassigned")
+    await _publish_pending(req.target_character_slug, new_name)
 
     logger.info(f"Reassigned {old_name} -> {new_name}: {req.character_slug} -> {req.target_character_slug}")
 
@@ -354,7 +387,7 @@ async def bulk_reject(req: BulkRejectRequest):
         raise HTTPException(status_code=400, detail="Provide character_slug or project_name")
 
     if req.project_name:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         rows = await conn.fetch(
             """SELECT REGEXP_REPLACE(LOWER(REPLACE(c.name, ' ', '_')), '[^a-z0-9_-]', '', 'g') AS slug
                FROM characters c JOIN projects p ON c.project_id = p.id
@@ -368,33 +401,27 @@ async def bulk_reject(req: BulkRejectRequest):
     else:
         slugs = [req.character_slug]
 
+    index = get_index(BASE_PATH)
     all_results = {}
     total_matched = 0
 
     for slug in slugs:
         dataset_path = BASE_PATH / slug
         images_dir = dataset_path / "images"
-        approval_file = dataset_path / "approval_status.json"
 
         if not images_dir.exists():
             continue
 
-        statuses = {}
-        if approval_file.exists():
-            with open(approval_file) as f:
-                statuses = json.load(f)
-
+        approved_rows, _ = index.query(status="approved", slugs=[slug], with_total=False)
         matches = []
-        for img_file in sorted(images_dir.glob("*.png")):
-            img_name = img_file.name
-            if statuses.get(img_name) != "approved":
-                continue
-
-            meta_file = images_dir / f"{img_file.stem}.meta.json"
-            meta = {}
-            if meta_file.exists():
-                with open(meta_file) as f:
-                    meta = json.load(f)
+        for row in sorted(approved_rows, key=lambda r: r["name"]):
+            img_name = row["name"]
+            # Decide on the sidecar as it is now, not on what the index last read
+            meta_path = images_dir / f"{Path(img_name).stem}.meta.json"
+            try:
+                meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+            except (json.JSONDecodeError, IOError):
+                meta = row["metadata"] or {}
 
             # Legacy compat: old meta files used "llava_review" key
             review = meta.get("vision_review") or meta.get("llava_review")
@@ -419,11 +446,7 @@ async def bulk_reject(req: BulkRejectRequest):
         total_matched += len(matches)
 
         if not req.dry_run:
-            for img_name in matches:
-                statuses[img_name] = "rejected"
-
-            with open(approval_file, "w") as f:
-                json.dump(statuses, f, indent=2)
+            index.set_statuses(slug, {img_name: "rejected" for img_name in matches})
 
             feedback_file = dataset_path / "feedback.json"
             feedback = {"rejections": [], "rejection_count": 0, "negative_additions": [], "categories": []}
@@ -492,6 +515,10 @@ async def bulk_set_status(req: BulkStatusRequest):
     for item in req.images:
         try:
             register_image_status(item.character_slug, item.image_name, req.status)
+            if req.status == "pending":
+                await _publish_pending(item.character_slug, item.image_name)
+            else:
+                _publish_status(item.character_slug, item.image_name, req.status)
             results.append({"character_slug": item.character_slug, "image_name": item.image_name})
         except Exception as e:
             errors.append({"character_slug": item.character_slug, "image_name": item.image_name, "error": str(e)})
@@ -19,6 +19,7 @@ from packages.core.db import get_char_project_map, get_pool
 from packages.core.generation import POSE_VARIATIONS
 from packages.core.gpu_router import ensure_gpu_ready
 from packages.core.models import TrainingRequest
+from .approval_index import get_index
 from .feedback import (
     load_training_jobs,
     save_training_jobs,
@@ -54,16 +55,11 @@ async def start_training(training: TrainingRequest):
     async with _training_lock:
         safe_name = re.sub(r'[^a-z0-9_-]', '', training.character_name.lower().replace(' ', '_'))
         dataset_path = BASE_PATH / safe_name
-        approval_file = dataset_path / "approval_status.json"
 
         if not dataset_path.exists():
             raise HTTPException(status_code=404, detail="Character not found")
 
-        approved_count = 0
-        if approval_file.exists():
-            with open(approval_file) as f:
-                statuses = json.load(f)
-                approved_count = sum(1 for s in statuses.values() if s == "approved")
+        approved_count = get_index(BASE_PATH).count(safe_name, "approved")
 
         MIN_TRAINING_IMAGES = 100
         if approved_count < MIN_TRAINING_IMAGES:
@@ -143,6 +139,9 @@ async def start_training(training: TrainingRequest):
             "learning_rate": training.learning_rate,
             "resolution": resolution,
             "lora_rank": lora_rank,
+            "batch_size": training.batch_size or 1,
+            "bucket": bool(training.bucket),
+            "cache_latents": bool(training.cache_latents),
             "model_type": model_type,
             "prediction_type": prediction_type,
             "checkpoint": checkpoint_name,
@@ -171,7 +170,12 @@ async def start_training(training: TrainingRequest):
             f"--lora-rank={lora_rank}",
             f"--model-type={model_type}",
             f"--prediction-type={prediction_type}",
+            f"--batch-size={training.batch_size or 1}",
         ]
+        if training.bucket:
+            cmd.append("--bucket")
+        if training.cache_latents:
+            cmd.append("--cache-latents")
 
         log_fh = open(log_file, "w")
         proc = subprocess.Popen(
@@ -452,17 +456,8 @@ async def gap_analysis(project_name: str | None = None):
     for slug, info in sorted(char_map.items()):
         dataset_path = BASE_PATH / slug
         images_dir = dataset_path / "images"
-        approval_file = dataset_path / "approval_status.json"
 
-        # Load approval statuses
-        approval_status = {}
-        if approval_file.exists():
-            try:
-                approval_status = json.loads(approval_file.read_text())
-            except (json.JSONDecodeError, IOError):
-                pass
-
-        approved_images = [name for name, st in approval_status.items() if st == "approved"]
+        approved_images = get_index(BASE_PATH).names_with_status(slug, "approved")
         approved_count = len(approved_images)
         total_approved += approved_count
 
@@ -12,8 +12,9 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from packages.core.config import BASE_PATH, COMFYUI_URL, COMFYUI_INPUT_DIR, normalize_sampler
+from packages.core.config import BASE_PATH, COMFYUI_INPUT_DIR, normalize_sampler
 from packages.core.comfyui import build_ipadapter_workflow
+from packages.core.comfyui_client import get_comfyui_client
 from packages.core.db import get_char_project_map, get_pool
 
 logger = logging.getLogger(__name__)
@@ -35,8 +36,6 @@ class VariantRequest(BaseModel):
 @variant_router.post("/variant/{character_slug}/{image_name}")
 async def generate_variant(character_slug: str, image_name: str, body: VariantRequest = VariantRequest()):
     """Generate faithful variants of an approved image using IP-Adapter + original params."""
-    import urllib.request as _ur
-
     image_dir = BASE_PATH / character_slug / "images"
     image_path = image_dir / image_name
     if not image_path.exists():
@@ -97,13 +96,7 @@ async def generate_variant(character_slug: str, image_name: str, body: VariantRe
         )
 
         try:
-            payload = json.dumps({"prompt": workflow}).encode()
-            req = _ur.Request(
-                f"{COMFYUI_URL}/prompt", data=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            resp = _ur.urlopen(req)
-            prompt_id = json.loads(resp.read()).get("prompt_id", "")
+            prompt_id = await get_comfyui_client().submit(workflow)
             results.append({"prompt_id": prompt_id, "seed": variant_seed})
             logger.info(f"Variant queued: {character_slug}/{image_name} seed={variant_seed} prompt_id={prompt_id}")
         except Exception as e:
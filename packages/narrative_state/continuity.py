@@ -7,7 +7,7 @@ import logging
 from pathlib import Path
 from typing import Any
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 
 logger = logging.getLogger(__name__)
 
@@ -2,14 +2,21 @@
 
 import json
 import logging
+import uuid
 from typing import Any
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
 from .decay import apply_all_decay
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_URL = "http://localhost:11434"
+# Columns written by propagation (everything set_state() takes from the state dict)
+_STATE_COLUMNS = (
+    "scene_id, character_slug, clothing, hair_state, injuries, accessories, body_state, "
+    "emotional_state, energy_level, relationship_context, location_in_scene, carrying"
+)
+
 OLLAMA_MODEL = "gemma3:12b"
 OLLAMA_TIMEOUT = 120
 
@@ -19,7 +26,7 @@ class NarrativeStateEngine:
 
     async def get_state(self, scene_id: str, character_slug: str) -> dict | None:
         """Fetch a single character state for a scene."""
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
             row = await conn.fetchrow(
                 "SELECT * FROM character_scene_state "
@@ -32,7 +39,7 @@ class NarrativeStateEngine:
 
     async def get_scene_states(self, scene_id: str) -> list[dict]:
         """Fetch all character states for a scene."""
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
             rows = await conn.fetch(
                 "SELECT * FROM character_scene_state WHERE scene_id = $1 "
@@ -48,7 +55,7 @@ class NarrativeStateEngine:
         state: dict, source: str = "auto",
     ) -> dict:
         """UPSERT a character state for a scene. Increments version on update."""
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
             row = await conn.fetchrow("""
                 INSERT INTO character_scene_state
@@ -92,7 +99,7 @@ class NarrativeStateEngine:
 
     async def delete_state(self, scene_id: str, character_slug: str) -> bool:
         """Remove a manual override, allowing re-propagation."""
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
             result = await conn.execute(
                 "DELETE FROM character_scene_state "
@@ -107,7 +114,7 @@ class NarrativeStateEngine:
         self, scene_id: str, project_id: int,
     ) -> list[dict]:
         """Use Ollama to parse scene description + characters into initial states."""
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
             scene = await conn.fetchrow(
                 "SELECT description, location, mood, weather, time_of_day "
@@ -173,18 +180,13 @@ class NarrativeStateEngine:
 
         Respects manual overrides (state_source='manual') — never overwrites them.
         Applies decay rules between scenes.
+
+        Set-based: downstream states are loaded in one query, the decay chain is
+        computed in memory and the results are written with one COPY + upsert
+        inside a single transaction.
         """
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
-            # Get source scene states
-            source_states = await conn.fetch(
-                "SELECT * FROM character_scene_state WHERE scene_id = $1",
-                from_scene_id,
-            )
-            if not source_states:
-                return []
-
-            # Get scene order for this project
             source_scene = await conn.fetchrow(
                 "SELECT scene_number, project_id FROM scenes WHERE id = $1",
                 from_scene_id,
@@ -204,57 +206,89 @@ class NarrativeStateEngine:
                 "ORDER BY scene_number",
                 pid, source_num,
             )
-            if not downstream:
-                return []
-
-            propagated = []
-            # Propagate each character separately
-            for src_state in source_states:
-                slug = src_state["character_slug"]
-                current_state = self._row_to_dict(src_state)
 
-                for ds_scene in downstream:
-                    ds_id = ds_scene["id"]
+            # Source + every downstream state in one round-trip
+            rows = await conn.fetch("""
+                SELECT css.*
+                FROM character_scene_state css
+                JOIN scenes s ON s.id = css.scene_id
+                WHERE css.scene_id = $1
+                   OR (s.project_id = $2 AND s.scene_number > $3)
+            """, from_scene_id, pid, source_num)
 
-                    # Check if target has a manual override
-                    existing = await conn.fetchrow(
-                        "SELECT state_source FROM character_scene_state "
-                        "WHERE scene_id = $1 AND character_slug = $2",
-                        ds_id, slug,
-                    )
-                    if existing and existing["state_source"] == "manual":
-                        # Don't overwrite manual overrides, but use it as base
-                        # for further downstream propagation
-                        manual_row = await conn.fetchrow(
-                            "SELECT * FROM character_scene_state "
-                            "WHERE scene_id = $1 AND character_slug = $2",
-                            ds_id, slug,
-                        )
-                        if manual_row:
-                            current_state = self._row_to_dict(manual_row)
-                        continue
-
-                    # Apply decay
-                    decayed = apply_all_decay(current_state)
-
-                    # Save propagated state
-                    saved = await self.set_state(
-                        str(ds_id), slug, decayed, source="propagated"
-                    )
-                    propagated.append(saved)
+            source_states = [
+                self._row_to_dict(r) for r in rows if str(r["scene_id"]) == str(from_scene_id)
+            ]
+            if not source_states or not downstream:
+                return []
+            existing = {
+                (str(r["scene_id"]), r["character_slug"]): r
+                for r in rows if str(r["scene_id"]) != str(from_scene_id)
+            }
+
+            planned = plan_propagation(
+                source_states,
+                [str(d["id"]) for d in downstream],
+                existing,
+                self._row_to_dict,
+            )
+            if not planned:
+                return []
 
-                    # Use the decayed state as base for next scene
-                    current_state = decayed
+            async with conn.transaction():
+                saved = await self._upsert_states(conn, planned, source="propagated")
 
-            return propagated
+            # Same order as the in-memory plan (per character, scene order)
+            order = {(scene_id, slug): i for i, (scene_id, slug, _) in enumerate(planned)}
+            saved.sort(key=lambda s: order.get((s["scene_id"], s["character_slug"]), 0))
+            return saved
         finally:
             await conn.close()
 
+    async def _upsert_states(
+        self, conn, planned: list[tuple[str, str, dict]], source: str,
+    ) -> list[dict]:
+        """COPY planned states into a temp table and upsert them in one statement.
+
+        Same merge rules as set_state(); rows that became manual overrides in
+        the meantime are left untouched.
+        """
+        await conn.execute(f"""
+            CREATE TEMP TABLE _css_propagate ON COMMIT DROP AS
+            SELECT {_STATE_COLUMNS} FROM character_scene_state WITH NO DATA
+        """)
+        await conn.copy_records_to_table(
+            "_css_propagate",
+            columns=[c.strip() for c in _STATE_COLUMNS.split(",")],
+            records=[_state_record(scene_id, slug, state) for scene_id, slug, state in planned],
+        )
+        rows = await conn.fetch(f"""
+            INSERT INTO character_scene_state ({_STATE_COLUMNS}, state_source, version)
+            SELECT {_STATE_COLUMNS}, $1, 1 FROM _css_propagate
+            ON CONFLICT (scene_id, character_slug) DO UPDATE SET
+                clothing = COALESCE(EXCLUDED.clothing, character_scene_state.clothing),
+                hair_state = COALESCE(EXCLUDED.hair_state, character_scene_state.hair_state),
+                injuries = COALESCE(EXCLUDED.injuries, character_scene_state.injuries),
+                accessories = COALESCE(EXCLUDED.accessories, character_scene_state.accessories),
+                body_state = COALESCE(EXCLUDED.body_state, character_scene_state.body_state),
+                emotional_state = COALESCE(EXCLUDED.emotional_state, character_scene_state.emotional_state),
+                energy_level = COALESCE(EXCLUDED.energy_level, character_scene_state.energy_level),
+                relationship_context = COALESCE(EXCLUDED.relationship_context, character_scene_state.relationship_context),
+                location_in_scene = COALESCE(EXCLUDED.location_in_scene, character_scene_state.location_in_scene),
+                carrying = COALESCE(EXCLUDED.carrying, character_scene_state.carrying),
+                state_source = EXCLUDED.state_source,
+                version = character_scene_state.version + 1,
+                updated_at = now()
+            WHERE character_scene_state.state_source <> 'manual'
+            RETURNING *
+        """, source)
+        return [self._row_to_dict(r) for r in rows]
+
     async def get_timeline(
         self, project_id: int, character_slug: str,
     ) -> list[dict]:
         """Get ordered state history for a character across all scenes in a project."""
-        conn = await connect_direct()
+        conn = await connect_pooled()
         try:
             rows = await conn.fetch("""
                 SELECT css.*, s.scene_number, s.title as scene_title
@@ -331,24 +365,16 @@ Output ONLY the JSON array, no other text. Example:
 
     async def _call_ollama(self, prompt: str) -> list[dict] | None:
         """Call Ollama and parse the JSON response."""
-        import urllib.request
         try:
-            payload = json.dumps({
-                "model": OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "format": "json",
-                "options": {"temperature": 0.3, "num_predict": 2048},
-            }).encode()
-
-            req = urllib.request.Request(
-                f"{OLLAMA_URL}/api/generate",
-                data=payload,
-                headers={"Content-Type": "application/json"},
+            response_text = await llm_gateway.generate(
+                OLLAMA_MODEL,
+                prompt,
+                caller="narrative_state",
+                priority=PRIORITY_BATCH,
+                format="json",
+                options={"temperature": 0.3, "num_predict": 2048},
+                timeout=OLLAMA_TIMEOUT,
             )
-            resp = urllib.request.urlopen(req, timeout=OLLAMA_TIMEOUT)
-            result = json.loads(resp.read())
-            response_text = result.get("response", "")
 
             # Try to parse as JSON array
             parsed = json.loads(response_text)
@@ -370,3 +396,53 @@ Output ONLY the JSON array, no other text. Example:
 
 # Module-level singleton
 narrative_engine = NarrativeStateEngine()
+
+
+def _state_record(scene_id: str, slug: str, state: dict) -> tuple:
+    """State dict -> COPY record in _STATE_COLUMNS order (same defaults as set_state)."""
+    return (
+        uuid.UUID(str(scene_id)), slug,
+        state.get("clothing"),
+        state.get("hair_state"),
+        json.dumps(state.get("injuries", [])),
+        state.get("accessories", []),
+        state.get("body_state", "clean"),
+        state.get("emotional_state", "calm"),
+        state.get("energy_level", "normal"),
+        json.dumps(state.get("relationship_context", {})),
+        state.get("location_in_scene"),
+        state.get("carrying", []),
+    )
+
+
+def plan_propagation(
+    source_states: list[dict],
+    downstream_scene_ids: list[str],
+    existing: dict[tuple[str, str], Any],
+    to_dict=dict,
+) -> list[tuple[str, str, dict]]:
+    """Compute the decay chain for every character across downstream scenes.
+
+    existing maps (scene_id, slug) -> stored row. Manual overrides are never
+    replaced but become the base for the scenes after them.
+
+    Returns [(scene_id, slug, decayed_state), ...] per character in scene order.
+    """
+    planned = []
+    for src_state in source_states:
+        slug = src_state["character_slug"]
+        current_state = src_state
+
+        for ds_id in downstream_scene_ids:
+            row = existing.get((ds_id, slug))
+            if row is not None and row["state_source"] == "manual":
+                # Don't overwrite manual overrides, but use it as base
+                # for further downstream propagation
+                current_state = to_dict(row)
+                continue
+
+            decayed = apply_all_decay(current_state)
+            planned.append((ds_id, slug, decayed))
+            # Use the decayed state as base for next scene
+            current_state = decayed
+    return planned
@@ -5,7 +5,7 @@ Registered at startup via register_nsm_handlers().
 
 import logging
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.events import (
     event_bus,
     SCENE_UPDATED, SHOT_UPDATED, EPISODE_UPDATED,
@@ -24,7 +24,7 @@ async def on_scene_updated(data: dict):
     if not scene_id:
         return
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow(
             "SELECT project_id, scene_number FROM scenes WHERE id = $1", scene_id
@@ -102,7 +102,7 @@ async def on_shot_updated(data: dict):
     if not (set(changed_fields) & content_fields):
         return
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot = await conn.fetchrow(
             "SELECT status, output_video_path FROM shots WHERE id = $1", shot_id
@@ -126,7 +126,7 @@ async def on_episode_updated(data: dict):
     if not episode_id:
         return
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scenes = await conn.fetch("""
             SELECT es.scene_id, s.generation_status
@@ -162,7 +162,7 @@ async def on_state_updated(data: dict):
     if not scene_id or source != "manual":
         return
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow(
             "SELECT project_id FROM scenes WHERE id = $1", scene_id
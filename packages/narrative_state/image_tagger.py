@@ -10,13 +10,17 @@ import logging
 from pathlib import Path
 
 from packages.core.config import BASE_PATH
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
+from packages.lora_training.approval_index import get_index
+from packages.visual_pipeline.review_cache import review_cache, review_key
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_URL = "http://localhost:11434"
 OLLAMA_MODEL = "gemma3:12b"
 OLLAMA_TIMEOUT = 90
+# Bump when _build_tag_prompt() changes (invalidates review_cache)
+TAG_PROMPT_VERSION = 1
 
 
 async def tag_image_visual_properties(
@@ -35,17 +39,23 @@ async def tag_image_visual_properties(
         return None
 
     # Read and encode image
-    image_data = base64.b64encode(image_path.read_bytes()).decode("utf-8")
+    image_bytes = image_path.read_bytes()
     image_name = image_path.name
 
-    prompt = _build_tag_prompt(character_slug, design_prompt)
-
-    tags = await _call_ollama_vision(prompt, image_data)
-    if not tags:
-        return None
+    cache_key = review_key(
+        "visual_tags", [image_bytes], TAG_PROMPT_VERSION, OLLAMA_MODEL,
+        character_slug=character_slug, design_prompt=design_prompt,
+    )
+    tags = review_cache.get(cache_key)
+    if tags is None:
+        prompt = _build_tag_prompt(character_slug, design_prompt)
+        tags = await _call_ollama_vision(prompt, base64.b64encode(image_bytes).decode("utf-8"))
+        if not tags:
+            return None
+        review_cache.put(cache_key, tags, slug=character_slug)
 
     # Persist to DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("""
             INSERT INTO image_visual_tags
@@ -95,24 +105,17 @@ async def batch_tag_character_images(
 
     Returns summary with counts.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
-        # Get approved images from approval_status.json
+        # Get approved images from the approval index
         images_dir = BASE_PATH / character_slug / "images"
-        approval_file = BASE_PATH / character_slug / "approval_status.json"
+        approved_images = get_index(BASE_PATH).names_with_status(
+            character_slug, "approved", on_disk=True,
+        )
 
-        if not images_dir.exists() or not approval_file.exists():
+        if not approved_images:
             return {"character_slug": character_slug, "tagged": 0, "skipped": 0,
-                    "error": "No images or approval file found"}
-
-        with open(approval_file) as f:
-            statuses = json.load(f)
-
-        approved_images = [
-            name for name, st in statuses.items()
-            if (st == "approved" or (isinstance(st, dict) and st.get("status") == "approved"))
-            and (images_dir / name).exists()
-        ]
+                    "error": "No approved images found"}
 
         # Filter out already-tagged images
         already_tagged = set()
@@ -166,7 +169,7 @@ async def get_image_tags(
     character_slug: str, image_names: list[str] | None = None,
 ) -> dict[str, dict]:
     """Fetch visual tags for a character's images. Returns {image_name: tags_dict}."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         if image_names:
             rows = await conn.fetch(
@@ -226,25 +229,17 @@ Output ONLY the JSON object, no other text."""
 
 async def _call_ollama_vision(prompt: str, image_b64: str) -> dict | None:
     """Call Ollama vision model with an image."""
-    import urllib.request
     try:
-        payload = json.dumps({
-            "model": OLLAMA_MODEL,
-            "prompt": prompt,
-            "images": [image_b64],
-            "stream": False,
-            "format": "json",
-            "options": {"temperature": 0.2, "num_predict": 1024},
-        }).encode()
-
-        req = urllib.request.Request(
-            f"{OLLAMA_URL}/api/generate",
-            data=payload,
-            headers={"Content-Type": "application/json"},
+        response_text = await llm_gateway.generate(
+            OLLAMA_MODEL,
+            prompt,
+            caller="image_tagger",
+            priority=PRIORITY_BATCH,
+            images=[image_b64],
+            format="json",
+            options={"temperature": 0.2, "num_predict": 1024},
+            timeout=OLLAMA_TIMEOUT,
         )
-        resp = urllib.request.urlopen(req, timeout=OLLAMA_TIMEOUT)
-        result = json.loads(resp.read())
-        response_text = result.get("response", "")
 
         parsed = json.loads(response_text)
         if isinstance(parsed, dict):
@@ -5,7 +5,7 @@ import uuid
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.events import event_bus, STATE_INITIALIZED, STATE_UPDATED, STATE_PROPAGATED
 from .engine import narrative_engine
 from .models import CharacterStateUpdate
@@ -68,7 +68,7 @@ async def delete_character_state(scene_id: str, character_slug: str):
 async def initialize_states(scene_id: str):
     """AI-seed character states from scene description via Ollama."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow("SELECT project_id FROM scenes WHERE id = $1", sid)
         if not scene:
@@ -95,7 +95,7 @@ async def initialize_states(scene_id: str):
 async def propagate_states(scene_id: str):
     """Forward-propagate states to downstream scenes."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow("SELECT project_id FROM scenes WHERE id = $1", sid)
         if not scene:
@@ -132,7 +132,7 @@ async def get_timeline(project_id: int, character_slug: str):
 @router.get("/regeneration-queue/{project_id}")
 async def get_regeneration_queue(project_id: int):
     """View pending regeneration items (Phase 2)."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT rq.*, s.title as scene_title
@@ -166,7 +166,7 @@ async def get_regeneration_queue(project_id: int):
 @router.post("/regeneration-queue/process")
 async def process_regeneration_queue():
     """Process pending regeneration queue items (Phase 2)."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         pending = await conn.fetch(
             "SELECT * FROM regeneration_queue WHERE status = 'pending' "
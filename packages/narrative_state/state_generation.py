@@ -7,7 +7,7 @@ this module generates targeted images with state-augmented prompts.
 import logging
 from typing import Any
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.config import BASE_PATH
 
 logger = logging.getLogger(__name__)
@@ -129,7 +129,7 @@ async def generate_state_matching_image(
 
     Returns generation result dict or None on failure.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Get character's design prompt
         char_row = await conn.fetchrow(
@@ -212,7 +212,7 @@ async def fill_state_gaps(
 
     Returns summary of gaps found and actions taken.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Get scenes with states
         if scene_id:
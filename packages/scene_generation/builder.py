@@ -6,16 +6,23 @@ All original exports remain available from this module.
 """
 
 import asyncio
-import json
 import logging
 import os
 import shutil
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from packages.core.config import BASE_PATH, COMFYUI_URL, COMFYUI_OUTPUT_DIR, COMFYUI_INPUT_DIR
-from packages.core.db import connect_direct
+from packages.core.comfyui_client import backend_slot, get_comfyui_client, history_error, output_files
+from packages.core.config import (
+    BASE_PATH, COMFYUI_URLS, COMFYUI_OUTPUT_DIR, COMFYUI_INPUT_DIR, SCENE_SHOTS_PER_BACKEND,
+)
+from packages.lora_training.approval_index import get_index
+from packages.core.db import connect_pooled
 from packages.core.audit import log_decision
-from packages.core.events import event_bus, SHOT_GENERATED
+from packages.core.events import event_bus, SHOT_GENERATED, SCENE_READY
+from packages.core.job_queue import (
+    PRIORITY_HIGH, SCENE_GENERATION, active_job, enqueue, job_stage, reap_expired,
+)
 
 from .framepack import build_framepack_workflow, _submit_comfyui_workflow
 from .ltx_video import build_ltx_workflow, _submit_comfyui_workflow as _submit_ltx_workflow
@@ -365,7 +372,7 @@ async def assemble_approved_scene(scene_id) -> dict:
     Called by the review endpoint when the last shot gets approved.
     Returns status dict.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         counts = await conn.fetchrow("""
             SELECT COUNT(*) as total,
@@ -403,134 +410,120 @@ async def copy_to_comfyui_input(image_path: str) -> str:
     return src.name
 
 
-async def poll_comfyui_completion(prompt_id: str, timeout_seconds: int = 1800) -> dict:
-    """Poll ComfyUI /history until the prompt completes or times out."""
-    import urllib.request
-    import time as _time
-    start = _time.time()
-    while (_time.time() - start) < timeout_seconds:
+async def poll_comfyui_completion(
+    prompt_id: str, timeout_seconds: int = 1800, base_url: str | None = None,
+) -> dict:
+    """Wait for a ComfyUI prompt to complete (WebSocket event, /history fallback)."""
+    entry = await get_comfyui_client(base_url).wait_for_completion(prompt_id, timeout=timeout_seconds)
+    if entry is None:
+        return {"status": "timeout", "output_files": []}
+    err = history_error(entry)
+    if err:
+        return {"status": "error", "output_files": [], "error": err}
+    videos = [f["filename"] for f in output_files(entry)]
+    if not videos and (entry.get("status") or {}).get("status_str") == "success":
+        # Scan output dir for files matching prefix (fallback)
         try:
-            req = urllib.request.Request(f"{COMFYUI_URL}/history/{prompt_id}")
-            resp = urllib.request.urlopen(req, timeout=10)
-            history = json.loads(resp.read())
-            if prompt_id in history:
-                entry = history[prompt_id]
-                # Check execution status
-                status_info = entry.get("status", {})
-                status_str = status_info.get("status_str", "unknown")
-                if status_str == "error":
-                    # Extract error details from messages
-                    msgs = status_info.get("messages", [])
-                    err_detail = ""
-                    for msg in msgs:
-                        if isinstance(msg, list) and len(msg) >= 2 and "error" in str(msg[0]).lower():
-                            err_detail = str(msg[1])[:200]
-                    return {"status": "error", "output_files": [], "error": err_detail or "ComfyUI execution error"}
-                outputs = entry.get("outputs", {})
-                videos = []
-                for node_output in outputs.values():
-                    for key in ("videos", "gifs", "images"):
-                        for item in node_output.get(key, []):
-                            fn = item.get("filename")
-                            if fn:
-                                videos.append(fn)
-                    # Also check 'video' (singular) used by some Wan nodes
-                    if "video" in node_output:
-                        v = node_output["video"]
-                        if isinstance(v, dict) and v.get("filename"):
-                            videos.append(v["filename"])
-                        elif isinstance(v, list):
-                            for item in v:
-                                fn = item.get("filename") if isinstance(item, dict) else None
-                                if fn:
-                                    videos.append(fn)
-                if not videos and status_str == "success":
-                    # Scan output dir for files matching prefix (fallback)
-                    try:
-                        import glob as _glob
-                        prompt_files = _glob.glob(str(COMFYUI_OUTPUT_DIR / f"*{prompt_id[:8]}*"))
-                        videos = [Path(f).name for f in prompt_files if f.endswith((".mp4", ".webm"))]
-                    except Exception:
-                        pass
-                return {"status": "completed", "output_files": videos}
+            import glob as _glob
+            prompt_files = _glob.glob(str(COMFYUI_OUTPUT_DIR / f"*{prompt_id[:8]}*"))
+            videos = [Path(f).name for f in prompt_files if f.endswith((".mp4", ".webm"))]
         except Exception:
             pass
-        await asyncio.sleep(5)
-    return {"status": "timeout", "output_files": []}
+    return {"status": "completed", "output_files": videos}
 
 
 async def recover_interrupted_generations():
-    """On startup, find shots stuck in 'generating' and re-queue their scenes.
+    """On startup, re-queue scenes whose shots were left 'generating' without a job.
 
-    Orderly: waits for ComfyUI, resets stuck shots to pending,
-    then re-triggers scene generation one at a time via existing lock.
+    Scenes that already have a queued/running scene_generation job are left to
+    the queue — a job whose worker died is re-queued by reap_expired() once its
+    lease lapses, so live work in other processes is never reset. The rest get
+    their stuck shots reset to pending and a fresh job; workers retry with
+    backoff, so there's no need to wait for ComfyUI here.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
-        # 1. Find all stuck shots (status = 'generating')
+        await reap_expired(conn)
         stuck = await conn.fetch("""
-            SELECT sh.id, sh.scene_id, s.title, s.project_id
+            SELECT sh.scene_id, s.title, COUNT(*) AS n
             FROM shots sh
             JOIN scenes s ON sh.scene_id = s.id
             WHERE sh.status = 'generating'
+            GROUP BY sh.scene_id, s.title
         """)
         if not stuck:
             logger.info("Recovery: no stuck shots found")
             return
 
-        logger.warning(f"Recovery: found {len(stuck)} stuck shot(s) in 'generating' state")
+        requeued = 0
+        for row in stuck:
+            sid = row["scene_id"]
+            if await active_job(conn, SCENE_GENERATION, str(sid)):
+                logger.info(f"Recovery: scene '{row['title']}' ({sid}) already has a job, leaving it")
+                continue
+            async with conn.transaction():
+                await conn.execute("""
+                    UPDATE shots SET status = 'pending', error_message = 'reset by startup recovery'
+                    WHERE scene_id = $1 AND status = 'generating'
+                """, sid)
+                await conn.execute("""
+                    UPDATE scenes SET generation_status = 'pending',
+                           current_generating_shot_id = NULL
+                    WHERE id = $1 AND generation_status = 'generating'
+                """, sid)
+                job_id = await enqueue(
+                    conn, SCENE_GENERATION, {"scene_id": str(sid)},
+                    dedupe_key=str(sid), priority=PRIORITY_HIGH,
+                )
+            if job_id:
+                requeued += 1
+                logger.info(f"Recovery: reset {row['n']} shot(s), re-queued scene '{row['title']}' ({sid}) as job {job_id}")
+
+        logger.info(f"Recovery: re-queued {requeued} scene(s) for generation")
+    finally:
+        await conn.close()
 
-        # 2. Collect unique scene IDs (preserve order)
-        scene_ids = list(dict.fromkeys(row["scene_id"] for row in stuck))
 
-        # 3. Reset stuck shots to pending
-        reset_count = await conn.execute("""
-            UPDATE shots SET status = 'pending', error_message = 'reset by startup recovery'
-            WHERE status = 'generating'
-        """)
-        logger.info(f"Recovery: reset {reset_count} shot(s) to pending")
+async def scene_generation_active(conn, scene_id: str) -> bool:
+    """True if the scene is generating in this process or has a queued/running job."""
+    task = _scene_generation_tasks.get(scene_id)
+    if task is not None and not task.done():
+        return True
+    return await active_job(conn, SCENE_GENERATION, scene_id) is not None
 
-        # 4. Reset their scenes' generation_status and current_generating_shot_id
-        for sid in scene_ids:
-            await conn.execute("""
-                UPDATE scenes SET generation_status = 'pending',
-                       current_generating_shot_id = NULL
-                WHERE id = $1 AND generation_status = 'generating'
-            """, sid)
-
-        # 5. Wait for ComfyUI to be reachable before re-queuing
-        import urllib.request
-        comfyui_ready = False
-        for attempt in range(30):  # up to 30 x 2s = 60s
-            try:
-                req = urllib.request.Request(f"{COMFYUI_URL}/system_stats")
-                urllib.request.urlopen(req, timeout=5)
-                comfyui_ready = True
-                break
-            except Exception:
-                await asyncio.sleep(2)
 
-        if not comfyui_ready:
-            logger.error("Recovery: ComfyUI not reachable after 60s, skipping re-queue")
-            return
+async def run_scene_generation_job(payload: dict):
+    """job_queue handler for SCENE_GENERATION jobs.
 
-        # 6. Re-queue each scene via existing generate_scene() (uses _scene_generation_lock)
-        for sid in scene_ids:
-            scene_title = next((r["title"] for r in stuck if r["scene_id"] == sid), "?")
-            logger.info(f"Recovery: re-queuing scene '{scene_title}' ({sid})")
-            task = asyncio.create_task(generate_scene(str(sid)))
-            _scene_generation_tasks[str(sid)] = task
+    generate_scene() records failures on the scene row rather than raising;
+    a 'failed' scene is raised here so the queue retries it with backoff.
+    notify_ready jobs (queued by the orchestrator) emit SCENE_READY afterwards.
+    """
+    scene_id = payload["scene_id"]
+    _scene_generation_tasks[scene_id] = asyncio.current_task()
+    try:
+        await generate_scene(scene_id, auto_approve=payload.get("auto_approve", False))
+    finally:
+        _scene_generation_tasks.pop(scene_id, None)
 
-        logger.info(f"Recovery: re-queued {len(scene_ids)} scene(s) for generation")
+    conn = await connect_pooled()
+    try:
+        status = await conn.fetchval("SELECT generation_status FROM scenes WHERE id = $1", scene_id)
     finally:
         await conn.close()
+    if status == "failed":
+        raise RuntimeError(f"Scene {scene_id} generation failed")
+    if payload.get("notify_ready"):
+        await event_bus.emit(SCENE_READY, {"project_id": payload.get("project_id"), "scene_id": scene_id})
 
 
 async def generate_scene(scene_id: str, auto_approve: bool = False):
-    """Background task: generate all shots sequentially with continuity chaining.
+    """Background task: generate all shots with continuity chaining.
 
-    Uses _scene_generation_lock to ensure only one scene generates at a time,
-    so scenes complete fully (all shots in order) before the next scene starts.
+    Shots run concurrently except where one chains its first frame from the
+    previous shot (see _shot_dependencies). Uses _scene_generation_lock to
+    ensure only one scene generates at a time, so scenes complete fully
+    before the next scene starts.
 
     Args:
         auto_approve: If True, shots are auto-approved after generation so the
@@ -644,7 +637,7 @@ async def ensure_source_images(conn, scene_id: str, shots: list) -> int:
         if not null_shots:
             return assigned_from_continuity
 
-    # Build approved image map from approval_status.json
+    # Build approved image map from the approval index
     all_slugs: set[str] = set()
     for shot in null_shots:
         chars = shot.get("characters_present")
@@ -656,28 +649,18 @@ async def ensure_source_images(conn, scene_id: str, shots: list) -> int:
         return assigned_from_continuity
 
     approved: dict[str, list[str]] = {}
+    index = get_index(BASE_PATH)
     for slug in all_slugs:
         dir_slug = resolve_slug(slug)
-        approval_file = BASE_PATH / dir_slug / "approval_status.json"
         images_dir = BASE_PATH / dir_slug / "images"
         if not images_dir.exists():
             logger.debug(f"No dataset dir for slug '{slug}' (resolved: '{dir_slug}')")
             continue
-        if approval_file.exists():
-            try:
-                with open(approval_file) as f:
-                    statuses = json.load(f)
-                imgs = [
-                    name for name, st in statuses.items()
-                    if (st == "approved" or (isinstance(st, dict) and st.get("status") == "approved"))
-                    and (images_dir / name).exists()
-                ]
-                if imgs:
-                    # Store under BOTH short and dir slug so lookups work either way
-                    approved[slug] = sorted(imgs)
-                    approved[dir_slug] = approved[slug]
-            except (json.JSONDecodeError, OSError) as e:
-                logger.warning(f"Failed to read approval_status.json for {dir_slug}: {e}")
+        imgs = index.names_with_status(dir_slug, "approved", on_disk=True)
+        if imgs:
+            # Store under BOTH short and dir slug so lookups work either way
+            approved[slug] = imgs
+            approved[dir_slug] = approved[slug]
 
     if not approved:
         # Mark all null shots as failed — no images available
@@ -851,6 +834,834 @@ async def _save_continuity_frame(
          scene_number, shot_number)
 
 
+@dataclass
+class _SceneContext:
+    """Scene-level settings shared by every shot task of one generation run."""
+    scene_id: str
+    project_id: int | None
+    scene_number: int | None
+    episode_number: int | None
+    project_slug: str
+    project_video_lora: str | None
+    genre_profile: dict
+    auto_approve: bool
+    nsm_shot_states: dict = field(default_factory=dict)
+
+
+def _lead_character(shot) -> str | None:
+    chars = shot.get("characters_present")
+    return chars[0] if chars and isinstance(chars, list) else None
+
+
+def _shot_dependencies(shots: list) -> dict[int, int]:
+    """Map shot index → index of the shot it must wait for.
+
+    A shot chains its first frame from the previous shot's last frame when both
+    share a lead character and the shot is image-conditioned (I2V). Text-only
+    Wan, multi-character (T2V / composite-sourced) and reference V2V shots —
+    and any character switch — have no intra-scene dependency.
+    """
+    deps = {}
+    for idx in range(1, len(shots)):
+        shot = shots[idx]
+        character = _lead_character(shot)
+        if not character or character != _lead_character(shots[idx - 1]):
+            continue
+        engine = shot.get("video_engine") or "framepack"
+        chars = shot.get("characters_present") or []
+        if engine in ("wan", "reference_v2v"):
+            continue
+        if len(chars) >= 2 and engine in ("wan22", "framepack", "framepack_f1"):
+            continue
+        deps[idx] = idx - 1
+    return deps
+
+
+def _shot_already_completed(shot) -> bool:
+    return bool(
+        shot["status"] in ("completed", "accepted_best")
+        and shot["output_video_path"]
+        and Path(shot["output_video_path"]).exists()
+    )
+
+
+async def _run_shot_dag(conn, scene: _SceneContext, shots: list, deps: dict[int, int]) -> list[dict | None]:
+    """Generate a scene's shots concurrently, respecting continuity dependencies.
+
+    At most SCENE_SHOTS_PER_BACKEND shots per ComfyUI backend are in flight, so
+    each backend's queue stays fed without flooding it. Returns one entry per
+    shot in shot order: {video_path, last_frame, character_slug} or None.
+    """
+    limiter = asyncio.Semaphore(max(1, SCENE_SHOTS_PER_BACKEND * len(COMFYUI_URLS)))
+    conn_lock = asyncio.Lock()  # the scene connection is shared by all shot tasks
+    completed_count = 0
+    tasks: list[asyncio.Task] = []
+
+    async def _run(idx: int):
+        nonlocal completed_count
+        shot = shots[idx]
+
+        # Skip already-completed shots (e.g., after a service restart)
+        if _shot_already_completed(shot):
+            logger.info(f"Shot {shot['id']}: already completed, skipping")
+            completed_count += 1
+            res = {
+                "video_path": shot["output_video_path"],
+                "last_frame": shot["last_frame_path"],
+                "character_slug": _lead_character(shot),
+            }
+            return res, res
+
+        # Continuity handed to this shot: the predecessor's output, or what the
+        # predecessor itself inherited if it failed
+        incoming = {"last_frame": None, "character_slug": None}
+        if idx in deps:
+            _, incoming = await tasks[deps[idx]]
+
+        try:
+            async with limiter, backend_slot() as comfyui_url:
+                res = await _generate_shot(
+                    scene, shot, incoming["last_frame"], incoming["character_slug"], comfyui_url,
+                )
+        except Exception as e:
+            logger.error(f"Shot {shot['id']} generation failed: {e}")
+            res = None
+
+        if res:
+            completed_count += 1
+            async with conn_lock:
+                await conn.execute(
+                    "UPDATE scenes SET completed_shots = $2 WHERE id = $1",
+                    scene.scene_id, completed_count,
+                )
+        return res, res or incoming
+
+    for idx in range(len(shots)):
+        tasks.append(asyncio.create_task(_run(idx)))
+    outcomes = await asyncio.gather(*tasks)
+    return [res for res, _ in outcomes]
+
+
+async def _generate_shot(
+    scene: _SceneContext,
+    shot,
+    prev_last_frame: str | None,
+    prev_character: str | None,
+    comfyui_url: str,
+) -> dict | None:
+    """Generate one shot end-to-end on the given ComfyUI backend.
+
+    prev_last_frame/prev_character are the continuity state from the shot this
+    one depends on (both None when it has no intra-scene dependency). Runs on
+    its own DB connection so shots can proceed concurrently.
+    Returns {video_path, last_frame, character_slug} or None on failure.
+    """
+    scene_id = scene.scene_id
+    project_id = scene.project_id
+    scene_number = scene.scene_number
+    episode_number = scene.episode_number
+    project_slug = scene.project_slug
+    project_video_lora = scene.project_video_lora
+    genre_profile = scene.genre_profile
+    auto_approve = scene.auto_approve
+    _nsm_shot_states = scene.nsm_shot_states
+    shot_id = shot["id"]
+
+    conn = await connect_pooled()
+    try:
+        await conn.execute(
+            "UPDATE shots SET status = 'generating' WHERE id = $1", shot_id
+        )
+        await conn.execute(
+            "UPDATE scenes SET current_generating_shot_id = $2 WHERE id = $1",
+            scene_id, shot_id,
+        )
+
+        # Single-pass generation — no QC vision review, all shots go to manual review
+        try:
+            from .video_qc import check_engine_blacklist
+            import time as _time_inner
+
+            shot_dict = dict(shot)
+            character_slug = None
+            chars = shot_dict.get("characters_present")
+            if chars and isinstance(chars, list) and len(chars) > 0:
+                character_slug = chars[0]
+
+            # Use project-level video_lora from DB (project-scoped, not global)
+            _project_wan_lora = project_video_lora
+
+            # Auto-select engine based on shot characteristics
+            from .engine_selector import select_engine
+            has_source = bool(shot_dict.get("source_image_path"))
+            has_source_video = bool(shot_dict.get("source_video_path"))
+            shot_type = shot_dict.get("shot_type") or "medium"
+            char_list = chars if isinstance(chars, list) else []
+            engine_sel = select_engine(
+                shot_type=shot_type,
+                characters_present=char_list,
+                has_source_image=has_source,
+                has_source_video=has_source_video,
+                project_wan_lora=_project_wan_lora,
+            )
+            shot_engine = engine_sel.engine
+            # Persist engine selection to DB
+            await conn.execute(
+                "UPDATE shots SET video_engine = $2 WHERE id = $1",
+                shot_id, shot_engine,
+            )
+            logger.info(f"Shot {shot_id}: engine={shot_engine} reason='{engine_sel.reason}'")
+
+            # Engine blacklist check
+            if character_slug:
+                project_id = None
+                try:
+                    scene_row = await conn.fetchrow("SELECT project_id FROM scenes WHERE id = $1", scene_id)
+                    if scene_row:
+                        project_id = scene_row["project_id"]
+                except Exception:
+                    pass
+                bl = await check_engine_blacklist(conn, character_slug, project_id, shot_engine)
+                if bl:
+                    logger.warning(f"Shot {shot_id}: engine '{shot_engine}' blacklisted for '{character_slug}'")
+                    await conn.execute(
+                        "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
+                        shot_id, f"Engine '{shot_engine}' blacklisted: {bl.get('reason', '')}",
+                    )
+                    return None
+
+            # Build identity-anchored prompt
+            motion_prompt = shot_dict["motion_prompt"] or shot_dict.get("generation_prompt") or ""
+
+            # Helper: look up character by short or full slug
+            async def _find_character(slug):
+                return await conn.fetchrow(
+                    "SELECT name, design_prompt FROM characters "
+                    "WHERE project_id = $2 AND ("
+                    "  REGEXP_REPLACE(LOWER(REPLACE(name, ' ', '_')), '[^a-z0-9_-]', '', 'g') = $1 "
+                    "  OR REGEXP_REPLACE(LOWER(REPLACE(name, ' ', '_')), '[^a-z0-9_-]', '', 'g') LIKE $1 || '_%'"
+                    ")", slug, project_id,
+                )
+
+            # Fetch scene context for richer prompts
+            scene_desc = ""
+            scene_location = ""
+            scene_mood = ""
+            scene_time = ""
+            try:
+                _scene_ctx = await conn.fetchrow(
+                    "SELECT description, location, time_of_day, mood FROM scenes WHERE id = $1",
+                    scene_id,
+                )
+                if _scene_ctx:
+                    scene_desc = _scene_ctx["description"] or ""
+                    scene_location = _scene_ctx["location"] or ""
+                    scene_mood = _scene_ctx["mood"] or ""
+                    scene_time = _scene_ctx["time_of_day"] or ""
+            except Exception:
+                pass
+
+            # Fetch project style for visual anchoring
+            style_anchor = ""
+            _project_width = None
+            _project_height = None
+            try:
+                _style_row = await conn.fetchrow(
+                    "SELECT gs.checkpoint_model, gs.prompt_format, gs.width, gs.height FROM projects p "
+                    "JOIN generation_styles gs ON p.default_style = gs.style_name "
+                    "WHERE p.id = $1", project_id,
+                )
+                if _style_row:
+                    ckpt = (_style_row["checkpoint_model"] or "").lower()
+                    if "realistic" in ckpt or "cyber" in ckpt or "basil" in ckpt or "lazymix" in ckpt:
+                        style_anchor = "photorealistic, live action film, cinematic lighting"
+                    elif "cartoon" in ckpt or "pixar" in ckpt:
+                        style_anchor = "3D animated, Pixar style, cinematic lighting"
+                    elif "counterfeit" in ckpt or "noob" in ckpt:
+                        style_anchor = "anime style, detailed animation, cinematic"
+                    # Store project resolution for Wan T2V aspect ratio
+                    _project_width = _style_row["width"]
+                    _project_height = _style_row["height"]
+            except Exception:
+                pass
+
+            current_prompt = motion_prompt
+            if character_slug and shot_engine in ("framepack", "framepack_f1"):
+                try:
+                    char_row = await _find_character(character_slug)
+                    if char_row and char_row["design_prompt"]:
+                        appearance = _condense_for_video(char_row["design_prompt"], genre_profile, shot_engine)
+                        # Build FramePack prompt with same structure as Wan:
+                        # style anchor → scene context → character → motion
+                        fp_parts = []
+                        if style_anchor:
+                            fp_parts.append(style_anchor)
+                        if scene_location:
+                            setting = scene_location
+                            if scene_time:
+                                setting += f", {scene_time}"
+                            fp_parts.append(setting)
+                        if scene_desc:
+                            fp_parts.append(scene_desc)
+                        fp_parts.append(appearance)
+                        if motion_prompt and motion_prompt.lower() != "static":
+                            fp_parts.append(motion_prompt)
+                        fp_parts.append("consistent character appearance, maintain all physical features")
+                        if scene_mood:
+                            fp_parts.append(f"{scene_mood} mood")
+                        current_prompt = ", ".join(fp_parts)
+                        logger.info(f"Shot {shot_id}: FramePack prompt ({len(current_prompt)} chars): {current_prompt[:120]}...")
+                except Exception as e:
+                    logger.warning(f"Shot {shot_id}: design_prompt lookup failed: {e}")
+            elif shot_engine == "wan22" and chars:
+                # Wan 2.2 5B: richer prompt capacity than 1.3B.
+                # Character → action → scene context → style (5B handles longer prompts well).
+                try:
+                    char_descriptions = []
+                    for cslug in chars:
+                        char_row = await _find_character(cslug)
+                        if char_row and char_row["design_prompt"]:
+                            cname = char_row["name"]
+                            appearance = _condense_for_video(char_row["design_prompt"], genre_profile, shot_engine)
+                            char_descriptions.append(f"{cname} ({appearance})")
+                    prompt_parts = []
+                    # 1. Character descriptions (5B has enough attention for full descriptions)
+                    if char_descriptions:
+                        prompt_parts.append("; ".join(char_descriptions))
+                    # 2. Action/motion
+                    if motion_prompt and motion_prompt.lower() != "static":
+                        prompt_parts.append(motion_prompt)
+                    # 3. Scene description (more room with 5B)
+                    if scene_desc and genre_profile.get("include_scene_desc", True):
+                        prompt_parts.append(scene_desc[:200])
+                    # 4. Scene context
+                    if scene_location:
+                        setting = scene_location
+                        if scene_time:
+                            setting += f", {scene_time}"
+                        prompt_parts.append(setting)
+                    # 5. Style anchor
+                    if style_anchor:
+                        prompt_parts.append(style_anchor)
+                    if scene_mood:
+                        prompt_parts.append(f"{scene_mood} mood")
+                    current_prompt = ". ".join(prompt_parts)
+                    logger.info(f"Shot {shot_id}: Wan22 prompt ({len(current_prompt)} chars): {current_prompt[:120]}...")
+                except Exception as e:
+                    logger.warning(f"Shot {shot_id}: Wan22 prompt build failed: {e}")
+            elif shot_engine == "wan" and chars:
+                # Wan T2V: ACTION FIRST, then condensed characters, then context.
+                # Wan 1.3B has limited attention — explicit terms must be near the start.
+                try:
+                    char_descriptions = []
+                    for cslug in chars:
+                        char_row = await _find_character(cslug)
+                        if char_row and char_row["design_prompt"]:
+                            cname = char_row["name"]
+                            appearance = _condense_for_video(char_row["design_prompt"], genre_profile, shot_engine)
+                            char_descriptions.append(f"{cname} ({appearance})")
+                    # Build structured prompt: ACTION → characters → scene
+                    prompt_parts = []
+                    # 1. Action/motion FIRST — this is what the shot is about
+                    if motion_prompt and motion_prompt.lower() != "static":
+                        prompt_parts.append(motion_prompt)
+                    # 2. Condensed character appearances
+                    if char_descriptions:
+                        prompt_parts.append("; ".join(char_descriptions))
+                    # 3. Scene description (truncated for token budget)
+                    if scene_desc and genre_profile.get("include_scene_desc", True):
+                        prompt_parts.append(scene_desc[:120])
+                    # 4. Scene context (location + time)
+                    if scene_location:
+                        setting = scene_location
+                        if scene_time:
+                            setting += f", {scene_time}"
+                        prompt_parts.append(setting)
+                    # 5. Style anchor last (least important for content)
+                    if style_anchor:
+                        prompt_parts.append(style_anchor)
+                    current_prompt = ". ".join(prompt_parts)
+                    logger.info(f"Shot {shot_id}: Wan prompt ({len(current_prompt)} chars): {current_prompt[:120]}...")
+                except Exception as e:
+                    logger.warning(f"Shot {shot_id}: Wan prompt build failed: {e}")
+
+            # Inject NSM state descriptors into prompt (Phase 4)
+            _shot_nsm = _nsm_shot_states.get(str(shot_id), {})
+            if _shot_nsm and character_slug and character_slug in _shot_nsm:
+                _state_ctx = _shot_nsm[character_slug]
+                if _state_ctx.get("prompt_additions"):
+                    current_prompt = f"{current_prompt}, {_state_ctx['prompt_additions']}"
+                    logger.info(f"Shot {shot_id}: NSM state additions: {_state_ctx['prompt_additions'][:80]}")
+            elif _shot_nsm and shot_engine == "wan" and chars:
+                # Multi-character: use structured state prompt builder
+                try:
+                    from packages.narrative_state.continuity import build_multi_character_state_prompt
+                    _mc_chars = []
+                    for _cs in chars:
+                        _cs_state = _shot_nsm.get(_cs, {}).get("state", {})
+                        _cs_row = await _find_character(_cs)
+                        _mc_chars.append({
+                            "name": _cs_row["name"] if _cs_row else _cs,
+                            "slug": _cs,
+                            "design_prompt": _cs_row["design_prompt"] if _cs_row else "",
+                            "state": _cs_state,
+                        })
+                    if any(c["state"] for c in _mc_chars):
+                        current_prompt = build_multi_character_state_prompt(
+                            characters=_mc_chars,
+                            motion_prompt=current_prompt,
+                        )
+                        logger.info(f"Shot {shot_id}: multi-char state prompt built ({len(current_prompt)} chars)")
+                except Exception as _mc_err:
+                    # Fallback to simple injection
+                    state_additions = []
+                    for _cs in chars:
+                        if _cs in _shot_nsm and _shot_nsm[_cs].get("prompt_additions"):
+                            state_additions.append(f"{_cs}: {_shot_nsm[_cs]['prompt_additions']}")
+                    if state_additions:
+                        current_prompt = f"{current_prompt}. State: {'. '.join(state_additions)}"
+                    logger.debug(f"Shot {shot_id}: multi-char state prompt fallback: {_mc_err}")
+
+            # Build genre + style-aware negative prompt
+            _nsm_neg = ""
+            if _shot_nsm and character_slug and character_slug in _shot_nsm:
+                _nsm_neg = _shot_nsm[character_slug].get("negative_additions", "")
+            current_negative = _build_video_negative(style_anchor, genre_profile, _nsm_neg)
+            shot_steps = shot_dict.get("steps") or 30
+            shot_guidance = shot_dict.get("guidance_scale") or 6.0
+            shot_seconds = float(shot_dict.get("duration_seconds") or 3)
+            shot_use_f1 = shot_dict.get("use_f1") or False
+            shot_seed = shot_dict.get("seed")
+
+            # Determine first frame source — priority order:
+            # 0. Multi-character FramePack: generate composite source image via IP-Adapter
+            # 1. Previous shot's last frame (same character, same scene) — intra-scene continuity
+            # 2. Cross-scene continuity frame (same character, prior scene) — inter-scene continuity
+            # 3. Auto-assigned source image from approved pool — cold start
+            # Wan T2V is text-only — skip source image entirely
+            is_multi_char = chars and len(chars) >= 2
+            image_filename = None
+            first_frame_path = None
+            if shot_engine == "wan":
+                logger.info(f"Shot {shot_id}: Wan T2V — no source image needed")
+            elif shot_engine == "wan22" and is_multi_char:
+                # Wan 2.2 multi-char: T2V mode, no source image needed
+                logger.info(f"Shot {shot_id}: Wan22 T2V (multi-char) — no source image needed")
+            # wan22 solo shots fall through to source image selection below (I2V mode)
+            elif is_multi_char and shot_engine in ("framepack", "framepack_f1"):
+                # Multi-character shot: generate composite source image
+                try:
+                    from .composite_image import generate_composite_source
+                    # Get checkpoint from project's generation style
+                    ckpt = "realistic_vision_v51.safetensors"
+                    try:
+                        style_row = await conn.fetchrow(
+                            """SELECT gs.checkpoint_model FROM projects p
+                               JOIN generation_styles gs ON p.default_style = gs.style_name
+                               WHERE p.id = $1""", project_id)
+                        if style_row and style_row["checkpoint_model"]:
+                            ckpt = style_row["checkpoint_model"]
+                            if not ckpt.endswith(".safetensors"):
+                                ckpt += ".safetensors"
+                    except Exception:
+                        pass
+
+                    logger.info(f"Shot {shot_id}: multi-char ({chars}) — generating composite source image")
+                    composite_path = await generate_composite_source(
+                        conn, project_id, list(chars), motion_prompt, ckpt
+                    )
+                    if composite_path and composite_path.exists():
+                        first_frame_path = str(composite_path)
+                        image_filename = await copy_to_comfyui_input(first_frame_path)
+                        logger.info(f"Shot {shot_id}: composite source ready: {composite_path.name}")
+                    else:
+                        logger.warning(f"Shot {shot_id}: composite generation failed, falling back to solo image")
+                        # Fall through to solo image logic below
+                        is_multi_char = False
+                except Exception as e:
+                    logger.warning(f"Shot {shot_id}: composite error: {e}, falling back to solo image")
+                    is_multi_char = False
+
+            if not image_filename and shot_engine != "wan" and not (is_multi_char and first_frame_path):
+                same_char_prev_shot = (
+                    prev_last_frame
+                    and prev_character
+                    and character_slug == prev_character
+                    and Path(prev_last_frame).exists()
+                )
+                if same_char_prev_shot:
+                    # Priority 1: chain from previous shot in this scene
+                    first_frame_path = prev_last_frame
+                    image_filename = await copy_to_comfyui_input(first_frame_path)
+                    logger.info(f"Shot {shot_id}: continuity chain from previous shot (same character: {character_slug})")
+                else:
+                    # Priority 2: check for cross-scene continuity frame
+                    # Use state-aware selection when NSM states exist (Phase 4)
+                    cross_scene_frame = None
+                    if character_slug and project_id:
+                        _char_target_state = None
+                        if _shot_nsm and character_slug in _shot_nsm:
+                            _char_target_state = _shot_nsm[character_slug].get("state")
+                        if _char_target_state:
+                            try:
+                                from packages.narrative_state.continuity import select_continuity_source
+                                cross_scene_frame = await select_continuity_source(
+                                    conn, project_id, character_slug,
+                                    _char_target_state, scene_id,
+                                )
+                            except Exception as _e:
+                                logger.debug(f"NSM continuity selection: {_e}")
+                        if not cross_scene_frame:
+                            cross_scene_frame = await _get_continuity_frame(
+                                conn, project_id, character_slug, scene_id
+                            )
+
+                    if cross_scene_frame:
+                        first_frame_path = cross_scene_frame
+                        image_filename = await copy_to_comfyui_input(first_frame_path)
+                        logger.info(
+                            f"Shot {shot_id}: cross-scene continuity frame for '{character_slug}' "
+                            f"(from prior scene)"
+                        )
+                    else:
+                        # Priority 3: fall back to auto-assigned source image
+                        source_path = shot_dict.get("source_image_path")
+                        if not source_path:
+                            if shot_engine == "wan22":
+                                # Wan 2.2: graceful fallback to T2V mode (no ref image)
+                                logger.info(f"Shot {shot_id}: Wan22 no source image → T2V fallback")
+                            else:
+                                logger.error(f"Shot {shot_id}: no source image and no continuity frame available")
+                                await conn.execute(
+                                    "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
+                                    shot_id, "No source image available (auto-assignment failed or no characters_present)")
+                                return None
+                        image_filename = await copy_to_comfyui_input(source_path)
+                        first_frame_path = str(BASE_PATH / source_path) if not Path(source_path).is_absolute() else source_path
+                        if prev_character and character_slug != prev_character:
+                            logger.info(f"Shot {shot_id}: character switch {prev_character} → {character_slug}, using source image")
+
+            attempt_start = _time_inner.time()
+
+            # Build structured filename prefix: {project}_ep{N}_sc{N}_sh{N}_{engine}_{hash}
+            # The hash is the first 8 chars of the shot UUID for disk→DB traceability.
+            _ep = f"ep{episode_number:02d}" if episode_number else "ep00"
+            _sc = f"sc{scene_number:02d}" if scene_number else "sc00"
+            _sh = f"sh{shot_dict.get('shot_number', 0):02d}"
+            _shot_hash = str(shot_id).replace("-", "")[:8]
+            _file_prefix = f"{project_slug}_{_ep}_{_sc}_{_sh}_{shot_engine}_{_shot_hash}"
+
+            # Persist the final assembled prompts so they're visible in the UI
+            await conn.execute(
+                "UPDATE shots SET generation_prompt = $2, generation_negative = $3 WHERE id = $1",
+                shot_id, current_prompt, current_negative,
+            )
+
+            # Dispatch to video engine
+            if shot_engine == "reference_v2v":
+                # V2V style transfer: use source video clip directly through FramePack V2V
+                _ref_video = shot_dict.get("source_video_path")
+                if not _ref_video or not Path(_ref_video).exists():
+                    logger.error(f"Shot {shot_id}: reference_v2v but no source_video_path")
+                    await conn.execute(
+                        "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
+                        shot_id, "No source video clip available for reference_v2v",
+                    )
+                    return None
+
+                # Auto-detect kohya-format FramePack LoRA for the character
+                # Only attach LoRAs that use lora_unet_ key format (kohya/comfyui)
+                _fp_lora = None
+                if character_slug:
+                    for _suffix in ("_framepack_lora", "_framepack"):
+                        _lp = Path(f"/opt/ComfyUI/models/loras/{character_slug}{_suffix}.safetensors")
+                        if _lp.exists():
+                            # Validate LoRA format — must be kohya/comfyui format
+                            try:
+                                from safetensors import safe_open
+                                with safe_open(str(_lp), framework="pt") as _sf:
+                                    _k0 = list(_sf.keys())[0] if _sf.keys() else ""
+                                if _k0.startswith("lora_unet_"):
+                                    _fp_lora = _lp.name
+                                else:
+                                    logger.warning(f"Skipping incompatible LoRA {_lp.name} (not kohya format, key: {_k0[:60]})")
+                            except Exception as _le:
+                                logger.warning(f"Could not validate LoRA {_lp.name}: {_le}")
+                            break
+
+                from .framepack_refine import refine_wan_video
+                attempt_start = _time_inner.time()
+                refined = await refine_wan_video(
+                    wan_video_path=_ref_video,
+                    prompt_text=current_prompt,
+                    negative_text=current_negative,
+                    denoise_strength=0.45,
+                    total_seconds=shot_seconds,
+                    steps=25,
+                    seed=shot_seed,
+                    guidance_scale=shot_guidance,
+                    lora_name=_fp_lora,
+                    output_prefix=_file_prefix,
+                )
+                gen_time = _time_inner.time() - attempt_start
+
+                if not refined:
+                    await conn.execute(
+                        "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
+                        shot_id, "FramePack V2V refinement returned no output",
+                    )
+                    return None
+
+                video_path = refined
+                logger.info(f"Shot {shot_id}: reference_v2v done in {gen_time:.0f}s → {Path(refined).name}")
+
+                # Post-process: interpolation + color grade only (no upscale — already 544x704)
+                try:
+                    from .video_postprocess import postprocess_wan_video
+                    processed = await postprocess_wan_video(
+                        video_path,
+                        upscale=False,
+                        interpolate=True,
+                        color_grade=True,
+                        target_fps=30,
+                    )
+                    if processed:
+                        video_path = processed
+                        logger.info(f"Shot {shot_id}: post-processed → {Path(processed).name}")
+                except Exception as e:
+                    logger.warning(f"Shot {shot_id}: post-processing failed: {e}, using raw output")
+
+                last_frame = await extract_last_frame(video_path)
+
+                _review = 'approved' if auto_approve else 'pending_review'
+                await conn.execute("""
+                    UPDATE shots SET status = 'completed', output_video_path = $2,
+                           last_frame_path = $3, generation_time_seconds = $4,
+                           review_status = $5
+                    WHERE id = $1
+                """, shot_id, video_path, last_frame, gen_time, _review)
+
+                logger.info(f"Shot {shot_id}: generated in {gen_time:.0f}s → {_review}")
+
+                await event_bus.emit(SHOT_GENERATED, {
+                    "shot_id": str(shot_id),
+                    "scene_id": str(scene_id),
+                    "project_id": project_id,
+                    "video_engine": shot_engine,
+                    "video_path": video_path,
+                    "generation_time_seconds": gen_time,
+                    "auto_approve": auto_approve,
+                })
+                return {"video_path": video_path, "last_frame": last_frame, "character_slug": character_slug}
+
+            elif shot_engine == "wan22":
+                fps = 16
+                num_frames = max(9, int(shot_seconds * fps) + 1)
+                import hashlib as _hashlib
+                if not shot_seed:
+                    _scene_seed_bytes = _hashlib.sha256(str(scene_id).encode()).digest()
+                    _scene_base_seed = int.from_bytes(_scene_seed_bytes[:8], "big") % (2**63)
+                    shot_seed = _scene_base_seed + (shot_dict.get("shot_number", 0) or 0)
+                wan_cfg = max(shot_guidance, 7.5)  # higher CFG keeps prompt control over LoRA
+                wan_w, wan_h = 480, 720
+                if _project_width and _project_height and _project_width > _project_height:
+                    wan_w, wan_h = 720, 480
+                # Get LoRA from engine selector (set by _find_wan_lora)
+                _wan22_lora = engine_sel.lora_name
+                _wan22_lora_str = engine_sel.lora_strength
+                # I2V mode: pass ref_image if we have a source image
+                _wan22_ref = image_filename if image_filename else None
+                logger.info(
+                    f"Shot {shot_id}: Wan22 dims={wan_w}x{wan_h} lora={_wan22_lora} "
+                    f"ref_image={_wan22_ref is not None} seed={shot_seed} cfg={wan_cfg} frames={num_frames}"
+                )
+                workflow, prefix = build_wan22_workflow(
+                    prompt_text=current_prompt, num_frames=num_frames, fps=fps,
+                    steps=shot_steps, seed=shot_seed, cfg=wan_cfg,
+                    width=wan_w, height=wan_h,
+                    negative_text=current_negative,
+                    output_prefix=_file_prefix,
+                    lora_name=_wan22_lora,
+                    lora_strength=_wan22_lora_str,
+                    ref_image=_wan22_ref,
+                )
+                comfyui_prompt_id = await _submit_wan_workflow(workflow, base_url=comfyui_url)
+            elif shot_engine == "wan":
+                fps = 16
+                num_frames = max(9, int(shot_seconds * fps) + 1)
+                # Use scene-level seed for style consistency across shots
+                # Derive per-shot seed: scene_seed + shot_number
+                import hashlib as _hashlib
+                if not shot_seed:
+                    _scene_seed_bytes = _hashlib.sha256(str(scene_id).encode()).digest()
+                    _scene_base_seed = int.from_bytes(_scene_seed_bytes[:8], "big") % (2**63)
+                    shot_seed = _scene_base_seed + (shot_dict.get("shot_number", 0) or 0)
+                # Higher CFG for better style compliance
+                wan_cfg = max(shot_guidance, 7.5)
+                # Map project resolution to Wan-safe dims (must be multiples of 16)
+                # Wan native is 480x720; scale proportionally for landscape/portrait
+                wan_w, wan_h = 480, 720  # default portrait
+                if _project_width and _project_height and _project_width > _project_height:
+                    wan_w, wan_h = 720, 480  # landscape
+                logger.info(f"Shot {shot_id}: Wan dims={wan_w}x{wan_h} (project={_project_width}x{_project_height})")
+                workflow, prefix = build_wan_t2v_workflow(
+                    prompt_text=current_prompt, num_frames=num_frames, fps=fps,
+                    steps=shot_steps, seed=shot_seed, cfg=wan_cfg,
+                    width=wan_w, height=wan_h,
+                    use_gguf=True,
+                    negative_text=current_negative,
+                    output_prefix=_file_prefix,
+                )
+                logger.info(f"Shot {shot_id}: Wan seed={shot_seed} cfg={wan_cfg} frames={num_frames}")
+                comfyui_prompt_id = await _submit_wan_workflow(workflow, base_url=comfyui_url)
+            elif shot_engine == "ltx":
+                fps = 24
+                num_frames = max(9, int(shot_seconds * fps) + 1)
+                workflow, prefix = build_ltx_workflow(
+                    prompt_text=current_prompt,
+                    image_path=image_filename if image_filename else None,
+                    num_frames=num_frames, fps=fps, steps=shot_steps,
+                    seed=shot_seed,
+                    lora_name=shot_dict.get("lora_name"),
+                    lora_strength=shot_dict.get("lora_strength", 0.8),
+                )
+                comfyui_prompt_id = await _submit_ltx_workflow(workflow, base_url=comfyui_url)
+            else:
+                use_f1 = shot_engine == "framepack_f1" or shot_use_f1
+                workflow_data, sampler_node_id, prefix = build_framepack_workflow(
+                    prompt_text=current_prompt, image_path=image_filename,
+                    total_seconds=shot_seconds, steps=shot_steps, use_f1=use_f1,
+                    seed=shot_seed, negative_text=current_negative,
+                    gpu_memory_preservation=6.0, guidance_scale=shot_guidance,
+                    output_prefix=_file_prefix,
+                )
+                comfyui_prompt_id = await _submit_comfyui_workflow(workflow_data["prompt"], base_url=comfyui_url)
+
+            await conn.execute(
+                "UPDATE shots SET comfyui_prompt_id = $2, first_frame_path = $3 WHERE id = $1",
+                shot_id, comfyui_prompt_id, first_frame_path,
+            )
+
+            result = await poll_comfyui_completion(comfyui_prompt_id, base_url=comfyui_url)
+            gen_time = _time_inner.time() - attempt_start
+
+            if result["status"] != "completed" or not result["output_files"]:
+                await conn.execute(
+                    "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
+                    shot_id, f"ComfyUI {result['status']}",
+                )
+                return None
+
+            video_filename = result["output_files"][0]
+            video_path = str(COMFYUI_OUTPUT_DIR / video_filename)
+
+            # FramePack V2V refinement for Wan shots (2.1 and 2.2)
+            if shot_engine in ("wan", "wan22") and video_path:
+                try:
+                    from .framepack_refine import refine_wan_video
+                    # Auto-detect kohya-format FramePack LoRA for refinement
+                    _fp_lora = None
+                    if character_slug:
+                        for _suffix in ("_framepack_lora", "_framepack"):
+                            _lp = Path(f"/opt/ComfyUI/models/loras/{character_slug}{_suffix}.safetensors")
+                            if _lp.exists():
+                                try:
+                                    from safetensors import safe_open
+                                    with safe_open(str(_lp), framework="pt") as _sf:
+                                        _k0 = list(_sf.keys())[0] if _sf.keys() else ""
+                                    if _k0.startswith("lora_unet_"):
+                                        _fp_lora = _lp.name
+                                    else:
+                                        logger.warning(f"Skipping incompatible LoRA {_lp.name} for refinement")
+                                except Exception:
+                                    pass
+                                break
+                    refined = await refine_wan_video(
+                        wan_video_path=video_path,
+                        prompt_text=current_prompt,
+                        negative_text=current_negative,
+                        denoise_strength=0.4,
+                        total_seconds=shot_seconds,
+                        steps=25,
+                        seed=shot_seed,
+                        guidance_scale=shot_guidance,
+                        lora_name=_fp_lora,
+                        output_prefix=f"{_file_prefix}_refined",
+                    )
+                    if refined:
+                        video_path = refined
+                        logger.info(f"Shot {shot_id}: FramePack V2V refinement done → {Path(refined).name}")
+                except Exception as e:
+                    logger.warning(f"Shot {shot_id}: V2V refinement failed: {e}, using raw Wan output")
+
+            # Post-process all video outputs: interpolation + upscale + color grade
+            # Wan gets upscale (480→960), FramePack gets interpolation + color only
+            try:
+                from .video_postprocess import postprocess_wan_video
+                do_upscale = shot_engine in ("wan", "wan22")  # Wan is 480p, needs upscale
+                processed = await postprocess_wan_video(
+                    video_path,
+                    upscale=do_upscale,
+                    interpolate=True,
+                    color_grade=True,
+                    scale_factor=2,
+                    target_fps=30,
+                )
+                if processed:
+                    video_path = processed
+                    logger.info(f"Shot {shot_id}: post-processed → {Path(processed).name}")
+            except Exception as e:
+                logger.warning(f"Shot {shot_id}: post-processing failed: {e}, using raw output")
+
+            last_frame = await extract_last_frame(video_path)
+
+            # Record source image effectiveness for the feedback loop
+            source_path = shot_dict.get("source_image_path")
+            if source_path:
+                parts = source_path.replace("\\", "/").split("/")
+                if len(parts) >= 3 and parts[-2] == "images":
+                    eff_slug = parts[0] if len(parts) == 3 else parts[-3]
+                    try:
+                        await conn.execute("""
+                            INSERT INTO source_image_effectiveness
+                                (character_slug, image_name, shot_id, video_quality_score, video_engine)
+                            VALUES ($1, $2, $3, NULL, $4)
+                        """, eff_slug, parts[-1], shot_id, shot_engine)
+                    except Exception:
+                        pass
+
+            _review = 'approved' if auto_approve else 'pending_review'
+            await conn.execute("""
+                UPDATE shots SET status = 'completed', output_video_path = $2,
+                       last_frame_path = $3, generation_time_seconds = $4,
+                       review_status = $5
+                WHERE id = $1
+            """, shot_id, video_path, last_frame, gen_time, _review)
+
+            logger.info(f"Shot {shot_id}: generated in {gen_time:.0f}s → {_review}")
+
+            await event_bus.emit(SHOT_GENERATED, {
+                "shot_id": str(shot_id),
+                "scene_id": str(scene_id),
+                "project_id": project_id,
+                "character_slug": character_slug,
+                "video_engine": shot_engine,
+                "generation_time": gen_time,
+                "video_path": video_path,
+            })
+            return {"video_path": video_path, "last_frame": last_frame, "character_slug": character_slug}
+
+        except Exception as e:
+            logger.error(f"Shot {shot_id} generation failed: {e}")
+            await conn.execute(
+                "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
+                shot_id, str(e)[:500],
+            )
+            return None
+    finally:
+        await conn.close()
+
+
 async def _generate_scene_impl(scene_id: str, auto_approve: bool = False):
     """Inner implementation — do not call directly, use generate_scene().
 
@@ -863,7 +1674,8 @@ async def _generate_scene_impl(scene_id: str, auto_approve: bool = False):
     import time as _time
     conn = None
     try:
-        conn = await connect_direct()
+        job_stage("prepare")
+        conn = await connect_pooled()
 
         shots = await conn.fetch(
             "SELECT * FROM shots WHERE scene_id = $1 ORDER BY shot_number",
@@ -969,769 +1781,44 @@ async def _generate_scene_impl(scene_id: str, auto_approve: bool = False):
         except Exception as _e:
             logger.debug(f"NSM state context pre-fetch: {_e}")
 
-        completed_videos = []
-        completed_count = 0
-        prev_last_frame = None
-        prev_character = None
-
-        for shot in shots:
-            shot_id = shot["id"]
-
-            # Skip already-completed shots (e.g., after a service restart)
-            if (shot["status"] in ("completed", "accepted_best")
-                    and shot["output_video_path"]
-                    and Path(shot["output_video_path"]).exists()):
-                completed_videos.append(shot["output_video_path"])
-                completed_count += 1
-                prev_last_frame = shot["last_frame_path"]
-                skip_chars = shot.get("characters_present")
-                prev_character = skip_chars[0] if skip_chars and isinstance(skip_chars, list) else None
-                # Backfill continuity frame from already-completed shots
-                if prev_character and prev_last_frame and project_id:
-                    try:
-                        await _save_continuity_frame(
-                            conn, project_id, prev_character,
-                            scene_id, shot_id, prev_last_frame,
-                            scene_number=scene_number,
-                            shot_number=shot.get("shot_number"),
-                        )
-                    except Exception:
-                        pass
-                logger.info(f"Shot {shot_id}: already completed, skipping")
-                continue
-
-            await conn.execute(
-                "UPDATE shots SET status = 'generating' WHERE id = $1", shot_id
-            )
-            await conn.execute(
-                "UPDATE scenes SET current_generating_shot_id = $2 WHERE id = $1",
-                scene_id, shot_id,
-            )
-
-            # Single-pass generation — no QC vision review, all shots go to manual review
-            try:
-                from .video_qc import check_engine_blacklist
-                from .framepack import build_framepack_workflow, _submit_comfyui_workflow
-                from .ltx_video import build_ltx_workflow, _submit_comfyui_workflow as _submit_ltx_workflow
-                from .wan_video import build_wan_t2v_workflow, build_wan22_workflow, _submit_comfyui_workflow as _submit_wan_workflow
-                import time as _time_inner
-
-                shot_dict = dict(shot)
-                character_slug = None
-                chars = shot_dict.get("characters_present")
-                if chars and isinstance(chars, list) and len(chars) > 0:
-                    character_slug = chars[0]
-
-                # Use project-level video_lora from DB (project-scoped, not global)
-                _project_wan_lora = project_video_lora
-
-                # Auto-select engine based on shot characteristics
-                from .engine_selector import select_engine
-                has_source = bool(shot_dict.get("source_image_path"))
-                has_source_video = bool(shot_dict.get("source_video_path"))
-                shot_type = shot_dict.get("shot_type") or "medium"
-                char_list = chars if isinstance(chars, list) else []
-                engine_sel = select_engine(
-                    shot_type=shot_type,
-                    characters_present=char_list,
-                    has_source_image=has_source,
-                    has_source_video=has_source_video,
-                    project_wan_lora=_project_wan_lora,
-                )
-                shot_engine = engine_sel.engine
-                # Persist engine selection to DB
-                await conn.execute(
-                    "UPDATE shots SET video_engine = $2 WHERE id = $1",
-                    shot_id, shot_engine,
-                )
-                logger.info(f"Shot {shot_id}: engine={shot_engine} reason='{engine_sel.reason}'")
-
-                # Engine blacklist check
-                if character_slug:
-                    project_id = None
-                    try:
-                        scene_row = await conn.fetchrow("SELECT project_id FROM scenes WHERE id = $1", scene_id)
-                        if scene_row:
-                            project_id = scene_row["project_id"]
-                    except Exception:
-                        pass
-                    bl = await check_engine_blacklist(conn, character_slug, project_id, shot_engine)
-                    if bl:
-                        logger.warning(f"Shot {shot_id}: engine '{shot_engine}' blacklisted for '{character_slug}'")
-                        await conn.execute(
-                            "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
-                            shot_id, f"Engine '{shot_engine}' blacklisted: {bl.get('reason', '')}",
-                        )
-                        continue
-
-                # Build identity-anchored prompt
-                motion_prompt = shot_dict["motion_prompt"] or shot_dict.get("generation_prompt") or ""
-
-                # Helper: look up character by short or full slug
-                async def _find_character(slug):
-                    return await conn.fetchrow(
-                        "SELECT name, design_prompt FROM characters "
-                        "WHERE project_id = $2 AND ("
-                        "  REGEXP_REPLACE(LOWER(REPLACE(name, ' ', '_')), '[^a-z0-9_-]', '', 'g') = $1 "
-                        "  OR REGEXP_REPLACE(LOWER(REPLACE(name, ' ', '_')), '[^a-z0-9_-]', '', 'g') LIKE $1 || '_%'"
-                        ")", slug, project_id,
-                    )
-
-                # Fetch scene context for richer prompts
-                scene_desc = ""
-                scene_location = ""
-                scene_mood = ""
-                scene_time = ""
-                try:
-                    _scene_ctx = await conn.fetchrow(
-                        "SELECT description, location, time_of_day, mood FROM scenes WHERE id = $1",
-                        scene_id,
-                    )
-                    if _scene_ctx:
-                        scene_desc = _scene_ctx["description"] or ""
-                        scene_location = _scene_ctx["location"] or ""
-                        scene_mood = _scene_ctx["mood"] or ""
-                        scene_time = _scene_ctx["time_of_day"] or ""
-                except Exception:
-                    pass
-
-                # Fetch project style for visual anchoring
-                style_anchor = ""
-                _project_width = None
-                _project_height = None
-                try:
-                    _style_row = await conn.fetchrow(
-                        "SELECT gs.checkpoint_model, gs.prompt_format, gs.width, gs.height FROM projects p "
-                        "JOIN generation_styles gs ON p.default_style = gs.style_name "
-                        "WHERE p.id = $1", project_id,
-                    )
-                    if _style_row:
-                        ckpt = (_style_row["checkpoint_model"] or "").lower()
-                        if "realistic" in ckpt or "cyber" in ckpt or "basil" in ckpt or "lazymix" in ckpt:
-                            style_anchor = "photorealistic, live action film, cinematic lighting"
-                        elif "cartoon" in ckpt or "pixar" in ckpt:
-                            style_anchor = "3D animated, Pixar style, cinematic lighting"
-                        elif "counterfeit" in ckpt or "noob" in ckpt:
-                            style_anchor = "anime style, detailed animation, cinematic"
-                        # Store project resolution for Wan T2V aspect ratio
-                        _project_width = _style_row["width"]
-                        _project_height = _style_row["height"]
-                except Exception:
-                    pass
-
-                current_prompt = motion_prompt
-                if character_slug and shot_engine in ("framepack", "framepack_f1"):
-                    try:
-                        char_row = await _find_character(character_slug)
-                        if char_row and char_row["design_prompt"]:
-                            appearance = _condense_for_video(char_row["design_prompt"], genre_profile, shot_engine)
-                            # Build FramePack prompt with same structure as Wan:
-                            # style anchor → scene context → character → motion
-                            fp_parts = []
-                            if style_anchor:
-                                fp_parts.append(style_anchor)
-                            if scene_location:
-                                setting = scene_location
-                                if scene_time:
-                                    setting += f", {scene_time}"
-                                fp_parts.append(setting)
-                            if scene_desc:
-                                fp_parts.append(scene_desc)
-                            fp_parts.append(appearance)
-                            if motion_prompt and motion_prompt.lower() != "static":
-                                fp_parts.append(motion_prompt)
-                            fp_parts.append("consistent character appearance, maintain all physical features")
-                            if scene_mood:
-                                fp_parts.append(f"{scene_mood} mood")
-                            current_prompt = ", ".join(fp_parts)
-                            logger.info(f"Shot {shot_id}: FramePack prompt ({len(current_prompt)} chars): {current_prompt[:120]}...")
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: design_prompt lookup failed: {e}")
-                elif shot_engine == "wan22" and chars:
-                    # Wan 2.2 5B: richer prompt capacity than 1.3B.
-                    # Character → action → scene context → style (5B handles longer prompts well).
-                    try:
-                        char_descriptions = []
-                        for cslug in chars:
-                            char_row = await _find_character(cslug)
-                            if char_row and char_row["design_prompt"]:
-                                cname = char_row["name"]
-                                appearance = _condense_for_video(char_row["design_prompt"], genre_profile, shot_engine)
-                                char_descriptions.append(f"{cname} ({appearance})")
-                        prompt_parts = []
-                        # 1. Character descriptions (5B has enough attention for full descriptions)
-                        if char_descriptions:
-                            prompt_parts.append("; ".join(char_descriptions))
-                        # 2. Action/motion
-                        if motion_prompt and motion_prompt.lower() != "static":
-                            prompt_parts.append(motion_prompt)
-                        # 3. Scene description (more room with 5B)
-                        if scene_desc and genre_profile.get("include_scene_desc", True):
-                            prompt_parts.append(scene_desc[:200])
-                        # 4. Scene context
-                        if scene_location:
-                            setting = scene_location
-                            if scene_time:
-                                setting += f", {scene_time}"
-                            prompt_parts.append(setting)
-                        # 5. Style anchor
-                        if style_anchor:
-                            prompt_parts.append(style_anchor)
-                        if scene_mood:
-                            prompt_parts.append(f"{scene_mood} mood")
-                        current_prompt = ". ".join(prompt_parts)
-                        logger.info(f"Shot {shot_id}: Wan22 prompt ({len(current_prompt)} chars): {current_prompt[:120]}...")
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: Wan22 prompt build failed: {e}")
-                elif shot_engine == "wan" and chars:
-                    # Wan T2V: ACTION FIRST, then condensed characters, then context.
-                    # Wan 1.3B has limited attention — explicit terms must be near the start.
-                    try:
-                        char_descriptions = []
-                        for cslug in chars:
-                            char_row = await _find_character(cslug)
-                            if char_row and char_row["design_prompt"]:
-                                cname = char_row["name"]
-                                appearance = _condense_for_video(char_row["design_prompt"], genre_profile, shot_engine)
-                                char_descriptions.append(f"{cname} ({appearance})")
-                        # Build structured prompt: ACTION → characters → scene
-                        prompt_parts = []
-                        # 1. Action/motion FIRST — this is what the shot is about
-                        if motion_prompt and motion_prompt.lower() != "static":
-                            prompt_parts.append(motion_prompt)
-                        # 2. Condensed character appearances
-                        if char_descriptions:
-                            prompt_parts.append("; ".join(char_descriptions))
-                        # 3. Scene description (truncated for token budget)
-                        if scene_desc and genre_profile.get("include_scene_desc", True):
-                            prompt_parts.append(scene_desc[:120])
-                        # 4. Scene context (location + time)
-                        if scene_location:
-                            setting = scene_location
-                            if scene_time:
-                                setting += f", {scene_time}"
-                            prompt_parts.append(setting)
-                        # 5. Style anchor last (least important for content)
-                        if style_anchor:
-                            prompt_parts.append(style_anchor)
-                        current_prompt = ". ".join(prompt_parts)
-                        logger.info(f"Shot {shot_id}: Wan prompt ({len(current_prompt)} chars): {current_prompt[:120]}...")
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: Wan prompt build failed: {e}")
-
-                # Inject NSM state descriptors into prompt (Phase 4)
-                _shot_nsm = _nsm_shot_states.get(str(shot_id), {})
-                if _shot_nsm and character_slug and character_slug in _shot_nsm:
-                    _state_ctx = _shot_nsm[character_slug]
-                    if _state_ctx.get("prompt_additions"):
-                        current_prompt = f"{current_prompt}, {_state_ctx['prompt_additions']}"
-                        logger.info(f"Shot {shot_id}: NSM state additions: {_state_ctx['prompt_additions'][:80]}")
-                elif _shot_nsm and shot_engine == "wan" and chars:
-                    # Multi-character: use structured state prompt builder
-                    try:
-                        from packages.narrative_state.continuity import build_multi_character_state_prompt
-                        _mc_chars = []
-                        for _cs in chars:
-                            _cs_state = _shot_nsm.get(_cs, {}).get("state", {})
-                            _cs_row = await _find_character(_cs)
-                            _mc_chars.append({
-                                "name": _cs_row["name"] if _cs_row else _cs,
-                                "slug": _cs,
-                                "design_prompt": _cs_row["design_prompt"] if _cs_row else "",
-                                "state": _cs_state,
-                            })
-                        if any(c["state"] for c in _mc_chars):
-                            current_prompt = build_multi_character_state_prompt(
-                                characters=_mc_chars,
-                                motion_prompt=current_prompt,
-                            )
-                            logger.info(f"Shot {shot_id}: multi-char state prompt built ({len(current_prompt)} chars)")
-                    except Exception as _mc_err:
-                        # Fallback to simple injection
-                        state_additions = []
-                        for _cs in chars:
-                            if _cs in _shot_nsm and _shot_nsm[_cs].get("prompt_additions"):
-                                state_additions.append(f"{_cs}: {_shot_nsm[_cs]['prompt_additions']}")
-                        if state_additions:
-                            current_prompt = f"{current_prompt}. State: {'. '.join(state_additions)}"
-                        logger.debug(f"Shot {shot_id}: multi-char state prompt fallback: {_mc_err}")
-
-                # Build genre + style-aware negative prompt
-                _nsm_neg = ""
-                if _shot_nsm and character_slug and character_slug in _shot_nsm:
-                    _nsm_neg = _shot_nsm[character_slug].get("negative_additions", "")
-                current_negative = _build_video_negative(style_anchor, genre_profile, _nsm_neg)
-                shot_steps = shot_dict.get("steps") or 30
-                shot_guidance = shot_dict.get("guidance_scale") or 6.0
-                shot_seconds = float(shot_dict.get("duration_seconds") or 3)
-                shot_use_f1 = shot_dict.get("use_f1") or False
-                shot_seed = shot_dict.get("seed")
-
-                # Determine first frame source — priority order:
-                # 0. Multi-character FramePack: generate composite source image via IP-Adapter
-                # 1. Previous shot's last frame (same character, same scene) — intra-scene continuity
-                # 2. Cross-scene continuity frame (same character, prior scene) — inter-scene continuity
-                # 3. Auto-assigned source image from approved pool — cold start
-                # Wan T2V is text-only — skip source image entirely
-                is_multi_char = chars and len(chars) >= 2
-                image_filename = None
-                first_frame_path = None
-                if shot_engine == "wan":
-                    logger.info(f"Shot {shot_id}: Wan T2V — no source image needed")
-                elif shot_engine == "wan22" and is_multi_char:
-                    # Wan 2.2 multi-char: T2V mode, no source image needed
-                    logger.info(f"Shot {shot_id}: Wan22 T2V (multi-char) — no source image needed")
-                # wan22 solo shots fall through to source image selection below (I2V mode)
-                elif is_multi_char and shot_engine in ("framepack", "framepack_f1"):
-                    # Multi-character shot: generate composite source image
-                    try:
-                        from .composite_image import generate_composite_source
-                        # Get checkpoint from project's generation style
-                        ckpt = "realistic_vision_v51.safetensors"
-                        try:
-                            style_row = await conn.fetchrow(
-                                """SELECT gs.checkpoint_model FROM projects p
-                                   JOIN generation_styles gs ON p.default_style = gs.style_name
-                                   WHERE p.id = $1""", project_id)
-                            if style_row and style_row["checkpoint_model"]:
-                                ckpt = style_row["checkpoint_model"]
-                                if not ckpt.endswith(".safetensors"):
-                                    ckpt += ".safetensors"
-                        except Exception:
-                            pass
-
-                        logger.info(f"Shot {shot_id}: multi-char ({chars}) — generating composite source image")
-                        composite_path = await generate_composite_source(
-                            conn, project_id, list(chars), motion_prompt, ckpt
-                        )
-                        if composite_path and composite_path.exists():
-                            first_frame_path = str(composite_path)
-                            image_filename = await copy_to_comfyui_input(first_frame_path)
-                            logger.info(f"Shot {shot_id}: composite source ready: {composite_path.name}")
-                        else:
-                            logger.warning(f"Shot {shot_id}: composite generation failed, falling back to solo image")
-                            # Fall through to solo image logic below
-                            is_multi_char = False
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: composite error: {e}, falling back to solo image")
-                        is_multi_char = False
-
-                if not image_filename and shot_engine != "wan" and not (is_multi_char and first_frame_path):
-                    same_char_prev_shot = (
-                        prev_last_frame
-                        and prev_character
-                        and character_slug == prev_character
-                        and Path(prev_last_frame).exists()
-                    )
-                    if same_char_prev_shot:
-                        # Priority 1: chain from previous shot in this scene
-                        first_frame_path = prev_last_frame
-                        image_filename = await copy_to_comfyui_input(first_frame_path)
-                        logger.info(f"Shot {shot_id}: continuity chain from previous shot (same character: {character_slug})")
-                    else:
-                        # Priority 2: check for cross-scene continuity frame
-                        # Use state-aware selection when NSM states exist (Phase 4)
-                        cross_scene_frame = None
-                        if character_slug and project_id:
-                            _char_target_state = None
-                            if _shot_nsm and character_slug in _shot_nsm:
-                                _char_target_state = _shot_nsm[character_slug].get("state")
-                            if _char_target_state:
-                                try:
-                                    from packages.narrative_state.continuity import select_continuity_source
-                                    cross_scene_frame = await select_continuity_source(
-                                        conn, project_id, character_slug,
-                                        _char_target_state, scene_id,
-                                    )
-                                except Exception as _e:
-                                    logger.debug(f"NSM continuity selection: {_e}")
-                            if not cross_scene_frame:
-                                cross_scene_frame = await _get_continuity_frame(
-                                    conn, project_id, character_slug, scene_id
-                                )
-
-                        if cross_scene_frame:
-                            first_frame_path = cross_scene_frame
-                            image_filename = await copy_to_comfyui_input(first_frame_path)
-                            logger.info(
-                                f"Shot {shot_id}: cross-scene continuity frame for '{character_slug}' "
-                                f"(from prior scene)"
-                            )
-                        else:
-                            # Priority 3: fall back to auto-assigned source image
-                            source_path = shot_dict.get("source_image_path")
-                            if not source_path:
-                                if shot_engine == "wan22":
-                                    # Wan 2.2: graceful fallback to T2V mode (no ref image)
-                                    logger.info(f"Shot {shot_id}: Wan22 no source image → T2V fallback")
-                                else:
-                                    logger.error(f"Shot {shot_id}: no source image and no continuity frame available")
-                                    await conn.execute(
-                                        "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
-                                        shot_id, "No source image available (auto-assignment failed or no characters_present)")
-                                    continue
-                            image_filename = await copy_to_comfyui_input(source_path)
-                            first_frame_path = str(BASE_PATH / source_path) if not Path(source_path).is_absolute() else source_path
-                            if prev_character and character_slug != prev_character:
-                                logger.info(f"Shot {shot_id}: character switch {prev_character} → {character_slug}, using source image")
-
-                attempt_start = _time_inner.time()
-
-                # Build structured filename prefix: {project}_ep{N}_sc{N}_sh{N}_{engine}_{hash}
-                # The hash is the first 8 chars of the shot UUID for disk→DB traceability.
-                _ep = f"ep{episode_number:02d}" if episode_number else "ep00"
-                _sc = f"sc{scene_number:02d}" if scene_number else "sc00"
-                _sh = f"sh{shot_dict.get('shot_number', 0):02d}"
-                _shot_hash = str(shot_id).replace("-", "")[:8]
-                _file_prefix = f"{project_slug}_{_ep}_{_sc}_{_sh}_{shot_engine}_{_shot_hash}"
-
-                # Persist the final assembled prompts so they're visible in the UI
-                await conn.execute(
-                    "UPDATE shots SET generation_prompt = $2, generation_negative = $3 WHERE id = $1",
-                    shot_id, current_prompt, current_negative,
-                )
-
-                # Dispatch to video engine
-                if shot_engine == "reference_v2v":
-                    # V2V style transfer: use source video clip directly through FramePack V2V
-                    _ref_video = shot_dict.get("source_video_path")
-                    if not _ref_video or not Path(_ref_video).exists():
-                        logger.error(f"Shot {shot_id}: reference_v2v but no source_video_path")
-                        await conn.execute(
-                            "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
-                            shot_id, "No source video clip available for reference_v2v",
-                        )
-                        continue
-
-                    # Auto-detect kohya-format FramePack LoRA for the character
-                    # Only attach LoRAs that use lora_unet_ key format (kohya/comfyui)
-                    _fp_lora = None
-                    if character_slug:
-                        for _suffix in ("_framepack_lora", "_framepack"):
-                            _lp = Path(f"/opt/ComfyUI/models/loras/{character_slug}{_suffix}.safetensors")
-                            if _lp.exists():
-                                # Validate LoRA format — must be kohya/comfyui format
-                                try:
-                                    from safetensors import safe_open
-                                    with safe_open(str(_lp), framework="pt") as _sf:
-                                        _k0 = list(_sf.keys())[0] if _sf.keys() else ""
-                                    if _k0.startswith("lora_unet_"):
-                                        _fp_lora = _lp.name
-                                    else:
-                                        logger.warning(f"Skipping incompatible LoRA {_lp.name} (not kohya format, key: {_k0[:60]})")
-                                except Exception as _le:
-                                    logger.warning(f"Could not validate LoRA {_lp.name}: {_le}")
-                                break
-
-                    from .framepack_refine import refine_wan_video
-                    attempt_start = _time_inner.time()
-                    refined = await refine_wan_video(
-                        wan_video_path=_ref_video,
-                        prompt_text=current_prompt,
-                        negative_text=current_negative,
-                        denoise_strength=0.45,
-                        total_seconds=shot_seconds,
-                        steps=25,
-                        seed=shot_seed,
-                        guidance_scale=shot_guidance,
-                        lora_name=_fp_lora,
-                        output_prefix=_file_prefix,
-                    )
-                    gen_time = _time_inner.time() - attempt_start
-
-                    if not refined:
-                        await conn.execute(
-                            "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
-                            shot_id, "FramePack V2V refinement returned no output",
-                        )
-                        continue
-
-                    video_path = refined
-                    logger.info(f"Shot {shot_id}: reference_v2v done in {gen_time:.0f}s → {Path(refined).name}")
-
-                    # Post-process: interpolation + color grade only (no upscale — already 544x704)
-                    try:
-                        from .video_postprocess import postprocess_wan_video
-                        processed = await postprocess_wan_video(
-                            video_path,
-                            upscale=False,
-                            interpolate=True,
-                            color_grade=True,
-                            target_fps=30,
-                        )
-                        if processed:
-                            video_path = processed
-                            logger.info(f"Shot {shot_id}: post-processed → {Path(processed).name}")
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: post-processing failed: {e}, using raw output")
-
-                    last_frame = await extract_last_frame(video_path)
-
-                    completed_count += 1
-                    completed_videos.append(video_path)
-                    prev_last_frame = last_frame
-                    prev_character = character_slug
-
-                    _review = 'approved' if auto_approve else 'pending_review'
-                    await conn.execute("""
-                        UPDATE shots SET status = 'completed', output_video_path = $2,
-                               last_frame_path = $3, generation_time_seconds = $4,
-                               review_status = $5
-                        WHERE id = $1
-                    """, shot_id, video_path, last_frame, gen_time, _review)
-
-                    if character_slug and last_frame and project_id:
-                        try:
-                            await _save_continuity_frame(
-                                conn, project_id, character_slug,
-                                scene_id, shot_id, last_frame,
-                                scene_number=scene_number,
-                                shot_number=shot_dict.get("shot_number"),
-                            )
-                        except Exception as e:
-                            logger.warning(f"Shot {shot_id}: failed to save continuity frame: {e}")
-
-                    logger.info(f"Shot {shot_id}: generated in {gen_time:.0f}s → {_review}")
-
-                    await event_bus.emit(SHOT_GENERATED, {
-                        "shot_id": str(shot_id),
-                        "scene_id": str(scene_id),
-                        "project_id": project_id,
-                        "video_engine": shot_engine,
-                        "video_path": video_path,
-                        "generation_time_seconds": gen_time,
-                        "auto_approve": auto_approve,
-                    })
-                    continue
-
-                elif shot_engine == "wan22":
-                    fps = 16
-                    num_frames = max(9, int(shot_seconds * fps) + 1)
-                    import hashlib as _hashlib
-                    if not shot_seed:
-                        _scene_seed_bytes = _hashlib.sha256(str(scene_id).encode()).digest()
-                        _scene_base_seed = int.from_bytes(_scene_seed_bytes[:8], "big") % (2**63)
-                        shot_seed = _scene_base_seed + (shot_dict.get("shot_number", 0) or 0)
-                    wan_cfg = max(shot_guidance, 7.5)  # higher CFG keeps prompt control over LoRA
-                    wan_w, wan_h = 480, 720
-                    if _project_width and _project_height and _project_width > _project_height:
-                        wan_w, wan_h = 720, 480
-                    # Get LoRA from engine selector (set by _find_wan_lora)
-                    _wan22_lora = engine_sel.lora_name
-                    _wan22_lora_str = engine_sel.lora_strength
-                    # I2V mode: pass ref_image if we have a source image
-                    _wan22_ref = image_filename if image_filename else None
-                    logger.info(
-                        f"Shot {shot_id}: Wan22 dims={wan_w}x{wan_h} lora={_wan22_lora} "
-                        f"ref_image={_wan22_ref is not None} seed={shot_seed} cfg={wan_cfg} frames={num_frames}"
-                    )
-                    workflow, prefix = build_wan22_workflow(
-                        prompt_text=current_prompt, num_frames=num_frames, fps=fps,
-                        steps=shot_steps, seed=shot_seed, cfg=wan_cfg,
-                        width=wan_w, height=wan_h,
-                        negative_text=current_negative,
-                        output_prefix=_file_prefix,
-                        lora_name=_wan22_lora,
-                        lora_strength=_wan22_lora_str,
-                        ref_image=_wan22_ref,
-                    )
-                    comfyui_prompt_id = _submit_wan_workflow(workflow)
-                elif shot_engine == "wan":
-                    fps = 16
-                    num_frames = max(9, int(shot_seconds * fps) + 1)
-                    # Use scene-level seed for style consistency across shots
-                    # Derive per-shot seed: scene_seed + shot_number
-                    import hashlib as _hashlib
-                    if not shot_seed:
-                        _scene_seed_bytes = _hashlib.sha256(str(scene_id).encode()).digest()
-                        _scene_base_seed = int.from_bytes(_scene_seed_bytes[:8], "big") % (2**63)
-                        shot_seed = _scene_base_seed + (shot_dict.get("shot_number", 0) or 0)
-                    # Higher CFG for better style compliance
-                    wan_cfg = max(shot_guidance, 7.5)
-                    # Map project resolution to Wan-safe dims (must be multiples of 16)
-                    # Wan native is 480x720; scale proportionally for landscape/portrait
-                    wan_w, wan_h = 480, 720  # default portrait
-                    if _project_width and _project_height and _project_width > _project_height:
-                        wan_w, wan_h = 720, 480  # landscape
-                    logger.info(f"Shot {shot_id}: Wan dims={wan_w}x{wan_h} (project={_project_width}x{_project_height})")
-                    workflow, prefix = build_wan_t2v_workflow(
-                        prompt_text=current_prompt, num_frames=num_frames, fps=fps,
-                        steps=shot_steps, seed=shot_seed, cfg=wan_cfg,
-                        width=wan_w, height=wan_h,
-                        use_gguf=True,
-                        negative_text=current_negative,
-                        output_prefix=_file_prefix,
-                    )
-                    logger.info(f"Shot {shot_id}: Wan seed={shot_seed} cfg={wan_cfg} frames={num_frames}")
-                    comfyui_prompt_id = _submit_wan_workflow(workflow)
-                elif shot_engine == "ltx":
-                    fps = 24
-                    num_frames = max(9, int(shot_seconds * fps) + 1)
-                    workflow, prefix = build_ltx_workflow(
-                        prompt_text=current_prompt,
-                        image_path=image_filename if image_filename else None,
-                        num_frames=num_frames, fps=fps, steps=shot_steps,
-                        seed=shot_seed,
-                        lora_name=shot_dict.get("lora_name"),
-                        lora_strength=shot_dict.get("lora_strength", 0.8),
-                    )
-                    comfyui_prompt_id = _submit_ltx_workflow(workflow)
-                else:
-                    use_f1 = shot_engine == "framepack_f1" or shot_use_f1
-                    workflow_data, sampler_node_id, prefix = build_framepack_workflow(
-                        prompt_text=current_prompt, image_path=image_filename,
-                        total_seconds=shot_seconds, steps=shot_steps, use_f1=use_f1,
-                        seed=shot_seed, negative_text=current_negative,
-                        gpu_memory_preservation=6.0, guidance_scale=shot_guidance,
-                        output_prefix=_file_prefix,
-                    )
-                    comfyui_prompt_id = _submit_comfyui_workflow(workflow_data["prompt"])
-
-                await conn.execute(
-                    "UPDATE shots SET comfyui_prompt_id = $2, first_frame_path = $3 WHERE id = $1",
-                    shot_id, comfyui_prompt_id, first_frame_path,
-                )
-
-                result = await poll_comfyui_completion(comfyui_prompt_id)
-                gen_time = _time_inner.time() - attempt_start
-
-                if result["status"] != "completed" or not result["output_files"]:
-                    await conn.execute(
-                        "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
-                        shot_id, f"ComfyUI {result['status']}",
-                    )
+        # Shot DAG: a shot only waits for the shot it chains its first frame
+        # from; independent shots are dispatched concurrently across backends.
+        scene_ctx = _SceneContext(
+            scene_id=scene_id,
+            project_id=project_id,
+            scene_number=scene_number,
+            episode_number=episode_number,
+            project_slug=project_slug,
+            project_video_lora=project_video_lora,
+            genre_profile=genre_profile,
+            auto_approve=auto_approve,
+            nsm_shot_states=_nsm_shot_states,
+        )
+        deps = _shot_dependencies(shots)
+        logger.info(
+            f"Scene {scene_id}: {len(shots)} shots, {len(deps)} continuity-chained, "
+            f"{len(COMFYUI_URLS)} ComfyUI backend(s)"
+        )
+        job_stage("shots")
+        results = await _run_shot_dag(conn, scene_ctx, shots, deps)
+        job_stage("review")
+        completed_videos = [r["video_path"] for r in results if r]
+
+        # Save continuity frames for cross-scene reuse in shot order, so the
+        # latest shot of each character wins regardless of finish order
+        if project_id:
+            for shot, res in zip(shots, results):
+                if not (res and res["character_slug"] and res["last_frame"]):
                     continue
-
-                video_filename = result["output_files"][0]
-                video_path = str(COMFYUI_OUTPUT_DIR / video_filename)
-
-                # FramePack V2V refinement for Wan shots (2.1 and 2.2)
-                if shot_engine in ("wan", "wan22") and video_path:
-                    try:
-                        from .framepack_refine import refine_wan_video
-                        # Auto-detect kohya-format FramePack LoRA for refinement
-                        _fp_lora = None
-                        if character_slug:
-                            for _suffix in ("_framepack_lora", "_framepack"):
-                                _lp = Path(f"/opt/ComfyUI/models/loras/{character_slug}{_suffix}.safetensors")
-                                if _lp.exists():
-                                    try:
-                                        from safetensors import safe_open
-                                        with safe_open(str(_lp), framework="pt") as _sf:
-                                            _k0 = list(_sf.keys())[0] if _sf.keys() else ""
-                                        if _k0.startswith("lora_unet_"):
-                                            _fp_lora = _lp.name
-                                        else:
-                                            logger.warning(f"Skipping incompatible LoRA {_lp.name} for refinement")
-                                    except Exception:
-                                        pass
-                                    break
-                        refined = await refine_wan_video(
-                            wan_video_path=video_path,
-                            prompt_text=current_prompt,
-                            negative_text=current_negative,
-                            denoise_strength=0.4,
-                            total_seconds=shot_seconds,
-                            steps=25,
-                            seed=shot_seed,
-                            guidance_scale=shot_guidance,
-                            lora_name=_fp_lora,
-                            output_prefix=f"{_file_prefix}_refined",
-                        )
-                        if refined:
-                            video_path = refined
-                            logger.info(f"Shot {shot_id}: FramePack V2V refinement done → {Path(refined).name}")
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: V2V refinement failed: {e}, using raw Wan output")
-
-                # Post-process all video outputs: interpolation + upscale + color grade
-                # Wan gets upscale (480→960), FramePack gets interpolation + color only
                 try:
-                    from .video_postprocess import postprocess_wan_video
-                    do_upscale = shot_engine in ("wan", "wan22")  # Wan is 480p, needs upscale
-                    processed = await postprocess_wan_video(
-                        video_path,
-                        upscale=do_upscale,
-                        interpolate=True,
-                        color_grade=True,
-                        scale_factor=2,
-                        target_fps=30,
+                    await _save_continuity_frame(
+                        conn, project_id, res["character_slug"],
+                        scene_id, shot["id"], res["last_frame"],
+                        scene_number=scene_number,
+                        shot_number=shot.get("shot_number"),
                     )
-                    if processed:
-                        video_path = processed
-                        logger.info(f"Shot {shot_id}: post-processed → {Path(processed).name}")
                 except Exception as e:
-                    logger.warning(f"Shot {shot_id}: post-processing failed: {e}, using raw output")
-
-                last_frame = await extract_last_frame(video_path)
-
-                # Record source image effectiveness for the feedback loop
-                source_path = shot_dict.get("source_image_path")
-                if source_path:
-                    parts = source_path.replace("\\", "/").split("/")
-                    if len(parts) >= 3 and parts[-2] == "images":
-                        eff_slug = parts[0] if len(parts) == 3 else parts[-3]
-                        try:
-                            await conn.execute("""
-                                INSERT INTO source_image_effectiveness
-                                    (character_slug, image_name, shot_id, video_quality_score, video_engine)
-                                VALUES ($1, $2, $3, NULL, $4)
-                            """, eff_slug, parts[-1], shot_id, shot_engine)
-                        except Exception:
-                            pass
-
-                completed_count += 1
-                completed_videos.append(video_path)
-                prev_last_frame = last_frame
-                prev_character = character_slug
-
-                _review = 'approved' if auto_approve else 'pending_review'
-                await conn.execute("""
-                    UPDATE shots SET status = 'completed', output_video_path = $2,
-                           last_frame_path = $3, generation_time_seconds = $4,
-                           review_status = $5
-                    WHERE id = $1
-                """, shot_id, video_path, last_frame, gen_time, _review)
-
-                # Save continuity frame for cross-scene reuse
-                if character_slug and last_frame and project_id:
-                    try:
-                        await _save_continuity_frame(
-                            conn, project_id, character_slug,
-                            scene_id, shot_id, last_frame,
-                            scene_number=scene_number,
-                            shot_number=shot_dict.get("shot_number"),
-                        )
-                        logger.info(
-                            f"Shot {shot_id}: saved continuity frame for '{character_slug}' "
-                            f"(scene {scene_number})"
-                        )
-                    except Exception as e:
-                        logger.warning(f"Shot {shot_id}: failed to save continuity frame: {e}")
-
-                logger.info(f"Shot {shot_id}: generated in {gen_time:.0f}s → {_review}")
-
-                await event_bus.emit(SHOT_GENERATED, {
-                    "shot_id": str(shot_id),
-                    "scene_id": str(scene_id),
-                    "project_id": project_id,
-                    "character_slug": character_slug,
-                    "video_engine": shot_engine,
-                    "generation_time": gen_time,
-                    "video_path": video_path,
-                })
-
-            except Exception as e:
-                logger.error(f"Shot {shot_id} generation failed: {e}")
-                await conn.execute(
-                    "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
-                    shot_id, str(e)[:500],
-                )
-
-            await conn.execute(
-                "UPDATE scenes SET completed_shots = $2 WHERE id = $1",
-                scene_id, completed_count,
-            )
+                    logger.warning(f"Shot {shot['id']}: failed to save continuity frame: {e}")
 
         # Check if all shots are approved — only then assemble
         all_approved = False
@@ -1771,6 +1858,7 @@ async def _generate_scene_impl(scene_id: str, auto_approve: bool = False):
                 """, scene_id)
 
         if all_approved:
+            job_stage("assembly")
             await _assemble_scene(conn, scene_id, completed_videos, shots)
         elif not completed_videos:
             await conn.execute(
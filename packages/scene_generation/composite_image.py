@@ -16,15 +16,15 @@ Mask files (pre-generated, stored in ComfyUI/input/):
   - mask_right_half.png: right half white, left half black (544x704)
 """
 
-import json
 import logging
 import random
 import shutil
 import time
-import urllib.request
 from pathlib import Path
 
-from packages.core.config import BASE_PATH, COMFYUI_URL, COMFYUI_INPUT_DIR, COMFYUI_OUTPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client, output_files
+from packages.core.config import BASE_PATH, COMFYUI_INPUT_DIR, COMFYUI_OUTPUT_DIR
+from packages.lora_training.approval_index import get_index
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +53,7 @@ async def pick_best_reference(conn, character_slug: str, project_id: int) -> Pat
     """Pick the best approved image for a character as IP-Adapter reference.
 
     Prefers images with higher quality_score from character_approvals,
-    falls back to random approved image from approval_status.json.
+    falls back to random approved image from the approval index.
     """
     # Try DB approvals with quality score first
     try:
@@ -73,29 +73,24 @@ async def pick_best_reference(conn, character_slug: str, project_id: int) -> Pat
     except Exception:
         pass
 
-    # Fallback: pick from approval_status.json
-    status_file = BASE_PATH / character_slug / "approval_status.json"
-    if not status_file.exists():
+    # Fallback: pick from the approval index
+    index = get_index(BASE_PATH)
+    slug = character_slug
+    approved = index.names_with_status(slug, "approved", on_disk=True)
+    if not approved:
+        # The dataset dir can differ from the slug by underscores only
+        key = character_slug.replace("_", "")
         for d in BASE_PATH.iterdir():
-            if d.is_dir() and d.name.replace("_", "") == character_slug.replace("_", ""):
-                status_file = d / "approval_status.json"
+            if d.is_dir() and d.name != slug and d.name.replace("_", "") == key:
+                slug = d.name
+                approved = index.names_with_status(slug, "approved", on_disk=True)
                 break
-    if not status_file.exists():
-        logger.warning(f"No approval_status.json for {character_slug}")
-        return None
-
-    with open(status_file) as f:
-        statuses = json.load(f)
-
-    approved = [k for k, v in statuses.items() if v == "approved"]
     if not approved:
         logger.warning(f"No approved images for {character_slug}")
         return None
 
     chosen = random.choice(approved)
-    img_dir = BASE_PATH / character_slug / "images"
-    if not img_dir.exists():
-        img_dir = status_file.parent / "images"
+    img_dir = BASE_PATH / slug / "images"
     img_path = img_dir / chosen
     if img_path.exists():
         return img_path
@@ -289,47 +284,26 @@ def build_composite_workflow(
     return workflow, output_prefix
 
 
-def submit_workflow(workflow: dict) -> str:
+async def submit_workflow(workflow: dict) -> str:
     """Submit a workflow to ComfyUI and return the prompt_id."""
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = urllib.request.urlopen(req, timeout=30)
-    result = json.loads(resp.read())
-    return result.get("prompt_id", "")
-
-
-def poll_completion(prompt_id: str, timeout: int = 300) -> Path | None:
-    """Poll ComfyUI until the prompt completes. Return the output image path."""
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            url = f"{COMFYUI_URL}/history/{prompt_id}"
-            req = urllib.request.Request(url)
-            resp = urllib.request.urlopen(req, timeout=10)
-            history = json.loads(resp.read())
-
-            if prompt_id in history:
-                outputs = history[prompt_id].get("outputs", {})
-                for node_id, node_out in outputs.items():
-                    images = node_out.get("images", [])
-                    if images:
-                        img = images[0]
-                        subfolder = img.get("subfolder", "")
-                        filename = img["filename"]
-                        if subfolder:
-                            return Path(COMFYUI_OUTPUT_DIR) / subfolder / filename
-                        return Path(COMFYUI_OUTPUT_DIR) / filename
-                logger.warning(f"Prompt {prompt_id} completed but no images in output")
-                return None
-        except Exception:
-            pass
-        time.sleep(3)
-
-    logger.error(f"Prompt {prompt_id} timed out after {timeout}s")
+    return await get_comfyui_client().submit(workflow)
+
+
+async def poll_completion(prompt_id: str, timeout: int = 300) -> Path | None:
+    """Wait for ComfyUI to finish the prompt. Return the output image path."""
+    entry = await get_comfyui_client().wait_for_completion(prompt_id, timeout=timeout)
+    if entry is None:
+        logger.error(f"Prompt {prompt_id} timed out after {timeout}s")
+        return None
+
+    images = output_files(entry, ("images",))
+    if images:
+        img = images[0]
+        subfolder = img.get("subfolder", "")
+        if subfolder:
+            return Path(COMFYUI_OUTPUT_DIR) / subfolder / img["filename"]
+        return Path(COMFYUI_OUTPUT_DIR) / img["filename"]
+    logger.warning(f"Prompt {prompt_id} completed but no images in output")
     return None
 
 
@@ -402,13 +376,13 @@ async def generate_composite_source(
     )
 
     logger.info(f"Submitting composite workflow: {char_a} + {char_b}")
-    prompt_id = submit_workflow(workflow)
+    prompt_id = await submit_workflow(workflow)
     if not prompt_id:
         logger.error("Failed to submit composite workflow")
         return None
 
     logger.info(f"Composite workflow submitted: {prompt_id}, polling...")
-    result = poll_completion(prompt_id, timeout=120)
+    result = await poll_completion(prompt_id, timeout=120)
 
     if result and result.exists():
         logger.info(f"Composite image generated: {result}")
@@ -1,6 +1,5 @@
 """FramePack I2V workflow building and generation endpoints."""
 
-import json
 import logging
 import shutil
 from math import ceil
@@ -8,7 +7,9 @@ from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.config import BASE_PATH, COMFYUI_URL, COMFYUI_INPUT_DIR, COMFYUI_OUTPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client
+from packages.core.config import BASE_PATH, COMFYUI_INPUT_DIR, COMFYUI_OUTPUT_DIR
+from packages.lora_training.approval_index import get_index
 from packages.core.db import get_char_project_map
 from packages.core.models import FramePackRequest
 
@@ -70,18 +71,9 @@ FRAMEPACK_MODELS = {
 }
 
 
-def _submit_comfyui_workflow(workflow: dict) -> str:
-    """Submit a workflow to ComfyUI and return the prompt_id."""
-    import urllib.request
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = urllib.request.urlopen(req, timeout=30)
-    result = json.loads(resp.read())
-    return result.get("prompt_id", "")
+async def _submit_comfyui_workflow(workflow: dict, base_url: str | None = None) -> str:
+    """Submit a workflow to ComfyUI (default backend unless base_url) and return the prompt_id."""
+    return await get_comfyui_client(base_url).submit(workflow)
 
 
 def build_framepack_workflow(
@@ -318,15 +310,7 @@ async def generate_framepack(body: FramePackRequest):
     if not image_filename:
         # Pick the first approved image for this character
         char_images_dir = BASE_PATH / body.character_slug / "images"
-        approval_file = BASE_PATH / body.character_slug / "approval_status.json"
-        approved_images = []
-        if approval_file.exists():
-            with open(approval_file) as f:
-                approvals = json.load(f)
-            approved_images = [
-                name for name, st in approvals.items()
-                if st == "approved" or (isinstance(st, dict) and st.get("status") == "approved")
-            ]
+        approved_images = get_index(BASE_PATH).names_with_status(body.character_slug, "approved")
         if not approved_images and char_images_dir.exists():
             # Fall back to any image in the dataset
             approved_images = [p.name for p in sorted(char_images_dir.glob("*.png"))[:1]]
@@ -358,7 +342,7 @@ async def generate_framepack(body: FramePackRequest):
     )
 
     try:
-        prompt_id = _submit_comfyui_workflow(workflow_data["prompt"])
+        prompt_id = await _submit_comfyui_workflow(workflow_data["prompt"])
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ComfyUI submission failed: {e}")
 
@@ -377,40 +361,6 @@ async def generate_framepack(body: FramePackRequest):
 @router.get("/generate/framepack/{prompt_id}/status")
 async def get_framepack_status(prompt_id: str):
     """Check FramePack generation progress (poll-based fallback)."""
-    import urllib.request
-    try:
-        # Check queue
-        req = urllib.request.Request(f"{COMFYUI_URL}/queue")
-        resp = urllib.request.urlopen(req, timeout=10)
-        queue_data = json.loads(resp.read())
-
-        for job in queue_data.get("queue_running", []):
-            if prompt_id in str(job):
-                return {"status": "running", "progress": 0.5}
-
-        for job in queue_data.get("queue_pending", []):
-            if prompt_id in str(job):
-                return {"status": "pending", "progress": 0.1}
-
-        # Check history
-        req = urllib.request.Request(f"{COMFYUI_URL}/history/{prompt_id}")
-        resp = urllib.request.urlopen(req, timeout=10)
-        history = json.loads(resp.read())
-
-        if prompt_id in history:
-            outputs = history[prompt_id].get("outputs", {})
-            videos = []
-            for node_output in outputs.values():
-                for key in ("videos", "gifs", "images"):
-                    for item in node_output.get(key, []):
-                        videos.append(item.get("filename"))
-            return {
-                "status": "completed",
-                "progress": 1.0,
-                "output_files": videos,
-            }
-
-        return {"status": "unknown", "progress": 0.0}
-    except Exception as e:
-        logger.warning(f"FramePack progress check failed: {e}")
-        return {"status": "error", "progress": 0.0, "error": str(e)}
+    progress = await get_comfyui_client().progress(prompt_id)
+    progress.pop("images", None)
+    return progress
@@ -11,13 +11,12 @@ Pipeline:
 Optional character HunyuanVideo LoRA injected via FramePackLoraSelect node.
 """
 
-import asyncio
-import json
 import logging
 import time
 from pathlib import Path
 
-from packages.core.config import COMFYUI_URL, COMFYUI_OUTPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client, history_error, output_files
+from packages.core.config import COMFYUI_OUTPUT_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -292,8 +291,6 @@ async def refine_wan_video(
 
     Returns the path to the refined video, or None on failure.
     """
-    import urllib.request
-
     if not Path(wan_video_path).exists():
         logger.warning(f"V2V refine: source video not found: {wan_video_path}")
         return None
@@ -314,16 +311,9 @@ async def refine_wan_video(
     )
 
     # Submit to ComfyUI
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
+    client = get_comfyui_client()
     try:
-        resp = urllib.request.urlopen(req, timeout=30)
-        result = json.loads(resp.read())
-        prompt_id = result.get("prompt_id", "")
+        prompt_id = await client.submit(workflow)
     except Exception as e:
         logger.warning(f"V2V refine: ComfyUI submission failed: {e}")
         return None
@@ -334,52 +324,28 @@ async def refine_wan_video(
 
     logger.info(f"V2V refine: submitted prompt_id={prompt_id}, prefix={prefix}")
 
-    # Poll for completion (reuse same logic as builder.poll_comfyui_completion)
     timeout_seconds = 3600  # 60 min — long clips on RTX 3060 can take 40+ min
-    start = time.time()
-    while (time.time() - start) < timeout_seconds:
-        try:
-            hist_req = urllib.request.Request(f"{COMFYUI_URL}/history/{prompt_id}")
-            hist_resp = urllib.request.urlopen(hist_req, timeout=10)
-            history = json.loads(hist_resp.read())
-            if prompt_id in history:
-                entry = history[prompt_id]
-                status_info = entry.get("status", {})
-                status_str = status_info.get("status_str", "unknown")
-                if status_str == "error":
-                    msgs = status_info.get("messages", [])
-                    err = ""
-                    for msg in msgs:
-                        if isinstance(msg, list) and len(msg) >= 2 and "error" in str(msg[0]).lower():
-                            err = str(msg[1])[:200]
-                    logger.warning(f"V2V refine: ComfyUI error: {err or 'unknown'}")
-                    return None
-                # Extract output files
-                outputs = entry.get("outputs", {})
-                videos = []
-                for node_output in outputs.values():
-                    for key in ("videos", "gifs", "images"):
-                        for item in node_output.get(key, []):
-                            fn = item.get("filename")
-                            if fn:
-                                videos.append(fn)
-                if videos:
-                    refined_path = str(COMFYUI_OUTPUT_DIR / videos[0])
-                    logger.info(f"V2V refine: completed → {videos[0]}")
-                    return refined_path
-                if status_str == "success":
-                    # Fallback: scan output dir for prefix match
-                    import glob as _glob
-                    matches = _glob.glob(str(COMFYUI_OUTPUT_DIR / f"{prefix}*"))
-                    mp4s = [f for f in matches if f.endswith((".mp4", ".webm"))]
-                    if mp4s:
-                        logger.info(f"V2V refine: found via prefix scan → {Path(mp4s[0]).name}")
-                        return mp4s[0]
-                    logger.warning("V2V refine: completed but no output files found")
-                    return None
-        except Exception:
-            pass
-        await asyncio.sleep(5)
-
-    logger.warning(f"V2V refine: timed out after {timeout_seconds}s")
+    entry = await client.wait_for_completion(prompt_id, timeout=timeout_seconds)
+    if entry is None:
+        logger.warning(f"V2V refine: timed out after {timeout_seconds}s")
+        return None
+
+    err = history_error(entry)
+    if err:
+        logger.warning(f"V2V refine: ComfyUI error: {err}")
+        return None
+    videos = [f["filename"] for f in output_files(entry)]
+    if videos:
+        refined_path = str(COMFYUI_OUTPUT_DIR / videos[0])
+        logger.info(f"V2V refine: completed → {videos[0]}")
+        return refined_path
+    if (entry.get("status") or {}).get("status_str") == "success":
+        # Fallback: scan output dir for prefix match
+        import glob as _glob
+        matches = _glob.glob(str(COMFYUI_OUTPUT_DIR / f"{prefix}*"))
+        mp4s = [f for f in matches if f.endswith((".mp4", ".webm"))]
+        if mp4s:
+            logger.info(f"V2V refine: found via prefix scan → {Path(mp4s[0]).name}")
+            return mp4s[0]
+    logger.warning("V2V refine: completed but no output files found")
     return None
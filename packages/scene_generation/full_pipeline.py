@@ -15,7 +15,7 @@ from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.events import event_bus
 
 logger = logging.getLogger(__name__)
@@ -49,7 +49,7 @@ async def produce_episode(
         episode_number: Episode number to produce
         publish: If True, publish to Jellyfin after assembly
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # 1. Find the episode
         episode = await conn.fetchrow("""
@@ -132,7 +132,7 @@ async def produce_episode(
             )
 
             # Reset shots to pending for this scene
-            conn = await connect_direct()
+            conn = await connect_pooled()
             try:
                 await conn.execute(
                     "UPDATE shots SET status = 'pending', error_message = NULL "
@@ -151,7 +151,7 @@ async def produce_episode(
             await generate_scene(scene_id, auto_approve=True)
 
     # 5. Verify all scenes completed
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         final_scenes = await conn.fetch("""
             SELECT s.id, s.title, s.generation_status, s.final_video_path
@@ -10,7 +10,6 @@ Supports both text-to-video and image-to-video modes.
 Unlike FramePack, LTX-Video supports native LoRA injection.
 """
 
-import json
 import logging
 import shutil
 import time
@@ -18,7 +17,9 @@ from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.config import BASE_PATH, COMFYUI_URL, COMFYUI_INPUT_DIR, COMFYUI_OUTPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client
+from packages.core.config import BASE_PATH, COMFYUI_INPUT_DIR, COMFYUI_OUTPUT_DIR
+from packages.lora_training.approval_index import get_index
 from packages.core.db import get_char_project_map
 
 logger = logging.getLogger(__name__)
@@ -33,18 +34,9 @@ LTX_MODELS = {
 }
 
 
-def _submit_comfyui_workflow(workflow: dict) -> str:
-    """Submit a workflow to ComfyUI and return the prompt_id."""
-    import urllib.request
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = urllib.request.urlopen(req, timeout=30)
-    result = json.loads(resp.read())
-    return result.get("prompt_id", "")
+async def _submit_comfyui_workflow(workflow: dict, base_url: str | None = None) -> str:
+    """Submit a workflow to ComfyUI (default backend unless base_url) and return the prompt_id."""
+    return await get_comfyui_client(base_url).submit(workflow)
 
 
 def build_ltx_workflow(
@@ -359,15 +351,7 @@ async def generate_ltx_video(
         image_filename = image_path
         if not image_filename:
             char_images_dir = BASE_PATH / character_slug / "images"
-            approval_file = BASE_PATH / character_slug / "approval_status.json"
-            approved_images = []
-            if approval_file.exists():
-                with open(approval_file) as f:
-                    approvals = json.load(f)
-                approved_images = [
-                    name for name, st in approvals.items()
-                    if st == "approved" or (isinstance(st, dict) and st.get("status") == "approved")
-                ]
+            approved_images = get_index(BASE_PATH).names_with_status(character_slug, "approved")
             if not approved_images and char_images_dir.exists():
                 approved_images = [p.name for p in sorted(char_images_dir.glob("*.png"))[:1]]
             if not approved_images:
@@ -398,7 +382,7 @@ async def generate_ltx_video(
     )
 
     try:
-        prompt_id = _submit_comfyui_workflow(workflow)
+        prompt_id = await _submit_comfyui_workflow(workflow)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ComfyUI submission failed: {e}")
 
@@ -420,38 +404,6 @@ async def generate_ltx_video(
 @router.get("/generate/ltx/{prompt_id}/status")
 async def get_ltx_status(prompt_id: str):
     """Check LTX-Video generation progress."""
-    import urllib.request
-    try:
-        req = urllib.request.Request(f"{COMFYUI_URL}/queue")
-        resp = urllib.request.urlopen(req, timeout=10)
-        queue_data = json.loads(resp.read())
-
-        for job in queue_data.get("queue_running", []):
-            if prompt_id in str(job):
-                return {"status": "running", "progress": 0.5}
-
-        for job in queue_data.get("queue_pending", []):
-            if prompt_id in str(job):
-                return {"status": "pending", "progress": 0.1}
-
-        req = urllib.request.Request(f"{COMFYUI_URL}/history/{prompt_id}")
-        resp = urllib.request.urlopen(req, timeout=10)
-        history = json.loads(resp.read())
-
-        if prompt_id in history:
-            outputs = history[prompt_id].get("outputs", {})
-            videos = []
-            for node_output in outputs.values():
-                for key in ("videos", "gifs", "images"):
-                    for item in node_output.get(key, []):
-                        videos.append(item.get("filename"))
-            return {
-                "status": "completed",
-                "progress": 1.0,
-                "output_files": videos,
-            }
-
-        return {"status": "unknown", "progress": 0.0}
-    except Exception as e:
-        logger.warning(f"LTX progress check failed: {e}")
-        return {"status": "error", "progress": 0.0, "error": str(e)}
+    progress = await get_comfyui_client().progress(prompt_id)
+    progress.pop("images", None)
+    return progress
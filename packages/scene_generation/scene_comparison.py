@@ -15,7 +15,7 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException
 
 from packages.core.config import COMFYUI_OUTPUT_DIR
-from packages.core.db import connect_direct, log_model_change
+from packages.core.db import connect_pooled, log_model_change
 from packages.core.audit import log_decision, log_generation, update_generation_quality
 from packages.core.models import VideoCompareRequest
 from .builder import (
@@ -77,7 +77,7 @@ async def _run_video_compare(request: VideoCompareRequest, image_filename: str):
                     negative_text=request.negative_prompt,
                     gpu_memory_preservation=eng.gpu_memory_preservation,
                 )
-                prompt_id = _submit_comfyui_workflow(workflow_data["prompt"])
+                prompt_id = await _submit_comfyui_workflow(workflow_data["prompt"])
 
             elif engine_name == "ltx":
                 fps = 24
@@ -93,7 +93,7 @@ async def _run_video_compare(request: VideoCompareRequest, image_filename: str):
                     lora_name=eng.lora_name,
                     lora_strength=eng.lora_strength,
                 )
-                prompt_id = _submit_ltx_workflow(workflow)
+                prompt_id = await _submit_ltx_workflow(workflow)
 
             else:
                 entry["status"] = "error"
@@ -7,23 +7,29 @@ import asyncio
 import json
 import logging
 import uuid
+from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import FileResponse
 
 from packages.core.config import BASE_PATH, COMFYUI_OUTPUT_DIR
-from packages.core.db import connect_direct, get_char_project_map
+from packages.lora_training.approval_index import get_index
+from packages.core.db import connect_pooled, get_char_project_map
 from packages.core.events import event_bus, SCENE_UPDATED, SHOT_UPDATED
+from packages.core.job_queue import PRIORITY_HIGH, SCENE_GENERATION, enqueue, wake_workers
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
+from packages.core.response_cache import ResponseCache, decode_cursor, encode_cursor
+from packages.core.video_streaming import hls_response, range_file_response, video_path_cache
 from packages.core.models import (
     SceneCreateRequest, ShotCreateRequest, ShotUpdateRequest,
     SceneUpdateRequest, SceneAudioRequest,
 )
 from pydantic import BaseModel
 from .builder import (
-    SCENE_OUTPUT_DIR, _scene_generation_tasks,
+    SCENE_OUTPUT_DIR, scene_generation_active,
     extract_last_frame, concat_videos, copy_to_comfyui_input,
-    poll_comfyui_completion, generate_scene, apply_scene_audio,
+    poll_comfyui_completion, apply_scene_audio,
 )
 from .engine_selector import VALID_ENGINES
 from .framepack import (
@@ -35,66 +41,123 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Concurrency guard: only one scene generation at a time (GPU constraint)
-_scene_gen_semaphore = asyncio.Semaphore(1)
+# Scene listing responses — dropped on scene/shot writes here and on
+# SCENE_UPDATED/SHOT_UPDATED from elsewhere; the cache TTL covers the rest
+scene_list_cache = ResponseCache("scenes")
+
+
+def _invalidate_scene_lists(data: dict | None = None):
+    scene_list_cache.invalidate((data or {}).get("project_id"))
+
+
+event_bus.subscribe(SCENE_UPDATED, _invalidate_scene_lists)
+event_bus.subscribe(SHOT_UPDATED, _invalidate_scene_lists)
 
 
 @router.get("/scenes")
-async def list_scenes(project_id: int):
-    """List scenes for a project."""
-    conn = await connect_direct()
-    try:
-        rows = await conn.fetch("""
-            SELECT id, project_id, title, description, location, time_of_day,
-                   weather, mood, generation_status, target_duration_seconds,
-                   actual_duration_seconds, total_shots, completed_shots,
-                   final_video_path, created_at,
-                   audio_track_id, audio_track_name, audio_track_artist,
-                   audio_preview_url, audio_fade_in, audio_fade_out, audio_start_offset,
-                   audio_auto_duck, audio_generation_mode, audio_source_playlist_id
-            FROM scenes WHERE project_id = $1
-            ORDER BY scene_number NULLS LAST, created_at
-        """, project_id)
-        scenes = []
-        for r in rows:
-            shot_count = await conn.fetchval(
-                "SELECT COUNT(*) FROM shots WHERE scene_id = $1", r["id"])
-            scene_data = {
-                "id": str(r["id"]), "project_id": r["project_id"],
-                "title": r["title"], "description": r["description"],
-                "location": r["location"], "time_of_day": r["time_of_day"],
-                "weather": r["weather"], "mood": r["mood"],
-                "generation_status": r["generation_status"] or "draft",
-                "target_duration_seconds": r["target_duration_seconds"],
-                "actual_duration_seconds": r["actual_duration_seconds"],
-                "total_shots": shot_count,
-                "completed_shots": r["completed_shots"] or 0,
-                "final_video_path": r["final_video_path"],
-                "created_at": r["created_at"].isoformat() if r["created_at"] else None,
+async def list_scenes(
+    request: Request, project_id: int,
+    limit: int | None = Query(None, ge=1, le=500), after: str | None = None,
+):
+    """List scenes for a project.
+
+    One query (shot counts via a lateral join). With limit, pages are keyset
+    paginated: pass the returned next_cursor as after. Responses carry an ETag.
+    """
+    cursor = decode_cursor(after) if after else None
+
+    async def build():
+        conn = await connect_pooled()
+        try:
+            return await _fetch_scene_page(conn, project_id, limit, cursor)
+        finally:
+            await conn.close()
+
+    return await scene_list_cache.respond(request, project_id, (after, limit), build)
+
+
+# Sort key for keyset paging: scene_number NULLS LAST, then created_at, then id
+_SCENE_SORT = "COALESCE(s.scene_number, 2147483647), s.created_at, s.id"
+
+
+async def _fetch_scene_page(conn, project_id: int, limit: int | None, cursor: list | None) -> dict:
+    params: list = [project_id]
+    where = "s.project_id = $1"
+    if cursor:
+        if len(cursor) != 3:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where += f" AND ({_SCENE_SORT}) > ($2, $3::timestamp, $4::uuid)"
+        params += [cursor[0], datetime.fromisoformat(cursor[1]), uuid.UUID(cursor[2])]
+    page = ""
+    if limit:
+        params.append(limit + 1)
+        page = f"LIMIT ${len(params)}"
+    rows = await conn.fetch(f"""
+        SELECT s.id, s.project_id, s.scene_number, s.title, s.description, s.location,
+               s.time_of_day, s.weather, s.mood, s.generation_status,
+               s.target_duration_seconds, s.actual_duration_seconds,
+               s.completed_shots, s.final_video_path, s.created_at,
+               s.audio_track_id, s.audio_track_name, s.audio_track_artist,
+               s.audio_preview_url, s.audio_fade_in, s.audio_fade_out, s.audio_start_offset,
+               s.audio_auto_duck, s.audio_generation_mode, s.audio_source_playlist_id,
+               sc.shot_count
+        FROM scenes s
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) AS shot_count FROM shots WHERE shots.scene_id = s.id
+        ) sc ON true
+        WHERE {where}
+        ORDER BY {_SCENE_SORT}
+        {page}
+    """, *params)
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([
+            last["scene_number"] if last["scene_number"] is not None else 2147483647,
+            last["created_at"].isoformat(), str(last["id"]),
+        ])
+
+    scenes = []
+    for r in rows:
+        scene_data = {
+            "id": str(r["id"]), "project_id": r["project_id"],
+            "title": r["title"], "description": r["description"],
+            "location": r["location"], "time_of_day": r["time_of_day"],
+            "weather": r["weather"], "mood": r["mood"],
+            "generation_status": r["generation_status"] or "draft",
+            "target_duration_seconds": r["target_duration_seconds"],
+            "actual_duration_seconds": r["actual_duration_seconds"],
+            "total_shots": r["shot_count"] or 0,
+            "completed_shots": r["completed_shots"] or 0,
+            "final_video_path": r["final_video_path"],
+            "created_at": r["created_at"].isoformat() if r["created_at"] else None,
+        }
+        if r["audio_track_id"]:
+            scene_data["audio"] = {
+                "track_id": r["audio_track_id"],
+                "track_name": r["audio_track_name"],
+                "track_artist": r["audio_track_artist"],
+                "preview_url": r["audio_preview_url"],
+                "fade_in": r["audio_fade_in"],
+                "fade_out": r["audio_fade_out"],
+                "start_offset": r["audio_start_offset"],
+                "auto_duck": r["audio_auto_duck"] or False,
+                "generation_mode": r["audio_generation_mode"],
+                "source_playlist_id": r["audio_source_playlist_id"],
             }
-            if r["audio_track_id"]:
-                scene_data["audio"] = {
-                    "track_id": r["audio_track_id"],
-                    "track_name": r["audio_track_name"],
-                    "track_artist": r["audio_track_artist"],
-                    "preview_url": r["audio_preview_url"],
-                    "fade_in": r["audio_fade_in"],
-                    "fade_out": r["audio_fade_out"],
-                    "start_offset": r["audio_start_offset"],
-                    "auto_duck": r["audio_auto_duck"] or False,
-                    "generation_mode": r["audio_generation_mode"],
-                    "source_playlist_id": r["audio_source_playlist_id"],
-                }
-            scenes.append(scene_data)
-        return {"scenes": scenes}
-    finally:
-        await conn.close()
+        scenes.append(scene_data)
+    result = {"scenes": scenes}
+    if limit:
+        result["next_cursor"] = next_cursor
+    return result
 
 
 @router.post("/scenes")
 async def create_scene(body: SceneCreateRequest):
     """Create a new scene."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         async with conn.transaction():
             await conn.execute("SELECT pg_advisory_xact_lock($1)", body.project_id)
@@ -110,6 +173,7 @@ async def create_scene(body: SceneCreateRequest):
             """, body.project_id, body.title, body.description, body.location,
                 body.time_of_day, body.weather, body.mood, body.target_duration_seconds,
                 scene_num)
+        scene_list_cache.invalidate(body.project_id)
         return {
             "id": str(row["id"]), "scene_number": scene_num,
             "created_at": row["created_at"].isoformat() if row["created_at"] else None,
@@ -158,7 +222,7 @@ async def _persist_scenes_and_shots(
 
     Returns list of saved scenes with their DB ids and shot ids.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Build character name→slug map for dialogue assignment
         chars = await conn.fetch(
@@ -280,7 +344,7 @@ async def generate_shots_for_scene(scene_id: str):
     Uses the scene description + project characters to plan shots via Ollama.
     """
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow(
             "SELECT s.*, p.name as project_name, p.id as pid, p.genre "
@@ -306,9 +370,6 @@ async def generate_shots_for_scene(scene_id: str):
         await conn.close()
 
     # Build prompt for shot breakdown
-    import httpx
-    from packages.core.config import OLLAMA_URL
-
     prompt = f"""You are a professional anime scene planner. Break this scene into 3-5 concrete production shots.
 
 Scene: {scene['title']}
@@ -330,20 +391,11 @@ For each shot provide:
 
 Respond with ONLY a valid JSON array. No markdown, no explanation."""
 
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": "gemma3:12b",
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.7, "num_predict": 2048},
-            },
-        )
-        resp.raise_for_status()
-        result = resp.json()
-
-    raw_text = result.get("response", "").strip()
+    # Sampled at temperature 0.7 — a re-run should get a fresh breakdown, so uncached
+    raw_text = (await llm_gateway.generate(
+        "gemma3:12b", prompt, caller="shot_breakdown", priority=PRIORITY_BATCH,
+        options={"temperature": 0.7, "num_predict": 2048}, timeout=120, cache=False,
+    )).strip()
     if "```" in raw_text:
         parts = raw_text.split("```")
         for part in parts:
@@ -359,7 +411,7 @@ Respond with ONLY a valid JSON array. No markdown, no explanation."""
         raise HTTPException(status_code=502, detail="AI returned non-array response")
 
     # Build char slug map
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         char_slug_map = {c["name"].lower(): _name_to_slug(c["name"])
                          for c in chars}
@@ -401,7 +453,7 @@ Respond with ONLY a valid JSON array. No markdown, no explanation."""
 @router.post("/scenes/generate-shots-all")
 async def generate_shots_for_all_empty_scenes(project_id: int):
     """Generate shot breakdowns for ALL scenes in a project that have 0 shots."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT s.id, s.title
@@ -449,7 +501,7 @@ async def get_shot_recommendations(scene_id: str, top_n: int = 5):
     from .image_recommender import recommend_for_scene
 
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow(
             "SELECT project_id FROM scenes WHERE id = $1", sid)
@@ -470,21 +522,14 @@ async def get_shot_recommendations(scene_id: str, top_n: int = 5):
 
         char_map = await get_char_project_map()
         approved: dict[str, list[str]] = {}
+        index = get_index(BASE_PATH)
         for slug, info in char_map.items():
-            approval_file = BASE_PATH / slug / "approval_status.json"
             images_dir = BASE_PATH / slug / "images"
             if not images_dir.exists():
                 continue
-            if approval_file.exists():
-                with open(approval_file) as f:
-                    statuses = json.load(f)
-                imgs = [
-                    name for name, st in statuses.items()
-                    if (st == "approved" or (isinstance(st, dict) and st.get("status") == "approved"))
-                    and (images_dir / name).exists()
-                ]
-                if imgs:
-                    approved[slug] = sorted(imgs)
+            imgs = index.names_with_status(slug, "approved", on_disk=True)
+            if imgs:
+                approved[slug] = imgs
 
         recommendations = recommend_for_scene(BASE_PATH, shot_list, approved, top_n)
         return {"scene_id": scene_id, "shots": recommendations}
@@ -496,7 +541,7 @@ async def get_shot_recommendations(scene_id: str, top_n: int = 5):
 async def get_scene(scene_id: str):
     """Get scene detail with all shots."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow("""
             SELECT s.*, p.name as project_name
@@ -573,7 +618,7 @@ async def get_scene(scene_id: str):
 async def update_scene(scene_id: str, body: SceneUpdateRequest):
     """Update scene metadata."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         updates, params, idx = [], [], 2
         for field in ["title", "description", "location", "time_of_day", "weather", "mood", "target_duration_seconds", "post_interpolate_fps", "post_upscale_factor"]:
@@ -586,6 +631,7 @@ async def update_scene(scene_id: str, body: SceneUpdateRequest):
             return {"message": "No fields to update"}
         updates.append("updated_at = NOW()")
         await conn.execute(f"UPDATE scenes SET {', '.join(updates)} WHERE id = $1", sid, *params)
+        scene_list_cache.invalidate()
 
         # Emit scene updated event for NSM propagation
         changed_fields = [f for f in ["title", "description", "location", "time_of_day", "weather", "mood"] if getattr(body, f, None) is not None]
@@ -604,10 +650,11 @@ async def update_scene(scene_id: str, body: SceneUpdateRequest):
 async def delete_scene(scene_id: str):
     """Delete a scene and its shots."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("DELETE FROM shots WHERE scene_id = $1", sid)
         await conn.execute("DELETE FROM scenes WHERE id = $1", sid)
+        scene_list_cache.invalidate()
         return {"message": "Scene deleted"}
     finally:
         await conn.close()
@@ -617,7 +664,7 @@ async def delete_scene(scene_id: str):
 async def create_shot(scene_id: str, body: ShotCreateRequest):
     """Add a shot to a scene."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow("""
             INSERT INTO shots (scene_id, shot_number, source_image_path, shot_type,
@@ -633,6 +680,7 @@ async def create_shot(scene_id: str, body: ShotCreateRequest):
             body.seed, body.steps, body.use_f1,
             body.dialogue_text, body.dialogue_character_slug,
             body.transition_type, body.transition_duration, body.video_engine)
+        scene_list_cache.invalidate()
         return {"id": str(row["id"]), "shot_number": body.shot_number}
     finally:
         await conn.close()
@@ -642,7 +690,7 @@ async def create_shot(scene_id: str, body: ShotCreateRequest):
 async def update_shot(scene_id: str, shot_id: str, body: ShotUpdateRequest):
     """Update a shot."""
     shid = uuid.UUID(shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         updates, params, idx = [], [], 2
         for field, col in [
@@ -685,9 +733,10 @@ async def update_shot(scene_id: str, shot_id: str, body: ShotUpdateRequest):
 async def delete_shot(scene_id: str, shot_id: str):
     """Delete a shot."""
     shid = uuid.UUID(shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("DELETE FROM shots WHERE id = $1", shid)
+        scene_list_cache.invalidate()
         return {"message": "Shot deleted"}
     finally:
         await conn.close()
@@ -699,7 +748,7 @@ async def delete_shot(scene_id: str, shot_id: str):
 async def set_scene_audio(scene_id: str, body: SceneAudioRequest):
     """Assign an Apple Music track to a scene for audio overlay during assembly."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         exists = await conn.fetchval("SELECT 1 FROM scenes WHERE id = $1", sid)
         if not exists:
@@ -714,6 +763,7 @@ async def set_scene_audio(scene_id: str, body: SceneAudioRequest):
         """, sid, body.track_id, body.track_name, body.track_artist,
             body.preview_url, body.fade_in, body.fade_out, body.start_offset,
             body.auto_duck, body.generation_mode, body.source_playlist_id)
+        scene_list_cache.invalidate()
         return {
             "message": "Audio track assigned to scene",
             "scene_id": scene_id,
@@ -727,7 +777,7 @@ async def set_scene_audio(scene_id: str, body: SceneAudioRequest):
 async def remove_scene_audio(scene_id: str):
     """Remove audio track assignment from a scene."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         exists = await conn.fetchval("SELECT 1 FROM scenes WHERE id = $1", sid)
         if not exists:
@@ -741,6 +791,7 @@ async def remove_scene_audio(scene_id: str):
                    audio_source_playlist_id = NULL
             WHERE id = $1
         """, sid)
+        scene_list_cache.invalidate()
         return {"message": "Audio track removed from scene", "scene_id": scene_id}
     finally:
         await conn.close()
@@ -751,7 +802,7 @@ async def generate_scene_music(scene_id: str):
     """Generate AI music for a scene based on its mood via ACE-Step."""
     import urllib.request as _req
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow(
             "SELECT mood, target_duration_seconds, title FROM scenes WHERE id = $1", sid)
@@ -808,7 +859,7 @@ async def attach_scene_music(scene_id: str, body: dict):
     """Attach a generated or uploaded music file to a scene."""
     import urllib.request as _req
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         music_path = body.get("path")
 
@@ -845,22 +896,20 @@ async def attach_scene_music(scene_id: str, body: dict):
 
 @router.post("/scenes/{scene_id}/generate")
 async def generate_scene_endpoint(scene_id: str, auto_approve: bool = False):
-    """Start scene generation (background task).
+    """Queue scene generation on the durable job queue.
 
     Args:
         auto_approve: If True, auto-approve all completed shots so the full
             downstream pipeline (voice → music → assembly) fires without review.
     """
     sid = uuid.UUID(scene_id)
-    if scene_id in _scene_generation_tasks:
-        task = _scene_generation_tasks[scene_id]
-        if not task.done():
-            raise HTTPException(status_code=409, detail="Scene is already generating")
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow("SELECT * FROM scenes WHERE id = $1", sid)
         if not scene:
             raise HTTPException(status_code=404, detail="Scene not found")
+        if await scene_generation_active(conn, scene_id):
+            raise HTTPException(status_code=409, detail="Scene is already generating")
         shot_count = await conn.fetchval(
             "SELECT COUNT(*) FROM shots WHERE scene_id = $1", sid)
         if shot_count == 0:
@@ -878,23 +927,25 @@ async def generate_scene_endpoint(scene_id: str, auto_approve: bool = False):
             elif dur <= 3: est_minutes += 13
             elif dur <= 5: est_minutes += 25
             else: est_minutes += 30
+        job_id = await enqueue(
+            conn, SCENE_GENERATION, {"scene_id": scene_id, "auto_approve": auto_approve},
+            dedupe_key=scene_id, priority=PRIORITY_HIGH,
+        )
+        if job_id is None:
+            raise HTTPException(status_code=409, detail="Scene is already generating")
     finally:
         await conn.close()
 
-    async def _guarded_generate(scene_uuid, _auto_approve):
-        async with _scene_gen_semaphore:
-            await generate_scene(scene_uuid, auto_approve=_auto_approve)
-
-    task = asyncio.create_task(_guarded_generate(sid, auto_approve))
-    _scene_generation_tasks[scene_id] = task
-    return {"message": "Scene generation started", "total_shots": shot_count, "estimated_minutes": est_minutes, "auto_approve": auto_approve}
+    wake_workers()
+    return {"message": "Scene generation queued", "job_id": job_id, "total_shots": shot_count,
+            "estimated_minutes": est_minutes, "auto_approve": auto_approve}
 
 
 @router.get("/scenes/{scene_id}/status")
 async def get_scene_status(scene_id: str):
     """Poll generation progress for a scene."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow("""
             SELECT generation_status, total_shots, completed_shots,
@@ -939,12 +990,10 @@ async def regenerate_shot(scene_id: str, shot_id: str):
     """Regenerate a single failed shot."""
     shid = uuid.UUID(shot_id)
     sid = uuid.UUID(scene_id)
-    if scene_id in _scene_generation_tasks:
-        task = _scene_generation_tasks[scene_id]
-        if not task.done():
-            raise HTTPException(status_code=409, detail="Scene is currently generating")
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
+        if await scene_generation_active(conn, scene_id):
+            raise HTTPException(status_code=409, detail="Scene is currently generating")
         shot = await conn.fetchrow("SELECT * FROM shots WHERE id = $1 AND scene_id = $2", shid, sid)
         if not shot:
             raise HTTPException(status_code=404, detail="Shot not found")
@@ -966,7 +1015,7 @@ async def regenerate_shot(scene_id: str, shot_id: str):
             total_seconds=float(shot["duration_seconds"] or 3),
             steps=shot["steps"] or 25, use_f1=shot["use_f1"] or False,
             seed=shot["seed"], gpu_memory_preservation=6.0)
-        comfyui_prompt_id = _submit_comfyui_workflow(workflow_data["prompt"])
+        comfyui_prompt_id = await _submit_comfyui_workflow(workflow_data["prompt"])
         await conn.execute(
             "UPDATE shots SET status = 'generating', comfyui_prompt_id = $2, first_frame_path = $3 WHERE id = $1",
             shid, comfyui_prompt_id, first_frame)
@@ -977,7 +1026,7 @@ async def regenerate_shot(scene_id: str, shot_id: str):
         import time as _time
         start = _time.time()
         result = await poll_comfyui_completion(comfyui_prompt_id)
-        c = await connect_direct()
+        c = await connect_pooled()
         try:
             if result["status"] == "completed" and result["output_files"]:
                 vpath = str(COMFYUI_OUTPUT_DIR / result["output_files"][0])
@@ -987,6 +1036,7 @@ async def regenerate_shot(scene_id: str, shot_id: str):
                            last_frame_path = $3, generation_time_seconds = $4
                     WHERE id = $1
                 """, shid, vpath, last_frame, _time.time() - start)
+                video_path_cache.invalidate(("shot", shid))
             else:
                 await c.execute(
                     "UPDATE shots SET status = 'failed', error_message = $2 WHERE id = $1",
@@ -1001,7 +1051,7 @@ async def regenerate_shot(scene_id: str, shot_id: str):
 async def assemble_scene(scene_id: str):
     """Re-concatenate completed shots into scene video."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shots = await conn.fetch(
             "SELECT output_video_path FROM shots WHERE scene_id = $1 AND status = 'completed' "
@@ -1027,38 +1077,69 @@ async def assemble_scene(scene_id: str):
                    generation_status = CASE WHEN completed_shots = total_shots THEN 'completed' ELSE 'partial' END
             WHERE id = $1
         """, sid, scene_video_path, duration)
+        video_path_cache.invalidate(("scene", sid))
         return {"message": "Scene assembled", "video_path": scene_video_path,
                 "duration_seconds": duration, "shots_included": len(video_paths)}
     finally:
         await conn.close()
 
 
-@router.get("/scenes/{scene_id}/video")
-async def serve_scene_video(scene_id: str):
-    """Serve assembled scene video."""
+async def _scene_video_path(scene_id: str) -> str:
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
-    try:
-        path = await conn.fetchval("SELECT final_video_path FROM scenes WHERE id = $1", sid)
-    finally:
-        await conn.close()
+
+    async def fetch():
+        conn = await connect_pooled()
+        try:
+            return await conn.fetchval("SELECT final_video_path FROM scenes WHERE id = $1", sid)
+        finally:
+            await conn.close()
+
+    path = await video_path_cache.lookup(("scene", sid), fetch)
     if not path or not Path(path).exists():
         raise HTTPException(status_code=404, detail="Scene video not found")
-    return FileResponse(path, media_type="video/mp4", filename=f"scene_{scene_id}.mp4")
+    return path
 
 
-@router.get("/scenes/{scene_id}/shots/{shot_id}/video")
-async def serve_shot_video(scene_id: str, shot_id: str):
-    """Serve individual shot video."""
+async def _shot_video_path(shot_id: str) -> str:
     shid = uuid.UUID(shot_id)
-    conn = await connect_direct()
-    try:
-        path = await conn.fetchval("SELECT output_video_path FROM shots WHERE id = $1", shid)
-    finally:
-        await conn.close()
+
+    async def fetch():
+        conn = await connect_pooled()
+        try:
+            return await conn.fetchval("SELECT output_video_path FROM shots WHERE id = $1", shid)
+        finally:
+            await conn.close()
+
+    path = await video_path_cache.lookup(("shot", shid), fetch)
     if not path or not Path(path).exists():
         raise HTTPException(status_code=404, detail="Shot video not found")
-    return FileResponse(path, media_type="video/mp4", filename=f"shot_{shot_id}.mp4")
+    return path
+
+
+@router.get("/scenes/{scene_id}/video")
+async def serve_scene_video(scene_id: str, request: Request):
+    """Serve assembled scene video (supports Range requests for seeking)."""
+    path = await _scene_video_path(scene_id)
+    return range_file_response(request, path, filename=f"scene_{scene_id}.mp4")
+
+
+@router.get("/scenes/{scene_id}/video/hls/{name}")
+async def serve_scene_video_hls(scene_id: str, name: str):
+    """HLS playlist (index.m3u8) or segment for the assembled scene video."""
+    return await hls_response(await _scene_video_path(scene_id), name)
+
+
+@router.get("/scenes/{scene_id}/shots/{shot_id}/video")
+async def serve_shot_video(scene_id: str, shot_id: str, request: Request):
+    """Serve individual shot video (supports Range requests for seeking)."""
+    path = await _shot_video_path(shot_id)
+    return range_file_response(request, path, filename=f"shot_{shot_id}.mp4")
+
+
+@router.get("/scenes/{scene_id}/shots/{shot_id}/video/hls/{name}")
+async def serve_shot_video_hls(scene_id: str, shot_id: str, name: str):
+    """HLS playlist (index.m3u8) or segment for a shot video."""
+    return await hls_response(await _shot_video_path(shot_id), name)
 
 
 @router.post("/scenes/{scene_id}/synthesize-dialogue")
@@ -1072,7 +1153,7 @@ async def synthesize_scene_dialogue_endpoint(scene_id: str):
     from .scene_audio import build_scene_dialogue
 
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Check if already exists
         existing = await conn.fetchval("SELECT dialogue_audio_path FROM scenes WHERE id = $1", sid)
@@ -1091,7 +1172,7 @@ async def synthesize_scene_dialogue_endpoint(scene_id: str):
 async def serve_scene_dialogue_audio(scene_id: str):
     """Serve combined dialogue audio WAV for a scene."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         path = await conn.fetchval("SELECT dialogue_audio_path FROM scenes WHERE id = $1", sid)
     finally:
@@ -1105,7 +1186,7 @@ async def serve_scene_dialogue_audio(scene_id: str):
 async def get_scene_dialogue_status(scene_id: str):
     """Check if a scene has dialogue audio available."""
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "SELECT dialogue_audio_path FROM scenes WHERE id = $1", sid
@@ -1125,25 +1206,17 @@ async def get_approved_images_for_scene(
 ):
     """Get approved images for characters in a project (for shot source image picker)."""
     char_map = await get_char_project_map()
+    index = get_index(BASE_PATH)
     results = {}
     for slug, info in char_map.items():
         if project_id and info.get("project_name"):
             pass
-        approval_file = BASE_PATH / slug / "approval_status.json"
         images_dir = BASE_PATH / slug / "images"
         if not images_dir.exists():
             continue
-        approved = []
-        if approval_file.exists():
-            with open(approval_file) as f:
-                statuses = json.load(f)
-            for name, st in statuses.items():
-                if st == "approved" or (isinstance(st, dict) and st.get("status") == "approved"):
-                    if (images_dir / name).exists():
-                        approved.append(name)
+        approved = index.names_with_status(slug, "approved", on_disk=True)
         if not approved:
             continue
-        approved.sort()
 
         if include_metadata:
             from .image_recommender import batch_read_metadata
@@ -1183,7 +1256,7 @@ async def generate_dialogue_for_scene(scene_id: str):
     """Auto-generate dialogue for all shots in a scene that have characters but no dialogue."""
     from packages.voice_pipeline.synthesis import generate_dialogue_from_story
     sid = uuid.UUID(scene_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         scene = await conn.fetchrow(
             "SELECT title, description, mood FROM scenes WHERE id = $1", sid)
@@ -1259,7 +1332,7 @@ async def generate_dialogue_for_scene(scene_id: str):
 @router.get("/scenes/source-image-stats")
 async def source_image_stats(project_id: int):
     """Get source image effectiveness stats per character for a project."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT sie.character_slug,
@@ -1322,15 +1395,16 @@ async def source_image_stats(project_id: int):
 async def generate_all_scenes(project_id: int, auto_approve: bool = False):
     """Queue generation for all scenes that have shots but no final video.
 
-    Scenes are generated sequentially in episode order (episode_number, then
-    position within episode) to maintain narrative continuity.
-    Falls back to scene_number for scenes not linked to an episode.
+    Scenes are queued in episode order (episode_number, then position within
+    episode; scene_number for scenes not linked to an episode). Jobs of equal
+    priority are claimed FIFO, so a single worker still generates them in
+    narrative order; extra worker processes drain the queue in parallel.
 
     Args:
         auto_approve: If True, auto-approve all completed shots so voice synthesis,
             music generation, audio mixing, and scene assembly fire automatically.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT s.id, s.title, s.scene_number, s.generation_status,
@@ -1342,64 +1416,48 @@ async def generate_all_scenes(project_id: int, auto_approve: bool = False):
             LEFT JOIN episode_scenes es ON es.scene_id = s.id AND es.episode_id = e.id
             WHERE s.project_id = $1
               AND s.generation_status NOT IN ('generating', 'completed')
+              AND NOT EXISTS (
+                  SELECT 1 FROM job_queue j
+                  WHERE j.kind = $2 AND j.dedupe_key = s.id::text
+                    AND j.status IN ('queued', 'running'))
             ORDER BY e.episode_number NULLS LAST, COALESCE(es.position, 0), s.scene_number NULLS LAST, s.created_at
-        """, project_id)
+        """, project_id, SCENE_GENERATION)
 
         eligible = [r for r in rows if r["shot_count"] > 0]
         if not eligible:
             return {"message": "No scenes to generate", "queued": 0}
 
-        # Check if a generate-all pipeline is already running for this project
-        pipeline_key = f"pipeline_{project_id}"
-        if pipeline_key in _scene_generation_tasks:
-            task = _scene_generation_tasks[pipeline_key]
-            if not task.done():
-                return {"message": "Generation pipeline already running for this project",
-                        "queued": 0}
-
-        # Reset all eligible shots to pending
-        for scene_row in eligible:
-            sid = scene_row["id"]
+        queued = []
+        async with conn.transaction():
+            scene_ids = [r["id"] for r in eligible]
+            # Reset all eligible shots to pending
             await conn.execute(
                 "UPDATE shots SET status = 'pending', error_message = NULL "
-                "WHERE scene_id = $1", sid)
+                "WHERE scene_id = ANY($1::uuid[])", scene_ids)
             await conn.execute(
                 "UPDATE scenes SET completed_shots = 0, "
-                "current_generating_shot_id = NULL WHERE id = $1", sid)
-
-        scene_ids = [r["id"] for r in eligible]
-        queued = [{"scene_id": str(r["id"]), "title": r["title"],
-                   "episode_number": r["episode_number"],
-                   "scene_number": r["scene_number"],
-                   "shot_count": r["shot_count"]} for r in eligible]
-
-        async def _sequential_pipeline(ordered_scene_ids, _auto_approve):
-            """Generate scenes one at a time in order."""
-            for sid in ordered_scene_ids:
-                scene_id_str = str(sid)
-                try:
-                    async with _scene_gen_semaphore:
-                        logger.info(f"generate-all: starting scene {scene_id_str}")
-                        await generate_scene(sid, auto_approve=_auto_approve)
-                        logger.info(f"generate-all: completed scene {scene_id_str}")
-                except Exception as e:
-                    logger.error(f"generate-all: scene {scene_id_str} failed: {e}")
-                    # Continue to next scene on failure
-                _scene_generation_tasks.pop(scene_id_str, None)
-            _scene_generation_tasks.pop(pipeline_key, None)
-            logger.info(f"generate-all: pipeline finished for project {project_id}")
-
-        task = asyncio.create_task(_sequential_pipeline(scene_ids, auto_approve))
-        _scene_generation_tasks[pipeline_key] = task
-
-        return {
-            "message": f"Queued {len(queued)} scenes for sequential generation",
-            "queued": len(queued),
-            "scenes": queued,
-        }
+                "current_generating_shot_id = NULL WHERE id = ANY($1::uuid[])", scene_ids)
+            for r in eligible:
+                job_id = await enqueue(
+                    conn, SCENE_GENERATION, {"scene_id": str(r["id"]), "auto_approve": auto_approve},
+                    dedupe_key=str(r["id"]),
+                )
+                if job_id is None:
+                    continue
+                queued.append({"scene_id": str(r["id"]), "title": r["title"],
+                               "episode_number": r["episode_number"],
+                               "scene_number": r["scene_number"],
+                               "shot_count": r["shot_count"], "job_id": job_id})
     finally:
         await conn.close()
 
+    wake_workers()
+    return {
+        "message": f"Queued {len(queued)} scenes for generation",
+        "queued": len(queued),
+        "scenes": queued,
+    }
+
 
 class SelectEngineRequest(BaseModel):
     video_engine: str
@@ -1421,7 +1479,7 @@ async def select_engine_for_shot(scene_id: str, shot_id: str, body: SelectEngine
 
     sid = uuid.UUID(scene_id)
     shot_uuid = uuid.UUID(shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot = await conn.fetchrow(
             "SELECT id FROM shots WHERE id = $1 AND scene_id = $2", shot_uuid, sid,
@@ -1462,7 +1520,7 @@ async def assign_source_video(scene_id: str, shot_id: str, body: AssignSourceVid
 
     sid = uuid.UUID(scene_id)
     shot_uuid = uuid.UUID(shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot = await conn.fetchrow(
             "SELECT id FROM shots WHERE id = $1 AND scene_id = $2", shot_uuid, sid,
@@ -1499,7 +1557,7 @@ async def override_shot_engine(scene_id: str, shot_id: str, body: OverrideEngine
 
     sid = uuid.UUID(scene_id)
     shot_uuid = uuid.UUID(shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot = await conn.fetchrow(
             "SELECT id FROM shots WHERE id = $1 AND scene_id = $2", shot_uuid, sid,
@@ -1519,7 +1577,7 @@ async def override_shot_engine(scene_id: str, shot_id: str, body: OverrideEngine
 @router.get("/continuity-frames")
 async def get_continuity_frames(project_id: int):
     """View current continuity frames for all characters in a project."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT ccf.character_slug, ccf.frame_path,
@@ -1538,7 +1596,7 @@ async def get_continuity_frames(project_id: int):
 @router.delete("/continuity-frames")
 async def clear_continuity_frames(project_id: int):
     """Clear all continuity frames for a project (forces cold start from approved images)."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         result = await conn.execute(
             "DELETE FROM character_continuity_frames WHERE project_id = $1", project_id
@@ -11,7 +11,7 @@ from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.models import VideoReviewRequest, BatchVideoReviewRequest
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ async def get_pending_videos(
     character_slug: str | None = None,
 ):
     """List shots pending human video review, with scene/project context."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         conditions = ["sh.review_status = 'pending_review'", "sh.output_video_path IS NOT NULL"]
         params = []
@@ -105,7 +105,7 @@ async def get_pending_videos(
 async def review_video(body: VideoReviewRequest):
     """Approve or reject a single shot video. Optionally blacklist the engine."""
     shot_id = uuid.UUID(body.shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot = await conn.fetchrow(
             "SELECT sh.*, s.project_id FROM shots sh JOIN scenes s ON sh.scene_id = s.id WHERE sh.id = $1",
@@ -188,7 +188,7 @@ async def _try_assemble_scene(conn, scene_id) -> bool:
 @router.post("/scenes/batch-review-video")
 async def batch_review_video(body: BatchVideoReviewRequest):
     """Batch approve or reject multiple shot videos."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot_ids = [uuid.UUID(sid) for sid in body.shot_ids]
         status = "approved" if body.approved else "rejected"
@@ -227,7 +227,7 @@ async def batch_review_video(body: BatchVideoReviewRequest):
 @router.get("/scenes/engine-stats")
 async def get_engine_stats(project_id: int | None = None, character_slug: str | None = None):
     """Per-engine quality statistics, filterable by project/character."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         conditions = ["sh.quality_score IS NOT NULL"]
         params = []
@@ -314,7 +314,7 @@ async def qc_review_shot(scene_id: str, shot_id: str, auto_fix: bool = False):
     from .video_qc import extract_review_frames, review_video_frames, build_prompt_fixes
 
     shid = uuid.UUID(shot_id)
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         shot = await conn.fetchrow(
             "SELECT * FROM shots WHERE id = $1 AND scene_id = $2",
@@ -369,18 +369,15 @@ async def qc_review_shot(scene_id: str, shot_id: str, auto_fix: bool = False):
 async def qc_regenerate_shot(scene_id: str, shot_id: str):
     """Trigger a full QC loop on a specific shot (with prompt refinement)."""
     from .video_qc import run_qc_loop
-    from .builder import _QUALITY_GATES, _MAX_RETRIES, _scene_generation_tasks
+    from .builder import _QUALITY_GATES, _MAX_RETRIES, scene_generation_active
 
     shid = uuid.UUID(shot_id)
     sid = uuid.UUID(scene_id)
 
-    if scene_id in _scene_generation_tasks:
-        task = _scene_generation_tasks[scene_id]
-        if not task.done():
-            raise HTTPException(status_code=409, detail="Scene is currently generating")
-
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
+        if await scene_generation_active(conn, scene_id):
+            raise HTTPException(status_code=409, detail="Scene is currently generating")
         shot = await conn.fetchrow(
             "SELECT * FROM shots WHERE id = $1 AND scene_id = $2", shid, sid)
         if not shot:
@@ -396,7 +393,7 @@ async def qc_regenerate_shot(scene_id: str, shot_id: str):
         await conn.close()
 
     async def _run_qc():
-        c = await connect_direct()
+        c = await connect_pooled()
         try:
             shot_dict = dict(shot)
             shot_dict["_prev_last_frame"] = (
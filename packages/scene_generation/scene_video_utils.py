@@ -5,6 +5,8 @@ import logging
 import os
 import shutil
 
+from packages.core.video_assembly import Join, assemble
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,72 +54,18 @@ async def concat_videos(
     # Default transitions: dissolve 0.3s between every pair
     if not transitions:
         transitions = [{"type": "dissolve", "duration": 0.3}] * (len(video_paths) - 1)
-
-    # Probe all video durations upfront
-    durations = []
-    for vp in video_paths:
-        durations.append(await _probe_duration(vp))
-
-    # Build ffmpeg xfade filter chain
-    # Each xfade: [prev][next]xfade=transition=TYPE:duration=D:offset=OFFSET
-    # offset = cumulative duration of previous outputs minus cumulative crossfade overlap
-    inputs = []
-    for vp in video_paths:
-        inputs.extend(["-i", vp])
-
-    filter_parts = []
-    cumulative_duration = durations[0]
-
+    joins = []
     for i in range(len(video_paths) - 1):
         t = transitions[i] if i < len(transitions) else {"type": "dissolve", "duration": 0.3}
-        xfade_type = t.get("type", "dissolve")
-        xfade_dur = min(t.get("duration", 0.3), durations[i] * 0.4, durations[i + 1] * 0.4)
-        offset = cumulative_duration - xfade_dur
-
-        if i == 0:
-            src_label = "[0:v]"
-        else:
-            src_label = f"[v{i}]"
-
-        dst_label = f"[{i + 1}:v]"
-
-        if i == len(video_paths) - 2:
-            out_label = "[vout]"
-        else:
-            out_label = f"[v{i + 1}]"
-
-        filter_parts.append(
-            f"{src_label}{dst_label}xfade=transition={xfade_type}:"
-            f"duration={xfade_dur:.3f}:offset={offset:.3f}{out_label}"
-        )
-
-        # Next segment's cumulative = previous total + next duration - overlap
-        cumulative_duration = offset + xfade_dur + durations[i + 1] - xfade_dur
-        # Simplifies to: cumulative_duration = offset + durations[i + 1]
-        cumulative_duration = offset + durations[i + 1]
-
-    filter_complex = ";".join(filter_parts)
-
-    cmd = [
-        "ffmpeg", "-y",
-        *inputs,
-        "-filter_complex", filter_complex,
-        "-map", "[vout]",
-        "-c:v", "libx264", "-preset", "fast", "-crf", "19",
-        "-pix_fmt", "yuv420p",
-        output_path,
-    ]
+        joins.append(Join(t.get("type", "dissolve"), t.get("duration", 0.3)))
 
-    logger.info(f"Crossfade concat: {len(video_paths)} clips, filter={filter_complex[:200]}")
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-    )
-    _, stderr = await proc.communicate()
-
-    if proc.returncode != 0:
-        # Fallback to hard-cut concat if xfade fails
-        logger.warning(f"xfade concat failed, falling back to hard-cut: {stderr.decode()[-200:]}")
+    # Only the transition windows are re-encoded; unchanged shots come from the
+    # segment cache. Output is video-only, as before (scene audio is mixed later).
+    logger.info(f"Crossfade concat: {len(video_paths)} clips, joins={[j.type for j in joins][:5]}")
+    try:
+        await assemble([str(p) for p in video_paths], output_path, joins, audio=False)
+    except (RuntimeError, OSError) as e:
+        logger.warning(f"Segment concat failed, falling back to hard-cut: {e}")
         return await _concat_videos_hardcut(video_paths, output_path)
 
     return output_path
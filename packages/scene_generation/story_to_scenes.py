@@ -3,10 +3,8 @@
 import json
 import logging
 
-import httpx
-
-from packages.core.config import OLLAMA_URL
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -180,19 +178,16 @@ def _extract_json_scenes(raw_text: str) -> list[dict]:
 
 async def _call_ollama(prompt: str) -> str:
     """Call Ollama and return the raw response text."""
-    async with httpx.AsyncClient(timeout=300) as client:
-        resp = await client.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": "gemma3:12b",
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.7, "num_predict": 4096},
-            },
-        )
-        resp.raise_for_status()
-        result = resp.json()
-    return result.get("response", "").strip()
+    text = await llm_gateway.generate(
+        "gemma3:12b",
+        prompt,
+        caller="story_to_scenes",
+        priority=PRIORITY_BATCH,
+        options={"temperature": 0.7, "num_predict": 4096},
+        timeout=300,
+        cache=False,
+    )
+    return text.strip()
 
 
 async def generate_scenes_from_story(project_id: int, episode_id: str | None = None) -> list[dict]:
@@ -201,7 +196,7 @@ async def generate_scenes_from_story(project_id: int, episode_id: str | None = N
     If episode_id is provided, generates scenes specifically for that episode using
     the episode's synopsis and story_arc as primary context.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         story_context, char_list, world_context = await _get_project_context(conn, project_id)
 
@@ -12,15 +12,14 @@ ffmpeg fallback (when GPU is busy or nodes unavailable):
   2. lanczos 2x upscale
 """
 
-import json
 import logging
 import subprocess
 import shutil
 import time
-import urllib.request
 from pathlib import Path
 
-from packages.core.config import COMFYUI_URL, COMFYUI_OUTPUT_DIR, COMFYUI_INPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client, history_error, output_files
+from packages.core.config import COMFYUI_OUTPUT_DIR, COMFYUI_INPUT_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -117,49 +116,28 @@ def build_postprocess_workflow(
     return workflow, output_prefix
 
 
-def _submit_workflow(workflow: dict) -> str:
+async def _submit_workflow(workflow: dict) -> str:
     """Submit workflow to ComfyUI, return prompt_id."""
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = urllib.request.urlopen(req, timeout=30)
-    return json.loads(resp.read()).get("prompt_id", "")
+    return await get_comfyui_client().submit(workflow)
 
 
-def _poll_completion(prompt_id: str, timeout: int = 600) -> dict | None:
-    """Poll ComfyUI history for completion. Return output info or None."""
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            url = f"{COMFYUI_URL}/history/{prompt_id}"
-            resp = urllib.request.urlopen(urllib.request.Request(url), timeout=10)
-            history = json.loads(resp.read())
-            if prompt_id in history:
-                outputs = history[prompt_id].get("outputs", {})
-                status = history[prompt_id].get("status", {})
-                if status.get("status_str") == "error":
-                    logger.error(f"ComfyUI post-processing failed: {status}")
-                    return None
-                # Look for video output from VHS_VideoCombine
-                for nid, out in outputs.items():
-                    gifs = out.get("gifs", [])
-                    if gifs:
-                        return {"filename": gifs[0].get("filename", ""), "subfolder": gifs[0].get("subfolder", "")}
-                    images = out.get("images", [])
-                    if images:
-                        return {"filename": images[0].get("filename", ""), "subfolder": images[0].get("subfolder", "")}
-                return None
-        except Exception:
-            pass
-        time.sleep(5)
-    logger.error(f"Post-processing timed out after {timeout}s")
+async def _poll_completion(prompt_id: str, timeout: int = 600) -> dict | None:
+    """Wait for ComfyUI to finish. Return output info or None."""
+    entry = await get_comfyui_client().wait_for_completion(prompt_id, timeout=timeout)
+    if entry is None:
+        logger.error(f"Post-processing timed out after {timeout}s")
+        return None
+    if history_error(entry):
+        logger.error(f"ComfyUI post-processing failed: {entry.get('status', {})}")
+        return None
+    # Look for video output from VHS_VideoCombine
+    files = output_files(entry, ("gifs", "images"))
+    if files:
+        return {"filename": files[0].get("filename", ""), "subfolder": files[0].get("subfolder", "")}
     return None
 
 
-def postprocess_gpu(
+async def postprocess_gpu(
     input_video: str,
     output_prefix: str = "pp",
     timeout: int = 600,
@@ -201,13 +179,13 @@ def postprocess_gpu(
         output_prefix=output_prefix,
     )
 
-    prompt_id = _submit_workflow(workflow)
+    prompt_id = await _submit_workflow(workflow)
     if not prompt_id:
         logger.error("Failed to submit post-processing workflow")
         return None
 
     logger.info(f"GPU post-processing submitted: {prompt_id}")
-    result = _poll_completion(prompt_id, timeout)
+    result = await _poll_completion(prompt_id, timeout)
 
     if result and result.get("filename"):
         subfolder = result.get("subfolder", "")
@@ -341,7 +319,7 @@ async def postprocess_wan_video(
     if use_gpu and upscale and interpolate:
         try:
             ts = int(time.time())
-            gpu_result = postprocess_gpu(
+            gpu_result = await postprocess_gpu(
                 current,
                 output_prefix=f"pp_{stem}_{ts}",
                 timeout=600,
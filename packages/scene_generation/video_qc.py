@@ -20,6 +20,7 @@ from pathlib import Path
 
 from packages.core.config import COMFYUI_OUTPUT_DIR
 from packages.core.audit import log_decision
+from packages.visual_pipeline.prescreen import screen_video_frames
 
 # Re-export vision functions so external callers can still import from video_qc
 from .video_vision import (  # noqa: F401
@@ -293,7 +294,7 @@ async def run_qc_loop(
                     seed=shot_seed,
                     use_gguf=True,
                 )
-                comfyui_prompt_id = _submit_wan_workflow(workflow)
+                comfyui_prompt_id = await _submit_wan_workflow(workflow)
             elif shot_engine == "ltx":
                 fps = 24
                 num_frames = max(9, int(shot_seconds * fps) + 1)
@@ -307,7 +308,7 @@ async def run_qc_loop(
                     lora_name=shot_data.get("lora_name"),
                     lora_strength=shot_data.get("lora_strength", 0.8),
                 )
-                comfyui_prompt_id = _submit_ltx_workflow(workflow)
+                comfyui_prompt_id = await _submit_ltx_workflow(workflow)
             else:
                 # framepack or framepack_f1
                 use_f1 = shot_engine == "framepack_f1" or shot_use_f1
@@ -324,7 +325,7 @@ async def run_qc_loop(
                     gpu_memory_preservation=6.0,
                     guidance_scale=retry_guidance,
                 )
-                comfyui_prompt_id = _submit_comfyui_workflow(workflow_data["prompt"])
+                comfyui_prompt_id = await _submit_comfyui_workflow(workflow_data["prompt"])
 
             # Update shot with current ComfyUI prompt
             await conn.execute(
@@ -354,9 +355,14 @@ async def run_qc_loop(
 
             frame_paths = await extract_review_frames(video_path)
             if frame_paths:
-                review = await review_video_frames(
-                    frame_paths, current_prompt, character_slug, source_img,
-                )
+                # Black/blank/smeared frames fail the attempt without a vision-model call
+                review = await asyncio.to_thread(screen_video_frames, frame_paths, character_slug)
+                if review is not None:
+                    logger.info(f"Shot {shot_id} QC attempt {attempt+1}: pre-screen failed ({review['issues']})")
+                else:
+                    review = await review_video_frames(
+                        frame_paths, current_prompt, character_slug, source_img,
+                    )
                 shot_quality = review["overall_score"]
                 issues = review["issues"]
             else:
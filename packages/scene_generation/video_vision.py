@@ -1,15 +1,21 @@
 """Video vision review — frame extraction and per-frame vision model assessment.
 
 Split from video_qc.py to isolate vision model interaction from QC orchestration.
+QC frames are extracted by one ffmpeg run and, by default, scored in a single
+multi-image request (VIDEO_QC_REVIEW_MODE) instead of one request per frame.
 """
 
 import asyncio
 import base64
+import io
 import json
 import logging
 from pathlib import Path
 
-from packages.core.config import OLLAMA_URL, VISION_MODEL
+from packages.core.config import VIDEO_QC_REVIEW_MODE, VISION_MODEL
+from packages.core.llm_gateway import PRIORITY_REVIEW, llm_gateway
+from packages.visual_pipeline.review_cache import review_cache, review_key
+from packages.visual_pipeline.vision import extract_json_from_vision
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +26,17 @@ KNOWN_ISSUES = [
     "color_shift",
 ]
 
+# Bump when the frame review prompts or score parsing change (invalidates review_cache)
+FRAME_REVIEW_VERSION = 1
+# Frame height in a contact sheet (VIDEO_QC_REVIEW_MODE="sheet")
+CONTACT_SHEET_HEIGHT = 512
+
 
 async def extract_review_frames(video_path: str, count: int = 3) -> list[str]:
-    """Extract frames at start (0.1s), midpoint, and end (-0.1s) via ffmpeg.
+    """Extract frames at start (0.1s), midpoint, and end (-0.1s) in one ffmpeg run.
 
+    Each timestamp is a separately seeked input of the same ffmpeg process
+    (fast keyframe seek, one decoded frame each), mapped to its own output.
     Returns list of PNG paths stored alongside the video as _qc_frame_N.png.
     """
     video = Path(video_path)
@@ -45,26 +58,50 @@ async def extract_review_frames(video_path: str, count: int = 3) -> list[str]:
         timestamps.append(max(0.2, duration / 2))
     if count >= 3:
         timestamps.append(max(0.3, duration - 0.1))
+    timestamps = timestamps[:count]
 
-    frame_paths = []
     base = video_path.rsplit(".", 1)[0]
+    out_paths = [f"{base}_qc_frame_{i}.png" for i in range(len(timestamps))]
+    cmd = ["ffmpeg", "-y", "-v", "error"]
+    for ts in timestamps:
+        cmd += ["-ss", f"{ts:.3f}", "-i", video_path]
+    for i, out_path in enumerate(out_paths):
+        Path(out_path).unlink(missing_ok=True)
+        cmd += ["-map", f"{i}:v:0", "-frames:v", "1", out_path]
 
-    for i, ts in enumerate(timestamps[:count]):
-        out_path = f"{base}_qc_frame_{i}.png"
-        proc = await asyncio.create_subprocess_exec(
-            "ffmpeg", "-y", "-ss", str(ts), "-i", video_path,
-            "-vframes", "1", "-q:v", "2", out_path,
-            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    frame_paths = [p for p in out_paths if Path(p).exists() and Path(p).stat().st_size > 0]
+    if proc.returncode != 0 or len(frame_paths) < len(out_paths):
+        logger.warning(
+            f"Frame extraction got {len(frame_paths)}/{len(out_paths)} frames from {video.name}: "
+            f"{stderr.decode()[-200:]}"
         )
-        _, stderr = await proc.communicate()
-        if proc.returncode == 0 and Path(out_path).exists():
-            frame_paths.append(out_path)
-        else:
-            logger.warning(f"Frame extraction failed at {ts}s: {stderr.decode()[-200:]}")
-
     return frame_paths
 
 
+def _frame_scores(parsed: dict) -> dict:
+    """Clamp one frame's category scores to 1-10 and keep only known issues."""
+    scores = {}
+    for key in ("character_match", "style_match", "motion_execution", "technical_quality"):
+        val = parsed.get(key, 5)
+        scores[key] = max(1, min(10, int(val)))
+    issues = [i for i in parsed.get("issues", []) if i in KNOWN_ISSUES]
+    return {**scores, "issues": issues}
+
+
+def _neutral_scores() -> dict:
+    return {
+        "character_match": 5,
+        "style_match": 5,
+        "motion_execution": 5,
+        "technical_quality": 5,
+        "issues": [],
+    }
+
+
 async def _vision_review_single_frame(
     frame_path: str,
     motion_prompt: str,
@@ -83,21 +120,23 @@ async def _vision_review_single_frame(
     Returns dict with character_match, style_match, motion_execution,
     technical_quality (all 1-10), and issues list.
     """
-    import urllib.request
-
     with open(frame_path, "rb") as f:
-        frame_b64 = base64.b64encode(f.read()).decode()
+        frame_bytes = f.read()
+    frame_b64 = base64.b64encode(frame_bytes).decode()
 
     images = [frame_b64]
+    image_bytes = [frame_bytes]
     char_context = f" The character should be '{character_slug}'." if character_slug else ""
     issue_list = ", ".join(KNOWN_ISSUES)
 
     # Comparative prompt when source image is available
     if source_image_path and Path(source_image_path).exists():
         with open(source_image_path, "rb") as f:
-            source_b64 = base64.b64encode(f.read()).decode()
+            source_bytes = f.read()
+        source_b64 = base64.b64encode(source_bytes).decode()
         # Source image first, generated frame second
         images = [source_b64, frame_b64]
+        image_bytes = [source_bytes, frame_bytes]
 
         prompt = (
             f"You are comparing a SOURCE IMAGE (image 1) with a GENERATED VIDEO FRAME (image 2). "
@@ -128,24 +167,25 @@ async def _vision_review_single_frame(
             f'"technical_quality": N, "issues": ["issue1", "issue2"]}}'
         )
 
-    payload = json.dumps({
-        "model": VISION_MODEL,
-        "prompt": prompt,
-        "images": images,
-        "stream": False,
-        "options": {"temperature": 0.1},
-    }).encode()
-
-    req = urllib.request.Request(
-        f"{OLLAMA_URL}/api/generate",
-        data=payload,
-        headers={"Content-Type": "application/json"},
+    cache_key = review_key(
+        "video_frame", image_bytes, FRAME_REVIEW_VERSION, VISION_MODEL,
+        motion_prompt=motion_prompt, character_slug=character_slug,
     )
+    cached = review_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        resp = urllib.request.urlopen(req, timeout=90)
-        result = json.loads(resp.read())
-        text = result.get("response", "").strip()
+        text = await llm_gateway.generate(
+            VISION_MODEL,
+            prompt,
+            caller="video_qc",
+            priority=PRIORITY_REVIEW,
+            images=images,
+            options={"temperature": 0.1},
+            timeout=90,
+        )
+        text = text.strip()
 
         # Extract JSON from response (may have markdown fences)
         if "```" in text:
@@ -156,26 +196,131 @@ async def _vision_review_single_frame(
 
         parsed = json.loads(text)
 
-        # Validate and clamp scores
-        scores = {}
-        for key in ("character_match", "style_match", "motion_execution", "technical_quality"):
-            val = parsed.get(key, 5)
-            scores[key] = max(1, min(10, int(val)))
+        result = _frame_scores(parsed)
+        review_cache.put(cache_key, result, slug=character_slug)
+        return result
+
+    except Exception as e:
+        logger.warning(f"Vision review failed for {frame_path}: {e}")
+        return _neutral_scores()
 
-        # Validate issues
-        issues = [i for i in parsed.get("issues", []) if i in KNOWN_ISSUES]
 
-        return {**scores, "issues": issues}
+def contact_sheet(frame_paths: list[str], height: int = CONTACT_SHEET_HEIGHT) -> bytes:
+    """Frames side by side, left to right, scaled to a common height, as one PNG."""
+    from PIL import Image
+
+    frames = []
+    for fp in frame_paths:
+        with Image.open(fp) as img:
+            img = img.convert("RGB")
+            scale = min(1.0, height / img.height)
+            frames.append(img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale)))))
+    gap = 8
+    sheet = Image.new(
+        "RGB", (sum(f.width for f in frames) + gap * (len(frames) - 1), max(f.height for f in frames)), "white",
+    )
+    x = 0
+    for frame in frames:
+        sheet.paste(frame, (x, 0))
+        x += frame.width + gap
+    buf = io.BytesIO()
+    sheet.save(buf, "PNG")
+    return buf.getvalue()
 
+
+def _frames_prompt(count: int, motion_prompt: str, character_slug: str | None,
+                   has_source: bool, sheet: bool) -> str:
+    char_context = f" The character should be '{character_slug}'." if character_slug else ""
+    issue_list = ", ".join(KNOWN_ISSUES)
+    if sheet:
+        frames_desc = (f"a CONTACT SHEET of {count} frames from a generated anime video, "
+                       f"left to right in time order (frame 1 = leftmost)")
+    else:
+        frames_desc = f"{count} frames from a generated anime video, in time order"
+    if has_source:
+        layout = (f"Image 1 is the SOURCE IMAGE. The remaining image(s) show {frames_desc}. "
+                  f"The video was supposed to animate the source image with this action: \"{motion_prompt}\".")
+        categories = (
+            "- character_match: does the frame preserve the character's identity, face, hair, clothing from the source? (1=completely different person, 10=perfect match)\n"
+            "- style_match: does the art style, color palette, line quality match the source? (1=totally different style, 10=seamless)\n"
+            "- motion_execution: does the frame show the described action naturally? (1=frozen/wrong action, 10=perfect motion)\n"
+            "- technical_quality: sharpness, no artifacts, no glitches, good anatomy (1=broken, 10=flawless)\n"
+        )
+    else:
+        layout = f"The image(s) show {frames_desc}. The intended motion/action is: \"{motion_prompt}\"."
+        categories = (
+            "- character_match: character appears on-model and correct (if no reference, score anatomy/consistency)\n"
+            "- style_match: art style is consistent and appealing\n"
+            "- motion_execution: does the frame match the described motion/action\n"
+            "- technical_quality: sharpness, no artifacts, no glitches\n"
+        )
+    return (
+        f"{layout}{char_context}\n\n"
+        f"Score EACH of the {count} frames separately, 1-10 per category:\n{categories}\n"
+        f"Be STRICT — a score of 7+ means genuinely good. 5 means mediocre. 3 means bad.\n\n"
+        f"For each frame also list any issues from this set: [{issue_list}]\n\n"
+        f"Reply in EXACTLY this JSON format with one entry per frame, in order, nothing else:\n"
+        f'{{"frames": [{{"frame": 1, "character_match": N, "style_match": N, "motion_execution": N, '
+        f'"technical_quality": N, "issues": ["issue1"]}}, ...]}}'
+    )
+
+
+async def _vision_review_frames_together(
+    frame_paths: list[str],
+    motion_prompt: str,
+    character_slug: str | None = None,
+    source_image_path: str | None = None,
+    sheet: bool = False,
+) -> list[dict] | None:
+    """Review all frames in one vision request (multi-image, or one contact sheet).
+
+    Returns per-frame score dicts in frame order, or None when the reply can't be
+    parsed into exactly one entry per frame (the caller then reviews frames one by one).
+    """
+    frame_bytes = [Path(fp).read_bytes() for fp in frame_paths]
+    source_bytes = None
+    if source_image_path and Path(source_image_path).exists():
+        source_bytes = Path(source_image_path).read_bytes()
+
+    cache_key = review_key(
+        "video_frames", ([source_bytes] if source_bytes else []) + frame_bytes,
+        FRAME_REVIEW_VERSION, VISION_MODEL,
+        motion_prompt=motion_prompt, character_slug=character_slug, sheet=sheet,
+    )
+    cached = review_cache.get(cache_key)
+    if cached is not None:
+        return cached["frames"]
+
+    shown = [await asyncio.to_thread(contact_sheet, frame_paths)] if sheet else frame_bytes
+    images = [base64.b64encode(b).decode() for b in ([source_bytes] if source_bytes else []) + shown]
+    prompt = _frames_prompt(len(frame_paths), motion_prompt, character_slug, source_bytes is not None, sheet)
+
+    try:
+        text = await llm_gateway.generate(
+            VISION_MODEL,
+            prompt,
+            caller="video_qc",
+            priority=PRIORITY_REVIEW,
+            images=images,
+            options={"temperature": 0.1},
+            timeout=150,
+        )
     except Exception as e:
-        logger.warning(f"Vision review failed for {frame_path}: {e}")
-        return {
-            "character_match": 5,
-            "style_match": 5,
-            "motion_execution": 5,
-            "technical_quality": 5,
-            "issues": [],
-        }
+        logger.warning(f"Vision review failed for {len(frame_paths)} frames of {frame_paths[0]}: {e}")
+        return [_neutral_scores() for _ in frame_paths]
+
+    parsed = extract_json_from_vision(text)
+    frames = parsed.get("frames") if parsed else None
+    if not isinstance(frames, list) or len(frames) != len(frame_paths) \
+            or not all(isinstance(f, dict) for f in frames):
+        logger.warning(f"Multi-frame review reply not usable, reviewing frames one by one: {text[:200]}")
+        return None
+    try:
+        per_frame = [_frame_scores(f) for f in frames]
+    except (TypeError, ValueError):
+        return None
+    review_cache.put(cache_key, {"frames": per_frame}, slug=character_slug)
+    return per_frame
 
 
 async def review_video_frames(
@@ -186,8 +331,9 @@ async def review_video_frames(
 ) -> dict:
     """Review multiple frames and aggregate scores.
 
-    When source_image_path is provided, each frame is compared against
-    the source for character/style fidelity (comparative scoring).
+    Frames are scored in one request per VIDEO_QC_REVIEW_MODE, falling back to
+    one request per frame. When source_image_path is provided, each frame is
+    compared against the source for character/style fidelity (comparative scoring).
 
     Returns:
         {
@@ -200,13 +346,20 @@ async def review_video_frames(
     if not frame_paths:
         return {"overall_score": 0.5, "issues": [], "per_frame": []}
 
-    # Review frames sequentially (Ollama single-model queue)
-    per_frame = []
-    for fp in frame_paths:
-        result = await _vision_review_single_frame(
-            fp, motion_prompt, character_slug, source_image_path,
+    # One request for every frame; per-frame requests if that reply can't be parsed
+    per_frame = None
+    if VIDEO_QC_REVIEW_MODE in ("batch", "sheet") and len(frame_paths) > 1:
+        per_frame = await _vision_review_frames_together(
+            frame_paths, motion_prompt, character_slug, source_image_path,
+            sheet=VIDEO_QC_REVIEW_MODE == "sheet",
         )
-        per_frame.append(result)
+    if per_frame is None:
+        per_frame = []
+        for fp in frame_paths:
+            result = await _vision_review_single_frame(
+                fp, motion_prompt, character_slug, source_image_path,
+            )
+            per_frame.append(result)
 
     # Aggregate: weighted average across frames, then weighted category mix
     # character_match + style_match weighted higher when comparing against source
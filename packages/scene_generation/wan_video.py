@@ -21,13 +21,13 @@ Model files needed in ComfyUI/models/:
     - vae/: wan2.2_vae.safetensors (48-channel, NOT compatible with 2.1)
 """
 
-import json
 import logging
 import time
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.config import COMFYUI_URL, COMFYUI_OUTPUT_DIR
+from packages.core.comfyui_client import get_comfyui_client
+from packages.core.config import COMFYUI_OUTPUT_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -56,18 +56,9 @@ WAN22_MODELS = {
 }
 
 
-def _submit_comfyui_workflow(workflow: dict) -> str:
-    """Submit a workflow to ComfyUI and return the prompt_id."""
-    import urllib.request
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = urllib.request.urlopen(req, timeout=30)
-    result = json.loads(resp.read())
-    return result.get("prompt_id", "")
+async def _submit_comfyui_workflow(workflow: dict, base_url: str | None = None) -> str:
+    """Submit a workflow to ComfyUI (default backend unless base_url) and return the prompt_id."""
+    return await get_comfyui_client(base_url).submit(workflow)
 
 
 def build_wan_t2v_workflow(
@@ -571,7 +562,7 @@ async def generate_wan_video(
     )
 
     try:
-        prompt_id = _submit_comfyui_workflow(workflow)
+        prompt_id = await _submit_comfyui_workflow(workflow)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ComfyUI submission failed: {e}")
 
@@ -627,7 +618,7 @@ async def generate_wan22_video(
     )
 
     try:
-        prompt_id = _submit_comfyui_workflow(workflow)
+        prompt_id = await _submit_comfyui_workflow(workflow)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ComfyUI submission failed: {e}")
 
@@ -8,7 +8,7 @@ from datetime import datetime
 from pathlib import Path
 from fastapi import APIRouter, HTTPException
 from packages.core.config import BASE_PATH, OLLAMA_URL
-from packages.core.db import get_char_project_map, invalidate_char_cache, connect_direct
+from packages.core.db import get_char_project_map, invalidate_char_cache, connect_pooled
 from packages.core.models import (
     ProjectCreate, ProjectUpdate,
     StorylineUpsert, WorldSettingsUpsert, StyleUpdate,
@@ -59,7 +59,7 @@ def _dynamic_update(body, fields, params=None, idx=1):
 async def get_projects():
     """Get list of projects with their character counts."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         rows = await conn.fetch("""SELECT p.id, p.name, p.default_style, COUNT(c.id) as char_count
             FROM projects p LEFT JOIN characters c ON c.project_id=p.id
             GROUP BY p.id, p.name, p.default_style ORDER BY p.name""")
@@ -100,7 +100,7 @@ async def get_checkpoints():
 async def get_project_detail(project_id: int):
     """Get full project detail including generation style and storyline."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         row = await conn.fetchrow("""
             SELECT p.id,p.name,p.description,p.genre,p.status,p.default_style,p.premise,p.content_rating,
                    gs.checkpoint_model,gs.cfg_scale,gs.steps,gs.sampler,gs.scheduler,gs.width,gs.height,
@@ -142,7 +142,7 @@ async def create_project(body: ProjectCreate):
     """Create a new project with an auto-generated generation style."""
     style_name = re.sub(r'[^a-z0-9_]', '', body.name.lower().replace(' ', '_')) + "_style"
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         if await conn.fetchval("SELECT style_name FROM generation_styles WHERE style_name=$1", style_name):
             style_name += "_" + str(int(datetime.now().timestamp()) % 10000)
         await conn.execute("""INSERT INTO generation_styles
@@ -165,7 +165,7 @@ async def create_project(body: ProjectCreate):
 async def update_project(project_id: int, body: ProjectUpdate):
     """Update project metadata."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         if not await conn.fetchrow("SELECT id FROM projects WHERE id=$1", project_id):
             await conn.close()
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
@@ -188,7 +188,7 @@ async def update_project(project_id: int, body: ProjectUpdate):
 async def upsert_storyline(project_id: int, body: StorylineUpsert):
     """Create or update the storyline for a project."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         if not await conn.fetchrow("SELECT id FROM projects WHERE id=$1", project_id):
             await conn.close()
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
@@ -223,7 +223,7 @@ async def upsert_storyline(project_id: int, body: StorylineUpsert):
 async def update_style(project_id: int, body: StyleUpdate):
     """Update the generation style for a project. Snapshots current style to style_history before applying changes."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         row = await conn.fetchrow(
             "SELECT p.name, p.default_style FROM projects p WHERE p.id=$1", project_id)
         if not row:
@@ -331,7 +331,7 @@ async def _store_style_switch_memory(
 async def get_style_history(project_id: int):
     """Get past style snapshots with live per-checkpoint stats."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         if not await conn.fetchrow("SELECT id FROM projects WHERE id=$1", project_id):
             await conn.close()
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
@@ -388,7 +388,7 @@ async def get_style_history(project_id: int):
 async def get_style_stats(project_id: int):
     """Aggregated per-checkpoint quality stats for a project."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         project_name = await conn.fetchval("SELECT name FROM projects WHERE id=$1", project_id)
         if not project_name:
             await conn.close()
@@ -437,7 +437,7 @@ async def get_style_stats(project_id: int):
 async def get_world_settings(project_id: int):
     """Get world settings for a project."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         if not await conn.fetchrow("SELECT id FROM projects WHERE id=$1", project_id):
             await conn.close()
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
@@ -454,7 +454,7 @@ async def get_world_settings(project_id: int):
 async def upsert_world_settings(project_id: int, body: WorldSettingsUpsert):
     """Create or update world settings for a project."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         if not await conn.fetchrow("SELECT id FROM projects WHERE id=$1", project_id):
             await conn.close()
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
@@ -4,15 +4,18 @@ Extracted from story/router.py.  Character listing, creation, update,
 appearance data, and LLM-driven narration endpoints.
 """
 
-import json, logging, re, urllib.request as _ur
+import json, logging, re
 from datetime import datetime
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from packages.core.config import BASE_PATH, OLLAMA_URL
-from packages.core.db import get_char_project_map, invalidate_char_cache, connect_direct
+from packages.core.config import BASE_PATH
+from packages.core.db import get_char_project_map, invalidate_char_cache, connect_pooled
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
 from packages.core.models import CharacterCreate
+from packages.lora_training.approval_index import get_index
+from packages.visual_pipeline.review_cache import review_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -71,7 +74,7 @@ async def get_characters():
     # Fetch per-character generation history checkpoints
     gen_checkpoints: dict[str, list[dict]] = {}
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         gen_rows = await conn.fetch("""
             SELECT character_slug, checkpoint_model, COUNT(*) as count
             FROM generation_history
@@ -112,7 +115,7 @@ async def create_character(character: CharacterCreate):
     safe_name = re.sub(r'[^a-z0-9_-]', '', character.name.lower().replace(' ', '_'))
     char_path = BASE_PATH / safe_name
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         project = await conn.fetchrow(
             "SELECT id FROM projects WHERE name=$1", character.project_name)
@@ -143,10 +146,7 @@ async def create_character(character: CharacterCreate):
         await conn.close()
 
     (char_path / "images").mkdir(parents=True, exist_ok=True)
-    approval_file = char_path / "approval_status.json"
-    if not approval_file.exists():
-        with open(approval_file, "w") as f:
-            json.dump({}, f)
+    get_index(BASE_PATH).ensure_status_file(char_path.name)
 
     invalidate_char_cache()
     logger.info(f"Created character '{character.name}' (id={char_id}) in project '{character.project_name}'")
@@ -157,7 +157,7 @@ async def create_character(character: CharacterCreate):
 async def get_character_detail(character_slug: str):
     """Get full character profile with all columns."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         row = await conn.fetchrow("""
             SELECT c.id, c.name, c.description, c.design_prompt, c.traits, c.age,
                    c.appearance_data, c.personality, c.background, c.role,
@@ -240,7 +240,7 @@ async def update_character(character_slug: str, body: dict):
         raise HTTPException(status_code=400, detail=f"No valid fields provided. Allowed: {list(_PATCH_ALLOWED.keys())}")
 
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         row = await conn.fetchrow(_SLUG_SQL, character_slug)
         if not row:
             await conn.close()
@@ -275,6 +275,8 @@ async def update_character(character_slug: str, body: dict):
         await conn.execute(sql, *params)
         await conn.close()
         invalidate_char_cache()
+        if "design_prompt" in updates or "appearance_data" in updates:
+            review_cache.invalidate(character_slug)
         logger.info(f"Updated {list(updates.keys())} for {row['name']} (id={row['id']})")
         return {
             "message": f"Updated {list(updates.keys())} for {row['name']}",
@@ -294,7 +296,7 @@ async def archive_character(character_slug: str, body: dict = {}):
     """Archive or unarchive a character. Body: {"archived": true/false}"""
     archived = body.get("archived", True)
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         row = await conn.fetchrow(_SLUG_SQL, character_slug)
         if not row:
             await conn.close()
@@ -317,7 +319,7 @@ async def archive_character(character_slug: str, body: dict = {}):
 async def get_archived_characters():
     """List archived characters."""
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         rows = await conn.fetch("""
             SELECT c.name,
                    REGEXP_REPLACE(LOWER(REPLACE(c.name, ' ', '_')), '[^a-z0-9_-]', '', 'g') as slug,
@@ -353,7 +355,7 @@ async def update_character_appearance(character_slug: str, body: dict):
     if appearance_data is None:
         raise HTTPException(status_code=400, detail="appearance_data is required")
     try:
-        conn = await connect_direct()
+        conn = await connect_pooled()
         row = await conn.fetchrow(_SLUG_SQL, character_slug)
         if not row:
             await conn.close()
@@ -362,6 +364,7 @@ async def update_character_appearance(character_slug: str, body: dict):
                            json.dumps(appearance_data), row["id"])
         await conn.close()
         invalidate_char_cache()
+        review_cache.invalidate(character_slug)
         logger.info(f"Updated appearance_data for {row['name']} (id={row['id']})")
         return {"message": f"Updated appearance_data for {row['name']}", "appearance_data": appearance_data}
     except HTTPException:
@@ -389,19 +392,18 @@ async def narrate_character_appearance(body: dict):
         raise HTTPException(status_code=400, detail="Provide character_slug or project_name")
     if body.get("missing_only", False):
         target_slugs = [s for s in target_slugs if not char_map[s].get("appearance_data")]
-    results, conn = [], (await connect_direct()) if save else None
+    results, conn = [], (await connect_pooled()) if save else None
     for slug in target_slugs:
         info = char_map[slug]
         prompt = _NARRATION_PROMPT.format(
             character_name=info["name"], design_prompt=info.get("design_prompt") or "no design prompt",
             project_name=info.get("project_name", "unknown"),
             style_preamble=info.get("style_preamble") or "standard anime style")
-        payload = json.dumps({"model": "gemma3:12b", "prompt": prompt, "stream": False,
-                              "options": {"temperature": 0.3, "num_predict": 600}}).encode()
         try:
-            req = _ur.Request(f"{OLLAMA_URL}/api/generate", data=payload,
-                              headers={"Content-Type": "application/json"})
-            raw = json.loads(_ur.urlopen(req, timeout=60).read()).get("response", "").strip()
+            raw = (await llm_gateway.generate(
+                "gemma3:12b", prompt, caller="narrate_appearance", priority=PRIORITY_BATCH,
+                options={"temperature": 0.3, "num_predict": 600}, timeout=60,
+            )).strip()
             appearance = _extract_json_from_vision(raw)
             if appearance is None:
                 results.append({"slug": slug, "name": info["name"], "status": "parse_error", "raw": raw[:200]})
@@ -411,6 +413,7 @@ async def narrate_character_appearance(body: dict):
                 if row:
                     await conn.execute("UPDATE characters SET appearance_data=$1::jsonb WHERE id=$2",
                                        json.dumps(appearance), row["id"])
+                    review_cache.invalidate(slug)
             results.append({"slug": slug, "name": info["name"], "status": "ok", "appearance_data": appearance})
         except Exception as e:
             logger.warning(f"Narration failed for {slug}: {e}")
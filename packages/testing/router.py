@@ -19,7 +19,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -72,7 +72,7 @@ async def generate_prompt_grid(req: PromptGridRequest):
     For each (action × seed × camera_setup), creates a row in prompt_tests
     and a temporary shot. Runs generation via the existing scene pipeline.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # Validate project
         project = await conn.fetchrow(
@@ -187,7 +187,7 @@ async def generate_prompt_grid(req: PromptGridRequest):
             await generate_scene(str(scene_id))
 
             # After generation, update prompt_test rows with results via shot_id
-            conn2 = await connect_direct()
+            conn2 = await connect_pooled()
             try:
                 shots = await conn2.fetch(
                     "SELECT id, status, output_video_path, "
@@ -214,13 +214,12 @@ async def generate_prompt_grid(req: PromptGridRequest):
             logger.error(f"Grid generation {batch_id} failed: {e}")
             # Mark all pending tests as failed
             try:
-                conn3 = await connect_direct()
-                await conn3.execute(
-                    "UPDATE prompt_tests SET status = 'failed', error_message = $1, completed_at = NOW() "
-                    "WHERE batch_id = $2 AND status = 'pending'",
-                    str(e), batch_id,
-                )
-                await conn3.close()
+                async with await connect_pooled() as conn3:
+                    await conn3.execute(
+                        "UPDATE prompt_tests SET status = 'failed', error_message = $1, completed_at = NOW() "
+                        "WHERE batch_id = $2 AND status = 'pending'",
+                        str(e), batch_id,
+                    )
             except Exception:
                 pass
 
@@ -244,7 +243,7 @@ async def generate_prompt_grid(req: PromptGridRequest):
 @router.get("/batches")
 async def list_batches(project_id: Optional[int] = None):
     """List all prompt test batches with summary stats."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         where = "WHERE project_id = $1" if project_id else ""
         params = [project_id] if project_id else []
@@ -274,7 +273,7 @@ async def list_batches(project_id: Optional[int] = None):
 @router.get("/batches/{batch_id}")
 async def get_batch(batch_id: str):
     """Get all prompt test results for a batch."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch(
             "SELECT * FROM prompt_tests WHERE batch_id = $1 ORDER BY id",
@@ -295,7 +294,7 @@ async def get_batch(batch_id: str):
 @router.post("/batches/{batch_id}/score")
 async def score_test(batch_id: str, test_id: int, score: float, notes: Optional[str] = None):
     """Score a prompt test result (0-10 scale)."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         result = await conn.execute(
             "UPDATE prompt_tests SET qualitative_score = $1, score_notes = $2 "
@@ -314,7 +313,7 @@ async def score_test(batch_id: str, test_id: int, score: float, notes: Optional[
 @router.post("/civitai-templates")
 async def create_civitai_template(tmpl: CivitaiTemplateCreate):
     """Store a Civitai video config as a reusable template."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "INSERT INTO civitai_templates "
@@ -341,7 +340,7 @@ async def create_civitai_template(tmpl: CivitaiTemplateCreate):
 @router.get("/civitai-templates")
 async def list_civitai_templates(engine_type: Optional[str] = None):
     """List stored Civitai templates, optionally filtered by engine."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         if engine_type:
             rows = await conn.fetch(
@@ -364,7 +363,7 @@ async def get_character_sheet(slug: str):
     Returns identity_block, design_prompt, LoRA config, reference stills,
     and the project's engine/LoRA defaults.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow("""
             SELECT c.name, c.identity_block, c.design_prompt,
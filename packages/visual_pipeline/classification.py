@@ -4,7 +4,8 @@ import json
 import logging
 from pathlib import Path
 
-from packages.core.config import VISION_MODEL, BASE_PATH, OLLAMA_URL
+from packages.core.config import VISION_MODEL, BASE_PATH
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -188,24 +189,20 @@ def verify_confusable(image_path: Path, initial_slug: str, img_b64: str) -> str
 
     Returns the verified slug, or None if inconclusive.
     """
-    import urllib.request as _ur
-
     pair = CONFUSABLE_PAIRS[initial_slug]
     partner = pair["partner"]
     prompt = pair["prompt"]
 
     try:
-        payload = json.dumps({
-            "model": VISION_MODEL,
-            "prompt": prompt,
-            "images": [img_b64],
-            "stream": False,
-            "options": {"temperature": 0.1, "num_predict": 100},
-        }).encode()
-        req = _ur.Request(f"{OLLAMA_URL}/api/generate", data=payload,
-                          headers={"Content-Type": "application/json"})
-        resp = _ur.urlopen(req, timeout=30)
-        raw = json.loads(resp.read()).get("response", "").strip()
+        raw = llm_gateway.generate_sync(
+            VISION_MODEL,
+            prompt,
+            caller="confusable_verify",
+            priority=PRIORITY_BATCH,
+            images=[img_b64],
+            options={"temperature": 0.1, "num_predict": 100},
+            timeout=30,
+        ).strip()
 
         from .vision import extract_json_from_vision
         result = extract_json_from_vision(raw)
@@ -307,7 +304,6 @@ def classify_image(image_path: Path, allowed_slugs: list[str] | None = None,
     Returns (matched_slugs, description).
     """
     import base64
-    import urllib.request as _ur
 
     from .vision import extract_json_from_vision
 
@@ -374,17 +370,15 @@ CONFIDENCE RULES:
 
     try:
         img_data = base64.b64encode(image_path.read_bytes()).decode()
-        payload = json.dumps({
-            "model": VISION_MODEL,
-            "prompt": prompt,
-            "images": [img_data],
-            "stream": False,
-            "options": {"temperature": 0.2, "num_predict": 500},
-        }).encode()
-        req = _ur.Request(f"{OLLAMA_URL}/api/generate", data=payload,
-                          headers={"Content-Type": "application/json"})
-        resp = _ur.urlopen(req, timeout=60)
-        raw = json.loads(resp.read()).get("response", "").strip()
+        raw = llm_gateway.generate_sync(
+            VISION_MODEL,
+            prompt,
+            caller="ingest_classify",
+            priority=PRIORITY_BATCH,
+            images=[img_data],
+            options={"temperature": 0.2, "num_predict": 500},
+            timeout=60,
+        ).strip()
 
         # Parse JSON response
         result = extract_json_from_vision(raw)
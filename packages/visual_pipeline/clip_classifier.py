@@ -5,21 +5,22 @@ and took ~18s/frame. This uses CLIP image embeddings for ~50ms/frame on CPU with
 higher accuracy.
 
 Pipeline:
-  1. Build reference embeddings from approved character images
+  1. Build reference embeddings from approved character images (persistent per-image store)
   2. Batch-embed candidate frames
-  3. Cosine similarity matching with thresholds
+  3. Cosine similarity matching with thresholds (one matmul per batch)
   4. Temporal verification pass (rescue/resolve ambiguous frames)
 """
 
-import json
 import logging
 import threading
+import time
 from pathlib import Path
 from typing import Callable
 
 import numpy as np
 
 from packages.core.config import BASE_PATH
+from packages.lora_training.approval_index import get_index
 
 logger = logging.getLogger(__name__)
 
@@ -103,32 +104,86 @@ def _embed_image(path: Path | str) -> np.ndarray:
 
 
 def _embed_images_batch(paths: list[Path], batch_size: int = 16) -> np.ndarray:
-    """Batch embed images. Returns (N, dim) array of L2-normalized vectors."""
+    """Batch embed images. Returns (N, dim) array of L2-normalized vectors.
+
+    Images that fail to load come back as zero rows (similarity 0 to everything);
+    the embedding store doesn't persist those.
+    """
     import torch
     from PIL import Image
 
     model, preprocess = _load_clip_model()
 
-    all_features = []
+    out: np.ndarray | None = None
     for i in range(0, len(paths), batch_size):
-        batch_paths = paths[i:i + batch_size]
-        tensors = []
-        for p in batch_paths:
+        tensors, rows = [], []
+        for j, p in enumerate(paths[i:i + batch_size], start=i):
             try:
                 img = Image.open(p).convert("RGB")
                 tensors.append(preprocess(img))
+                rows.append(j)
             except Exception as e:
                 logger.warning(f"Failed to load {p}: {e}")
-                # Use a zero tensor as placeholder — will get low similarity
-                tensors.append(preprocess(Image.new("RGB", (224, 224))))
+        if not tensors:
+            continue
 
         batch = torch.stack(tensors).to(_get_device())
         with torch.no_grad():
             features = model.encode_image(batch)
             features = features / features.norm(dim=-1, keepdim=True)
-        all_features.append(features.cpu().numpy())
+        features = features.cpu().numpy()
+        if out is None:
+            out = np.zeros((len(paths), features.shape[1]), dtype=features.dtype)
+        out[rows] = features
+
+    if out is None:
+        return np.zeros((len(paths), model.visual.output_dim), dtype=np.float32) if paths else np.empty((0, 0))
+    return out
+
+
+# Reference sets are rebuilt from the embedding store after this many seconds
+# (re-scans reference dirs + approval index; only new/changed images get embedded)
+REFS_TTL = 300
 
-    return np.concatenate(all_features, axis=0) if all_features else np.empty((0, 0))
+_store = None
+_store_lock = threading.Lock()
+_refs_cache: dict[tuple, tuple[float, "ReferenceEmbeddings"]] = {}
+
+
+def _get_store():
+    """Process-wide per-image embedding store under datasets/.clip_cache/embeddings/."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from .embedding_store import EmbeddingStore
+            _store = EmbeddingStore(BASE_PATH / ".clip_cache" / "embeddings")
+        return _store
+
+
+class ReferenceEmbeddings(dict):
+    """slug -> (N, dim) reference embeddings, plus a lazily stacked matrix.
+
+    `stacked` is (matrix (R, dim), slugs, segment starts) so a batch of frames is
+    scored against every character with one matmul + np.maximum.reduceat.
+    """
+
+    _stacked = None
+
+    @property
+    def stacked(self) -> tuple[np.ndarray, list[str], np.ndarray]:
+        if self._stacked is None:
+            self._stacked = _stack_references(self)
+        return self._stacked
+
+
+def _stack_references(refs: dict[str, np.ndarray]) -> tuple[np.ndarray, list[str], np.ndarray]:
+    slugs = [slug for slug, emb in refs.items() if len(emb)]
+    if not slugs:
+        return np.empty((0, 0), dtype=np.float32), [], np.empty(0, dtype=np.intp)
+    counts = [len(refs[s]) for s in slugs]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+    matrix = np.concatenate([refs[s] for s in slugs], axis=0).astype(np.float32)
+    return matrix, slugs, starts
 
 
 def build_reference_embeddings(
@@ -140,33 +195,23 @@ def build_reference_embeddings(
 
     Sources (in priority order):
       1. datasets/{slug}/reference_images/ — curated references
-      2. Approved images from datasets/{slug}/images/ via approval_status.json
+      2. Approved images from datasets/{slug}/images/ via the approval index
 
-    Returns dict mapping slug -> (N, dim) array of reference embeddings.
-    Caches to datasets/.clip_cache/{project}_refs.npz.
+    Returns a ReferenceEmbeddings dict mapping slug -> (N, dim) array.
+    Per-image embeddings come from the persistent store, so only new or
+    modified images are embedded. Results are memoised for REFS_TTL seconds;
+    force_rebuild re-scans the reference sources immediately.
     """
-    import re
-
-    project_slug = re.sub(r"[^a-z0-9_]", "", project_name.lower().replace(" ", "_"))
-    cache_dir = BASE_PATH / ".clip_cache"
-    cache_file = cache_dir / f"{project_slug}_refs.npz"
-
-    # Try cache first
-    if not force_rebuild and cache_file.exists():
-        try:
-            data = np.load(cache_file, allow_pickle=False)
-            refs = {key: data[key] for key in data.files}
-            if refs:
-                logger.info(f"Loaded cached reference embeddings: {', '.join(f'{k}:{v.shape[0]}' for k, v in refs.items())}")
-                return refs
-        except Exception as e:
-            logger.warning(f"Cache load failed: {e}")
-
     # Discover character slugs from DB if not provided
     if character_slugs is None:
         character_slugs = _get_project_slugs(project_name)
 
-    refs: dict[str, np.ndarray] = {}
+    cache_key = (project_name, tuple(character_slugs))
+    cached = _refs_cache.get(cache_key)
+    if not force_rebuild and cached and time.monotonic() - cached[0] < REFS_TTL:
+        return cached[1]
+
+    ref_paths_by_slug: dict[str, list[Path]] = {}
 
     for slug in character_slugs:
         ref_paths: list[Path] = []
@@ -180,86 +225,103 @@ def build_reference_embeddings(
             ref_paths = [p for p in ref_paths if "_rejected" not in str(p)]
 
         # Priority 2: approved images from images/
-        approval_file = BASE_PATH / slug / "approval_status.json"
-        if approval_file.exists():
-            try:
-                approval = json.loads(approval_file.read_text())
-                images_dir = BASE_PATH / slug / "images"
-                for filename, status in approval.items():
-                    if status == "approved":
-                        img_path = images_dir / filename
-                        if img_path.exists() and img_path not in ref_paths:
-                            ref_paths.append(img_path)
-            except (json.JSONDecodeError, IOError):
-                pass
+        images_dir = BASE_PATH / slug / "images"
+        seen = set(ref_paths)
+        for filename in get_index(BASE_PATH).names_with_status(slug, "approved", on_disk=True):
+            img_path = images_dir / filename
+            if img_path not in seen:
+                ref_paths.append(img_path)
 
         if not ref_paths:
             logger.warning(f"No reference images for {slug}")
             continue
-
-        embeddings = _embed_images_batch(ref_paths)
-        if embeddings.size > 0:
-            refs[slug] = embeddings
-            logger.info(f"  {slug}: {len(ref_paths)} references -> {embeddings.shape}")
-
-    # Save cache
-    if refs:
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        np.savez(cache_file, **refs)
-        logger.info(f"Cached reference embeddings to {cache_file}")
-
+        ref_paths_by_slug[slug] = ref_paths
+
+    # One store lookup for every character — a single embedding batch for anything new
+    all_paths = [p for paths in ref_paths_by_slug.values() for p in paths]
+    refs = ReferenceEmbeddings()
+    if all_paths:
+        embeddings = _get_store().get_many(all_paths, _embed_images_batch)
+        offset = 0
+        for slug, paths in ref_paths_by_slug.items():
+            rows = embeddings[offset:offset + len(paths)]
+            offset += len(paths)
+            rows = rows[rows.any(axis=1)]  # drop references that couldn't be read
+            if not len(rows):
+                logger.warning(f"No readable reference images for {slug}")
+                continue
+            refs[slug] = rows
+            logger.info(f"  {slug}: {len(rows)} references -> {rows.shape}")
+
+    _refs_cache[cache_key] = (time.monotonic(), refs)
     return refs
 
 
-def classify_frame_clip(
-    frame_embedding: np.ndarray,
+def classify_embeddings(
+    frame_embeddings: np.ndarray,
     ref_embeddings: dict[str, np.ndarray],
-) -> dict:
-    """Classify a single frame against reference embeddings via cosine similarity.
+) -> list[dict]:
+    """Classify (N, dim) frame embeddings against references via cosine similarity.
 
-    Multi-character aware: returns ALL characters above threshold, not just the top one.
-    A frame of Mario riding Yoshi returns both.
+    All frames are scored against the stacked reference matrix in one matmul;
+    per-character scores are the max over that character's segment.
+    Multi-character aware: a frame of Mario riding Yoshi returns both.
 
-    Returns:
+    Returns one dict per frame:
         {matched_slug (best), matched_slugs (all above threshold), similarity,
          all_scores, ambiguous, runner_up_slug, runner_up_similarity}
     """
-    all_scores: dict[str, float] = {}
-
-    for slug, refs in ref_embeddings.items():
-        # Cosine similarity — embeddings are already L2-normalized
-        similarities = frame_embedding @ refs.T
-        # Use max similarity across all reference images for this character
-        all_scores[slug] = float(np.max(similarities))
-
-    if not all_scores:
-        return {
+    if isinstance(ref_embeddings, ReferenceEmbeddings):
+        matrix, slugs, starts = ref_embeddings.stacked
+    else:
+        matrix, slugs, starts = _stack_references(ref_embeddings)
+
+    frame_embeddings = np.atleast_2d(np.asarray(frame_embeddings, dtype=np.float32))
+    if not slugs:
+        return [{
             "matched_slug": None, "matched_slugs": [], "similarity": 0.0,
             "all_scores": {}, "ambiguous": False,
             "runner_up_slug": None, "runner_up_similarity": 0.0,
-        }
+        } for _ in range(len(frame_embeddings))]
 
-    # Sort by score descending
-    ranked = sorted(all_scores.items(), key=lambda x: x[1], reverse=True)
-    best_slug, best_score = ranked[0]
-    runner_slug = ranked[1][0] if len(ranked) > 1 else None
-    runner_score = ranked[1][1] if len(ranked) > 1 else 0.0
+    # Cosine similarity — embeddings are already L2-normalized.
+    # (N, R) similarities -> (N, n_slugs) max per character segment.
+    scores = np.maximum.reduceat(frame_embeddings @ matrix.T, starts, axis=1)
 
-    # All characters above threshold — multi-character assignment
-    matched_slugs = [slug for slug, score in ranked if score >= MATCH_THRESHOLD]
+    results = []
+    for row in scores:
+        all_scores = {slug: float(s) for slug, s in zip(slugs, row)}
+
+        # Sort by score descending
+        ranked = sorted(all_scores.items(), key=lambda x: x[1], reverse=True)
+        best_slug, best_score = ranked[0]
+        runner_slug = ranked[1][0] if len(ranked) > 1 else None
+        runner_score = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        # All characters above threshold — multi-character assignment
+        matched_slugs = [slug for slug, score in ranked if score >= MATCH_THRESHOLD]
+
+        matched = best_slug if best_score >= MATCH_THRESHOLD else None
+        ambiguous = (best_score - runner_score) < AMBIGUITY_MARGIN if matched else False
+
+        results.append({
+            "matched_slug": matched,
+            "matched_slugs": matched_slugs,
+            "similarity": best_score,
+            "all_scores": all_scores,
+            "ambiguous": ambiguous,
+            "runner_up_slug": runner_slug,
+            "runner_up_similarity": runner_score,
+        })
+    return results
 
-    matched = best_slug if best_score >= MATCH_THRESHOLD else None
-    ambiguous = (best_score - runner_score) < AMBIGUITY_MARGIN if matched else False
 
-    return {
-        "matched_slug": matched,
-        "matched_slugs": matched_slugs,
-        "similarity": best_score,
-        "all_scores": all_scores,
-        "ambiguous": ambiguous,
-        "runner_up_slug": runner_slug,
-        "runner_up_similarity": runner_score,
-    }
+def classify_frame_clip(
+    frame_embedding: np.ndarray,
+    ref_embeddings: dict[str, np.ndarray],
+) -> dict:
+    """Classify a single frame against reference embeddings (see classify_embeddings)."""
+    return classify_embeddings(frame_embedding[None, :], ref_embeddings)[0]
 
 
 def classify_frames_batch(
@@ -269,12 +331,10 @@ def classify_frames_batch(
 ) -> list[dict]:
     """Batch classify frames against references. Returns list of classification dicts."""
     frame_embeddings = _embed_images_batch(frame_paths, batch_size=batch_size)
-    results = []
-    for i, embedding in enumerate(frame_embeddings):
-        result = classify_frame_clip(embedding, ref_embeddings)
+    results = classify_embeddings(frame_embeddings, ref_embeddings) if len(frame_paths) else []
+    for i, result in enumerate(results):
         result["frame_path"] = str(frame_paths[i])
         result["frame_index"] = i
-        results.append(result)
     return results
 
 
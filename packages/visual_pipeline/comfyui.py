@@ -1,10 +1,10 @@
 """ComfyUI interaction helpers — workflow building, submission, progress tracking."""
 
-import json
 import logging
 from pathlib import Path
 
-from packages.core.config import COMFYUI_URL, COMFYUI_OUTPUT_DIR, BASE_PATH
+from packages.core.comfyui_client import get_comfyui_client
+from packages.core.config import COMFYUI_OUTPUT_DIR, BASE_PATH
 from packages.core.model_profiles import get_model_profile
 
 logger = logging.getLogger(__name__)
@@ -230,53 +230,11 @@ def build_comfyui_workflow(
     return workflow
 
 
-def submit_comfyui_workflow(workflow: dict) -> str:
+async def submit_comfyui_workflow(workflow: dict) -> str:
     """Submit a workflow to ComfyUI and return the prompt_id."""
-    import urllib.request
-    payload = json.dumps({"prompt": workflow}).encode()
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = urllib.request.urlopen(req, timeout=30)
-    result = json.loads(resp.read())
-    return result.get("prompt_id", "")
+    return await get_comfyui_client().submit(workflow)
 
 
-def get_comfyui_progress(prompt_id: str) -> dict:
+async def get_comfyui_progress(prompt_id: str) -> dict:
     """Check ComfyUI generation progress for a given prompt_id."""
-    import urllib.request
-    try:
-        req = urllib.request.Request(f"{COMFYUI_URL}/queue")
-        resp = urllib.request.urlopen(req, timeout=10)
-        queue_data = json.loads(resp.read())
-
-        for job in queue_data.get("queue_running", []):
-            if prompt_id in str(job):
-                return {"status": "running", "progress": 0.5}
-
-        for job in queue_data.get("queue_pending", []):
-            if prompt_id in str(job):
-                return {"status": "pending", "progress": 0.1}
-
-        # Check history for completion
-        req = urllib.request.Request(f"{COMFYUI_URL}/history/{prompt_id}")
-        resp = urllib.request.urlopen(req, timeout=10)
-        history = json.loads(resp.read())
-
-        if prompt_id in history:
-            outputs = history[prompt_id].get("outputs", {})
-            images = []
-            for node_output in outputs.values():
-                images.extend(node_output.get("images", []))
-            return {
-                "status": "completed",
-                "progress": 1.0,
-                "images": [img.get("filename") for img in images],
-            }
-
-        return {"status": "unknown", "progress": 0.0}
-    except Exception as e:
-        logger.warning(f"ComfyUI progress check failed: {e}")
-        return {"status": "error", "progress": 0.0, "error": str(e)}
+    return await get_comfyui_client().progress(prompt_id)
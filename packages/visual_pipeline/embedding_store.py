@@ -0,0 +1,172 @@
+"""Persistent per-image CLIP embedding store.
+
+Embeddings live in a memory-mapped float16 matrix (embeddings.f16) with a JSON
+id map (index.json) from image path to (row, mtime_ns). Looking up a set of
+images only embeds the ones that are new or whose file changed since they were
+stored; everything else is read straight from the memmap.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DTYPE = np.float16
+_MIN_CAPACITY = 256
+
+
+class EmbeddingStore:
+    """path+mtime keyed embedding rows backed by a float16 memmap."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._matrix_path = root / "embeddings.f16"
+        self._index_path = root / "index.json"
+        self.dim: int | None = None
+        self._rows: dict[str, tuple[int, int]] = {}  # path -> (row, mtime_ns)
+        self._free: list[int] = []
+        self._used = 0
+        self._mm: np.memmap | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # -- persistence --------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self._index_path.is_file():
+            return
+        try:
+            data = json.loads(self._index_path.read_text())
+            self.dim = data["dim"]
+            self._rows = {k: (v[0], v[1]) for k, v in data["rows"].items()}
+            self._used = data["used"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Embedding store index unreadable, starting fresh: {e}")
+            self._reset()
+            return
+        live = {row for row, _ in self._rows.values()}
+        self._free = [r for r in range(self._used) if r not in live]
+        self._open()
+
+    def _open(self) -> None:
+        if self.dim is None or not self._matrix_path.is_file():
+            self._mm = None
+            return
+        rows = self._matrix_path.stat().st_size // (self.dim * np.dtype(_DTYPE).itemsize)
+        self._mm = np.memmap(self._matrix_path, dtype=_DTYPE, mode="r+", shape=(rows, self.dim)) if rows else None
+
+    def _capacity(self) -> int:
+        return 0 if self._mm is None else self._mm.shape[0]
+
+    def _ensure_capacity(self, n: int) -> None:
+        if n <= self._capacity():
+            return
+        new_cap = max(n, 2 * self._capacity(), _MIN_CAPACITY)
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm = None
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self._matrix_path, "ab") as f:
+            f.truncate(new_cap * self.dim * np.dtype(_DTYPE).itemsize)
+        self._open()
+
+    def _save_index(self) -> None:
+        tmp = self._index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({
+            "dim": self.dim,
+            "used": self._used,
+            "rows": {k: list(v) for k, v in self._rows.items()},
+        }))
+        os.replace(tmp, self._index_path)
+
+    def _reset(self) -> None:
+        self._mm = None
+        self._rows.clear()
+        self._free.clear()
+        self._used = 0
+        self.dim = None
+        self._matrix_path.unlink(missing_ok=True)
+        self._index_path.unlink(missing_ok=True)
+
+    # -- lookup -------------------------------------------------------------
+
+    def get_many(
+        self, paths: list[Path], embed_fn: Callable[[list[Path]], np.ndarray],
+    ) -> np.ndarray:
+        """Return (N, dim) float32 embeddings for paths, embedding only stale entries.
+
+        embed_fn is called once with every path that is missing or whose mtime
+        changed, and returns a zero row for any image it couldn't read. Unreadable
+        and missing paths come back as zero vectors and are not stored.
+        """
+        keys = [str(p) for p in paths]
+        mtimes: list[int | None] = []
+        for p in paths:
+            try:
+                mtimes.append(os.stat(p).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+
+        with self._lock:
+            todo = [
+                i for i, (k, mt) in enumerate(zip(keys, mtimes))
+                if mt is not None and self._rows.get(k, (None, None))[1] != mt
+            ]
+
+        if todo:
+            vecs = np.asarray(embed_fn([paths[i] for i in todo]), dtype=np.float32)
+            loaded = vecs.any(axis=1)
+            with self._lock:
+                dim_changed = loaded.any() and self.dim is not None and vecs.shape[1] != self.dim
+                if dim_changed:
+                    logger.warning(f"Embedding dim changed {self.dim} -> {vecs.shape[1]}, resetting store")
+                    self._reset()
+            if dim_changed:
+                # Everything stored is gone (different CLIP model) — embed the hits too
+                return self.get_many(paths, embed_fn)
+
+            with self._lock:
+                for vec, i, ok in zip(vecs, todo, loaded):
+                    if not ok:
+                        # Failed load: forget any older embedding so it isn't served for the new file
+                        mtimes[i] = None
+                        stale = self._rows.pop(keys[i], None)
+                        if stale is not None:
+                            self._free.append(stale[0])
+                        continue
+                    self.dim = vecs.shape[1]
+                    row = self._rows.get(keys[i], (None, None))[0]
+                    if row is None:
+                        if self._free:
+                            row = self._free.pop()
+                        else:
+                            row = self._used
+                            self._used += 1
+                        self._ensure_capacity(self._used)
+                    self._mm[row] = vec.astype(_DTYPE)
+                    self._rows[keys[i]] = (row, mtimes[i])
+                if self._mm is not None:
+                    self._mm.flush()
+                self._save_index()
+            failed = int(len(todo) - loaded.sum())
+            logger.info(
+                f"Embedding store: embedded {len(todo) - failed} new/changed of {len(paths)} images"
+                + (f", {failed} unreadable" if failed else "")
+            )
+
+        with self._lock:
+            out = np.zeros((len(paths), self.dim or 0), dtype=np.float32)
+            hits = [(i, self._rows[k][0]) for i, k in enumerate(keys) if mtimes[i] is not None and k in self._rows]
+            if hits:
+                idx, rows = zip(*hits)
+                out[list(idx)] = self._mm[list(rows)]
+        return out
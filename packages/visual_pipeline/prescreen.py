@@ -0,0 +1,234 @@
+"""Pre-screen — cheap CPU checks that settle obvious cases before vision review.
+
+Every candidate used to go straight to the 12B vision model, including black
+frames, blank canvases, smeared renders and re-generations of images that were
+already rejected. The pre-screen runs first and rejects those outright; only
+images it can't decide go on to the LLM. Checks, cheapest first:
+
+    metrics    brightness / contrast / Laplacian blur from server/quality_scorer.py
+               (black, washed-out, blank and heavily blurred images)
+    duplicate  perceptual-hash match to an image already rejected for the character
+    clip       CLIP similarity to the character's reference set; a poor match is
+               rejected, and a confident match to another character of the project
+               is reported as suggested_slug
+
+Each check is skipped when its dependency (OpenCV, CLIP) isn't installed or the
+character has no references, so the pre-screen only ever removes LLM calls.
+Thresholds are the PRESCREEN_* settings in config; prescreen_stats() reports
+per-stage counts and how many vision-model calls were saved.
+"""
+
+import importlib.util
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from packages.core.config import (
+    BASE_PATH,
+    PRESCREEN_ENABLED,
+    PRESCREEN_MAX_BRIGHTNESS,
+    PRESCREEN_MIN_BLUR,
+    PRESCREEN_MIN_BRIGHTNESS,
+    PRESCREEN_MIN_CLIP,
+    PRESCREEN_MIN_CONTRAST,
+    VIDEO_QC_REVIEW_MODE,
+)
+from packages.lora_training.approval_index import get_index
+
+logger = logging.getLogger(__name__)
+
+# Reason kind -> video QC issue (KNOWN_ISSUES in scene_generation/video_vision.py)
+FRAME_ISSUES = {
+    "dark": "poor_lighting",
+    "bright": "poor_lighting",
+    "blank": "artifact_flicker",
+    "blurry": "blurry",
+    "wrong_character": "wrong_character",
+}
+
+_counters: dict[str, dict] = {}
+
+
+@dataclass
+class Screen:
+    """Pre-screen outcome for one image: "reject" or "review" (send to the LLM)."""
+
+    verdict: str = "review"
+    reasons: list[str] = field(default_factory=list)
+    kinds: list[str] = field(default_factory=list)
+    metrics: dict = field(default_factory=dict)
+    clip_similarity: float | None = None
+    suggested_slug: str | None = None
+    duplicate_of: str | None = None
+
+    @property
+    def rejected(self) -> bool:
+        return self.verdict == "reject"
+
+    def reject(self, kind: str, reason: str):
+        self.verdict = "reject"
+        self.kinds.append(kind)
+        self.reasons.append(reason)
+
+    def as_dict(self) -> dict:
+        return {
+            "verdict": self.verdict, "reasons": self.reasons, "kinds": self.kinds,
+            "metrics": self.metrics, "clip_similarity": self.clip_similarity,
+            "suggested_slug": self.suggested_slug, "duplicate_of": self.duplicate_of,
+        }
+
+    def as_review(self) -> dict:
+        """A vision-review-shaped result for a rejected image (scores 0, reasons as issues)."""
+        return {
+            "character_match": 0 if "wrong_character" in self.kinds else 5,
+            "solo": True,
+            "clarity": 0,
+            "completeness": "unknown",
+            "training_value": 0,
+            "caption": "",
+            "issues": list(self.reasons),
+            "prescreen": self.as_dict(),
+        }
+
+
+def check_metrics(metrics: dict, screen: Screen):
+    """Reject black, washed-out, blank or heavily blurred images from quality_scorer metrics."""
+    if metrics.get("quality_score") is None:
+        return
+    brightness = metrics["brightness"]
+    if brightness < PRESCREEN_MIN_BRIGHTNESS:
+        screen.reject("dark", f"low quality: black frame (brightness {brightness:.2f})")
+    elif brightness > PRESCREEN_MAX_BRIGHTNESS:
+        screen.reject("bright", f"low quality: washed-out frame (brightness {brightness:.2f})")
+    if metrics["contrast"] < PRESCREEN_MIN_CONTRAST:
+        screen.reject("blank", f"low quality: blank image (contrast {metrics['contrast']:.3f})")
+    elif metrics["blur_score"] < PRESCREEN_MIN_BLUR:
+        screen.reject("blurry", f"blurry: Laplacian blur score {metrics['blur_score']:.4f}")
+
+
+def _image_metrics(image_path: Path) -> dict:
+    from server.quality_scorer import score_image
+    return score_image(str(image_path))
+
+
+def _rejected_duplicate(image_path: Path, slug: str) -> str | None:
+    """Name of an already rejected image of slug that image_path near-duplicates."""
+    from packages.lora_training.dedup import build_hash_index, image_hashes
+
+    rejected = get_index(BASE_PATH).names_with_status(slug, "rejected")
+    if not rejected:
+        return None
+    try:
+        matches = build_hash_index(slug).find_all(image_hashes(image_path))
+    except Exception:
+        return None
+    rejected = set(rejected)
+    return next((n for n in matches if n in rejected and n != image_path.name), None)
+
+
+def clip_available() -> bool:
+    return importlib.util.find_spec("open_clip") is not None and importlib.util.find_spec("torch") is not None
+
+
+def _clip_scores(image_path: Path, slugs: list[str]) -> dict[str, float]:
+    from .clip_classifier import _embed_images_batch, build_reference_embeddings, classify_embeddings
+
+    refs = build_reference_embeddings("", character_slugs=slugs)
+    if not refs:
+        return {}
+    return classify_embeddings(_embed_images_batch([image_path]), refs)[0]["all_scores"]
+
+
+def check_clip(image_path: Path, slug: str, screen: Screen, project_slugs: list[str] | None = None):
+    """Reject images far from slug's references; note a confident match to another character."""
+    from .clip_classifier import HIGH_CONFIDENCE
+
+    if PRESCREEN_MIN_CLIP <= 0 or not clip_available():
+        return
+    try:
+        scores = _clip_scores(image_path, sorted({slug, *(project_slugs or [])}))
+    except Exception as e:
+        logger.warning(f"Pre-screen CLIP check failed for {image_path.name}: {e}")
+        return
+    if slug not in scores:
+        return  # no references for this character
+    screen.clip_similarity = round(scores[slug], 4)
+    best_slug, best = max(scores.items(), key=lambda kv: kv[1])
+    if best_slug != slug and best >= HIGH_CONFIDENCE:
+        screen.suggested_slug = best_slug
+    if scores[slug] < PRESCREEN_MIN_CLIP:
+        looks_like = f", looks like {screen.suggested_slug}" if screen.suggested_slug else ""
+        screen.reject(
+            "wrong_character",
+            f"wrong character: CLIP similarity {scores[slug]:.2f} to {slug} references{looks_like}",
+        )
+
+
+def screen_image(image_path: Path, slug: str, project_slugs: list[str] | None = None,
+                 stage: str = "image_review") -> Screen:
+    """Run the pre-screen on a dataset image; stops at the first failing check."""
+    screen = Screen()
+    if PRESCREEN_ENABLED:
+        screen.metrics = _image_metrics(image_path)
+        check_metrics(screen.metrics, screen)
+        if not screen.rejected:
+            screen.duplicate_of = _rejected_duplicate(image_path, slug)
+            if screen.duplicate_of:
+                screen.reject("reject_duplicate", f"near-duplicate of rejected {screen.duplicate_of}")
+        if not screen.rejected:
+            check_clip(image_path, slug, screen, project_slugs)
+    _record(stage, [screen], calls_saved=1 if screen.rejected else 0)
+    return screen
+
+
+def screen_video_frames(frame_paths: list[str], character_slug: str | None = None,
+                        stage: str = "video_qc") -> dict | None:
+    """Pre-screen QC frames. Returns a failing QC review when any frame is rejected, else None.
+
+    A single black, blank or smeared frame fails the attempt, so the vision model
+    isn't asked about the others; the issues map onto KNOWN_ISSUES so the QC loop's
+    prompt fixes still apply.
+    """
+    if not PRESCREEN_ENABLED or not frame_paths:
+        return None
+    screens = []
+    for fp in frame_paths:
+        screen = Screen(metrics=_image_metrics(Path(fp)))
+        check_metrics(screen.metrics, screen)
+        if not screen.rejected and character_slug:
+            check_clip(Path(fp), character_slug, screen)
+        screens.append(screen)
+    failed = any(s.rejected for s in screens)
+    # batch/sheet review asks about every frame in one request
+    calls = len(frame_paths) if VIDEO_QC_REVIEW_MODE == "per_frame" else 1
+    _record(stage, screens, calls_saved=calls if failed else 0)
+    if not failed:
+        return None
+    issues = {FRAME_ISSUES[k] for s in screens for k in s.kinds if k in FRAME_ISSUES}
+    return {
+        "overall_score": 0.0,
+        "issues": sorted(issues),
+        "per_frame": [s.as_dict() for s in screens],
+        "category_averages": {},
+        "prescreen": True,
+    }
+
+
+def _record(stage: str, screens: list[Screen], calls_saved: int):
+    counts = _counters.setdefault(stage, {
+        "screened": 0, "rejected": 0, "sent_to_llm": 0, "llm_calls_saved": 0, "reasons": {},
+    })
+    counts["screened"] += len(screens)
+    counts["llm_calls_saved"] += calls_saved
+    if calls_saved:
+        counts["rejected"] += 1
+    else:
+        counts["sent_to_llm"] += 1
+    for s in screens:
+        for kind in s.kinds:
+            counts["reasons"][kind] = counts["reasons"].get(kind, 0) + 1
+
+
+def prescreen_stats() -> dict:
+    """Per-stage pre-screen counters (items rejected vs sent on, LLM calls saved, reasons)."""
+    return {"enabled": PRESCREEN_ENABLED, "clip": clip_available(), "stages": _counters}
@@ -0,0 +1,100 @@
+"""Review cache — content-addressed store of vision-model results.
+
+Image review, video frame QC and visual tagging run a 12B vision model per
+image, and the same unchanged images come back again and again (re-review
+after a restart, replenishment loops, QC retries, reassignment between
+characters). Results are stored in the approval index database under:
+
+    kind              which caller ("image_review", "video_frame", "visual_tags")
+    content_hash      sha1 of the image bytes (all images, in order, for multi-image prompts)
+    template_version  the caller's prompt version — bump it when the prompt changes
+    context_hash      sha1 of the character context the prompt is built from
+    model             vision model name
+
+A character edit changes its context hash, so stale reviews stop matching on
+their own; invalidate(slug) also deletes them when design_prompt or
+appearance_data is updated. Only parsed model answers are stored, never the
+neutral fallbacks returned when Ollama fails.
+
+Usage:
+    key = review_key("image_review", [img_bytes], VISION_REVIEW_VERSION, model,
+                     design_prompt=design_prompt, appearance_data=appearance_data)
+    review = review_cache.get(key)
+    if review is None:
+        review = ...  # call the model
+        review_cache.put(key, review, slug=character_slug)
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from packages.core.config import BASE_PATH
+from packages.lora_training.approval_index import get_index
+
+logger = logging.getLogger(__name__)
+
+
+def review_key(kind: str, images: list[bytes], template_version: int, model: str,
+               **context) -> tuple[str, str, int, str, str]:
+    """Cache key for one review: (kind, content_hash, template_version, context_hash, model)."""
+    content = hashlib.sha1()
+    for data in images:
+        content.update(hashlib.sha1(data).digest())
+    ctx = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+    return kind, content.hexdigest(), template_version, hashlib.sha1(ctx.encode()).hexdigest(), model
+
+
+class ReviewCache:
+    """Hit/miss-counting front for the vision_reviews table."""
+
+    def __init__(self, root: Path | None = None):
+        self.root = root
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, kind: str, field: str):
+        counts = self._counters.setdefault(kind, {"hits": 0, "misses": 0, "stored": 0})
+        counts[field] += 1
+
+    def get(self, key: tuple[str, str, int, str, str]) -> dict | None:
+        try:
+            result = get_index(self.root or BASE_PATH).get_vision_review(key)
+        except Exception as e:
+            logger.warning(f"Review cache read failed: {e}")
+            result = None
+        self._count(key[0], "hits" if result is not None else "misses")
+        return result
+
+    def put(self, key: tuple[str, str, int, str, str], result: dict, slug: str | None = None):
+        try:
+            get_index(self.root or BASE_PATH).put_vision_review(key, slug, result)
+            self._count(key[0], "stored")
+        except Exception as e:
+            logger.warning(f"Review cache write failed: {e}")
+
+    def invalidate(self, slug: str) -> int:
+        """Forget every review made against a character (after its description changed)."""
+        try:
+            removed = get_index(self.root or BASE_PATH).invalidate_vision_reviews(slug)
+        except Exception as e:
+            logger.warning(f"Review cache invalidation failed for {slug}: {e}")
+            return 0
+        if removed:
+            logger.info(f"Review cache: dropped {removed} cached reviews for {slug}")
+        return removed
+
+    def stats(self) -> dict:
+        kinds = {}
+        for kind, counts in sorted(self._counters.items()):
+            lookups = counts["hits"] + counts["misses"]
+            kinds[kind] = {**counts, "hit_rate": round(counts["hits"] / lookups, 3) if lookups else None}
+        try:
+            entries = get_index(self.root or BASE_PATH).vision_review_counts()
+        except Exception:
+            entries = {}
+        return {"kinds": kinds, "entries": entries}
+
+
+# Module-level singleton
+review_cache = ReviewCache()
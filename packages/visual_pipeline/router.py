@@ -101,7 +101,7 @@ async def generate_for_character(character_slug: str, body: GenerateRequest):
     )
 
     try:
-        prompt_id = submit_comfyui_workflow(workflow)
+        prompt_id = await submit_comfyui_workflow(workflow)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ComfyUI submission failed: {e}")
 
@@ -146,7 +146,7 @@ async def generate_for_character(character_slug: str, body: GenerateRequest):
 @router.get("/generate/{prompt_id}/status")
 async def get_generation_status(prompt_id: str):
     """Check ComfyUI generation progress."""
-    return get_comfyui_progress(prompt_id)
+    return await get_comfyui_progress(prompt_id)
 
 
 @router.get("/gallery")
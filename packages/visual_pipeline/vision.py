@@ -4,7 +4,9 @@ import json
 import logging
 from pathlib import Path
 
-from packages.core.config import VISION_MODEL, OLLAMA_URL
+from packages.core.config import VISION_MODEL
+from packages.core.llm_gateway import PRIORITY_REVIEW, llm_gateway
+from .review_cache import review_cache, review_key
 
 logger = logging.getLogger(__name__)
 
@@ -63,21 +65,22 @@ def extract_json_from_vision(raw: str) -> dict | None:
 def vision_describe_image(image_path: Path) -> str:
     """Get a visual description of an image using the configured vision model (legacy, kept for upload endpoint)."""
     import base64
-    import urllib.request as _ur
 
     img_data = base64.b64encode(image_path.read_bytes()).decode()
-    payload = json.dumps({
-        "model": VISION_MODEL,
-        "prompt": "Describe the characters visible in this animated frame. Focus on species, colors, clothing, and distinctive features. Be concise.",
-        "images": [img_data],
-        "stream": False,
-        "options": {"temperature": 0.1, "num_predict": 250},
-    }).encode()
-    req = _ur.Request(f"{OLLAMA_URL}/api/generate", data=payload, headers={"Content-Type": "application/json"})
-    resp = _ur.urlopen(req, timeout=60)
-    return json.loads(resp.read()).get("response", "").strip()
+    return llm_gateway.generate_sync(
+        VISION_MODEL,
+        "Describe the characters visible in this animated frame. Focus on species, colors, clothing, and distinctive features. Be concise.",
+        caller="vision_describe",
+        priority=PRIORITY_REVIEW,
+        images=[img_data],
+        options={"temperature": 0.1, "num_predict": 250},
+        timeout=60,
+    ).strip()
 
 
+# Bump when the prompt or vision_review_image()'s score gates change (invalidates review_cache)
+VISION_REVIEW_VERSION = 1
+
 _VISION_REVIEW_PROMPT = """You are evaluating an image for use in LoRA training of a specific character.
 
 The character this image SHOULD contain: {character_name}
@@ -198,7 +201,6 @@ def _verify_species(image_path: Path, species: str, appearance_data: dict) -> bo
     Returns True if species matches, False if wrong species detected.
     """
     import base64
-    import urllib.request as _ur
 
     # Find the best matching species check
     species_lower = species.lower()
@@ -226,17 +228,15 @@ def _verify_species(image_path: Path, species: str, appearance_data: dict) -> bo
 
     try:
         img_data = base64.b64encode(image_path.read_bytes()).decode()
-        payload = json.dumps({
-            "model": VISION_MODEL,
-            "prompt": prompt,
-            "images": [img_data],
-            "stream": False,
-            "options": {"temperature": 0.1, "num_predict": 30},
-        }).encode()
-        req = _ur.Request(f"{OLLAMA_URL}/api/generate", data=payload,
-                          headers={"Content-Type": "application/json"})
-        resp = _ur.urlopen(req, timeout=30)
-        raw = json.loads(resp.read()).get("response", "").strip()
+        raw = llm_gateway.generate_sync(
+            VISION_MODEL,
+            prompt,
+            caller="species_check",
+            priority=PRIORITY_REVIEW,
+            images=[img_data],
+            options={"temperature": 0.1, "num_predict": 30},
+            timeout=30,
+        ).strip()
 
         result = extract_json_from_vision(raw)
         if result and "species_correct" in result:
@@ -262,10 +262,24 @@ def _verify_species(image_path: Path, species: str, appearance_data: dict) -> bo
 
 def vision_review_image(image_path: Path, character_name: str, design_prompt: str,
                         model: str | None = None, appearance_data: dict | None = None,
-                        model_profile: dict | None = None) -> dict:
-    """Assess an image for LoRA training quality using the configured vision model."""
+                        model_profile: dict | None = None, character_slug: str | None = None) -> dict:
+    """Assess an image for LoRA training quality using the configured vision model.
+
+    Results are cached by image content + character context (review_cache);
+    character_slug tags the entry so it can be invalidated when the character changes.
+    """
     import base64
-    import urllib.request as _ur
+
+    model = model or VISION_MODEL
+    img_bytes = image_path.read_bytes()
+    cache_key = review_key(
+        "image_review", [img_bytes], VISION_REVIEW_VERSION, model,
+        character_name=character_name, design_prompt=design_prompt,
+        appearance_data=appearance_data, model_profile=model_profile,
+    )
+    cached = review_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     expected_gender = _extract_gender(design_prompt)
     feature_checklist = build_feature_checklist(appearance_data or {})
@@ -298,24 +312,20 @@ def vision_review_image(image_path: Path, character_name: str, design_prompt: st
         style_context=style_context,
         common_errors_section=common_errors_section,
     )
-    img_data = base64.b64encode(image_path.read_bytes()).decode()
-    payload = json.dumps({
-        "model": model or VISION_MODEL,
-        "prompt": prompt,
-        "images": [img_data],
-        "stream": False,
-        "options": {"temperature": 0.3, "num_predict": 400},
-    }).encode()
-    req = _ur.Request(
-        f"{OLLAMA_URL}/api/generate",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    resp = _ur.urlopen(req, timeout=90)
-    raw = json.loads(resp.read()).get("response", "").strip()
+    img_data = base64.b64encode(img_bytes).decode()
+    raw = llm_gateway.generate_sync(
+        model,
+        prompt,
+        caller="vision_review",
+        priority=PRIORITY_REVIEW,
+        images=[img_data],
+        options={"temperature": 0.3, "num_predict": 400},
+        timeout=90,
+    ).strip()
 
     # Try to parse JSON from the response
     review = extract_json_from_vision(raw)
+    parsed = review is not None
     if review is None:
         logger.warning(f"Vision model returned non-JSON for {image_path.name}: {raw[:200]}")
         review = {
@@ -392,6 +402,8 @@ def vision_review_image(image_path: Path, character_name: str, design_prompt: st
             f"KNOWN PROBLEM: {hit}" for hit in error_hits
         ]
 
+    if parsed:
+        review_cache.put(cache_key, review, slug=character_slug)
     return review
 
 
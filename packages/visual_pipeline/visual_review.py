@@ -17,11 +17,13 @@ from packages.core.config import BASE_PATH, OLLAMA_URL
 from packages.core.db import get_char_project_map
 from packages.core.models import VisionReviewRequest
 from packages.lora_training.feedback import record_rejection, queue_regeneration, REJECTION_NEGATIVE_MAP
+from packages.lora_training.approval_index import get_index
 from packages.core.audit import log_decision, log_rejection, log_approval
 from packages.core.events import event_bus, IMAGE_REJECTED, IMAGE_APPROVED, REGENERATION_QUEUED
 
 from packages.core.model_profiles import get_model_profile, adjust_thresholds
 
+from .prescreen import screen_image
 from .vision import vision_review_image, vision_issues_to_categories
 
 logger = logging.getLogger(__name__)
@@ -81,6 +83,7 @@ async def vision_review(body: VisionReviewRequest):
         "reviewed": 0,
         "auto_approved": 0,
         "auto_rejected": 0,
+        "prescreened": 0,
         "errors": 0,
         "regen_queued": 0,
         "current_image": None,
@@ -135,6 +138,20 @@ async def cancel_vision_task(task_id: str):
     return {"task_id": task_id, "message": "Cancellation requested — will stop before next image"}
 
 
+async def _prescreen(task_id: str, img_path: Path, slug: str, project_slugs: list[str]) -> dict | None:
+    """Pre-screen a pending image; returns a rejecting review, or None to send it to the vision model."""
+    try:
+        screen = await asyncio.to_thread(screen_image, img_path, slug, project_slugs)
+    except Exception as e:
+        logger.warning(f"[{task_id}] Pre-screen failed for {img_path.name}: {e}")
+        return None
+    if not screen.rejected:
+        return None
+    _vision_tasks[task_id]["prescreened"] += 1
+    logger.info(f"[{task_id}] Pre-screen rejected {slug}/{img_path.name}: {'; '.join(screen.reasons)}")
+    return screen.as_review()
+
+
 async def _vision_review_worker(
     task_id: str,
     body: VisionReviewRequest,
@@ -158,6 +175,9 @@ async def _vision_review_worker(
 
             db_info = char_map[slug]
             checkpoint = db_info.get("checkpoint_model", "unknown")
+            # Characters an image could be confused with (pre-screen CLIP routing)
+            project_slugs = [other for other, info in char_map.items()
+                             if info.get("project_name") == db_info.get("project_name")]
 
             profile = get_model_profile(
                 checkpoint,
@@ -173,11 +193,9 @@ async def _vision_review_worker(
             if not images_path.exists():
                 continue
 
-            approval_file = char_dir / "approval_status.json"
-            approval_status = {}
-            if approval_file.exists():
-                with open(approval_file) as f:
-                    approval_status = json.load(f)
+            index = get_index(BASE_PATH)
+            approval_status = index.get_statuses(slug)
+            status_updates: dict[str, str] = {}
 
             target_statuses = ["pending"]
             if body.include_approved:
@@ -189,8 +207,6 @@ async def _vision_review_worker(
                 if approval_status.get(img.name, "pending") in target_statuses
             ]
 
-            status_changed = False
-
             for img_path in target_pngs:
                 if task["reviewed"] >= body.max_images or task["cancelled"]:
                     break
@@ -210,32 +226,39 @@ async def _vision_review_worker(
                 task["current_image"] = f"{slug}/{img_path.name}"
                 logger.info(f"[{task_id}] Vision reviewing {slug}/{img_path.name} ({task['reviewed'] + 1}/{body.max_images})")
 
-                try:
-                    # Run blocking Ollama call in thread pool — event loop stays free
-                    review = await asyncio.to_thread(
-                        vision_review_image,
-                        img_path,
-                        character_name=db_info["name"],
-                        design_prompt=db_info.get("design_prompt", ""),
-                        model=body.model,
-                        appearance_data=db_info.get("appearance_data"),
-                        model_profile=profile,
-                    )
-                    consecutive_errors = 0  # Reset on success
-                except Exception as e:
-                    logger.warning(f"[{task_id}] Vision review failed for {img_path.name}: {e}")
-                    consecutive_errors += 1
-                    task["errors"] += 1
-                    task["results"].append({
-                        "image": img_path.name,
-                        "character_slug": slug,
-                        "quality_score": None,
-                        "solo": None,
-                        "action": "error",
-                        "issues": [f"Review failed: {e}"],
-                    })
-                    task["reviewed"] += 1
-                    continue
+                # Cheap CPU checks first: obvious rejects never reach the vision model
+                review = None
+                if body.prescreen and approval_status.get(img_path.name, "pending") == "pending":
+                    review = await _prescreen(task_id, img_path, slug, project_slugs)
+
+                if review is None:
+                    try:
+                        # Run blocking Ollama call in thread pool — event loop stays free
+                        review = await asyncio.to_thread(
+                            vision_review_image,
+                            img_path,
+                            character_name=db_info["name"],
+                            design_prompt=db_info.get("design_prompt", ""),
+                            model=body.model,
+                            appearance_data=db_info.get("appearance_data"),
+                            model_profile=profile,
+                            character_slug=slug,
+                        )
+                        consecutive_errors = 0  # Reset on success
+                    except Exception as e:
+                        logger.warning(f"[{task_id}] Vision review failed for {img_path.name}: {e}")
+                        consecutive_errors += 1
+                        task["errors"] += 1
+                        task["results"].append({
+                            "image": img_path.name,
+                            "character_slug": slug,
+                            "quality_score": None,
+                            "solo": None,
+                            "action": "error",
+                            "issues": [f"Review failed: {e}"],
+                        })
+                        task["reviewed"] += 1
+                        continue
 
                 quality_score = round(
                     (review["character_match"] + review["clarity"] + review["training_value"]) / 30, 2
@@ -259,6 +282,7 @@ async def _vision_review_worker(
                     caption_path = img_path.with_suffix(".txt")
                     if body.update_captions or quality_score >= effective_approve:
                         caption_path.write_text(review["caption"])
+                index.refresh_image(slug, img_path.name)
 
                 # --- Auto-triage decision ---
                 current_status = approval_status.get(img_path.name, "pending")
@@ -274,8 +298,7 @@ async def _vision_review_worker(
                 elif quality_score < effective_reject and not is_rejected_recheck:
                     # Don't re-reject already rejected images — just score them
                     action = "rejected"
-                    approval_status[img_path.name] = "rejected"
-                    status_changed = True
+                    status_updates[img_path.name] = "rejected"
                     task["auto_rejected"] += 1
 
                     categories = vision_issues_to_categories(review)
@@ -318,8 +341,7 @@ async def _vision_review_worker(
 
                 elif quality_score >= effective_approve and review.get("solo", False):
                     action = "approved"
-                    approval_status[img_path.name] = "approved"
-                    status_changed = True
+                    status_updates[img_path.name] = "approved"
                     task["auto_approved"] += 1
 
                     await log_approval(
@@ -355,9 +377,8 @@ async def _vision_review_worker(
                 })
                 task["reviewed"] += 1
 
-            if status_changed:
-                with open(approval_file, "w") as f:
-                    json.dump(approval_status, f, indent=2)
+            # Only the decided images are written, so concurrent approvals aren't clobbered
+            index.set_statuses(slug, status_updates)
 
             if task["reviewed"] >= body.max_images:
                 break
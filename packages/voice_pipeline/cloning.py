@@ -15,7 +15,7 @@ from datetime import datetime
 from pathlib import Path
 
 from packages.core.config import BASE_PATH
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.events import event_bus, VOICE_TRAINING_SUBMITTED, VOICE_TRAINING_COMPLETED
 
 logger = logging.getLogger(__name__)
@@ -103,7 +103,7 @@ async def start_sovits_training(
             f.write(f"{wav}|{character_name or character_slug}|en|{text}\n")
 
     # Record job in DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("""
             INSERT INTO voice_training_jobs (job_id, character_slug, character_name,
@@ -144,7 +144,7 @@ async def _run_sovits_training(
     output_dir: Path, list_file: Path, epochs: int, log_path: Path,
 ):
     """Execute GPT-SoVITS training in background subprocess."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute(
             "UPDATE voice_training_jobs SET status = 'running', started_at = NOW() WHERE job_id = $1",
@@ -259,7 +259,7 @@ async def start_rvc_training(
     )
 
     # Record job in DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("""
             INSERT INTO voice_training_jobs (job_id, character_slug, character_name,
@@ -296,7 +296,7 @@ async def _run_rvc_training(
     output_dir: Path, combined_wav: Path, epochs: int, log_path: Path,
 ):
     """Execute RVC v2 training in background subprocess."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute(
             "UPDATE voice_training_jobs SET status = 'running', started_at = NOW() WHERE job_id = $1",
@@ -412,7 +412,7 @@ async def cancel_training_job(job_id: str) -> dict:
         proc.send_signal(signal.SIGTERM)
         _running_jobs.pop(job_id, None)
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute(
             "UPDATE voice_training_jobs SET status = 'failed', error = 'Cancelled by user' WHERE job_id = $1",
@@ -426,7 +426,7 @@ async def cancel_training_job(job_id: str) -> dict:
 
 async def get_training_jobs(project_name: str = None, character_slug: str = None) -> list[dict]:
     """List voice training jobs, optionally filtered."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         query = "SELECT * FROM voice_training_jobs WHERE 1=1"
         params = []
@@ -449,7 +449,7 @@ async def get_training_jobs(project_name: str = None, character_slug: str = None
 
 async def get_training_job(job_id: str) -> dict | None:
     """Get a single training job by ID."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "SELECT * FROM voice_training_jobs WHERE job_id = $1", job_id
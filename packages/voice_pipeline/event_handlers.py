@@ -5,7 +5,7 @@ Registered at startup in server/app.py via register_voice_event_handlers().
 
 import logging
 
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.events import event_bus, VOICE_TRAINING_COMPLETED
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ async def _on_voice_training_completed(data: dict):
         logger.warning("voice.training.completed event missing character_slug, skipping")
         return
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         # 1. Null out dialogue_audio_path for scenes containing this character's dialogue
         #    This forces re-synthesis on next build_scene_dialogue() call.
@@ -12,7 +12,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 
 from packages.core.config import BASE_PATH
-from packages.core.db import connect_direct, get_char_project_map
+from packages.core.db import connect_pooled, get_char_project_map
 from packages.core.models import (
     VoiceDiarizeRequest, VoiceTrainRequest, VoiceSynthesizeRequest,
     VoiceSceneDialogueRequest,
@@ -54,7 +54,7 @@ async def run_diarization(body: VoiceDiarizeRequest):
 @router.get("/speakers/{project_name}")
 async def list_speakers(project_name: str):
     """List speaker clusters for a project with segment counts."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch(
             "SELECT * FROM voice_speakers WHERE project_name = $1 ORDER BY speaker_label",
@@ -169,7 +169,7 @@ async def synthesize(body: VoiceSynthesizeRequest):
         raise HTTPException(status_code=400, detail=result["error"])
 
     # Record in DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         import uuid
         job_id = f"synth_{uuid.uuid4().hex[:8]}"
@@ -191,7 +191,7 @@ async def synthesize(body: VoiceSynthesizeRequest):
 @router.get("/synthesis/{job_id}")
 async def get_synthesis_result(job_id: str):
     """Get synthesis job result."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "SELECT * FROM voice_synthesis_jobs WHERE job_id = $1", job_id
@@ -206,7 +206,7 @@ async def get_synthesis_result(job_id: str):
 @router.get("/synthesis/{job_id}/audio")
 async def stream_synthesis_audio(job_id: str):
     """Stream synthesized audio WAV file."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         output_path = await conn.fetchval(
             "SELECT output_path FROM voice_synthesis_jobs WHERE job_id = $1", job_id
@@ -258,7 +258,7 @@ async def synthesize_shot_dialogue(shot_id: str, engine: str = None):
     Reads dialogue_text and dialogue_character_slug from the shot record,
     synthesizes audio, and returns the audio URL for playback.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "SELECT dialogue_text, dialogue_character_slug FROM shots WHERE id = $1::uuid",
@@ -283,7 +283,7 @@ async def synthesize_shot_dialogue(shot_id: str, engine: str = None):
     # Record in DB
     import uuid as _uuid
     job_id = f"synth_{_uuid.uuid4().hex[:8]}"
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("""
             INSERT INTO voice_synthesis_jobs
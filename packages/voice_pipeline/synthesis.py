@@ -17,8 +17,9 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
-from packages.core.config import BASE_PATH, OLLAMA_URL
-from packages.core.db import connect_direct
+from packages.core.config import BASE_PATH
+from packages.core.db import connect_pooled
+from packages.core.llm_gateway import PRIORITY_BATCH, llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +64,7 @@ _MALE_KEYWORDS = {"male", "man", "boy", "he", "him", "guy", "king", "prince", "f
 
 async def _get_voice_profile(character_slug: str) -> dict:
     """Load voice_profile JSONB from characters table."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         raw = await conn.fetchval(
             "SELECT voice_profile FROM characters WHERE REGEXP_REPLACE(LOWER(REPLACE(name, ' ', '_')), '[^a-z0-9_-]', '', 'g') = $1 AND project_id IS NOT NULL",
@@ -96,7 +97,7 @@ async def _auto_assign_edge_voice(character_slug: str) -> str:
     Uses hash(slug) to pick from the appropriate gender pool so the same
     character always gets the same voice across runs.
     """
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow(
             "SELECT voice_profile, design_prompt FROM characters "
@@ -148,7 +149,7 @@ async def _resolve_character_slug(slug: str) -> str:
             return d.name
 
     # Fallback: query DB for a character whose computed slug starts with this
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         full_slug = await conn.fetchval(
             """SELECT REGEXP_REPLACE(LOWER(REPLACE(name, ' ', '_')), '[^a-z0-9_-]', '', 'g')
@@ -501,7 +502,7 @@ async def synthesize_scene_dialogue(
             pass
 
     # Record in DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         for r in results:
             if "output_path" in r:
@@ -535,8 +536,6 @@ async def generate_dialogue_from_story(
 
     Returns list of {"character_slug": str, "text": str} ready for synthesis.
     """
-    import httpx
-
     char_list = ", ".join(characters)
     prompt = f"""Write short dialogue for an anime scene.
 
@@ -549,15 +548,10 @@ Example: [{{"character": "Mario", "text": "Let's-a go!"}}]
 Keep lines short (1-2 sentences). Match character personalities. No narration."""
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(f"{OLLAMA_URL}/api/generate", json={
-                "model": "gemma3:12b",
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.7},
-            })
-            resp.raise_for_status()
-            text = resp.json().get("response", "")
+        text = await llm_gateway.generate(
+            "gemma3:12b", prompt, caller="dialogue_draft", priority=PRIORITY_BATCH,
+            options={"temperature": 0.7}, timeout=60, cache=False,
+        )
 
         # Parse JSON from response (may be wrapped in markdown code block)
         text = text.strip()
@@ -649,7 +643,7 @@ async def synthesize_episode_dialogue(episode_id: str) -> dict:
     """
     from packages.scene_generation.scene_audio import build_scene_dialogue
 
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch("""
             SELECT es.scene_id, es.position, s.dialogue_audio_path, s.title
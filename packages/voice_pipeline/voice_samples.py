@@ -13,7 +13,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 
 from packages.core.config import BASE_PATH
-from packages.core.db import connect_direct
+from packages.core.db import connect_pooled
 from packages.core.events import event_bus, VOICE_SEGMENT_APPROVED, VOICE_SEGMENT_REJECTED
 from packages.core.models import (
     VoiceSpeakerAssignRequest, VoiceSampleApprovalRequest,
@@ -35,7 +35,7 @@ VOICE_DATASETS = VOICE_BASE / "voice_datasets"
 @router.post("/speakers/{speaker_id}/assign")
 async def assign_speaker_to_character(speaker_id: int, body: VoiceSpeakerAssignRequest):
     """Assign a speaker cluster to a character."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         row = await conn.fetchrow("SELECT * FROM voice_speakers WHERE id = $1", speaker_id)
         if not row:
@@ -113,7 +113,7 @@ async def assign_speaker_to_character(speaker_id: int, body: VoiceSpeakerAssignR
 @router.get("/samples/{character_slug}")
 async def list_voice_samples(character_slug: str):
     """List voice samples for a character with quality metrics."""
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         rows = await conn.fetch(
             "SELECT * FROM voice_samples WHERE character_slug = $1 ORDER BY start_time",
@@ -193,7 +193,7 @@ async def approve_voice_sample(body: VoiceSampleApprovalRequest):
         json.dump(statuses, f, indent=2)
 
     # Update DB
-    conn = await connect_direct()
+    conn = await connect_pooled()
     try:
         await conn.execute("""
             UPDATE voice_samples SET approval_status = $1, reviewed_at = NOW(),
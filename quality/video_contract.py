@@ -281,8 +281,11 @@ class VideoQualityContract:
         frame_samples.extend([str(f) for f in extracted_frames])
 
         if len(extracted_frames) >= 2:
+            # Decode once; motion and visual gates share the arrays
+            images = self._load_frames(extracted_frames)
+
             # Motion validation
-            motion_results = self._validate_motion(extracted_frames)
+            motion_results = self._validate_motion(extracted_frames, images)
             motion_gates.update(motion_results)
 
             if not all(g.passed for g in motion_results.values()):
@@ -292,7 +295,7 @@ class VideoQualityContract:
                 )
 
             # Visual quality validation
-            quality_results = self._validate_visual_quality(extracted_frames)
+            quality_results = self._validate_visual_quality(extracted_frames, images)
             quality_gates.update(quality_results)
 
         # Calculate overall quality score
@@ -359,7 +362,7 @@ class VideoQualityContract:
                 frame_samples.append(str(sample_path))
 
                 # Visual quality checks
-                quality_results = self._validate_visual_quality([str(file_path)])
+                quality_results = self._validate_visual_quality([str(file_path)], [img])
                 quality_gates.update(quality_results)
 
         except Exception as e:
@@ -414,7 +417,12 @@ class VideoQualityContract:
 
         return frames
 
-    def _validate_motion(self, frame_paths: List[Path]) -> Dict[str, GateResult]:
+    def _load_frames(self, frame_paths: List[Path]) -> List[Optional[np.ndarray]]:
+        """Decode frames once (BGR); unreadable frames are None, index-aligned with paths."""
+        return [cv2.imread(str(p)) for p in frame_paths]
+
+    def _validate_motion(self, frame_paths: List[Path],
+                         images: Optional[List[Optional[np.ndarray]]] = None) -> Dict[str, GateResult]:
         """Validate that video has actual motion, not just repeated stills."""
         results = {}
 
@@ -427,8 +435,9 @@ class VideoQualityContract:
 
         # Load frames
         frames = []
-        for path in frame_paths[:4]:  # Check first 4 frames
-            img = cv2.imread(str(path))
+        if images is None:
+            images = self._load_frames(frame_paths[:4])
+        for img in images[:4]:  # Check first 4 frames
             if img is not None:
                 frames.append(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
 
@@ -483,7 +492,8 @@ class VideoQualityContract:
 
         return results
 
-    def _validate_visual_quality(self, frame_paths: List[str]) -> Dict[str, GateResult]:
+    def _validate_visual_quality(self, frame_paths: List[str],
+                                 images: Optional[List[Optional[np.ndarray]]] = None) -> Dict[str, GateResult]:
         """Assess visual quality of frames."""
         results = {}
 
@@ -496,13 +506,14 @@ class VideoQualityContract:
 
         for idx in sample_indices:
             if idx < len(frame_paths):
-                img = cv2.imread(frame_paths[idx])
+                img = images[idx] if images is not None else cv2.imread(str(frame_paths[idx]))
                 if img is None:
                     continue
 
                 # Check 1: Blank detection
                 gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                unique_pixels = len(np.unique(gray))
+                # Counting occupied histogram bins avoids np.unique's full sort
+                unique_pixels = int(np.count_nonzero(np.bincount(gray.ravel(), minlength=256)))
                 total_pixels = gray.size
                 blank_ratio = 1.0 - (unique_pixels / min(total_pixels, 256))
 
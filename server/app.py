@@ -18,14 +18,15 @@ Database credentials loaded from Vault (secret/anime/database).
 
 import logging
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from packages.core.auth import AuthMiddleware
 from packages.core.config import APP_ENV
-from packages.core.db import init_pool, get_pool, run_migrations
+from packages.core.db import init_pool, get_pool, pool_stats, request_db_scope, run_migrations
 from packages.core.logging_config import setup_logging
 from packages.core.events import event_bus
+from packages.core.llm_gateway import llm_gateway
 from packages.core.gpu_router import get_system_status
 import packages.core.learning as learning  # registers EventBus handlers on import
 import packages.core.auto_correction as auto_correction  # registers EventBus handler on import
@@ -55,7 +56,8 @@ from packages.interactive import interactive_router
 setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Tower Anime Studio", version="3.5")
+# request_db_scope: sequential DB calls within one request share a pooled connection
+app = FastAPI(title="Tower Anime Studio", version="3.5", dependencies=[Depends(request_db_scope)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -102,6 +104,10 @@ async def startup():
     await init_pool()
     await run_migrations()
     reconcile_training_jobs()
+    # Lets sync code in worker threads (frame ingestion) emit onto this loop
+    event_bus.bind_loop()
+    # Sync vision helpers in worker threads queue their Ollama calls on this loop
+    llm_gateway.bind_loop()
 
     # Register graph sync EventBus handlers
     from packages.core.events import register_graph_sync_handlers
@@ -111,6 +117,10 @@ async def startup():
     orchestrator.register_orchestrator_handlers()
     await orchestrator.start_tick_loop()
 
+    # Keep the learning / model-selector rollups current (catch-up runs immediately)
+    from packages.core.learning_rollups import start_refresh_loop
+    start_refresh_loop()
+
     # Register NSM EventBus handlers
     from packages.narrative_state.hooks import register_nsm_handlers
     register_nsm_handlers()
@@ -119,9 +129,17 @@ async def startup():
     from packages.voice_pipeline.event_handlers import register_voice_event_handlers
     register_voice_event_handlers()
 
-    # Recover any shots stuck in 'generating' from before this restart
-    from packages.scene_generation.builder import recover_interrupted_generations
+    # Connect the shared ComfyUI client's event listener before jobs resume
+    from packages.core.comfyui_client import get_comfyui_client
+    get_comfyui_client().start()
+
+    # Durable job queue: re-queue shots stuck in 'generating' from before this
+    # restart, then start this process's workers (JOB_WORKER_CONCURRENCY=0 for API-only)
+    from packages.core.job_queue import SCENE_GENERATION, register_handler, start_workers
+    from packages.scene_generation.builder import recover_interrupted_generations, run_scene_generation_job
+    register_handler(SCENE_GENERATION, run_scene_generation_job)
     await recover_interrupted_generations()
+    await start_workers()
 
     # Start interactive session cleanup loop
     from packages.interactive.session_store import store as interactive_store
@@ -130,6 +148,16 @@ async def startup():
     logger.info("Tower Anime Studio v3.5 started — 10 packages + graph + orchestrator + NSM + interactive mounted")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    # Cancel running jobs and re-queue them now rather than when their lease expires
+    from packages.core.job_queue import stop_workers
+    await stop_workers()
+    # Dedup hash indexes are saved on a delay; write pending registrations now
+    from packages.lora_training.dedup import flush_indexes
+    flush_indexes()
+
+
 # ── System Endpoints ─────────────────────────────────────────────────────
 
 
@@ -151,12 +179,46 @@ async def db_health():
         raise HTTPException(status_code=503, detail=f"Database unhealthy: {e}")
 
 
+@app.get("/api/system/db/pool")
+async def db_pool_stats():
+    """asyncpg pool utilisation — size, idle, acquire waits, saturation and timeouts."""
+    return pool_stats()
+
+
 @app.get("/api/system/gpu/status")
 async def gpu_status():
     """Full GPU dashboard — both GPUs + Ollama + ComfyUI."""
     return get_system_status()
 
 
+@app.get("/api/system/comfyui/stats")
+async def comfyui_stats():
+    """Shared ComfyUI client statistics — WebSocket state, completions, timeouts."""
+    from packages.core.comfyui_client import get_comfyui_client, inflight
+    from packages.core.config import COMFYUI_URLS
+    return {
+        "backends": [get_comfyui_client(url).stats() for url in COMFYUI_URLS],
+        "inflight": inflight(),
+    }
+
+
+@app.get("/api/system/jobs/stats")
+async def job_queue_stats():
+    """Durable job queue — depth per kind/status, 24h outcomes, per-stage p50/p95, local workers."""
+    from packages.core.job_queue import queue_stats
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        return await queue_stats(conn)
+
+
+@app.get("/api/system/llm/stats")
+async def llm_stats():
+    """LLM gateway — queue depth, cache hit rate, per-caller wait/latency, review cache, pre-screen savings."""
+    from packages.visual_pipeline.prescreen import prescreen_stats
+    from packages.visual_pipeline.review_cache import review_cache
+    return {**llm_gateway.stats(), "review_cache": review_cache.stats(), "prescreen": prescreen_stats()}
+
+
 @app.get("/api/system/events/stats")
 async def events_stats():
     """EventBus statistics — registered handlers, emit count, errors."""
@@ -172,6 +234,13 @@ async def get_learning_stats():
     return await learning.learning_stats()
 
 
+@app.post("/api/system/learning/rollups/refresh")
+async def refresh_learning_rollups(full: bool = False):
+    """Rebuild learning rollups changed since the last refresh (full=true: rebuild all)."""
+    from packages.core.learning_rollups import refresh
+    return await refresh(full=full)
+
+
 @app.get("/api/system/learning/suggest/{character_slug}")
 async def get_suggestions(character_slug: str):
     """Suggest optimal generation parameters based on historical quality data."""
@@ -511,11 +511,8 @@ def main():
             approved = 0
         else:
             # Legacy target mode: generate until N approved
-            status_file = DATASETS_DIR / slug / "approval_status.json"
-            approved = 0
-            if status_file.exists():
-                statuses = json.load(open(status_file))
-                approved = sum(1 for v in statuses.values() if v == "approved")
+            from packages.lora_training.approval_index import get_index
+            approved = get_index(DATASETS_DIR).count(slug, "approved")
 
             need = max(0, target - approved)
             if need <= 0:
@@ -3,19 +3,108 @@
 
 Reads approved images from a character's dataset directory,
 loads paired .txt caption files, and returns tokenized training pairs.
+
+Captions are tokenized once up front. Two optional modes on top of that:
+
+- Aspect-ratio bucketing: each image is assigned the bucket (multiple of 64,
+  about resolution² pixels) closest to its aspect ratio and is resized to cover
+  it and center-cropped, instead of being squashed into a square. Batches drawn
+  through BucketBatchSampler share a bucket, so batch_size > 1 works.
+- Latent cache: the VAE and text encoders are frozen, so their outputs are
+  constant per image/caption. With a LatentCache, items whose latents and
+  encoder states are already on disk skip image decoding entirely and return
+  the cached tensors (see precompute_cache() in train_lora.py).
 """
 
-import json
+import hashlib
 import logging
+import math
+import os
+import random
 from pathlib import Path
 
 import torch
 from PIL import Image
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, Sampler
 from torchvision import transforms
 
 logger = logging.getLogger(__name__)
 
+# Bucket edges are multiples of this (VAE /8, then the UNet's down blocks)
+BUCKET_STEP = 64
+MAX_BUCKET_RATIO = 2.0
+
+
+def make_buckets(resolution: int, step: int = BUCKET_STEP,
+                 max_ratio: float = MAX_BUCKET_RATIO) -> list[tuple[int, int]]:
+    """(width, height) buckets of at most resolution² pixels, aspect ratio <= max_ratio."""
+    area = resolution * resolution
+    buckets = set()
+    for width in range(step, int(resolution * max_ratio) + 1, step):
+        height = (area // width) // step * step
+        if height >= step and max(width / height, height / width) <= max_ratio:
+            buckets.add((width, height))
+    return sorted(buckets)
+
+
+def nearest_bucket(width: int, height: int, buckets: list[tuple[int, int]]) -> tuple[int, int]:
+    """Bucket whose aspect ratio is closest (in log space) to width/height."""
+    ratio = math.log(width / height)
+    return min(buckets, key=lambda b: abs(math.log(b[0] / b[1]) - ratio))
+
+
+def file_hash(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()[:20]
+
+
+def model_cache_key(checkpoint_path: str) -> str:
+    """Short key that changes when the checkpoint file is replaced."""
+    st = os.stat(checkpoint_path)
+    digest = hashlib.sha1(f"{os.path.abspath(checkpoint_path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return f"{Path(checkpoint_path).stem[:40]}-{digest.hexdigest()[:10]}"
+
+
+class LatentCache:
+    """On-disk safetensors cache of VAE latent distributions and text encoder outputs.
+
+    latents/<image hash>_<w>x<h>_<model>.safetensors  -> latent_mean, latent_std,
+                                                         original_size, crop_top_left
+    text/<caption hash>_<model>.safetensors           -> encoder_hidden_states[, pooled_prompt_embeds]
+
+    The latent distribution (not a sample) is stored so every epoch still draws
+    a fresh latent, exactly like vae.encode(...).latent_dist.sample().
+    Files are opened with safe_open, which memory-maps them.
+    """
+
+    def __init__(self, root: Path, model_key: str):
+        self.root = Path(root)
+        self.model_key = model_key
+
+    def latent_path(self, image_hash: str, size: tuple[int, int]) -> Path:
+        return self.root / "latents" / f"{image_hash}_{size[0]}x{size[1]}_{self.model_key}.safetensors"
+
+    def text_path(self, caption: str) -> Path:
+        digest = hashlib.sha1(caption.encode()).hexdigest()[:20]
+        return self.root / "text" / f"{digest}_{self.model_key}.safetensors"
+
+    @staticmethod
+    def load(path: Path) -> dict[str, torch.Tensor]:
+        from safetensors import safe_open
+        with safe_open(str(path), framework="pt") as f:
+            return {k: f.get_tensor(k) for k in f.keys()}
+
+    @staticmethod
+    def save(path: Path, tensors: dict[str, torch.Tensor]):
+        from safetensors.torch import save_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        save_file({
+            k: v.detach().to("cpu", torch.float16 if v.is_floating_point() else v.dtype).contiguous()
+            for k, v in tensors.items()
+        }, str(tmp))
+        os.replace(tmp, path)
+
 
 class LoRADataset(Dataset):
     """Dataset of approved character images with text captions.
@@ -23,31 +112,34 @@ class LoRADataset(Dataset):
     Args:
         dataset_dir: Path to character dataset dir (contains images/ and approval_status.json)
         tokenizer: CLIP tokenizer for caption encoding
-        resolution: Target image size (square crop)
+        resolution: Target image size (square crop, or bucket area when bucketing)
+        bucketing: Group images into aspect-ratio buckets instead of square crops
+        cache: LatentCache to serve precomputed latents/encoder states from
     """
 
-    def __init__(self, dataset_dir: str | Path, tokenizer, resolution: int = 512, tokenizer_2=None):
+    def __init__(self, dataset_dir: str | Path, tokenizer, resolution: int = 512, tokenizer_2=None,
+                 bucketing: bool = False, cache: LatentCache | None = None):
         self.dataset_dir = Path(dataset_dir)
         self.images_dir = self.dataset_dir / "images"
         self.tokenizer = tokenizer
         self.tokenizer_2 = tokenizer_2
         self.resolution = resolution
+        self.bucketing = bucketing
+        self.cache = cache
 
-        # Load approval status — only train on approved images
-        approval_file = self.dataset_dir / "approval_status.json"
-        if approval_file.exists():
-            with open(approval_file) as f:
-                approval_status = json.load(f)
-        else:
-            approval_status = {}
+        # Only train on approved images; the shared approval index tracks approval_status.json
+        from packages.lora_training.approval_index import get_index
+        approved = get_index(self.dataset_dir.parent).names_with_status(
+            self.dataset_dir.name, "approved", on_disk=True,
+        )
 
         # Collect approved image paths
         self.image_paths = []
         self.captions = []
 
-        for img_path in sorted(self.images_dir.glob("*.png")):
-            status = approval_status.get(img_path.name, "pending")
-            if status != "approved":
+        for name in approved:
+            img_path = self.images_dir / name
+            if img_path.suffix != ".png":
                 continue
 
             # Load caption from .txt sidecar
@@ -61,9 +153,26 @@ class LoRADataset(Dataset):
             self.image_paths.append(img_path)
             self.captions.append(caption)
 
+        # Target (width, height) per image; Image.open only reads the header here
+        if bucketing:
+            buckets = make_buckets(resolution)
+            self.target_sizes = []
+            for img_path in self.image_paths:
+                with Image.open(img_path) as img:
+                    self.target_sizes.append(nearest_bucket(*img.size, buckets))
+        else:
+            self.target_sizes = [(resolution, resolution)] * len(self.image_paths)
+
+        self.image_hashes = [file_hash(p) for p in self.image_paths] if cache else []
+
+        # Captions never change during training — tokenize them once
+        self.input_ids = self._tokenize(tokenizer)
+        self.input_ids_2 = self._tokenize(tokenizer_2) if tokenizer_2 is not None else None
+
         logger.info(
             f"LoRADataset: {len(self.image_paths)} approved images "
-            f"from {self.dataset_dir.name} (resolution={resolution})"
+            f"from {self.dataset_dir.name} (resolution={resolution}, "
+            f"buckets={len(set(self.target_sizes))}, cache={'on' if cache else 'off'})"
         )
 
         # Image transforms: resize, center crop, normalize to [-1, 1]
@@ -73,37 +182,109 @@ class LoRADataset(Dataset):
             transforms.ToTensor(),
             transforms.Normalize([0.5], [0.5]),
         ])
+        self.normalize = transforms.Compose([
+            transforms.ToTensor(),
+            transforms.Normalize([0.5], [0.5]),
+        ])
+
+    def _tokenize(self, tokenizer) -> torch.Tensor | None:
+        if not self.captions:
+            return None
+        return tokenizer(
+            self.captions,
+            padding="max_length",
+            max_length=tokenizer.model_max_length,
+            truncation=True,
+            return_tensors="pt",
+        ).input_ids
 
     def __len__(self):
         return len(self.image_paths)
 
-    def __getitem__(self, idx):
+    def load_pixels(self, idx) -> dict:
+        """Decode, resize and crop one image; returns pixel_values plus SDXL size conditioning."""
         img = Image.open(self.image_paths[idx]).convert("RGB")
-        pixel_values = self.transform(img)
+        width, height = img.size
+        target_w, target_h = self.target_sizes[idx]
+        if not self.bucketing:
+            scale = self.resolution / min(width, height)
+            top = max(round((height * scale - target_h) / 2), 0)
+            left = max(round((width * scale - target_w) / 2), 0)
+            pixel_values = self.transform(img)
+        else:
+            # Resize to cover the bucket, then center crop
+            scale = max(target_w / width, target_h / height)
+            new_w, new_h = max(target_w, round(width * scale)), max(target_h, round(height * scale))
+            img = img.resize((new_w, new_h), Image.LANCZOS)
+            top, left = (new_h - target_h) // 2, (new_w - target_w) // 2
+            img = img.crop((left, top, left + target_w, top + target_h))
+            pixel_values = self.normalize(img)
+        return {
+            "pixel_values": pixel_values,
+            "original_size": torch.tensor([height, width]),
+            "crop_top_left": torch.tensor([top, left]),
+            "target_size": torch.tensor([target_h, target_w]),
+        }
 
-        caption = self.captions[idx]
-        tokens = self.tokenizer(
-            caption,
-            padding="max_length",
-            max_length=self.tokenizer.model_max_length,
-            truncation=True,
-            return_tensors="pt",
+    def latent_path(self, idx) -> Path | None:
+        if not self.cache:
+            return None
+        return self.cache.latent_path(self.image_hashes[idx], self.target_sizes[idx])
+
+    def is_cached(self, idx) -> bool:
+        return (
+            self.cache is not None
+            and self.latent_path(idx).exists()
+            and self.cache.text_path(self.captions[idx]).exists()
         )
 
-        result = {
-            "pixel_values": pixel_values,
-            "input_ids": tokens.input_ids.squeeze(0),
-        }
+    def __getitem__(self, idx):
+        if self.is_cached(idx):
+            result = self.cache.load(self.latent_path(idx))
+            result.update(self.cache.load(self.cache.text_path(self.captions[idx])))
+            target_w, target_h = self.target_sizes[idx]
+            result["target_size"] = torch.tensor([target_h, target_w])
+            return result
+
+        result = self.load_pixels(idx)
+        result["input_ids"] = self.input_ids[idx]
 
         # SDXL dual text encoder: return tokens from both CLIP-L and OpenCLIP-G
-        if self.tokenizer_2 is not None:
-            tokens_2 = self.tokenizer_2(
-                caption,
-                padding="max_length",
-                max_length=self.tokenizer_2.model_max_length,
-                truncation=True,
-                return_tensors="pt",
-            )
-            result["input_ids_2"] = tokens_2.input_ids.squeeze(0)
+        if self.input_ids_2 is not None:
+            result["input_ids_2"] = self.input_ids_2[idx]
 
         return result
+
+
+class BucketBatchSampler(Sampler):
+    """Yields batches of indices that share a target size.
+
+    Indices are shuffled within each bucket and the batch order is shuffled
+    every epoch, so buckets are interleaved rather than trained one by one.
+    """
+
+    def __init__(self, target_sizes: list[tuple[int, int]], batch_size: int,
+                 shuffle: bool = True, seed: int = 0):
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        self.groups: dict[tuple[int, int], list[int]] = {}
+        for idx, size in enumerate(target_sizes):
+            self.groups.setdefault(size, []).append(idx)
+
+    def __len__(self):
+        return sum(math.ceil(len(g) / self.batch_size) for g in self.groups.values())
+
+    def __iter__(self):
+        rng = random.Random(self.seed + self.epoch)
+        self.epoch += 1
+        batches = []
+        for group in self.groups.values():
+            group = list(group)
+            if self.shuffle:
+                rng.shuffle(group)
+            batches.extend(group[i:i + self.batch_size] for i in range(0, len(group), self.batch_size))
+        if self.shuffle:
+            rng.shuffle(batches)
+        return iter(batches)
@@ -5,18 +5,28 @@ Lightweight image quality scorer for LoRA Studio.
 Uses OpenCV for blur, contrast, brightness, and edge analysis.
 Extracted from /opt/anime-studio/quality/comfyui_quality_integration.py.
 
+Images are decoded once from their bytes and scored at a working resolution
+(long side <= WORK_SIZE, so typical 512-1024px generations are scored at full
+size). Batch mode hashes each file, skips anything whose content hash already
+has a score in the approval index, and fans the rest out over a process pool.
+
 Usage:
     # As a library
-    from quality_scorer import score_image
+    from quality_scorer import score_image, score_paths
     result = score_image("/path/to/image.png")
+    results = score_paths(paths, workers=8, index=get_index())
 
     # As CLI
     python3 quality_scorer.py /path/to/image.png
-    python3 quality_scorer.py --batch /path/to/datasets/  # score all dataset images
+    python3 quality_scorer.py --batch /path/to/datasets/ [--write] [--workers N]
 """
 
+import hashlib
 import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 try:
@@ -26,8 +36,71 @@ try:
 except ImportError:
     HAS_CV2 = False
 
+# Long-side cap for scoring; larger images are area-downscaled after decode
+WORK_SIZE = 1024
+# Bump when the metrics change — cached scores of older versions are ignored
+SCORER_VERSION = 1
+# Images handed to a worker per round trip
+CHUNK_SIZE = 16
+
+
+def _score_array(image, width: int, height: int) -> dict:
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Blur detection (Laplacian variance)
+    _, lap_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_64F))
+    blur_score = min(float(lap_std[0, 0]) ** 2 / 1000.0, 1.0)
+
+    # Contrast (std of grayscale) and brightness (penalize extremes) in one pass
+    mean, std = cv2.meanStdDev(gray)
+    contrast = float(std[0, 0]) / 255.0
+    brightness = float(mean[0, 0]) / 255.0
+    brightness_score = 1.0 - abs(brightness - 0.5) * 2
+
+    # Edge density (detail richness)
+    edge_density = cv2.countNonZero(cv2.Canny(gray, 50, 150)) / gray.size
+
+    # Weighted combination
+    quality_score = (
+        blur_score * 0.3 +
+        contrast * 0.3 +
+        brightness_score * 0.2 +
+        edge_density * 0.2
+    )
+    quality_score = min(quality_score, 1.0)
+
+    return {
+        "quality_score": round(quality_score, 4),
+        "blur_score": round(blur_score, 4),
+        "contrast": round(contrast, 4),
+        "brightness": round(brightness, 4),
+        "brightness_score": round(brightness_score, 4),
+        "edge_density": round(edge_density, 4),
+        "resolution": f"{width}x{height}",
+    }
+
+
+def score_bytes(data: bytes, work_size: int = WORK_SIZE) -> dict:
+    """Score encoded image bytes (PNG/JPEG/...)."""
+    if not HAS_CV2:
+        return {"quality_score": None, "error": "opencv not available"}
+    try:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return {"quality_score": None, "error": "failed to read image"}
+        height, width = image.shape[:2]
+        scale = work_size / max(height, width)
+        if scale < 1.0:
+            image = cv2.resize(
+                image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        return _score_array(image, width, height)
+    except Exception as e:
+        return {"quality_score": None, "error": str(e)}
+
 
-def score_image(image_path: str) -> dict:
+def score_image(image_path: str, work_size: int = WORK_SIZE) -> dict:
     """Score an image's quality. Returns dict with overall score and breakdown."""
     if not HAS_CV2:
         return {"quality_score": None, "error": "opencv not available"}
@@ -37,55 +110,106 @@ def score_image(image_path: str) -> dict:
         return {"quality_score": None, "error": "file not found"}
 
     try:
-        image = cv2.imread(str(path))
-        if image is None:
-            return {"quality_score": None, "error": "failed to read image"}
+        data = path.read_bytes()
+    except OSError as e:
+        return {"quality_score": None, "error": str(e)}
+    return score_bytes(data, work_size)
 
-        height, width = image.shape[:2]
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-        # Blur detection (Laplacian variance)
-        blur_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-        blur_score = min(blur_var / 1000.0, 1.0)
+def _score_file(args: tuple[str, int]) -> tuple[str, dict]:
+    path, work_size = args
+    return path, score_image(path, work_size)
 
-        # Contrast (standard deviation of grayscale)
-        contrast = gray.std() / 255.0
 
-        # Brightness (penalize extremes)
-        brightness = gray.mean() / 255.0
-        brightness_score = 1.0 - abs(brightness - 0.5) * 2
+def _init_worker():
+    # One process per core already; OpenCV's own threads would oversubscribe
+    if HAS_CV2:
+        cv2.setNumThreads(1)
 
-        # Edge density (detail richness)
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = np.count_nonzero(edges) / edges.size
 
-        # Weighted combination
-        quality_score = (
-            blur_score * 0.3 +
-            contrast * 0.3 +
-            brightness_score * 0.2 +
-            edge_density * 0.2
-        )
-        quality_score = min(quality_score, 1.0)
-
-        return {
-            "quality_score": round(quality_score, 4),
-            "blur_score": round(blur_score, 4),
-            "contrast": round(contrast, 4),
-            "brightness": round(brightness, 4),
-            "brightness_score": round(brightness_score, 4),
-            "edge_density": round(edge_density, 4),
-            "resolution": f"{width}x{height}",
-        }
-    except Exception as e:
-        return {"quality_score": None, "error": str(e)}
+def _hash_file(path: str) -> tuple[str, int, int, str] | None:
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha1").hexdigest()
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size, digest
+
+
+def score_paths(
+    paths: list[str],
+    workers: int | None = None,
+    index=None,
+    work_size: int = WORK_SIZE,
+    force: bool = False,
+) -> dict[str, dict]:
+    """Score many images; returns {path: score dict} in input order.
 
+    With an ApprovalIndex, files whose content hash already has a score for
+    SCORER_VERSION are served from it (force=True rescores everything) and new
+    scores are written back. workers=1 scores inline, None uses every core.
+    """
+    paths = [str(p) for p in paths]
+    results: dict[str, dict] = {}
+    hashed: dict[str, tuple[str, int, int, str]] = {}
 
-def batch_score_datasets(datasets_dir: str, write_to_meta: bool = False):
+    if index is not None:
+        stats = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            stats.append((p, st.st_mtime_ns, st.st_size))
+        known = index.content_hashes(stats)
+        for p, mtime, size in stats:
+            if p in known:
+                hashed[p] = (p, mtime, size, known[p])
+        # Hashing is I/O bound and hashlib releases the GIL
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for entry in pool.map(_hash_file, [p for p, _, _ in stats if p not in known]):
+                if entry:
+                    hashed[entry[0]] = entry
+        if not force:
+            cached = index.get_quality_scores([e[3] for e in hashed.values()], SCORER_VERSION)
+            for p, entry in hashed.items():
+                if entry[3] in cached:
+                    results[p] = cached[entry[3]]
+
+    todo = [p for p in dict.fromkeys(paths) if p not in results]
+    workers = workers or os.cpu_count() or 1
+    if todo:
+        jobs = [(p, work_size) for p in todo]
+        if workers == 1 or len(todo) < 2 * CHUNK_SIZE:
+            for p, result in map(_score_file, jobs):
+                results[p] = result
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                for p, result in pool.map(_score_file, jobs, chunksize=CHUNK_SIZE):
+                    results[p] = result
+
+    if index is not None and todo:
+        fresh = [hashed[p] for p in todo if p in hashed and results[p].get("quality_score") is not None]
+        if fresh:
+            index.put_quality_scores(
+                fresh, {e[3]: results[e[0]] for e in fresh}, SCORER_VERSION,
+            )
+
+    return {p: results[p] for p in paths}
+
+
+def batch_score_datasets(
+    datasets_dir: str,
+    write_to_meta: bool = False,
+    workers: int | None = None,
+    index=None,
+    force: bool = False,
+) -> dict:
     """Score all images in dataset directories and optionally update .meta.json files."""
     base = Path(datasets_dir)
-    total = 0
-    scored = 0
+    started = time.monotonic()
+    images: list[tuple[str, Path]] = []
 
     for char_dir in sorted(base.iterdir()):
         if not char_dir.is_dir():
@@ -93,46 +217,77 @@ def batch_score_datasets(datasets_dir: str, write_to_meta: bool = False):
         images_dir = char_dir / "images"
         if not images_dir.exists():
             continue
+        images.extend((char_dir.name, png) for png in sorted(images_dir.glob("*.png")))
 
-        for png in sorted(images_dir.glob("*.png")):
-            total += 1
-            result = score_image(str(png))
+    results = score_paths([str(png) for _, png in images], workers=workers, index=index, force=force)
+    scored = 0
+    written = 0
 
-            if result.get("quality_score") is not None:
-                scored += 1
+    for slug, png in images:
+        result = results[str(png)]
+        if result.get("quality_score") is None:
+            continue
+        scored += 1
 
-                if write_to_meta:
-                    meta_path = png.with_suffix(".meta.json")
-                    meta = {}
-                    if meta_path.exists():
-                        try:
-                            meta = json.loads(meta_path.read_text())
-                        except (json.JSONDecodeError, IOError):
-                            pass
-                    meta["quality_score"] = result["quality_score"]
-                    meta["quality_breakdown"] = {
-                        "blur": result["blur_score"],
-                        "contrast": result["contrast"],
-                        "brightness": result["brightness_score"],
-                        "edge_density": result["edge_density"],
-                    }
-                    meta_path.write_text(json.dumps(meta, indent=2))
+        if write_to_meta:
+            meta_path = png.with_suffix(".meta.json")
+            meta = {}
+            if meta_path.exists():
+                try:
+                    meta = json.loads(meta_path.read_text())
+                except (json.JSONDecodeError, IOError):
+                    pass
+            breakdown = {
+                "blur": result["blur_score"],
+                "contrast": result["contrast"],
+                "brightness": result["brightness_score"],
+                "edge_density": result["edge_density"],
+            }
+            if meta.get("quality_score") != result["quality_score"] or meta.get("quality_breakdown") != breakdown:
+                meta["quality_score"] = result["quality_score"]
+                meta["quality_breakdown"] = breakdown
+                meta_path.write_text(json.dumps(meta, indent=2))
+                written += 1
+                if index is not None:
+                    index.refresh_image(slug, png.name)
 
-                print(f"  {char_dir.name}/{png.name}: {result['quality_score']:.3f}")
+        print(f"  {slug}/{png.name}: {result['quality_score']:.3f}")
 
-    print(f"\nScored {scored}/{total} images")
+    elapsed = time.monotonic() - started
+    print(f"\nScored {scored}/{len(images)} images in {elapsed:.1f}s")
+    return {
+        "total": len(images),
+        "scored": scored,
+        "meta_written": written,
+        "elapsed_seconds": round(elapsed, 2),
+    }
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python3 quality_scorer.py <image_path>")
-        print("       python3 quality_scorer.py --batch <datasets_dir> [--write]")
+        print("       python3 quality_scorer.py --batch <datasets_dir> [--write] [--workers N] [--force]")
         sys.exit(1)
 
     if sys.argv[1] == "--batch":
-        datasets_dir = sys.argv[2] if len(sys.argv) > 2 else str(Path(__file__).resolve().parent.parent / "datasets")
-        write = "--write" in sys.argv
-        batch_score_datasets(datasets_dir, write_to_meta=write)
+        args = sys.argv[2:]
+        workers = None
+        if "--workers" in args:
+            i = args.index("--workers")
+            workers = int(args[i + 1])
+            del args[i:i + 2]
+        positional = [a for a in args if not a.startswith("--")]
+        datasets_dir = positional[0] if positional else str(Path(__file__).resolve().parent.parent / "datasets")
+        try:
+            from packages.lora_training.approval_index import get_index
+            index = get_index(Path(datasets_dir))
+        except ImportError:
+            # Run outside the repo root: score without the persistent cache
+            index = None
+        batch_score_datasets(
+            datasets_dir, write_to_meta="--write" in args, workers=workers,
+            index=index, force="--force" in args,
+        )
     else:
         result = score_image(sys.argv[1])
         print(json.dumps(result, indent=2))
@@ -13,7 +13,14 @@ Usage:
         --checkpoint /opt/ComfyUI/models/checkpoints/realistic_vision_v51.safetensors \
         --dataset-dir /opt/anime-studio/datasets/mario \
         --output /opt/ComfyUI/models/loras/mario_lora_v2.safetensors \
-        --epochs 20 --learning-rate 1e-4 --resolution 512
+        --epochs 20 --learning-rate 1e-4 --resolution 512 \
+        [--cache-latents] [--bucket --batch-size 4]
+
+--cache-latents encodes every image and caption once with the frozen VAE and
+text encoders (cached under <dataset-dir>/.latent_cache, keyed by image hash,
+bucket size and checkpoint), then moves those models off the GPU for the
+training loop. --bucket trains on aspect-ratio buckets so --batch-size > 1
+batches share a shape.
 """
 
 import argparse
@@ -93,6 +100,71 @@ def detect_model_type(checkpoint_path: str) -> str:
         return profile["architecture"]
 
 
+def encode_prompt(text_encoder, text_encoder_2, input_ids, input_ids_2=None):
+    """Frozen text encoder pass -> (encoder_hidden_states, pooled_prompt_embeds or None)."""
+    with torch.no_grad():
+        if text_encoder_2 is not None:
+            # SDXL: use penultimate hidden states from both encoders
+            # (standard diffusers SDXL training approach)
+            enc1_out = text_encoder(input_ids, output_hidden_states=True)
+            enc1_hidden = enc1_out.hidden_states[-2]
+
+            enc2_out = text_encoder_2(input_ids_2, output_hidden_states=True)
+            enc2_hidden = enc2_out.hidden_states[-2]
+
+            # Pooled output from text_encoder_2 (OpenCLIP-G)
+            return torch.cat([enc1_hidden, enc2_hidden], dim=-1), enc2_out[0]
+        return text_encoder(input_ids)[0], None
+
+
+def precompute_cache(dataset, vae, text_encoder, text_encoder_2, batch_size: int = 4) -> int:
+    """Encode every image/caption missing from dataset.cache; returns images encoded."""
+    cache = dataset.cache
+    todo = [i for i in range(len(dataset)) if not dataset.latent_path(i).exists()]
+
+    # Group by target size so images can be encoded in batches
+    by_size: dict[tuple[int, int], list[int]] = {}
+    for i in todo:
+        by_size.setdefault(dataset.target_sizes[i], []).append(i)
+    for indices in by_size.values():
+        for start in range(0, len(indices), batch_size):
+            chunk = indices[start:start + batch_size]
+            items = [dataset.load_pixels(i) for i in chunk]
+            pixels = torch.stack([it["pixel_values"] for it in items]).to("cuda", dtype=torch.float16)
+            with torch.no_grad():
+                dist = vae.encode(pixels).latent_dist
+            for j, (i, item) in enumerate(zip(chunk, items)):
+                cache.save(dataset.latent_path(i), {
+                    "latent_mean": dist.mean[j],
+                    "latent_std": dist.std[j],
+                    "original_size": item["original_size"],
+                    "crop_top_left": item["crop_top_left"],
+                })
+
+    # Captions repeat (tag-style captions often do), encode each once
+    first_idx: dict[str, int] = {}
+    for i, caption in enumerate(dataset.captions):
+        if caption not in first_idx and not cache.text_path(caption).exists():
+            first_idx[caption] = i
+    captions = list(first_idx.items())
+    for start in range(0, len(captions), batch_size):
+        chunk = captions[start:start + batch_size]
+        idx = [i for _, i in chunk]
+        input_ids_2 = dataset.input_ids_2[idx].to("cuda") if dataset.input_ids_2 is not None else None
+        hidden, pooled = encode_prompt(text_encoder, text_encoder_2, dataset.input_ids[idx].to("cuda"), input_ids_2)
+        for j, (caption, _) in enumerate(chunk):
+            tensors = {"encoder_hidden_states": hidden[j]}
+            if pooled is not None:
+                tensors["pooled_prompt_embeds"] = pooled[j]
+            cache.save(cache.text_path(caption), tensors)
+
+    logger.info(
+        f"Latent cache: encoded {len(todo)} images and {len(captions)} captions "
+        f"({len(dataset) - len(todo)} images already cached) in {cache.root}"
+    )
+    return len(todo)
+
+
 def train(args):
     """Main training loop — supports both SD1.5 and SDXL checkpoints."""
     from diffusers.utils import convert_state_dict_to_kohya
@@ -100,7 +172,7 @@ def train(args):
     from safetensors.torch import save_file
     from torch.utils.data import DataLoader
 
-    from lora_dataset import LoRADataset
+    from lora_dataset import BucketBatchSampler, LatentCache, LoRADataset, model_cache_key
 
     # Register signal handler for graceful shutdown
     signal.signal(signal.SIGTERM, _sigterm_handler)
@@ -190,21 +262,47 @@ def train(args):
         logger.info(f"Trainable params: {trainable:,} / {total:,} ({100*trainable/total:.2f}%)")
 
         # Dataset (pass tokenizer_2 for SDXL dual encoding)
+        cache = None
+        if args.cache_latents:
+            cache_dir = Path(args.cache_dir) if args.cache_dir else Path(args.dataset_dir) / ".latent_cache"
+            cache = LatentCache(cache_dir, model_cache_key(args.checkpoint))
         dataset = LoRADataset(
             args.dataset_dir, tokenizer,
             resolution=args.resolution,
             tokenizer_2=tokenizer_2,
+            bucketing=args.bucket,
+            cache=cache,
         )
         if len(dataset) == 0:
             raise RuntimeError("No approved images found in dataset")
 
-        dataloader = DataLoader(
-            dataset,
-            batch_size=1,
-            shuffle=True,
-            num_workers=0,  # Single worker to keep VRAM usage low
-            pin_memory=True,
-        )
+        scaling_factor = vae.config.scaling_factor
+        if cache is not None:
+            precompute_cache(dataset, vae, text_encoder, text_encoder_2, batch_size=max(args.batch_size, 4))
+            if not all(dataset.is_cached(i) for i in range(len(dataset))):
+                raise RuntimeError(f"Latent cache in {cache.root} is incomplete")
+            # Frozen encoders aren't needed again — give their VRAM to the UNet
+            vae.to("cpu")
+            text_encoder.to("cpu")
+            if text_encoder_2 is not None:
+                text_encoder_2.to("cpu")
+            torch.cuda.empty_cache()
+
+        if args.bucket:
+            dataloader = DataLoader(
+                dataset,
+                batch_sampler=BucketBatchSampler(dataset.target_sizes, args.batch_size),
+                num_workers=0,  # Single worker to keep VRAM usage low
+                pin_memory=True,
+            )
+        else:
+            dataloader = DataLoader(
+                dataset,
+                batch_size=args.batch_size,
+                shuffle=True,
+                num_workers=0,  # Single worker to keep VRAM usage low
+                pin_memory=True,
+            )
 
         # Optimizer: 8-bit Adam via bitsandbytes
         import bitsandbytes as bnb
@@ -237,7 +335,8 @@ def train(args):
         logger.info(
             f"Training ({model_type}): {len(dataset)} images, {args.epochs} epochs, "
             f"{total_steps} optimizer steps, LR={args.learning_rate}, "
-            f"rank={args.lora_rank}, resolution={args.resolution}"
+            f"rank={args.lora_rank}, resolution={args.resolution}, batch_size={args.batch_size}, "
+            f"buckets={len(set(dataset.target_sizes))}, latent_cache={'on' if cache else 'off'}"
         )
 
         global_step = 0
@@ -249,32 +348,28 @@ def train(args):
             num_batches = 0
 
             for step, batch in enumerate(dataloader):
-                pixel_values = batch["pixel_values"].to("cuda", dtype=torch.float16)
-                input_ids = batch["input_ids"].to("cuda")
-
-                # Encode images to latent space
-                with torch.no_grad():
-                    latents = vae.encode(pixel_values).latent_dist.sample()
-                    latents = latents * vae.config.scaling_factor
-
-                # Encode text
-                with torch.no_grad():
-                    if is_sdxl and text_encoder_2 is not None:
-                        # SDXL: use penultimate hidden states from both encoders
-                        # (standard diffusers SDXL training approach)
-                        input_ids_2 = batch["input_ids_2"].to("cuda")
-
-                        enc1_out = text_encoder(input_ids, output_hidden_states=True)
-                        enc1_hidden = enc1_out.hidden_states[-2]
+                if "latent_mean" in batch:
+                    # Cached latent distribution: draw a fresh sample like latent_dist.sample()
+                    mean = batch["latent_mean"].to("cuda", dtype=torch.float16)
+                    std = batch["latent_std"].to("cuda", dtype=torch.float16)
+                    latents = (mean + std * torch.randn_like(mean)) * scaling_factor
+                    encoder_hidden_states = batch["encoder_hidden_states"].to("cuda", dtype=torch.float16)
+                    pooled_output = batch.get("pooled_prompt_embeds")
+                    if pooled_output is not None:
+                        pooled_output = pooled_output.to("cuda", dtype=torch.float16)
+                else:
+                    pixel_values = batch["pixel_values"].to("cuda", dtype=torch.float16)
 
-                        enc2_out = text_encoder_2(input_ids_2, output_hidden_states=True)
-                        enc2_hidden = enc2_out.hidden_states[-2]
+                    # Encode images to latent space
+                    with torch.no_grad():
+                        latents = vae.encode(pixel_values).latent_dist.sample()
+                        latents = latents * scaling_factor
 
-                        encoder_hidden_states = torch.cat([enc1_hidden, enc2_hidden], dim=-1)
-                        encoder_output_2 = enc2_out  # keep ref for pooled output below
-                    else:
-                        encoder_output = text_encoder(input_ids)
-                        encoder_hidden_states = encoder_output[0]
+                    # Encode text
+                    input_ids_2 = batch["input_ids_2"].to("cuda") if "input_ids_2" in batch else None
+                    encoder_hidden_states, pooled_output = encode_prompt(
+                        text_encoder, text_encoder_2, batch["input_ids"].to("cuda"), input_ids_2,
+                    )
 
                 # Sample noise and timesteps
                 noise = torch.randn_like(latents)
@@ -300,13 +395,16 @@ def train(args):
                 }
                 # SDXL needs added_cond_kwargs with pooled text embeddings + time_ids
                 if is_sdxl and text_encoder_2 is not None:
-                    # Pooled output from text_encoder_2 (OpenCLIP-G)
-                    pooled_output = encoder_output_2[0]
                     # Time IDs: [orig_h, orig_w, crop_top, crop_left, target_h, target_w]
-                    time_ids = torch.tensor(
-                        [[args.resolution, args.resolution, 0, 0, args.resolution, args.resolution]],
-                        dtype=torch.float16, device="cuda",
-                    )
+                    if args.bucket:
+                        time_ids = torch.cat(
+                            [batch["original_size"], batch["crop_top_left"], batch["target_size"]], dim=1,
+                        ).to("cuda", dtype=torch.float16)
+                    else:
+                        time_ids = torch.tensor(
+                            [[args.resolution, args.resolution, 0, 0, args.resolution, args.resolution]],
+                            dtype=torch.float16, device="cuda",
+                        ).repeat(latents.shape[0], 1)
                     unet_kwargs["added_cond_kwargs"] = {
                         "text_embeds": pooled_output,
                         "time_ids": time_ids,
@@ -431,6 +529,13 @@ def main():
                         help="Model architecture (auto-detect from checkpoint if 'auto')")
     parser.add_argument("--prediction-type", choices=["auto", "epsilon", "v_prediction"], default="auto",
                         help="Prediction type (auto-detect from model profile if 'auto')")
+    parser.add_argument("--batch-size", type=int, default=1, help="Images per step")
+    parser.add_argument("--bucket", action="store_true",
+                        help="Aspect-ratio bucketing instead of square center crops")
+    parser.add_argument("--cache-latents", action="store_true",
+                        help="Pre-encode latents/text embeddings once and offload the frozen encoders")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Latent cache directory (default: <dataset-dir>/.latent_cache)")
 
     args = parser.parse_args()
 
@@ -443,6 +548,7 @@ def main():
     logger.info(f"Epochs: {args.epochs}, LR: {args.learning_rate}, Resolution: {args.resolution}")
     logger.info(f"LoRA rank: {args.lora_rank}, Grad accum: {args.grad_accum}")
     logger.info(f"Prediction type: {args.prediction_type}")
+    logger.info(f"Batch size: {args.batch_size}, Bucketing: {args.bucket}, Latent cache: {args.cache_latents}")
 
     train(args)
 
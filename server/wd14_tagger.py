@@ -9,8 +9,10 @@ Usage:
     # Tag a single image
     python3 wd14_tagger.py /path/to/image.png
 
-    # Tag all images in datasets and write .txt captions
-    python3 wd14_tagger.py --batch /path/to/datasets/ [--write-captions] [--write-meta]
+    # Tag all images in datasets and write .txt captions (images whose sidecars
+    # are already current are skipped; --force retags everything)
+    python3 wd14_tagger.py --batch /path/to/datasets/ [--write-captions] [--write-meta] \
+        [--batch-size 8] [--workers 4] [--force]
 
     # Specify threshold
     python3 wd14_tagger.py --threshold 0.35 /path/to/image.png
@@ -60,74 +62,194 @@ def load_tags(csv_path: Path) -> list:
     return tags
 
 
-def tag_image(image_path: str, threshold: float = 0.35,
-              model_name: str = DEFAULT_MODEL) -> dict:
-    """Tag a single image. Returns dict with tags and confidence scores."""
-    try:
-        import onnxruntime as ort
-        from PIL import Image
-        import numpy as np
-    except ImportError as e:
-        return {"tags": [], "error": f"Missing dependency: {e}. Install: pip install onnxruntime pillow numpy"}
-
-    path = Path(image_path)
-    if not path.exists():
-        return {"tags": [], "error": "file not found"}
+class WD14Tagger:
+    """One loaded ONNX session + tag list, reused for every image.
 
-    try:
-        onnx_path, csv_path = ensure_model(model_name)
-        tags_list = load_tags(csv_path)
+    Images are decoded/resized in a thread pool while the previous batch is
+    in inference, and inference runs on batches of batch_size (when the model
+    has a dynamic batch dimension).
+    """
 
-        # Load and preprocess image
-        image = Image.open(path).convert("RGB")
-
-        # Get model input size
-        session = ort.InferenceSession(str(onnx_path))
-        input_shape = session.get_inputs()[0].shape
-        target_size = input_shape[1] if len(input_shape) >= 3 else 448
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 8,
+                 workers: int | None = None, intra_op_threads: int | None = None):
+        import onnxruntime as ort
 
-        # Resize with padding (same as ComfyUI node)
-        image = image.resize((target_size, target_size), Image.LANCZOS)
-        img_array = np.array(image, dtype=np.float32)
+        onnx_path, csv_path = ensure_model(model_name)
+        self.model_name = model_name
+        self.tags = load_tags(csv_path)
+
+        opts = ort.SessionOptions()
+        if intra_op_threads:
+            opts.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(str(onnx_path), sess_options=opts)
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.target_size = inp.shape[1] if len(inp.shape) >= 3 and isinstance(inp.shape[1], int) else 448
+        # A fixed leading dim (e.g. 1) means the export can't take batches
+        fixed_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+        self.batch_size = min(batch_size, fixed_batch) if fixed_batch else max(batch_size, 1)
+        self.workers = workers or min(8, (os.cpu_count() or 2))
+
+    def preprocess(self, path: Path):
+        """Decode and resize one image to the model's (H, W, 3) BGR float32 input."""
+        from PIL import Image
+        import numpy as np
 
+        with Image.open(path) as img:
+            image = img.convert("RGB").resize((self.target_size, self.target_size), Image.LANCZOS)
         # BGR conversion (model expects BGR)
-        img_array = img_array[:, :, ::-1]
+        return np.ascontiguousarray(np.asarray(image, dtype=np.float32)[:, :, ::-1])
 
-        # Add batch dimension
-        img_array = np.expand_dims(img_array, axis=0)
-
-        # Run inference
-        input_name = session.get_inputs()[0].name
-        output = session.run(None, {input_name: img_array})
-        predictions = output[0][0]
-
-        # Filter by threshold
-        results = []
-        for i, score in enumerate(predictions):
-            if i < len(tags_list) and float(score) >= threshold:
-                results.append({
-                    "tag": tags_list[i],
-                    "confidence": round(float(score), 4),
-                })
+    def predict(self, arrays: list):
+        """Run one inference over a list of preprocessed images; returns (N, n_tags)."""
+        import numpy as np
+        return self.session.run(None, {self.input_name: np.stack(arrays)})[0]
 
-        # Sort by confidence descending
-        results.sort(key=lambda x: x["confidence"], reverse=True)
+    def format(self, predictions, threshold: float) -> dict:
+        """Threshold one prediction row into the tag_image() result shape."""
+        import numpy as np
 
+        scores = np.asarray(predictions[:len(self.tags)], dtype=np.float32)
+        idx = np.flatnonzero(scores >= threshold)
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        results = [{"tag": self.tags[i], "confidence": round(float(scores[i]), 4)} for i in idx]
         return {
             "tags": results,
             "tag_string": ", ".join(r["tag"] for r in results),
             "count": len(results),
         }
+
+    def tag_paths(self, paths: list[Path], threshold: float = 0.35):
+        """Yield (path, result) in input order, preprocessing ahead of inference."""
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Bounded look-ahead: decoded 448px float images are ~2.4 MB each
+            pending = deque()
+            it = iter(paths)
+            lookahead = self.batch_size * 2
+
+            def _fill():
+                while len(pending) < lookahead:
+                    try:
+                        p = next(it)
+                    except StopIteration:
+                        return
+                    pending.append((p, pool.submit(self.preprocess, p)))
+
+            _fill()
+            while pending:
+                batch, arrays, failed = [], [], []
+                while pending and len(batch) < self.batch_size:
+                    p, fut = pending.popleft()
+                    try:
+                        arrays.append(fut.result())
+                        batch.append(p)
+                    except Exception as e:
+                        failed.append((p, {"tags": [], "error": str(e)}))
+                _fill()  # next batch decodes while this one runs
+                yield from failed
+                if not batch:
+                    continue
+                try:
+                    preds = self.predict(arrays)
+                except Exception as e:
+                    for p in batch:
+                        yield p, {"tags": [], "error": str(e)}
+                    continue
+                for p, row in zip(batch, preds):
+                    yield p, self.format(row, threshold)
+
+
+_taggers: dict[str, "WD14Tagger"] = {}
+
+
+def get_tagger(model_name: str = DEFAULT_MODEL, **kwargs) -> WD14Tagger:
+    """Process-wide tagger per model — the session is only created once."""
+    if model_name not in _taggers:
+        _taggers[model_name] = WD14Tagger(model_name, **kwargs)
+    return _taggers[model_name]
+
+
+def tag_image(image_path: str, threshold: float = 0.35,
+              model_name: str = DEFAULT_MODEL) -> dict:
+    """Tag a single image. Returns dict with tags and confidence scores."""
+    path = Path(image_path)
+    if not path.exists():
+        return {"tags": [], "error": "file not found"}
+
+    try:
+        tagger = get_tagger(model_name)
+        return tagger.format(tagger.predict([tagger.preprocess(path)])[0], threshold)
+    except ImportError as e:
+        return {"tags": [], "error": f"Missing dependency: {e}. Install: pip install onnxruntime pillow numpy"}
     except Exception as e:
         return {"tags": [], "error": str(e)}
 
 
+def _read_meta(meta_path: Path) -> dict:
+    if meta_path.exists():
+        try:
+            return json.loads(meta_path.read_text())
+        except (json.JSONDecodeError, IOError):
+            pass
+    return {}
+
+
+def _is_current(png: Path, model_name: str, threshold: float,
+                write_captions: bool, write_meta: bool) -> bool:
+    """True when every requested sidecar was already written from the current pixels."""
+    meta = _read_meta(png.with_suffix(".meta.json"))
+    stamp = meta.get("wd14_source")
+    if not stamp:
+        return False
+    if (stamp.get("mtime") != png.stat().st_mtime or stamp.get("model") != model_name
+            or stamp.get("threshold") != threshold):
+        return False
+    # The stamp is shared by both sidecars; a captions-only run leaves no tags in the meta
+    if write_meta and "wd14_tags" not in meta:
+        return False
+    return not write_captions or png.with_suffix(".txt").exists()
+
+
+def _write_sidecars(png: Path, result: dict, model_name: str, threshold: float,
+                    write_captions: bool, write_meta: bool):
+    meta_path = png.with_suffix(".meta.json")
+    meta = _read_meta(meta_path)
+
+    if write_captions:
+        # Write enhanced caption: design_prompt + top WD14 tags
+        caption_parts = []
+        design_prompt = meta.get("design_prompt", "")
+        if design_prompt:
+            caption_parts.append(design_prompt)
+        caption_parts.append(result["tag_string"])
+        png.with_suffix(".txt").write_text(", ".join(caption_parts))
+
+    if write_meta:
+        meta["wd14_tags"] = result["tags"][:30]  # top 30 tags
+        meta["wd14_tag_string"] = result["tag_string"]
+    # Stamp lets the next run skip this image until the PNG changes
+    meta["wd14_source"] = {"mtime": png.stat().st_mtime, "model": model_name, "threshold": threshold}
+    meta_path.write_text(json.dumps(meta, indent=2))
+
+
 def batch_tag_datasets(datasets_dir: str, threshold: float = 0.35,
-                       write_captions: bool = False, write_meta: bool = False):
-    """Tag all images in dataset directories."""
+                       write_captions: bool = False, write_meta: bool = False,
+                       batch_size: int = 8, workers: int | None = None,
+                       force: bool = False, model_name: str = DEFAULT_MODEL) -> dict:
+    """Tag all images in dataset directories.
+
+    With write_captions/write_meta, images whose sidecars are already current
+    (same PNG mtime, model and threshold) are skipped unless force is set.
+    Returns counts and throughput.
+    """
+    import time
+
     base = Path(datasets_dir)
-    total = 0
-    tagged = 0
+    total = skipped = tagged = errors = 0
+    todo: list[tuple[str, Path]] = []
 
     for char_dir in sorted(base.iterdir()):
         if not char_dir.is_dir():
@@ -135,74 +257,71 @@ def batch_tag_datasets(datasets_dir: str, threshold: float = 0.35,
         images_dir = char_dir / "images"
         if not images_dir.exists():
             continue
-
-        print(f"\n  {char_dir.name}:")
         for png in sorted(images_dir.glob("*.png")):
             total += 1
-            result = tag_image(str(png), threshold=threshold)
-
+            if (write_captions or write_meta) and not force and _is_current(
+                    png, model_name, threshold, write_captions, write_meta):
+                skipped += 1
+                continue
+            todo.append((char_dir.name, png))
+
+    print(f"  {len(todo)} to tag, {skipped} already current ({total} images)")
+    start = time.monotonic()
+    if todo:
+        tagger = get_tagger(model_name, batch_size=batch_size, workers=workers)
+        owner = {png: slug for slug, png in todo}
+        current_slug = None
+        for png, result in tagger.tag_paths([png for _, png in todo], threshold=threshold):
+            if owner[png] != current_slug:
+                current_slug = owner[png]
+                print(f"\n  {current_slug}:")
             if result.get("error"):
+                errors += 1
                 print(f"    {png.name}: ERROR - {result['error']}")
                 continue
 
             tagged += 1
             top_tags = [r["tag"] for r in result["tags"][:5]]
             print(f"    {png.name}: {', '.join(top_tags)} ({result['count']} total)")
+            if write_captions or write_meta:
+                _write_sidecars(png, result, model_name, threshold, write_captions, write_meta)
 
-            if write_captions:
-                # Combine design_prompt with auto-tags for better captions
-                meta_path = png.with_suffix(".meta.json")
-                design_prompt = ""
-                if meta_path.exists():
-                    try:
-                        meta = json.loads(meta_path.read_text())
-                        design_prompt = meta.get("design_prompt", "")
-                    except (json.JSONDecodeError, IOError):
-                        pass
-
-                # Write enhanced caption: design_prompt + top WD14 tags
-                caption_parts = []
-                if design_prompt:
-                    caption_parts.append(design_prompt)
-                caption_parts.append(result["tag_string"])
-                png.with_suffix(".txt").write_text(", ".join(caption_parts))
-
-            if write_meta:
-                meta_path = png.with_suffix(".meta.json")
-                meta = {}
-                if meta_path.exists():
-                    try:
-                        meta = json.loads(meta_path.read_text())
-                    except (json.JSONDecodeError, IOError):
-                        pass
-                meta["wd14_tags"] = result["tags"][:30]  # top 30 tags
-                meta["wd14_tag_string"] = result["tag_string"]
-                meta_path.write_text(json.dumps(meta, indent=2))
-
-    print(f"\nTagged {tagged}/{total} images")
+    elapsed = time.monotonic() - start
+    rate = tagged / elapsed if elapsed > 0 else 0.0
+    print(f"\nTagged {tagged}/{total} images ({skipped} skipped, {errors} errors) "
+          f"in {elapsed:.1f}s — {rate:.2f} images/s")
+    return {
+        "total": total, "tagged": tagged, "skipped": skipped, "errors": errors,
+        "seconds": round(elapsed, 2), "images_per_second": round(rate, 2),
+    }
 
 
 if __name__ == "__main__":
-    threshold = 0.35
     args = sys.argv[1:]
 
-    # Parse --threshold
-    for i, arg in enumerate(args):
-        if arg == "--threshold" and i + 1 < len(args):
-            threshold = float(args[i + 1])
-            args = args[:i] + args[i+2:]
-            break
+    # Parse --threshold / --batch-size / --workers
+    options = {"--threshold": 0.35, "--batch-size": 8, "--workers": None}
+    for flag in options:
+        if flag in args:
+            i = args.index(flag)
+            if i + 1 < len(args):
+                options[flag] = float(args[i + 1]) if flag == "--threshold" else int(args[i + 1])
+                args = args[:i] + args[i+2:]
+    threshold = options["--threshold"]
 
     if not args:
         print("Usage: python3 wd14_tagger.py [--threshold 0.35] <image_path>")
-        print("       python3 wd14_tagger.py --batch <datasets_dir> [--write-captions] [--write-meta]")
+        print("       python3 wd14_tagger.py --batch <datasets_dir> [--write-captions] [--write-meta]"
+              " [--batch-size 8] [--workers N] [--force]")
         sys.exit(1)
 
     if args[0] == "--batch":
         datasets_dir = args[1] if len(args) > 1 else str(Path(__file__).resolve().parent.parent / "datasets")
         write_captions = "--write-captions" in args
         write_meta = "--write-meta" in args
-        batch_tag_datasets(datasets_dir, threshold, write_captions, write_meta)
+        batch_tag_datasets(datasets_dir, threshold, write_captions, write_meta,
+                           batch_size=options["--batch-size"], workers=options["--workers"],
+                           force="--force" in args)
     else:
         result = tag_image(args[0], threshold=threshold)
         print(json.dumps(result, indent=2))
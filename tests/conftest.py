@@ -5,6 +5,7 @@ Provides:
 - mock_comfyui: Patches urllib.request for ComfyUI HTTP calls
 - mock_ollama: Patches urllib.request for Ollama vision model calls
 - mock_filesystem: tmp_path-based dataset directory
+- isolated_approval_index: (autouse) keeps the datasets approval index in tmp_path
 - event_bus_spy: Fresh EventBus with captured events
 - sample_char_map: Dict matching get_char_project_map() output shape
 - app_client: httpx.AsyncClient wrapping the FastAPI app
@@ -50,10 +51,18 @@ def mock_conn():
 
 
 class _MockAsyncCtx:
-    """Async context manager that yields a fixed value."""
+    """Async context manager that yields a fixed value.
+
+    Also awaitable, like asyncpg's PoolAcquireContext (`conn = await pool.acquire()`).
+    """
     def __init__(self, value):
         self._value = value
 
+    def __await__(self):
+        async def _value():
+            return self._value
+        return _value().__await__()
+
     async def __aenter__(self):
         return self._value
 
@@ -71,6 +80,7 @@ def mock_db_pool(mock_conn):
     """
     pool = MagicMock()
     pool.acquire.return_value = _MockAsyncCtx(mock_conn)
+    pool.release = AsyncMock()
     return pool
 
 
@@ -190,6 +200,22 @@ def mock_filesystem(tmp_path):
     return tmp_path
 
 
+@pytest.fixture(autouse=True)
+def isolated_approval_index(tmp_path, monkeypatch):
+    """Serve get_index() for the real datasets root from a tmp_path database.
+
+    Route handlers call get_index(BASE_PATH) with the unpatched BASE_PATH;
+    without this the suite would create datasets/.approval_index.sqlite3.
+    """
+    from packages.core.config import BASE_PATH
+    from packages.lora_training import approval_index
+
+    index = approval_index.ApprovalIndex(BASE_PATH, db_path=tmp_path / approval_index.INDEX_FILENAME)
+    monkeypatch.setitem(approval_index._indexes, str(BASE_PATH.resolve()), index)
+    yield index
+    index.close()
+
+
 # ---------------------------------------------------------------------------
 # EventBus Spy
 # ---------------------------------------------------------------------------
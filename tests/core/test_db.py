@@ -35,3 +35,58 @@ def test_max_concurrent_is_reasonable():
     """MAX_CONCURRENT should be a small positive integer."""
     assert isinstance(MAX_CONCURRENT, int)
     assert 1 <= MAX_CONCURRENT <= 10
+
+
+@pytest.mark.unit
+async def test_connect_pooled_close_releases_to_pool(patch_get_pool, mock_conn):
+    """close() on a pooled connection releases it exactly once; calls are delegated."""
+    conn = await db_module.connect_pooled()
+    await conn.fetchval("SELECT 1")
+    mock_conn.fetchval.assert_awaited_once_with("SELECT 1")
+
+    await conn.close()
+    await conn.close()
+    patch_get_pool.release.assert_awaited_once_with(mock_conn)
+
+
+@pytest.mark.unit
+async def test_request_scope_reuses_one_connection(patch_get_pool):
+    """Sequential connect_pooled() calls in one request share a single acquire."""
+    scope = db_module.request_db_scope()
+    await scope.__anext__()
+
+    for _ in range(3):
+        conn = await db_module.connect_pooled()
+        await conn.close()
+    leaked = await db_module.connect_pooled()  # never closed by the handler
+    assert leaked is not None
+    assert patch_get_pool.acquire.call_count == 1
+
+    with pytest.raises(StopAsyncIteration):
+        await scope.__anext__()
+    # Released at request end even though the last handle leaked
+    patch_get_pool.release.assert_awaited_once()
+
+
+@pytest.mark.unit
+async def test_request_scope_concurrent_users_get_own_connection(patch_get_pool):
+    scope = db_module.request_db_scope()
+    await scope.__anext__()
+
+    first = await db_module.connect_pooled()
+    second = await db_module.connect_pooled()  # first still in use
+    assert patch_get_pool.acquire.call_count == 2
+    await second.close()
+    await first.close()
+    assert patch_get_pool.release.await_count == 1  # only the non-scope one
+
+    with pytest.raises(StopAsyncIteration):
+        await scope.__anext__()
+    assert patch_get_pool.release.await_count == 2
+
+
+@pytest.mark.unit
+def test_pool_stats_reports_wait_metrics():
+    stats = db_module.pool_stats()
+    for key in ("acquired", "saturated", "timeouts", "avg_wait_ms", "max_wait_ms", "request_reuse"):
+        assert key in stats
@@ -9,7 +9,7 @@ Covers:
 
 import json
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch, call
+from unittest.mock import AsyncMock, patch, call
 
 import pytest
 
@@ -156,6 +156,7 @@ class TestPollUntilComplete:
         }
         with patch(
             "packages.core.generation.get_comfyui_progress",
+            new_callable=AsyncMock,
             return_value=mock_progress,
         ):
             result = await _poll_until_complete("prompt-123", timeout=10, interval=0.01)
@@ -167,6 +168,7 @@ class TestPollUntilComplete:
         mock_progress = {"status": "running", "progress": 0.5}
         with patch(
             "packages.core.generation.get_comfyui_progress",
+            new_callable=AsyncMock,
             return_value=mock_progress,
         ):
             result = await _poll_until_complete("prompt-123", timeout=0.05, interval=0.01)
@@ -178,6 +180,7 @@ class TestPollUntilComplete:
         mock_progress = {"status": "error", "progress": 0.0, "error": "CUDA OOM"}
         with patch(
             "packages.core.generation.get_comfyui_progress",
+            new_callable=AsyncMock,
             return_value=mock_progress,
         ):
             result = await _poll_until_complete("prompt-123", timeout=10, interval=0.01)
@@ -191,7 +194,7 @@ class TestPollUntilComplete:
             {"status": "running", "progress": 0.5},
             {"status": "completed", "progress": 1.0, "images": ["out.png"]},
         ]
-        mock_fn = MagicMock(side_effect=progress_sequence)
+        mock_fn = AsyncMock(side_effect=progress_sequence)
         with patch("packages.core.generation.get_comfyui_progress", mock_fn):
             result = await _poll_until_complete("prompt-123", timeout=10, interval=0.01)
 
@@ -235,6 +238,7 @@ def _make_generate_batch_patches(
         ),
         "submit": patch(
             "packages.core.generation.submit_comfyui_workflow",
+            new_callable=AsyncMock,
             side_effect=submit_side_effect,
             return_value=submit_return,
         ),
@@ -0,0 +1,112 @@
+"""Tests for packages.core.learning_rollups — quality bands, sketches and rollup rows."""
+
+import asyncio
+from datetime import date, datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from packages.core import learning_rollups
+from packages.core.learning import SUCCESS_THRESHOLD
+from packages.core.learning_rollups import (
+    ROLLUP_COLUMNS,
+    QuantileSketch,
+    band_floor,
+    build_rollups,
+    quality_band,
+)
+from packages.core.model_selector import QUALITY_FLOOR
+
+
+def _gen(hour=10, quality=0.8, status="approved", cfg=7.0, steps=30, sampler="dpmpp_2m", day=15):
+    return {
+        "generated_at": datetime(2026, 2, day, hour), "character_slug": "luigi",
+        "project_name": "Mario", "checkpoint_model": "pixar.safetensors", "sampler": sampler,
+        "scheduler": "karras", "status": status, "quality_score": quality,
+        "cfg_scale": cfg, "steps": steps, "width": 512, "height": 768,
+    }
+
+
+@pytest.mark.unit
+def test_thresholds_align_with_quality_bands():
+    assert band_floor(QUALITY_FLOOR) == quality_band(0.65) == 13
+    assert band_floor(SUCCESS_THRESHOLD) == quality_band(0.7) == 14
+    assert quality_band(0.6999) == 13
+    assert quality_band(1.0) == 20 and quality_band(None) is None
+
+
+@pytest.mark.unit
+class TestQuantileSketch:
+
+    def test_median_matches_nearest_rank(self):
+        sketch = QuantileSketch(0.1)
+        for v in (6.0, 7.0, 7.0, 8.5, 9.0):
+            sketch.add(v)
+        assert sketch.quantile(0.5) == 7.0
+        assert sketch.quantile(1.0) == 9.0
+
+    def test_values_round_to_resolution_and_merge(self):
+        a, b = QuantileSketch(8), QuantileSketch(8)
+        a.add(510)
+        a.add(None)
+        b.add(512)
+        b.add(768)
+        a.merge(b)
+        assert a.counts == {"512": 2, "768": 1}
+        assert QuantileSketch(8).quantile(0.5) is None
+
+
+@pytest.mark.unit
+def test_build_rollups_groups_by_dimensions_and_band():
+    rows = [
+        _gen(9, quality=0.81, cfg=7.0),
+        _gen(11, quality=0.84, cfg=8.0),
+        _gen(12, quality=0.3, status="rejected"),
+        _gen(13, quality=None, status="pending"),
+    ]
+    rollups = {r[ROLLUP_COLUMNS.index("quality_band")]: dict(zip(ROLLUP_COLUMNS, r)) for r in build_rollups(rows)}
+
+    top = rollups[16]
+    assert top["day"] == date(2026, 2, 15)
+    assert top["n"] == 2 and top["quality_sum"] == pytest.approx(1.65)
+    assert (top["quality_min"], top["quality_max"]) == (0.81, 0.84)
+    assert top["last_generated"] == datetime(2026, 2, 15, 11)
+    assert top["cfg_sketch"] == '{"7": 1, "8": 1}'
+    assert rollups[6]["status"] == "rejected"
+    assert rollups[None]["n"] == 1 and rollups[None]["quality_sum"] is None
+
+
+@pytest.mark.unit
+async def test_review_events_share_one_debounced_refresh(monkeypatch):
+    refreshes = []
+
+    async def refresh(full=False):
+        refreshes.append(full)
+
+    monkeypatch.setattr(learning_rollups, "refresh", refresh)
+    monkeypatch.setattr(learning_rollups, "LEARNING_ROLLUP_DEBOUNCE", 0.01)
+    monkeypatch.setattr(learning_rollups, "_debounce_task", None)
+
+    for _ in range(5):
+        await learning_rollups._handle_review({"character_slug": "luigi"})
+    await learning_rollups._debounce_task
+    assert refreshes == [False]
+
+    await learning_rollups._handle_review({"character_slug": "luigi"})
+    await asyncio.wait_for(learning_rollups._debounce_task, 1)
+    assert refreshes == [False, False]
+
+
+@pytest.mark.unit
+async def test_refresh_scans_updated_at_behind_the_watermark(mock_conn, mock_db_pool, monkeypatch):
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    mock_conn.fetchval.side_effect = [now, "2026-02-15T11:00:00"]
+    monkeypatch.setattr(learning_rollups, "get_pool", AsyncMock(return_value=mock_db_pool))
+
+    result = await learning_rollups.refresh()
+
+    sql, since = mock_conn.fetch.await_args_list[0].args
+    assert "updated_at > $1" in sql and "reviewed_at" not in sql
+    assert since == datetime(2026, 2, 15, 11) - learning_rollups.WATERMARK_OVERLAP
+    assert mock_conn.fetch.await_args_list[1].args[1] == since  # rejections
+    assert result["watermark"] == now.isoformat()
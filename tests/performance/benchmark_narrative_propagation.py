@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark narrative state propagation: per-row legacy path vs. set-based path.
+
+Runs against an in-memory fake connection that counts round-trips, so it needs
+no database. 60 scenes x 10 characters, propagated from scene 1.
+"""
+import asyncio
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+from packages.narrative_state.decay import apply_all_decay
+from packages.narrative_state.engine import NarrativeStateEngine
+
+SCENES = 60
+CHARACTERS = 10
+# Typical LAN round-trip to Postgres, added per query to make the difference visible
+RTT_S = 0.0005
+
+
+class FakeConn:
+    """Minimal asyncpg stand-in that counts queries and connections."""
+
+    def __init__(self, stats, scenes, states):
+        self.stats = stats
+        self.scenes = scenes
+        self.states = states
+        stats["connections"] += 1
+
+    async def _rtt(self):
+        self.stats["round_trips"] += 1
+        await asyncio.sleep(RTT_S)
+
+    async def fetchrow(self, sql, *args):
+        await self._rtt()
+        if "FROM scenes" in sql:
+            return {"scene_number": 1, "project_id": 1}
+        if "INSERT INTO" in sql:
+            return {"scene_id": args[0], "character_slug": args[1], "state_source": args[-1]}
+        return self.states.get((str(args[0]), args[1]))
+
+    async def fetch(self, sql, *args):
+        await self._rtt()
+        if "INSERT INTO" in sql:
+            return [{"scene_id": r[0], "character_slug": r[1], "state_source": args[0]}
+                    for r in self._copied]
+        if "character_scene_state" in sql:
+            if "css" in sql:
+                return list(self.states.values())
+            return [s for (sid, _), s in self.states.items() if sid == str(args[0])]
+        return [{"id": s, "scene_number": n} for n, s in enumerate(self.scenes[1:], start=2)]
+
+    async def execute(self, sql, *args):
+        await self._rtt()
+
+    async def copy_records_to_table(self, table, columns, records):
+        await self._rtt()
+        self._copied = list(records)
+
+    @asynccontextmanager
+    async def transaction(self):
+        await self._rtt()
+        yield
+        await self._rtt()
+
+    async def close(self):
+        pass
+
+
+async def legacy_propagate(engine, from_scene_id, conn_factory):
+    """The original per-character, per-scene loop (fetchrow + set_state each)."""
+    conn = await conn_factory()
+    source_states = await conn.fetch("SELECT * FROM character_scene_state WHERE scene_id = $1", from_scene_id)
+    await conn.fetchrow("SELECT scene_number, project_id FROM scenes WHERE id = $1", from_scene_id)
+    downstream = await conn.fetch("SELECT id, scene_number FROM scenes", 1, 1)
+    propagated = []
+    for src in source_states:
+        current = engine._row_to_dict(src)
+        for ds in downstream:
+            await conn.fetchrow("SELECT state_source FROM character_scene_state", ds["id"], src["character_slug"])
+            decayed = apply_all_decay(current)
+            propagated.append(await engine.set_state(str(ds["id"]), src["character_slug"], decayed, "propagated"))
+            current = decayed
+    return propagated
+
+
+def _fixture():
+    scenes = [str(uuid.uuid4()) for _ in range(SCENES)]
+    states = {
+        (scenes[0], f"char_{c}"): {
+            "scene_id": scenes[0], "character_slug": f"char_{c}", "clothing": "coat",
+            "injuries": [{"type": "cut", "severity": "severe", "countdown": 2}],
+            "body_state": "bloody", "emotional_state": "angry", "energy_level": "exhausted",
+            "relationship_context": {}, "accessories": [], "carrying": [], "state_source": "auto",
+        }
+        for c in range(CHARACTERS)
+    }
+    return scenes, states
+
+
+async def _run(label, fn):
+    scenes, states = _fixture()
+    stats = {"round_trips": 0, "connections": 0}
+
+    async def factory():
+        return FakeConn(stats, scenes, states)
+
+    engine = NarrativeStateEngine()
+    with patch("packages.narrative_state.engine.connect_pooled", side_effect=factory):
+        start = time.perf_counter()
+        rows = await fn(engine, scenes[0], factory)
+        elapsed = time.perf_counter() - start
+    return {"label": label, "rows": len(rows), "elapsed_ms": round(elapsed * 1000, 1), **stats}
+
+
+async def benchmark_propagation():
+    legacy = await _run("legacy", legacy_propagate)
+    set_based = await _run("set_based", lambda e, sid, _f: e.propagate_forward(sid, 1))
+
+    results = {
+        "scenes": SCENES,
+        "characters": CHARACTERS,
+        "legacy": legacy,
+        "set_based": set_based,
+        "benchmark_timestamp": time.time(),
+    }
+    with open("performance_narrative_propagation.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+    for r in (legacy, set_based):
+        print(f"{r['label']:>10}: {r['rows']} rows, {r['round_trips']} round-trips, "
+              f"{r['connections']} connections, {r['elapsed_ms']}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_propagation())
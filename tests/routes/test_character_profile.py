@@ -42,7 +42,7 @@ async def test_get_character_detail(app_client):
     })
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -72,7 +72,7 @@ async def test_get_character_detail_not_found(app_client):
     mock_conn.fetchrow = AsyncMock(return_value=None)
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -94,7 +94,7 @@ async def test_get_character_detail_null_jsonb(app_client):
     })
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -118,7 +118,7 @@ async def test_patch_character_design_prompt_only(app_client):
     mock_conn.execute = AsyncMock()
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ), patch("packages.story.story_characters.invalidate_char_cache"):
@@ -144,7 +144,7 @@ async def test_patch_character_multiple_fields(app_client):
     mock_conn.execute = AsyncMock()
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ), patch("packages.story.story_characters.invalidate_char_cache"):
@@ -173,7 +173,7 @@ async def test_patch_character_jsonb_field(app_client):
     mock_conn.execute = AsyncMock()
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ), patch("packages.story.story_characters.invalidate_char_cache"):
@@ -202,7 +202,7 @@ async def test_patch_character_no_valid_fields(app_client):
     mock_conn.fetchrow = AsyncMock(return_value={"id": 24, "name": "Mario", "project_id": 41})
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -220,7 +220,7 @@ async def test_patch_character_not_found(app_client):
     mock_conn.fetchrow = AsyncMock(return_value=None)
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -238,7 +238,7 @@ async def test_patch_character_all_field_types(app_client):
     mock_conn.execute = AsyncMock()
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ), patch("packages.story.story_characters.invalidate_char_cache"):
@@ -410,7 +410,7 @@ async def test_patch_then_detail_round_trip(app_client):
 
     # Step 1: GET detail — should show null fields
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -424,7 +424,7 @@ async def test_patch_then_detail_round_trip(app_client):
     mock_conn2.execute = AsyncMock()
     mock_conn2.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn2,
     ), patch("packages.story.story_characters.invalidate_char_cache"):
@@ -455,7 +455,7 @@ async def test_patch_then_detail_round_trip(app_client):
     mock_conn3.fetchrow = AsyncMock(return_value=updated_data)
     mock_conn3.close = AsyncMock()
     with patch(
-        "packages.story.story_characters.connect_direct",
+        "packages.story.story_characters.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn3,
     ):
@@ -0,0 +1,119 @@
+"""Tests for the scene and episode listing endpoints — single query, keyset pages, ETags."""
+
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from packages.core.events import event_bus, SCENE_UPDATED
+from packages.episode_assembly.router import episode_list_cache
+from packages.scene_generation.scene_crud import scene_list_cache
+
+
+def _scene_row(n, **extra):
+    row = {
+        "id": uuid.UUID(int=n), "project_id": 1, "scene_number": n,
+        "title": f"Scene {n}", "description": None, "location": None,
+        "time_of_day": None, "weather": None, "mood": None,
+        "generation_status": None, "target_duration_seconds": 30,
+        "actual_duration_seconds": None, "completed_shots": 0,
+        "final_video_path": None, "created_at": datetime(2026, 2, 18),
+        "audio_track_id": None, "audio_track_name": None, "audio_track_artist": None,
+        "audio_preview_url": None, "audio_fade_in": None, "audio_fade_out": None,
+        "audio_start_offset": None, "audio_auto_duck": None,
+        "audio_generation_mode": None, "audio_source_playlist_id": None,
+        "shot_count": n,
+    }
+    row.update(extra)
+    return row
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    scene_list_cache.invalidate()
+    episode_list_cache.invalidate()
+    yield
+    scene_list_cache.invalidate()
+    episode_list_cache.invalidate()
+
+
+def _mock_conn(rows):
+    conn = AsyncMock()
+    conn.fetch = AsyncMock(return_value=rows)
+    conn.close = AsyncMock()
+    return conn
+
+
+@pytest.mark.unit
+async def test_list_scenes_is_one_query_with_shot_counts(app_client):
+    conn = _mock_conn([_scene_row(1), _scene_row(2)])
+    with patch("packages.scene_generation.scene_crud.connect_pooled",
+               new_callable=AsyncMock, return_value=conn):
+        resp = await app_client.get("/api/scenes?project_id=1")
+
+    assert resp.status_code == 200
+    assert [s["total_shots"] for s in resp.json()["scenes"]] == [1, 2]
+    assert conn.fetch.await_count == 1
+    conn.fetchval.assert_not_awaited()
+    assert "next_cursor" not in resp.json()
+
+
+@pytest.mark.unit
+async def test_list_scenes_keyset_pagination(app_client):
+    conn = _mock_conn([_scene_row(1), _scene_row(2), _scene_row(3)])
+    with patch("packages.scene_generation.scene_crud.connect_pooled",
+               new_callable=AsyncMock, return_value=conn):
+        first = await app_client.get("/api/scenes?project_id=1&limit=2")
+        cursor = first.json()["next_cursor"]
+        conn.fetch.return_value = [_scene_row(3)]
+        second = await app_client.get(f"/api/scenes?project_id=1&limit=2&after={cursor}")
+
+    assert [s["title"] for s in first.json()["scenes"]] == ["Scene 1", "Scene 2"]
+    assert second.json()["next_cursor"] is None
+    # Page 2 resumes after scene 2's sort key
+    assert conn.fetch.await_args.args[1:] == (1, 2, datetime(2026, 2, 18), uuid.UUID(int=2), 3)
+
+    bad = await app_client.get("/api/scenes?project_id=1&after=not-a-cursor")
+    assert bad.status_code == 400
+
+
+@pytest.mark.unit
+async def test_list_scenes_etag_and_invalidation(app_client):
+    conn = _mock_conn([_scene_row(1)])
+    with patch("packages.scene_generation.scene_crud.connect_pooled",
+               new_callable=AsyncMock, return_value=conn):
+        first = await app_client.get("/api/scenes?project_id=1")
+        etag = first.headers["etag"]
+        cached = await app_client.get("/api/scenes?project_id=1", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert conn.fetch.await_count == 1
+
+        conn.fetch.return_value = [_scene_row(1, title="Renamed")]
+        await event_bus.emit(SCENE_UPDATED, {"scene_id": str(uuid.UUID(int=1))})
+        fresh = await app_client.get("/api/scenes?project_id=1", headers={"If-None-Match": etag})
+
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["scenes"][0]["title"] == "Renamed"
+
+
+@pytest.mark.unit
+async def test_list_episodes_grouped_count_and_pages(app_client):
+    rows = [
+        {"id": uuid.UUID(int=n), "project_id": 1, "project_name": "P", "episode_number": n,
+         "title": f"Ep {n}", "description": None, "story_arc": None, "status": None,
+         "final_video_path": None, "thumbnail_path": None, "actual_duration_seconds": None,
+         "scene_count": n * 2, "created_at": None}
+        for n in (1, 2)
+    ]
+    conn = _mock_conn(rows)
+    with patch("packages.episode_assembly.router.connect_pooled",
+               new_callable=AsyncMock, return_value=conn):
+        resp = await app_client.get("/api/episodes?project_id=1&limit=1")
+
+    data = resp.json()
+    assert [e["scene_count"] for e in data["episodes"]] == [2]
+    assert data["next_cursor"]
+    assert conn.fetch.await_count == 1
+    assert "GROUP BY" in conn.fetch.await_args.args[0]
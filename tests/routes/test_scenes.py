@@ -42,7 +42,7 @@ async def test_list_scenes(app_client):
     mock_conn.fetchval = AsyncMock(return_value=3)  # shot_count
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.scene_generation.router.connect_direct",
+        "packages.scene_generation.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -66,7 +66,7 @@ async def test_create_scene(app_client):
     })
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.scene_generation.router.connect_direct",
+        "packages.scene_generation.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -109,7 +109,7 @@ async def test_get_scene_status(app_client):
     mock_conn.fetch = AsyncMock(return_value=mock_shots)
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.scene_generation.router.connect_direct",
+        "packages.scene_generation.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -128,7 +128,7 @@ async def test_get_scene_status_not_found(app_client):
     mock_conn.fetchrow = AsyncMock(return_value=None)
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.scene_generation.router.connect_direct",
+        "packages.scene_generation.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -142,7 +142,7 @@ async def test_delete_scene(app_client):
     mock_conn.execute = AsyncMock()
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.scene_generation.router.connect_direct",
+        "packages.scene_generation.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
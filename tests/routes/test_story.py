@@ -13,7 +13,7 @@ async def test_get_projects(app_client):
     ])
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.router.connect_direct",
+        "packages.story.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -33,7 +33,7 @@ async def test_create_project(app_client):
     mock_conn.execute = AsyncMock()
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.router.connect_direct",
+        "packages.story.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -97,7 +97,7 @@ async def test_create_character(app_client):
     mock_conn.fetchval = AsyncMock(return_value=99)
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.router.connect_direct",
+        "packages.story.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ), patch(
@@ -140,7 +140,7 @@ async def test_create_character_project_not_found(app_client):
     mock_conn.fetchrow = AsyncMock(return_value=None)
     mock_conn.close = AsyncMock()
     with patch(
-        "packages.story.router.connect_direct",
+        "packages.story.router.connect_pooled",
         new_callable=AsyncMock,
         return_value=mock_conn,
     ):
@@ -75,6 +75,7 @@ async def test_generate_success(app_client):
         return_value=mock_workflow,
     ), patch(
         "packages.visual_pipeline.router.submit_comfyui_workflow",
+        new_callable=AsyncMock,
         return_value="prompt-abc-123",
     ), patch(
         "packages.visual_pipeline.router.log_generation",
@@ -105,6 +106,7 @@ async def test_get_generation_status(app_client):
     }
     with patch(
         "packages.visual_pipeline.router.get_comfyui_progress",
+        new_callable=AsyncMock,
         return_value=mock_progress,
     ):
         resp = await app_client.get("/api/visual/generate/test-prompt-id/status")
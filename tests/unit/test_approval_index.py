@@ -0,0 +1,155 @@
+"""Unit tests for packages.lora_training.approval_index — SQLite approval/image index."""
+
+import json
+import os
+
+import pytest
+
+from packages.lora_training.approval_index import ApprovalIndex, classify_source
+
+
+@pytest.mark.unit
+class TestApprovalIndex:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path):
+        self.base = tmp_path
+        self.index = ApprovalIndex(tmp_path)
+        yield
+        self.index.close()
+
+    def _create_image(self, slug: str, filename: str, meta: dict | None = None) -> None:
+        images_dir = self.base / slug / "images"
+        images_dir.mkdir(parents=True, exist_ok=True)
+        (images_dir / filename).write_bytes(b"\x89PNG_fake")
+        if meta is not None:
+            (images_dir / filename).with_suffix(".meta.json").write_text(json.dumps(meta))
+
+    def _write_statuses(self, slug: str, statuses: dict) -> None:
+        (self.base / slug / "approval_status.json").write_text(json.dumps(statuses))
+
+    # --- Tests ---
+
+    def test_unlisted_images_default_to_pending(self):
+        self._create_image("luigi", "gen_001.png")
+        self._create_image("luigi", "gen_002.png")
+        self._write_statuses("luigi", {"gen_001.png": "approved"})
+
+        assert self.index.names_with_status("luigi", "approved") == ["gen_001.png"]
+        assert self.index.names_with_status("luigi", "pending") == ["gen_002.png"]
+        # get_statuses mirrors the JSON file (explicit entries only)
+        assert self.index.get_statuses("luigi") == {"gen_001.png": "approved"}
+
+    def test_set_status_writes_through_to_json(self):
+        self._create_image("luigi", "gen_001.png")
+        self.index.set_status("luigi", "gen_001.png", "rejected")
+
+        on_disk = json.loads((self.base / "luigi" / "approval_status.json").read_text())
+        assert on_disk == {"gen_001.png": "rejected"}
+        assert self.index.count("luigi", "rejected") == 1
+
+    def test_external_json_edit_is_picked_up(self):
+        self._create_image("luigi", "gen_001.png")
+        self._write_statuses("luigi", {"gen_001.png": "pending"})
+        assert self.index.count("luigi", "approved") == 0
+
+        status_file = self.base / "luigi" / "approval_status.json"
+        status_file.write_text(json.dumps({"gen_001.png": "approved"}))
+        st = status_file.stat()
+        os.utime(status_file, (st.st_atime, st.st_mtime + 5))
+
+        assert self.index.count("luigi", "approved") == 1
+
+    def test_on_disk_filters_stale_entries(self):
+        self._create_image("luigi", "gen_001.png")
+        self._write_statuses("luigi", {"gen_001.png": "approved", "moved.png": "approved"})
+
+        assert self.index.count("luigi", "approved") == 2
+        assert self.index.names_with_status("luigi", "approved", on_disk=True) == ["gen_001.png"]
+
+    def test_legacy_dict_statuses_are_flattened(self):
+        self._create_image("luigi", "gen_001.png")
+        self._write_statuses("luigi", {"gen_001.png": {"status": "approved"}})
+
+        assert self.index.names_with_status("luigi", "approved") == ["gen_001.png"]
+
+    def test_query_filters_and_paginates_by_cursor(self):
+        for i in range(5):
+            self._create_image("luigi", f"gen_{i:03d}.png", meta={"checkpoint_model": "a.safetensors"})
+        self._create_image("bowser", "yt_ref_bowser_001.png")
+        self.index.set_project_map({"luigi": "Mario", "bowser": "Mario"})
+
+        rows, total = self.index.query(status="pending", project_name="Mario", limit=2)
+        assert total == 6
+        assert len(rows) == 2
+
+        last = rows[-1]
+        rest, _ = self.index.query(
+            status="pending", project_name="Mario",
+            before=(last["ctime"], last["slug"], last["name"]),
+        )
+        seen = {(r["slug"], r["name"]) for r in rows + rest}
+        assert len(seen) == 6
+
+        youtube, n = self.index.query(source="youtube")
+        assert n == 1 and youtube[0]["slug"] == "bowser"
+        assert rows[0]["metadata"] in ({"checkpoint_model": "a.safetensors"}, None)
+
+    def test_slug_stats_counts_and_model_breakdown(self):
+        self._create_image("luigi", "gen_001.png", meta={"checkpoint_model": "a.safetensors"})
+        self._create_image("luigi", "gen_002.png")
+        self._create_image("luigi", "gen_003.png")
+        self._write_statuses("luigi", {
+            "gen_001.png": "approved", "gen_002.png": "approved", "gen_003.png": "rejected",
+        })
+
+        stats = self.index.slug_stats()["luigi"]
+        assert stats["counts"] == {"approved": 2, "rejected": 1}
+        assert stats["models"] == {"a.safetensors": 1, "no_meta": 1}
+
+    def test_sidecars_written_after_png_are_picked_up(self):
+        self._create_image("luigi", "gen_001.png")
+        rows, _ = self.index.query(slugs=["luigi"])
+        assert rows[0]["caption"] is None and rows[0]["metadata"] is None
+
+        img = self.base / "luigi" / "images" / "gen_001.png"
+        img.with_suffix(".txt").write_text("luigi, solo")
+        img.with_suffix(".meta.json").write_text(json.dumps({"checkpoint_model": "a.safetensors"}))
+        images_dir = img.parent
+        st = images_dir.stat()
+        os.utime(images_dir, (st.st_atime, st.st_mtime + 5))
+
+        assert self.index.names_with_status("luigi", "pending") == ["gen_001.png"]
+        row = self.index.image_row("luigi", "gen_001.png")
+        assert row["caption"] == "luigi, solo"
+        assert row["checkpoint_model"] == "a.safetensors"
+
+    def test_query_reuses_recent_checks(self, monkeypatch):
+        self._create_image("luigi", "gen_001.png")
+        assert self.index.query()[1] == 1
+
+        scans = []
+        monkeypatch.setattr(self.index, "_slug_dirs", lambda: scans.append(1) or ["luigi"])
+        self._create_image("luigi", "gen_002.png")
+        assert self.index.query()[1] == 1  # served from the last check
+        assert scans == []
+
+        assert self.index.count("luigi", "pending") == 2  # direct reads still check
+        monkeypatch.setattr("packages.lora_training.approval_index.REFRESH_MAX_AGE", 0)
+        assert self.index.query()[1] == 2 and scans == [1]
+
+    def test_remove_drops_entry(self):
+        self._create_image("luigi", "gen_001.png")
+        self.index.set_status("luigi", "gen_001.png", "approved")
+        self.index.remove("luigi", "gen_001.png")
+
+        assert self.index.get_statuses("luigi") == {}
+
+
+@pytest.mark.unit
+def test_classify_source_prefixes():
+    assert classify_source("yt_unclassified_001.png") == "unclassified"
+    assert classify_source("yt_ref_luigi_001.png") == "youtube"
+    assert classify_source("upload_abc.png") == "upload"
+    assert classify_source("ref_luigi.png") == "reference"
+    assert classify_source("gen_luigi_001.png") == "generated"
@@ -1,8 +1,18 @@
-"""Unit tests for packages.core.auth — trusted network check and rate limiter."""
+"""Unit tests for packages.core.auth — trusted network check, rate limiter, token cache."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from packages.core.auth import RateLimiter, is_trusted_network
+from packages.core.auth import (
+    RateLimiter,
+    TokenCache,
+    is_trusted_network,
+    token_cache,
+    verify_token,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -71,3 +81,92 @@ def test_rate_limiter_separate_keys():
     assert limiter.is_allowed("key_a", 3, 60) is False
     # key_b is fresh
     assert limiter.is_allowed("key_b", 3, 60) is True
+
+
+@pytest.mark.unit
+def test_rate_limiter_window_slides(monkeypatch):
+    """Requests older than the window stop counting."""
+    clock = [1000.0]
+    monkeypatch.setattr("packages.core.auth.time.monotonic", lambda: clock[0])
+    limiter = RateLimiter()
+    for _ in range(3):
+        assert limiter.is_allowed("user3", 3, 60) is True
+    assert limiter.is_allowed("user3", 3, 60) is False
+    clock[0] += 61
+    assert limiter.is_allowed("user3", 3, 60) is True
+    assert len(limiter.requests["user3"]) == 1
+
+
+# ---------------------------------------------------------------------------
+# Token verification cache
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def clean_token_cache():
+    token_cache.clear()
+    yield token_cache
+    token_cache.clear()
+
+
+@pytest.mark.unit
+def test_token_cache_honors_exp(monkeypatch, clean_token_cache):
+    """Entries expire at the token's exp even inside the cache TTL."""
+    clock = [1000.0]
+    monkeypatch.setattr("packages.core.auth.time.time", lambda: clock[0])
+    cache = TokenCache(maxsize=2)
+    cache.put("a", {"valid": True, "expires": 1010})
+    assert cache.get("a") == (True, {"valid": True, "expires": 1010})
+    clock[0] = 1011
+    assert cache.get("a") == (False, None)
+
+
+@pytest.mark.unit
+def test_token_cache_is_lru_bounded(clean_token_cache):
+    cache = TokenCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.put(key, {"valid": True})
+    cache.get("a")
+    cache.put("c", {"valid": True})
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+
+
+@pytest.mark.unit
+async def test_verify_token_prefers_local_jwt(clean_token_cache):
+    """A valid local JWT never reaches the auth service, and is decoded once."""
+    local = MagicMock(return_value={"valid": True, "user": "tester", "expires": time.time() + 600})
+    remote = AsyncMock(return_value=(None, True))
+    with patch("packages.core.auth._verify_jwt_locally", local), \
+         patch("packages.core.auth._verify_with_auth_service", remote):
+        first = await verify_token("jwt-token")
+        second = await verify_token("jwt-token")
+    assert first["user"] == "tester" and second == first
+    remote.assert_not_awaited()
+    local.assert_called_once()
+
+
+@pytest.mark.unit
+async def test_verify_token_remote_fallback_is_shared_and_cached(clean_token_cache):
+    """Concurrent misses share one auth-service call; the result is cached."""
+    calls = 0
+
+    async def _remote(token):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"valid": True, "user": "svc"}, True
+
+    with patch("packages.core.auth._verify_with_auth_service", _remote):
+        results = await asyncio.gather(*(verify_token("opaque-token") for _ in range(5)))
+        again = await verify_token("opaque-token")
+    assert calls == 1
+    assert all(r["user"] == "svc" for r in results) and again["user"] == "svc"
+
+
+@pytest.mark.unit
+async def test_verify_token_does_not_cache_unreachable_service(clean_token_cache):
+    remote = AsyncMock(return_value=(None, False))
+    with patch("packages.core.auth._verify_with_auth_service", remote):
+        assert await verify_token("opaque-token") is None
+        assert await verify_token("opaque-token") is None
+    assert remote.await_count == 2
@@ -0,0 +1,147 @@
+"""Unit tests for CLIP reference embeddings — persistent store and stacked batch scoring."""
+
+import os
+
+import numpy as np
+import pytest
+
+from packages.visual_pipeline import clip_classifier
+from packages.visual_pipeline.clip_classifier import (
+    ReferenceEmbeddings,
+    build_reference_embeddings,
+    classify_embeddings,
+    classify_frame_clip,
+)
+from packages.visual_pipeline.embedding_store import EmbeddingStore
+
+
+def _unit(*values) -> np.ndarray:
+    v = np.array(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+class _FakeEmbedder:
+    """Deterministic 4-dim 'embedding' from the file contents; counts calls."""
+
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def __call__(self, paths):
+        self.embedded.extend(p.name for p in paths)
+        out = []
+        for p in paths:
+            seed = sum(p.read_bytes())
+            out.append(_unit(1, seed % 7, seed % 5, 1))
+        return np.stack(out)
+
+
+@pytest.mark.unit
+class TestEmbeddingStore:
+
+    def test_only_new_or_changed_images_are_embedded(self, tmp_path):
+        imgs = [tmp_path / f"{i}.png" for i in range(3)]
+        for i, p in enumerate(imgs):
+            p.write_bytes(bytes([i + 1]))
+        embed = _FakeEmbedder()
+
+        store = EmbeddingStore(tmp_path / "store")
+        first = store.get_many(imgs, embed)
+        assert embed.embedded == ["0.png", "1.png", "2.png"]
+
+        # Reopen from disk: nothing to embed, same vectors (float16 precision)
+        reopened = EmbeddingStore(tmp_path / "store")
+        again = reopened.get_many(imgs, embed)
+        assert len(embed.embedded) == 3
+        np.testing.assert_allclose(again, first, atol=1e-3)
+
+        # Touch one file -> only that one is re-embedded
+        imgs[1].write_bytes(bytes([9]))
+        st = imgs[1].stat()
+        os.utime(imgs[1], ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+        reopened.get_many(imgs, embed)
+        assert embed.embedded[3:] == ["1.png"]
+        assert len(reopened) == 3
+
+    def test_missing_file_gives_zero_vector(self, tmp_path):
+        ok = tmp_path / "ok.png"
+        ok.write_bytes(b"\x01")
+        store = EmbeddingStore(tmp_path / "store")
+        out = store.get_many([ok, tmp_path / "gone.png"], _FakeEmbedder())
+        assert out.shape == (2, 4)
+        assert not out[1].any()
+
+    def test_unreadable_image_is_not_stored(self, tmp_path):
+        ok, bad = tmp_path / "ok.png", tmp_path / "bad.png"
+        ok.write_bytes(b"\x01")
+        bad.write_bytes(b"\x02")
+        embed = _FakeEmbedder()
+        store = EmbeddingStore(tmp_path / "store")
+        store.get_many([ok, bad], embed)
+
+        def fail_bad(paths):
+            out = embed(paths)
+            out[[p == bad for p in paths]] = 0  # what _embed_images_batch returns for a failed load
+            return out
+
+        bad.write_bytes(b"\x03")
+        st = bad.stat()
+        os.utime(bad, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+        out = store.get_many([ok, bad], fail_bad)
+        assert out[0].any() and not out[1].any()
+        assert len(store) == 1  # the old embedding for bad.png was dropped, nothing new stored
+
+        store.get_many([ok, bad], embed)
+        assert embed.embedded[-1] == "bad.png"  # retried on the next lookup
+
+
+@pytest.mark.unit
+class TestClassifyEmbeddings:
+
+    def test_stacked_scores_match_per_character_max(self):
+        refs = ReferenceEmbeddings({
+            "mario": np.stack([_unit(1, 0, 0, 0), _unit(0.9, 0.1, 0, 0)]),
+            "luigi": np.stack([_unit(0, 1, 0, 0)]),
+            "yoshi": np.stack([_unit(0, 0, 1, 0), _unit(0, 0, 0.8, 0.6), _unit(0, 0.2, 1, 0)]),
+        })
+        frames = np.stack([_unit(1, 0.05, 0, 0), _unit(0, 0.7, 0.7, 0), _unit(0, 0, 0, 1)])
+
+        results = classify_embeddings(frames, refs)
+
+        for frame, result in zip(frames, results):
+            for slug, emb in refs.items():
+                assert result["all_scores"][slug] == pytest.approx(float(np.max(frame @ emb.T)), abs=1e-6)
+        assert results[0]["matched_slug"] == "mario"
+        assert results[2]["matched_slug"] is None
+        # Plain dicts still work and single-frame wrapper agrees
+        assert classify_frame_clip(frames[0], dict(refs))["all_scores"] == results[0]["all_scores"]
+
+    def test_no_references(self):
+        result = classify_embeddings(np.ones((2, 4), dtype=np.float32), {})
+        assert [r["matched_slug"] for r in result] == [None, None]
+
+
+@pytest.mark.unit
+def test_build_reference_embeddings_uses_store(tmp_path, monkeypatch):
+    for slug, data in (("mario", b"\x01"), ("luigi", b"\x02")):
+        ref_dir = tmp_path / slug / "reference_images"
+        ref_dir.mkdir(parents=True)
+        (ref_dir / "ref.png").write_bytes(data)
+
+    class _NoApprovals:
+        def names_with_status(self, slug, status, on_disk=False):
+            return []
+
+    embed = _FakeEmbedder()
+    monkeypatch.setattr(clip_classifier, "BASE_PATH", tmp_path)
+    monkeypatch.setattr(clip_classifier, "get_index", lambda base: _NoApprovals())
+    monkeypatch.setattr(clip_classifier, "_embed_images_batch", embed)
+    monkeypatch.setattr(clip_classifier, "_store", None)
+    monkeypatch.setattr(clip_classifier, "_refs_cache", {})
+
+    refs = build_reference_embeddings("Mario Galaxy", ["mario", "luigi", "peach"])
+    assert {k: v.shape for k, v in refs.items()} == {"mario": (1, 4), "luigi": (1, 4)}
+    assert len(embed.embedded) == 2
+
+    refs = build_reference_embeddings("Mario Galaxy", ["mario", "luigi", "peach"], force_rebuild=True)
+    assert len(embed.embedded) == 2  # rebuild re-scans but nothing changed
+    assert refs.stacked[1] == ["mario", "luigi"]
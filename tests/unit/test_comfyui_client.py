@@ -0,0 +1,68 @@
+"""Unit tests for packages.core.comfyui_client — history parsing and WS completion events."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from packages.core.comfyui_client import ComfyUIClient, history_error, output_files
+
+
+@pytest.mark.unit
+class TestHistoryHelpers:
+
+    def test_history_error_extracts_detail(self):
+        entry = {"status": {
+            "status_str": "error",
+            "messages": [["execution_start", {}], ["execution_error", {"exception_message": "CUDA OOM"}]],
+        }}
+        assert "CUDA OOM" in history_error(entry)
+
+    def test_history_error_none_on_success(self):
+        assert history_error({"status": {"status_str": "success"}}) is None
+        assert history_error({}) is None
+
+    def test_output_files_flattens_keys_and_singular_video(self):
+        entry = {"outputs": {
+            "9": {"gifs": [{"filename": "a.mp4", "subfolder": ""}]},
+            "10": {"images": [{"filename": "b.png"}]},
+            "11": {"video": {"filename": "c.mp4"}},
+        }}
+        names = [f["filename"] for f in output_files(entry)]
+        assert sorted(names) == ["a.mp4", "b.png", "c.mp4"]
+        assert [f["filename"] for f in output_files(entry, ("images",))] == ["b.png", "c.mp4"]
+
+
+@pytest.mark.unit
+class TestCompletionEvents:
+
+    async def test_executing_none_wakes_waiter(self):
+        client = ComfyUIClient("http://comfy.test")
+        history = {"outputs": {}, "status": {"status_str": "success"}}
+        # History only shows up once the completion event has fired
+        client.history = AsyncMock(side_effect=lambda pid: history if pid in client._done else None)
+
+        async def _complete_soon():
+            await asyncio.sleep(0.05)
+            client._handle_message({"type": "executing", "data": {"node": None, "prompt_id": "p1"}})
+
+        with patch("packages.core.comfyui_client.POLL_INTERVAL", 60):
+            task = asyncio.create_task(_complete_soon())
+            entry = await asyncio.wait_for(client.wait_for_completion("p1", timeout=10), 2)
+            await task
+
+        assert entry is history
+        assert client.stats()["completed_via_ws"] == 1
+        assert client.stats()["waiting"] == 0
+
+    async def test_wait_event_times_out_without_listener(self):
+        client = ComfyUIClient("http://comfy.test")
+        assert await client.wait_event("p2", 0.01) is False
+        client._handle_message({"type": "execution_success", "data": {"prompt_id": "p2"}})
+        assert await client.wait_event("p2", 0.01) is True
+
+    def test_progress_messages_track_fraction(self):
+        client = ComfyUIClient("http://comfy.test")
+        client._handle_message({"type": "progress", "data": {"prompt_id": "p3", "value": 5, "max": 20, "node": "3"}})
+        assert client._progress["p3"]["progress"] == 0.25
+        assert client._progress["p3"]["current_node"] == "3"
@@ -1,9 +1,18 @@
-"""Unit tests for packages.lora_training.dedup — hash-based perceptual dedup."""
+"""Unit tests for packages.lora_training.dedup — multi-hash perceptual dedup."""
 
+import threading
+
+import numpy as np
 import pytest
+from PIL import Image
 
 from packages.lora_training.dedup import (
+    INDEX_FILENAME,
+    HashIndex,
     build_hash_index,
+    compute_hashes,
+    flush_indexes,
+    hamming_distances,
     invalidate_cache,
     is_duplicate,
     register_hash,
@@ -16,22 +25,33 @@ class TestDedup:
 
     @pytest.fixture(autouse=True)
     def _setup(self, tmp_path, monkeypatch):
-        """Redirect BASE_PATH, mock perceptual_hash, and clear caches between tests."""
+        """Redirect BASE_PATH, mock image_hashes, and clear caches between tests."""
         monkeypatch.setattr("packages.lora_training.dedup.BASE_PATH", tmp_path)
         self.base = tmp_path
 
-        # Deterministic mock: hash is derived from the filename stem
+        # Deterministic mock: hashes are far apart per distinct path
         self._hash_counter = 0
-        self._hash_map: dict[str, str] = {}
+        self._hash_map: dict[str, tuple[int, int, int]] = {}
+        self.hash_calls = 0
 
-        def _mock_hash(image_path, hash_size=8):
+        def _mock_hashes(image_path):
+            self.hash_calls += 1
             name = str(image_path)
             if name not in self._hash_map:
-                self._hash_map[name] = f"abcd{self._hash_counter:04x}"
+                h = (0xFF << (8 * self._hash_counter)) & 0xFFFFFFFFFFFFFFFF
+                self._hash_map[name] = (h, h, h)
                 self._hash_counter += 1
             return self._hash_map[name]
 
-        monkeypatch.setattr("packages.lora_training.dedup.perceptual_hash", _mock_hash)
+        monkeypatch.setattr("packages.lora_training.dedup.image_hashes", _mock_hashes)
+
+        # Registrations schedule a deferred save; tests flush explicitly instead
+        self.save_requests = 0
+
+        def _schedule_save():
+            self.save_requests += 1
+
+        monkeypatch.setattr("packages.lora_training.dedup._schedule_save", _schedule_save)
 
         # Clear the module-level cache before each test
         _hash_caches.clear()
@@ -44,12 +64,12 @@ class TestDedup:
 
     # --- Tests ---
 
-    def test_build_hash_index_returns_set_of_hashes(self):
+    def test_build_hash_index_indexes_every_image(self):
         self._create_image("luigi", "gen_001.png")
         self._create_image("luigi", "gen_002.png")
 
         index = build_hash_index("luigi")
-        assert isinstance(index, set)
+        assert isinstance(index, HashIndex)
         assert len(index) == 2
 
     def test_is_duplicate_returns_true_for_matching_hash(self):
@@ -72,6 +92,80 @@ class TestDedup:
 
         assert is_duplicate(new_file, "luigi") is False
 
+    def test_near_duplicate_within_threshold_is_caught(self):
+        self._create_image("luigi", "gen_001.png")
+        build_hash_index("luigi")
+        near = self.base / "incoming" / "near.png"
+        near.parent.mkdir(parents=True, exist_ok=True)
+        near.write_bytes(b"x")
+        h = self._hash_map[str(self.base / "luigi" / "images" / "gen_001.png")][0]
+        self._hash_map[str(near)] = (h ^ 1, h ^ 0b11, h)  # 1-2 bits off
+
+        assert is_duplicate(near, "luigi") is True
+
+    def test_index_is_persisted_and_refreshed_incrementally(self):
+        self._create_image("luigi", "gen_001.png")
+        self._create_image("luigi", "gen_002.png")
+        build_hash_index("luigi")
+        assert (self.base / "luigi" / INDEX_FILENAME).is_file()
+
+        invalidate_cache()
+        self._create_image("luigi", "gen_003.png")
+        (self.base / "luigi" / "images" / "gen_001.png").unlink()
+        self.hash_calls = 0
+
+        index = build_hash_index("luigi")
+        assert len(index) == 2
+        assert self.hash_calls == 1  # only the new file was hashed
+
+    def test_register_hash_adds_to_index(self):
+        self._create_image("luigi", "gen_001.png")
+        build_hash_index("luigi")
+        self._create_image("luigi", "gen_002.png")
+        new = self.base / "luigi" / "images" / "gen_002.png"
+
+        register_hash(new, "luigi")
+        assert len(build_hash_index("luigi")) == 2
+        assert is_duplicate(new, "luigi") is True
+
+    def test_register_hash_defers_save_to_one_flush(self, monkeypatch):
+        self._create_image("luigi", "gen_001.png")
+        build_hash_index("luigi")
+        saves = []
+        original_save = HashIndex.save
+        monkeypatch.setattr(HashIndex, "save", lambda idx: saves.append(1) or original_save(idx))
+
+        for i in range(2, 5):
+            self._create_image("luigi", f"gen_{i:03d}.png")
+            register_hash(self.base / "luigi" / "images" / f"gen_{i:03d}.png", "luigi")
+        assert saves == [] and self.save_requests == 3
+
+        assert flush_indexes() == 1 and saves == [1]
+        assert flush_indexes() == 0  # nothing dirty any more
+        on_disk = HashIndex(self.base / "luigi" / INDEX_FILENAME)
+        assert on_disk.load() and len(on_disk) == 4
+
+    def test_building_one_character_does_not_block_others(self, monkeypatch):
+        self._create_image("luigi", "gen_001.png")
+        self._create_image("bowser", "gen_001.png")
+        release = threading.Event()
+
+        def _slow_hashes(image_path):
+            if "luigi" in str(image_path):
+                release.wait(5)  # luigi's refresh is still hashing
+            return (1, 1, 1)
+
+        monkeypatch.setattr("packages.lora_training.dedup.image_hashes", _slow_hashes)
+        worker = threading.Thread(target=build_hash_index, args=("luigi",))
+        worker.start()
+        try:
+            assert len(build_hash_index("bowser")) == 1
+            assert "luigi" not in _hash_caches
+        finally:
+            release.set()
+            worker.join(5)
+        assert len(_hash_caches["luigi"]) == 1
+
     def test_invalidate_cache_clears_cache(self):
         self._create_image("luigi", "gen_001.png")
         build_hash_index("luigi")
@@ -87,3 +181,25 @@ class TestDedup:
 
         invalidate_cache()  # None clears everything
         assert len(_hash_caches) == 0
+
+
+@pytest.mark.unit
+def test_hamming_distances_vectorized():
+    hashes = np.array([[0, 0, 0], [0xFF, 1, 0xFFFFFFFFFFFFFFFF]], dtype=np.uint64)
+    dist = hamming_distances(hashes, (0, 0, 0))
+    assert dist.tolist() == [[0, 0, 0], [8, 1, 64]]
+
+
+@pytest.mark.unit
+def test_compute_hashes_stable_under_rescale(tmp_path):
+    rng = np.random.default_rng(0)
+    pixels = (rng.random((16, 16)) * 255).astype(np.uint8)
+    big = Image.fromarray(pixels).resize((256, 256), Image.NEAREST)
+    big.save(tmp_path / "a.png")
+    big.resize((200, 200), Image.BILINEAR).save(tmp_path / "b.png")
+    Image.fromarray(255 - pixels).resize((256, 256), Image.NEAREST).save(tmp_path / "c.png")
+
+    index = HashIndex()
+    index.add("a.png", compute_hashes(tmp_path / "a.png"))
+    assert index.find(compute_hashes(tmp_path / "b.png")) == "a.png"
+    assert index.find(compute_hashes(tmp_path / "c.png")) is None
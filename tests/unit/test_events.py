@@ -141,3 +141,18 @@ def test_event_constants_are_nonempty_strings():
     for const in (IMAGE_APPROVED, IMAGE_REJECTED, GENERATION_SUBMITTED):
         assert isinstance(const, str)
         assert len(const) > 0
+
+
+@pytest.mark.unit
+async def test_emit_nowait_from_worker_thread():
+    """emit_nowait() from a thread delivers on the bound loop."""
+    bus = EventBus()
+    received = asyncio.Event()
+
+    @bus.on("test.event")
+    async def handler(data):
+        received.set()
+
+    bus.bind_loop()
+    await asyncio.to_thread(bus.emit_nowait, "test.event", {"key": "value"})
+    await asyncio.wait_for(received.wait(), timeout=1)
@@ -0,0 +1,71 @@
+"""Unit tests for packages.lora_training.frame_extraction — single-pass frame planning."""
+
+import subprocess
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from packages.lora_training import frame_extraction
+from packages.lora_training.frame_extraction import ANALYSIS_FPS, _plan_frames, extract_smart_frames
+
+
+def _shot(seed: int, count: int) -> list[np.ndarray]:
+    """count identical frames of a random texture (one static 'shot')."""
+    rng = np.random.default_rng(seed)
+    tex = np.kron(rng.integers(0, 256, (8, 8)), np.ones((8, 8))).astype(np.uint8)
+    return [tex] * count
+
+
+@pytest.mark.unit
+class TestPlanFrames:
+
+    def test_cut_is_detected_and_static_frames_deduped(self):
+        frames = _shot(1, 40) + _shot(2, 40)  # 10s at ANALYSIS_FPS=8, cut at 5s
+        plan = _plan_frames(frames, duration=len(frames) / ANALYSIS_FPS, max_frames=5)
+
+        assert plan == [
+            {"timestamp": 0.0, "source": "uniform"},
+            {"timestamp": 40 / ANALYSIS_FPS, "source": "scene"},
+        ]
+
+    def test_trims_evenly_to_max_frames(self):
+        frames = [f for seed in range(6) for f in _shot(seed, 8)]
+        plan = _plan_frames(frames, duration=len(frames) / ANALYSIS_FPS, max_frames=3)
+
+        assert len(plan) == 3
+        times = [p["timestamp"] for p in plan]
+        assert times == sorted(times)
+
+
+@pytest.mark.unit
+def test_extract_smart_frames_encodes_only_survivors(tmp_path):
+    frames = _shot(1, 16) + _shot(2, 16)
+    encoded = []
+
+    def _fake_encode(video_path, timestamps, dests):
+        encoded.extend(timestamps)
+        for d in dests:
+            d.write_bytes(b"png")
+
+    with patch.object(frame_extraction, "get_video_duration", return_value=4.0), \
+         patch.object(frame_extraction, "_iter_analysis_frames", return_value=iter(frames)), \
+         patch.object(frame_extraction, "_encode_frames", side_effect=_fake_encode):
+        result = extract_smart_frames(tmp_path / "v.mp4", max_frames=10, tmpdir=str(tmp_path))
+
+    assert encoded == [0.0, 2.0]
+    assert [p.name for p in result] == ["frame_0001.png", "frame_0002.png"]
+
+
+@pytest.mark.unit
+def test_analysis_decode_is_killed_after_timeout(tmp_path):
+    real_popen = subprocess.Popen
+
+    def stalled_ffmpeg(cmd, **kwargs):
+        return real_popen([sys.executable, "-c", "import time; time.sleep(30)"], **kwargs)
+
+    with patch.object(frame_extraction, "ANALYSIS_TIMEOUT", 0.2), \
+            patch.object(frame_extraction.subprocess, "Popen", stalled_ffmpeg):
+        with pytest.raises(subprocess.TimeoutExpired):
+            list(frame_extraction._iter_analysis_frames(tmp_path / "clip.mp4"))
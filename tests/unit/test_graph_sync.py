@@ -0,0 +1,62 @@
+"""Unit tests for packages.core.graph_sync — batched UNWIND writes and watermarks."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from packages.core import graph_sync
+from packages.core.graph_sync import _literal, _unwind, sync_approvals_rejections
+
+
+@pytest.mark.unit
+class TestLiteral:
+
+    def test_nested_values_are_escaped(self):
+        lit = _literal([{"name": "O'Brien", "score": 0.5, "solo": True, "tags": ["a", None]}])
+        assert lit == "[{name: 'O\\'Brien', score: 0.5, solo: true, tags: ['a', null]}]"
+
+
+@pytest.mark.unit
+class TestUnwind:
+
+    async def test_rows_are_split_into_batches(self):
+        conn = MagicMock()
+        with patch.object(graph_sync, "_cypher_void", new=AsyncMock()) as void, \
+             patch.object(graph_sync, "BATCH_SIZE", 2):
+            written = await _unwind(conn, "test_rows", [{"i": i} for i in range(5)], "MERGE (n {i: row.i})")
+
+        assert written == 5
+        assert void.await_count == 3
+        assert void.await_args_list[0].args[1].startswith("UNWIND [{i: 0}, {i: 1}] AS row MERGE")
+        assert graph_sync._metrics["test_rows"]["batches"] == 3
+
+    async def test_tolerated_batch_failure_is_skipped(self):
+        conn = MagicMock()
+        with patch.object(graph_sync, "_cypher_void", new=AsyncMock(side_effect=[RuntimeError("x"), None])), \
+             patch.object(graph_sync, "BATCH_SIZE", 1):
+            written = await _unwind(conn, "edges", [{"i": 1}, {"i": 2}], "MATCH (n) RETURN n", tolerate_errors=True)
+        assert written == 1
+
+
+@pytest.mark.unit
+async def test_approvals_read_from_watermark_and_advance_it():
+    mark = datetime(2026, 1, 1, 12, 0, 0)
+    newer = datetime(2026, 1, 1, 12, 5, 0)
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=mark)
+    conn.fetch = AsyncMock(side_effect=[
+        [{"id": 7, "character_slug": "luigi", "image_name": "a.png", "quality_score": 0.9,
+          "checkpoint_model": None, "created_at": newer}],
+        [],
+    ])
+    conn.execute = AsyncMock()
+
+    with patch.object(graph_sync, "_cypher_void", new=AsyncMock()):
+        count = await sync_approvals_rejections(conn)
+
+    assert count == 1
+    # Lower bound is the stored watermark minus the overlap window
+    assert conn.fetch.await_args_list[0].args[1] == mark - graph_sync.WATERMARK_OVERLAP
+    upsert = conn.execute.await_args_list[0].args
+    assert upsert[1:] == ("approvals", newer, 1)
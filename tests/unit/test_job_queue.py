@@ -0,0 +1,155 @@
+"""Unit tests for packages.core.job_queue — retries, stage timings and the worker run loop."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from packages.core import job_queue
+from packages.core.job_queue import JobContext, JobWorker, backoff_seconds, fail, job_stage
+
+
+def _job(**extra):
+    job = {"id": 7, "kind": "test_kind", "payload": {"x": 1}, "attempts": 1, "max_attempts": 3}
+    job.update(extra)
+    return job
+
+
+@pytest.mark.unit
+class TestBackoff:
+
+    def test_doubles_per_attempt(self):
+        assert [backoff_seconds(n) for n in (1, 2, 3)] == [30.0, 60.0, 120.0]
+
+    def test_is_capped(self):
+        assert backoff_seconds(20) == job_queue.BACKOFF_MAX_SECONDS
+
+
+@pytest.mark.unit
+class TestFail:
+
+    async def test_requeues_while_attempts_remain(self, mock_conn):
+        mock_conn.fetchrow.return_value = {"attempts": 1, "max_attempts": 3}
+        assert await fail(mock_conn, 7, "w1", "boom") == "queued"
+        args = mock_conn.execute.await_args.args
+        assert args[3] == "queued" and args[5] == backoff_seconds(1)
+
+    async def test_marks_failed_on_last_attempt(self, mock_conn):
+        mock_conn.fetchrow.return_value = {"attempts": 3, "max_attempts": 3}
+        assert await fail(mock_conn, 7, "w1", "boom") == "failed"
+
+    async def test_lost_lease_is_a_noop(self, mock_conn):
+        mock_conn.fetchrow.return_value = None
+        assert await fail(mock_conn, 7, "w1", "boom") is None
+        mock_conn.execute.assert_not_awaited()
+
+
+@pytest.mark.unit
+class TestStages:
+
+    def test_stage_durations_accumulate(self):
+        clock = iter([10.0, 25.0, 27.0])
+        with patch.object(job_queue.time, "monotonic", lambda: next(clock)):
+            ctx = JobContext(_job())
+            ctx.set_stage("shots")
+            ctx.set_stage("assembly")
+            ctx.set_stage(None)
+        assert ctx.timings == {"shots": 15.0, "assembly": 2.0}
+
+    def test_job_stage_outside_a_job_is_noop(self):
+        job_stage("shots")  # must not raise
+
+
+@pytest.mark.unit
+class TestWorker:
+
+    @pytest.fixture(autouse=True)
+    def _queue(self, mock_conn):
+        handlers = dict(job_queue._handlers)
+        with patch.object(job_queue, "connect_pooled", AsyncMock(return_value=mock_conn)), \
+                patch.object(job_queue, "complete", AsyncMock()) as complete, \
+                patch.object(job_queue, "fail", AsyncMock(return_value="queued")) as failed:
+            self.complete, self.fail = complete, failed
+            yield
+        job_queue._handlers.clear()
+        job_queue._handlers.update(handlers)
+
+    async def test_successful_job_completes_with_stage_timings(self):
+        seen = []
+
+        async def handler(payload):
+            job_stage("work")
+            seen.append(payload)
+
+        job_queue.register_handler("test_kind", handler)
+        worker = JobWorker()
+        await worker._run(_job())
+
+        assert seen == [{"x": 1}]
+        job_id, worker_id, timings = self.complete.await_args.args[1:]
+        assert (job_id, worker_id) == (7, worker.worker_id)
+        assert "work" in timings
+        assert worker.processed == 1 and worker.current is None
+
+    async def test_failing_job_is_reported(self):
+        async def handler(payload):
+            raise ValueError("no shots")
+
+        job_queue.register_handler("test_kind", handler)
+        worker = JobWorker()
+        await worker._run(_job())
+
+        self.complete.assert_not_awaited()
+        assert self.fail.await_args.args[3] == "ValueError: no shots"
+        assert worker.failed == 1
+
+    async def test_unknown_kind_fails(self):
+        worker = JobWorker()
+        await worker._run(_job(kind="nobody_handles_this"))
+        assert "No handler registered" in self.fail.await_args.args[3]
+
+    async def test_run_once_idles_when_nothing_due(self, mock_conn):
+        mock_conn.fetch.return_value = []
+        mock_conn.fetchrow.return_value = None
+        worker = JobWorker(kinds=["test_kind"])
+        assert await worker.run_once() is False
+
+    async def test_lost_lease_cancels_the_handler(self):
+        cancelled = asyncio.Event()
+
+        async def handler(payload):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        job_queue.register_handler("test_kind", handler)
+        worker = JobWorker(lease_seconds=0.03)
+        with patch.object(job_queue, "heartbeat", AsyncMock(return_value=False)):
+            await asyncio.wait_for(worker._run(_job()), timeout=5)
+
+        assert cancelled.is_set()
+        self.complete.assert_not_awaited()
+        self.fail.assert_not_awaited()
+        assert worker.current is None
+
+    async def test_shutdown_releases_the_running_job(self):
+        started = asyncio.Event()
+
+        async def handler(payload):
+            started.set()
+            await asyncio.sleep(60)
+
+        job_queue.register_handler("test_kind", handler)
+        worker = JobWorker()
+        with patch.object(job_queue, "release", AsyncMock()) as release:
+            run = asyncio.create_task(worker._run(_job()))
+            await started.wait()
+            run.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await run
+
+        assert release.await_args.args[1:3] == (7, worker.worker_id)
+        self.complete.assert_not_awaited()
+        self.fail.assert_not_awaited()
@@ -0,0 +1,167 @@
+"""Unit tests for packages.core.llm_gateway — scheduling, coalescing and the response cache."""
+
+import asyncio
+
+import pytest
+
+from packages.core.llm_gateway import (
+    PRIORITY_BATCH, PRIORITY_INTERACTIVE, PRIORITY_REVIEW,
+    OllamaGateway, ResponseStore, request_key,
+)
+
+
+def _gateway(tmp_path=None, concurrency=1, affinity_max_wait=10.0):
+    store = ResponseStore(tmp_path / "cache.sqlite3" if tmp_path else None)
+    return OllamaGateway("http://ollama", concurrency=concurrency, store=store,
+                         affinity_max_wait=affinity_max_wait)
+
+
+class FakeOllama:
+    """Stands in for _post: records call order and blocks until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, endpoint, payload, timeout):
+        self.calls.append(payload.get("prompt") or payload["messages"][-1]["content"])
+        await self.gate.wait()
+        return {"response": f"re: {self.calls[-1]}", "message": {"content": "chat"}}
+
+
+@pytest.fixture
+def fake():
+    return FakeOllama()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestScheduling:
+
+    async def test_higher_priority_goes_first(self, fake):
+        gw = _gateway()
+        gw._post = fake
+        first = asyncio.create_task(gw.generate("m", "blocker", caller="a", cache=False))
+        await _settle()
+        batch = asyncio.create_task(gw.generate("m", "batch", caller="b", priority=PRIORITY_BATCH, cache=False))
+        review = asyncio.create_task(gw.generate("m", "review", caller="r", priority=PRIORITY_REVIEW, cache=False))
+        player = asyncio.create_task(gw.generate("m", "player", caller="p", priority=PRIORITY_INTERACTIVE, cache=False))
+        await _settle()
+        assert gw.stats()["waiting"] == {"interactive": 1, "review": 1, "batch": 1}
+
+        fake.gate.set()
+        await asyncio.gather(first, batch, review, player)
+        assert fake.calls == ["blocker", "player", "review", "batch"]
+
+    async def test_loaded_model_preferred_within_class(self, fake):
+        gw = _gateway()
+        gw._post = fake
+        first = asyncio.create_task(gw.generate("gemma", "blocker", caller="a", cache=False))
+        await _settle()
+        other = asyncio.create_task(gw.generate("mistral", "other model", caller="a", cache=False))
+        same = asyncio.create_task(gw.generate("gemma", "same model", caller="a", cache=False))
+        await _settle()
+        fake.gate.set()
+        await asyncio.gather(first, other, same)
+        assert fake.calls == ["blocker", "same model", "other model"]
+
+    async def test_affinity_does_not_starve_old_requests(self, fake):
+        gw = _gateway(affinity_max_wait=0.0)
+        gw._post = fake
+        first = asyncio.create_task(gw.generate("gemma", "blocker", caller="a", cache=False))
+        await _settle()
+        other = asyncio.create_task(gw.generate("mistral", "other model", caller="a", cache=False))
+        same = asyncio.create_task(gw.generate("gemma", "same model", caller="a", cache=False))
+        await _settle()
+        fake.gate.set()
+        await asyncio.gather(first, other, same)
+        assert fake.calls == ["blocker", "other model", "same model"]
+
+    async def test_cancelled_waiter_leaves_queue(self, fake):
+        gw = _gateway()
+        gw._post = fake
+        first = asyncio.create_task(gw.generate("m", "blocker", caller="a", cache=False))
+        await _settle()
+        queued = asyncio.create_task(gw.generate("m", "gone", caller="a", cache=False))
+        await _settle()
+        queued.cancel()
+        await _settle()
+        assert sum(gw.stats()["waiting"].values()) == 0
+
+        fake.gate.set()
+        await first
+        assert gw.stats()["active"] == 0 and fake.calls == ["blocker"]
+
+
+@pytest.mark.unit
+class TestCache:
+
+    async def test_identical_requests_share_one_call(self, fake):
+        gw = _gateway()
+        gw._post = fake
+        tasks = [asyncio.create_task(gw.generate("m", "same", caller="tagger")) for _ in range(3)]
+        await _settle()
+        fake.gate.set()
+        results = await asyncio.gather(*tasks)
+
+        assert results == ["re: same"] * 3 and fake.calls == ["same"]
+        stats = gw.stats()["callers"]["tagger"]
+        assert (stats["requests"], stats["upstream_calls"], stats["coalesced"]) == (3, 1, 2)
+
+    async def test_results_persist_across_instances(self, fake, tmp_path):
+        fake.gate.set()
+        gw = _gateway(tmp_path)
+        gw._post = fake
+        await gw.generate("m", "describe", caller="v", images=["aGVsbG8="])
+
+        again = _gateway(tmp_path)
+        again._post = fake
+        assert await again.generate("m", "describe", caller="v", images=["aGVsbG8="]) == "re: describe"
+        assert fake.calls == ["describe"]
+        assert again.stats()["cache_hit_rate"] == 1.0
+
+    async def test_uncached_calls_always_hit_ollama(self, fake):
+        fake.gate.set()
+        gw = _gateway()
+        gw._post = fake
+        for _ in range(2):
+            await gw.chat("m", [{"role": "user", "content": "hi"}], caller="interactive", cache=False)
+        assert len(fake.calls) == 2
+
+    async def test_errors_are_counted_and_not_cached(self):
+        gw = _gateway()
+        calls = []
+
+        async def failing(endpoint, payload, timeout):
+            calls.append(payload)
+            raise ConnectionError("ollama down")
+
+        gw._post = failing
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await gw.generate("m", "x", caller="v")
+        assert len(calls) == 2 and gw.stats()["callers"]["v"]["errors"] == 2
+        assert gw.stats()["active"] == 0
+
+
+@pytest.mark.unit
+def test_request_key_covers_images_and_options():
+    base = {"model": "m", "prompt": "p", "images": ["aaaa"], "options": {"temperature": 0.1}}
+    assert request_key("/api/generate", base) == request_key("/api/generate", {**base, "stream": False})
+    assert request_key("/api/generate", base) != request_key("/api/generate", {**base, "images": ["bbbb"]})
+    assert request_key("/api/generate", base) != request_key("/api/generate", {**base, "options": {}})
+
+
+@pytest.mark.unit
+def test_generate_sync_runs_without_app_loop():
+    gw = _gateway()
+
+    async def instant(endpoint, payload, timeout):
+        return {"response": "ok"}
+
+    gw._post = instant
+    assert gw.generate_sync("m", "p", caller="cli") == "ok"
@@ -0,0 +1,193 @@
+"""Unit tests for server/lora_dataset.py and train_lora.precompute_cache — buckets, sampler, latent cache."""
+
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from server import train_lora  # noqa: E402
+from server.lora_dataset import (  # noqa: E402
+    BUCKET_STEP,
+    MAX_BUCKET_RATIO,
+    BucketBatchSampler,
+    LatentCache,
+    file_hash,
+    make_buckets,
+    model_cache_key,
+    nearest_bucket,
+)
+
+
+@pytest.mark.unit
+class TestBuckets:
+
+    @pytest.mark.parametrize("resolution", [512, 768, 1024])
+    def test_bucket_areas_stay_near_resolution_squared(self, resolution):
+        area = resolution * resolution
+        buckets = make_buckets(resolution)
+        assert (resolution, resolution) in buckets
+        for width, height in buckets:
+            assert width % BUCKET_STEP == 0 and height % BUCKET_STEP == 0
+            assert 0.9 * area <= width * height <= area
+            assert max(width / height, height / width) <= MAX_BUCKET_RATIO
+
+    def test_nearest_bucket_matches_aspect_ratio(self):
+        buckets = make_buckets(512)
+        assert nearest_bucket(500, 500, buckets) == (512, 512)
+        assert nearest_bucket(1920, 1080, buckets) == (640, 384)
+        assert nearest_bucket(1080, 1920, buckets) == (384, 640)
+        # Wider than any bucket: clamps to the widest one
+        assert nearest_bucket(3000, 1000, buckets) == (640, 384)
+
+
+@pytest.mark.unit
+class TestBucketBatchSampler:
+
+    SIZES = [(512, 512)] * 5 + [(640, 384)] * 3 + [(384, 640)]
+
+    def test_batches_share_one_shape_and_cover_every_index(self):
+        sampler = BucketBatchSampler(self.SIZES, batch_size=2)
+        for _epoch in range(3):
+            batches = list(sampler)
+            assert all(len({self.SIZES[i] for i in batch}) == 1 for batch in batches)
+            assert all(len(batch) <= 2 for batch in batches)
+            assert sorted(i for batch in batches for i in batch) == list(range(len(self.SIZES)))
+
+    def test_len_matches_batches_yielded(self):
+        for batch_size in (1, 2, 3, 8):
+            sampler = BucketBatchSampler(self.SIZES, batch_size=batch_size)
+            assert len(sampler) == len(list(sampler))
+        assert len(BucketBatchSampler(self.SIZES, batch_size=2)) == 3 + 2 + 1
+
+    def test_unshuffled_order_is_stable(self):
+        sampler = BucketBatchSampler(self.SIZES, batch_size=2, shuffle=False)
+        assert list(sampler) == list(sampler) == [[0, 1], [2, 3], [4], [5, 6], [7], [8]]
+
+
+@pytest.mark.unit
+class TestLatentCache:
+
+    def test_model_cache_key_changes_with_checkpoint(self, tmp_path):
+        a, b = tmp_path / "pixar.safetensors", tmp_path / "anime.safetensors"
+        a.write_bytes(b"weights")
+        b.write_bytes(b"weights")
+        key = model_cache_key(str(a))
+        assert key.startswith("pixar-")
+        assert key == model_cache_key(str(a))
+        assert key != model_cache_key(str(b))
+
+        a.write_bytes(b"retrained weights")  # replaced in place
+        assert model_cache_key(str(a)) != key
+        replaced = model_cache_key(str(a))
+        st = a.stat()
+        os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert model_cache_key(str(a)) != replaced
+
+    def test_latent_path_keys_on_content_bucket_and_model(self, tmp_path):
+        img1, img2 = tmp_path / "a.png", tmp_path / "b.png"
+        img1.write_bytes(b"image one")
+        img2.write_bytes(b"image two")
+        cache = LatentCache(tmp_path / "cache", "pixar-0123456789")
+        other_model = LatentCache(tmp_path / "cache", "anime-9876543210")
+
+        h1, h2 = file_hash(img1), file_hash(img2)
+        assert h1 != h2
+        path = cache.latent_path(h1, (640, 384))
+        assert path.parent == tmp_path / "cache" / "latents"
+        assert path.name == f"{h1}_640x384_pixar-0123456789.safetensors"
+        assert cache.latent_path(h2, (640, 384)) != path
+        assert cache.latent_path(h1, (384, 640)) != path
+        assert other_model.latent_path(h1, (640, 384)) != path
+
+        img2.write_bytes(b"image one")  # same content, same key
+        assert file_hash(img2) == h1
+
+    def test_text_path_keys_on_caption_and_model(self, tmp_path):
+        cache = LatentCache(tmp_path, "pixar-0123456789")
+        path = cache.text_path("luigi, solo")
+        assert path.parent == tmp_path / "text"
+        assert path == cache.text_path("luigi, solo")
+        assert path != cache.text_path("mario, solo")
+        assert path != LatentCache(tmp_path, "anime-9876543210").text_path("luigi, solo")
+
+    def test_save_load_round_trips_latent_distribution(self, tmp_path):
+        pytest.importorskip("safetensors")
+        cache = LatentCache(tmp_path, "pixar-0123456789")
+        mean, std = torch.randn(4, 48, 80), torch.rand(4, 48, 80)
+        path = cache.latent_path("abc", (640, 384))
+        cache.save(path, {
+            "latent_mean": mean,
+            "latent_std": std,
+            "original_size": torch.tensor([768, 1280]),
+            "crop_top_left": torch.tensor([0, 32]),
+        })
+        assert path.exists() and not path.with_name(path.name + ".tmp").exists()
+
+        loaded = LatentCache.load(path)
+        assert loaded["latent_mean"].dtype == torch.float16
+        assert torch.equal(loaded["latent_mean"], mean.to(torch.float16))
+        assert torch.equal(loaded["latent_std"], std.to(torch.float16))
+        assert loaded["original_size"].tolist() == [768, 1280]
+        assert loaded["crop_top_left"].tolist() == [0, 32]
+
+
+class _Ids:
+    """Token id rows that record which rows were selected; .to() is a no-op."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getitem__(self, idx):
+        return _Ids([self.rows[i] for i in idx])
+
+    def to(self, _device):
+        return self
+
+
+class _Dataset:
+    """LoRADataset surface precompute_cache() uses, with every latent already cached."""
+
+    def __init__(self, cache: LatentCache, captions: list[str]):
+        self.cache = cache
+        self.captions = captions
+        self.target_sizes = [(512, 512)] * len(captions)
+        self.input_ids = _Ids(list(range(len(captions))))
+        self.input_ids_2 = None
+        for i in range(len(captions)):
+            path = self.latent_path(i)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+    def __len__(self):
+        return len(self.captions)
+
+    def latent_path(self, idx):
+        return self.cache.latent_path(f"img{idx}", self.target_sizes[idx])
+
+
+@pytest.mark.unit
+def test_precompute_cache_encodes_each_caption_once(tmp_path, monkeypatch):
+    cache = LatentCache(tmp_path, "pixar-0123456789")
+    dataset = _Dataset(cache, ["luigi, solo", "luigi, solo", "mario", "luigi, solo", "peach"])
+    encoded, saved = [], []
+
+    def encode_prompt(_text_encoder, _text_encoder_2, input_ids, input_ids_2=None):
+        encoded.append(input_ids.rows)
+        return torch.zeros(len(input_ids.rows), 2, 4), None
+
+    monkeypatch.setattr(train_lora, "encode_prompt", encode_prompt)
+    monkeypatch.setattr(cache, "save", lambda path, tensors: saved.append(path))
+
+    assert train_lora.precompute_cache(dataset, None, None, None, batch_size=2) == 0
+    assert encoded == [[0, 2], [4]]
+    assert saved == [cache.text_path(c) for c in ("luigi, solo", "mario", "peach")]
+
+    # Captions already on disk aren't encoded again
+    for path in saved:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    encoded.clear()
+    train_lora.precompute_cache(dataset, None, None, None, batch_size=2)
+    assert encoded == []
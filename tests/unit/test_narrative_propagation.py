@@ -0,0 +1,98 @@
+"""Unit tests for set-based narrative state propagation."""
+
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from packages.narrative_state.decay import apply_all_decay
+from packages.narrative_state.engine import NarrativeStateEngine, plan_propagation
+
+
+def _state(scene_id, slug, source="auto", **extra):
+    state = {
+        "scene_id": scene_id,
+        "character_slug": slug,
+        "clothing": "coat",
+        "injuries": [{"type": "cut", "severity": "moderate", "countdown": 1, "location": "arm"}],
+        "accessories": [],
+        "body_state": "bloody",
+        "emotional_state": "angry",
+        "energy_level": "exhausted",
+        "relationship_context": {},
+        "carrying": [],
+        "state_source": source,
+    }
+    state.update(extra)
+    return state
+
+
+@pytest.mark.unit
+class TestPlanPropagation:
+
+    def test_decay_chains_through_downstream_scenes(self):
+        src = _state("s0", "luigi")
+        planned = plan_propagation([src], ["s1", "s2"], {})
+
+        assert [(sid, slug) for sid, slug, _ in planned] == [("s1", "luigi"), ("s2", "luigi")]
+        assert planned[0][2] == apply_all_decay(src)
+        assert planned[1][2] == apply_all_decay(apply_all_decay(src))
+
+    def test_manual_override_is_skipped_and_becomes_base(self):
+        src = _state("s0", "luigi")
+        manual = _state("s1", "luigi", source="manual", clothing="armor", injuries=[])
+        planned = plan_propagation([src], ["s1", "s2"], {("s1", "luigi"): manual})
+
+        assert [sid for sid, _, _ in planned] == ["s2"]
+        assert planned[0][2]["clothing"] == "armor"
+        assert planned[0][2] == apply_all_decay(manual)
+
+    def test_characters_are_independent(self):
+        planned = plan_propagation([_state("s0", "luigi"), _state("s0", "mario")], ["s1"], {})
+        assert {slug for _, slug, _ in planned} == {"luigi", "mario"}
+
+
+@pytest.mark.unit
+async def test_propagate_forward_uses_constant_round_trips():
+    src_id = uuid.uuid4()
+    downstream = [{"id": uuid.uuid4(), "scene_number": n} for n in range(2, 8)]
+    rows = [_state(src_id, "luigi"), _state(src_id, "mario")]
+
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value={"scene_number": 1, "project_id": 1})
+    copied = {}
+
+    async def _copy(table, columns, records):
+        copied["records"] = list(records)
+
+    async def _fetch(sql, *args):
+        if "FROM scenes" in sql and "character_scene_state" not in sql:
+            return downstream
+        if "INSERT INTO character_scene_state" in sql:
+            return [
+                {"scene_id": r[0], "character_slug": r[1], "state_source": args[0]}
+                for r in copied["records"]
+            ]
+        return rows
+
+    conn.fetch = AsyncMock(side_effect=_fetch)
+    conn.execute = AsyncMock()
+    conn.copy_records_to_table = AsyncMock(side_effect=_copy)
+    conn.close = AsyncMock()
+
+    @asynccontextmanager
+    async def _tx():
+        yield
+
+    conn.transaction = _tx
+
+    with patch("packages.narrative_state.engine.connect_pooled", AsyncMock(return_value=conn)):
+        result = await NarrativeStateEngine().propagate_forward(str(src_id), 1)
+
+    assert len(result) == 12
+    assert len(copied["records"]) == 12
+    assert conn.fetch.await_count == 3  # downstream scenes, states, upsert
+    assert conn.copy_records_to_table.await_count == 1
+    assert all(r["state_source"] == "propagated" for r in result)
+    conn.close.assert_awaited_once()
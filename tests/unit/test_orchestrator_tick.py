@@ -0,0 +1,147 @@
+"""Unit tests for the orchestrator tick — per-project fan-out and change-driven skipping."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from packages.core import orchestrator
+
+
+class _Conn:
+    def __init__(self, rows: dict[int, dict]):
+        self.rows = rows
+
+    async def fetch(self, sql, *args):
+        return [dict(r) for r in self.rows.values()]
+
+    async def execute(self, sql, *args):
+        if "gate_check_result" in sql:  # the gate result write stamps updated_at
+            now, _result, entry_id = args
+            self.rows[entry_id]["updated_at"] = now
+
+
+class _Pool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def acquire(self):
+        pool = self
+
+        class _Ctx:
+            async def __aenter__(self):
+                return _Conn(pool.rows)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+def _row(entry_id, project_id, slug):
+    return {
+        "id": entry_id, "entity_type": "character", "entity_id": slug, "project_id": project_id,
+        "phase": "training_data", "status": "pending", "updated_at": datetime(2026, 1, 1),
+    }
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Three character entries over two projects; gate calls recorded by slug."""
+    rows = {1: _row(1, 10, "luigi"), 2: _row(2, 10, "mario"), 3: _row(3, 20, "peach")}
+    pool = _Pool(rows)
+    calls = []
+
+    async def get_pool():
+        return pool
+
+    async def check_gate(conn, entity_type, entity_id, project_id, phase, target):
+        calls.append(entity_id)
+        return {"passed": False, "action_needed": False}
+
+    monkeypatch.setattr(orchestrator, "get_pool", get_pool)
+    monkeypatch.setattr(orchestrator, "_check_gate_impl", check_gate)
+    monkeypatch.setattr(orchestrator, "_enabled", True)
+    monkeypatch.setattr(orchestrator, "_dirty_all", False)
+    monkeypatch.setattr(orchestrator, "_entry_marks", {})
+    monkeypatch.setattr(orchestrator, "_dirty_projects", set())
+    monkeypatch.setattr(orchestrator, "_dirty_characters", set())
+    monkeypatch.setattr(orchestrator, "_gate_timings", {})
+    return rows, calls
+
+
+@pytest.mark.unit
+class TestChangeDrivenTick:
+
+    async def test_unchanged_entries_are_skipped(self, pipeline):
+        _rows, calls = pipeline
+        first = await orchestrator.tick()
+        second = await orchestrator.tick()
+        assert (first["evaluated"], first["projects"]) == (3, 2)
+        assert (second["evaluated"], second["skipped"]) == (0, 3)
+        assert sorted(calls) == ["luigi", "mario", "peach"]
+
+    async def test_updated_at_bump_wakes_the_entry(self, pipeline):
+        rows, calls = pipeline
+        await orchestrator.tick()
+        rows[3]["updated_at"] = datetime(2026, 2, 1)
+        calls.clear()
+        await orchestrator.tick()
+        assert calls == ["peach"]
+
+    async def test_events_wake_their_project_or_character(self, pipeline):
+        _rows, calls = pipeline
+        await orchestrator.tick()
+        calls.clear()
+        await orchestrator._handle_input_changed({"project_id": "10"})
+        await orchestrator.tick()
+        assert sorted(calls) == ["luigi", "mario"]
+        calls.clear()
+        await orchestrator._handle_input_changed({"character_slug": "peach"})
+        await orchestrator.tick()
+        assert calls == ["peach"]
+
+    async def test_stale_entries_rechecked(self, pipeline, monkeypatch):
+        _rows, calls = pipeline
+        await orchestrator.tick()
+        monkeypatch.setattr(orchestrator, "ORCHESTRATOR_RECHECK_SECONDS", 0)
+        assert (await orchestrator.tick())["evaluated"] == 3
+
+    async def test_force_and_gate_timings(self, pipeline):
+        await orchestrator.tick()
+        assert (await orchestrator.tick(force=True))["evaluated"] == 3
+        gate = orchestrator.tick_stats()["gates"]["training_data"]
+        assert gate["calls"] == 6 and gate["max_ms"] >= gate["avg_ms"] >= 0
+
+
+@pytest.mark.unit
+class TestProjectFanOut:
+
+    async def test_slow_project_does_not_block_others(self, pipeline, monkeypatch):
+        _rows, calls = pipeline
+        peach_checked = asyncio.Event()
+
+        async def check_gate(conn, entity_type, entity_id, project_id, phase, target):
+            calls.append(entity_id)
+            if project_id == 10:
+                await asyncio.wait_for(peach_checked.wait(), 2)  # deadlocks if run serially
+            else:
+                peach_checked.set()
+            return {"passed": False, "action_needed": False}
+
+        monkeypatch.setattr(orchestrator, "_check_gate_impl", check_gate)
+        assert (await orchestrator.tick())["evaluated"] == 3
+
+    async def test_failing_project_is_isolated_and_retried(self, pipeline, monkeypatch):
+        _rows, calls = pipeline
+
+        async def check_gate(conn, entity_type, entity_id, project_id, phase, target):
+            if entity_id == "luigi":
+                raise RuntimeError("db hiccup")
+            calls.append(entity_id)
+            return {"passed": False, "action_needed": False}
+
+        monkeypatch.setattr(orchestrator, "_check_gate_impl", check_gate)
+        result = await orchestrator.tick()
+        assert (result["evaluated"], result["errors"]) == (1, 1)
+        assert calls == ["peach"] and orchestrator._dirty_projects == {10}
@@ -0,0 +1,141 @@
+"""Unit tests for the pending-approval feed — cursor pages, SSE replay and event deltas."""
+
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from packages.core.events import IMAGE_APPROVED, IMAGE_GENERATED, event_bus
+from packages.lora_training import router_approval
+from packages.lora_training.approval_index import ApprovalIndex
+from packages.lora_training.pending_feed import RESYNC, PendingFeed, format_sse, passes_filters
+
+CHAR_MAP = {
+    "luigi": {"name": "Luigi", "project_name": "Mario Galaxy", "design_prompt": "",
+              "checkpoint_model": "a.safetensors", "default_style": ""},
+}
+
+
+@pytest.mark.unit
+class TestPendingFeed:
+
+    def test_replays_events_after_last_event_id(self):
+        feed = PendingFeed()
+        first = feed.publish("pending", {"n": 1})
+        feed.publish("status", {"n": 2})
+        feed.publish("pending", {"n": 3})
+
+        _, missed = feed.subscribe(first["id"])
+        assert [m["data"]["n"] for m in missed] == [2, 3]
+
+    def test_up_to_date_client_gets_nothing(self):
+        feed = PendingFeed()
+        feed.publish("pending", {})
+        _, missed = feed.subscribe(feed.last_id)
+        assert missed == []
+
+    def test_unknown_or_expired_id_resyncs(self):
+        feed = PendingFeed(backlog=2)
+        first = feed.publish("pending", {})
+        for _ in range(3):
+            feed.publish("pending", {})
+
+        assert feed.subscribe(first["id"])[1] == [RESYNC]
+        assert feed.subscribe("0-1")[1] == [RESYNC]
+        assert feed.subscribe("garbage")[1] == [RESYNC]
+
+    def test_overflowing_subscriber_is_told_to_resync(self):
+        feed = PendingFeed(queue_size=2)
+        queue, _ = feed.subscribe()
+        for n in range(3):
+            feed.publish("pending", {"n": n})
+
+        assert queue.qsize() == 1
+        assert queue.get_nowait() is RESYNC
+
+    def test_unsubscribe_stops_delivery(self):
+        feed = PendingFeed()
+        queue, _ = feed.subscribe()
+        feed.unsubscribe(queue)
+        feed.publish("pending", {})
+        assert queue.empty() and feed.subscriber_count == 0
+
+    def test_filters_and_format(self):
+        data = {"character_slug": "luigi", "project_name": "Mario Galaxy", "source": "generated"}
+        assert passes_filters(data, project_name="Mario Galaxy", source="generated")
+        assert not passes_filters(data, character_slug="mario")
+
+        text = format_sse({"id": "1-4", "event": "status", "data": {"status": "approved"}})
+        assert text == 'id: 1-4\nevent: status\ndata: {"status":"approved"}\n\n'
+
+
+@pytest.mark.unit
+class TestPendingEndpoints:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path):
+        self.base = tmp_path
+        images = tmp_path / "luigi" / "images"
+        images.mkdir(parents=True)
+        for i in range(5):
+            img = images / f"gen_{i:03d}.png"
+            img.write_bytes(b"\x89PNG_fake")
+            os.utime(img, (1000 + i, 1000 + i))
+        self.index = ApprovalIndex(tmp_path)
+        self.feed = PendingFeed()
+        with patch.object(router_approval, "BASE_PATH", tmp_path), \
+                patch.object(router_approval, "get_index", lambda _root: self.index), \
+                patch.object(router_approval, "pending_feed", self.feed), \
+                patch.object(router_approval, "get_char_project_map", AsyncMock(return_value=CHAR_MAP)):
+            yield
+        self.index.close()
+
+    async def test_cursor_pages_cover_the_queue_once(self):
+        seen, after = [], None
+        while True:
+            page = await router_approval.get_pending_approvals(limit=2, after=after)
+            seen += [p["name"] for p in page["pending_images"]]
+            assert page["total"] == 5
+            after = page["next_cursor"]
+            if after is None:
+                break
+        assert len(seen) == 5 and len(set(seen)) == 5
+
+    async def test_new_images_do_not_shift_later_pages(self):
+        page = await router_approval.get_pending_approvals(limit=2)
+        new = self.base / "luigi" / "images" / "gen_new.png"
+        new.write_bytes(b"\x89PNG_fake")
+        page2 = await router_approval.get_pending_approvals(limit=2, after=page["next_cursor"])
+
+        names = [p["name"] for p in page["pending_images"] + page2["pending_images"]]
+        assert "gen_new.png" not in names
+        assert len(set(names)) == 4
+
+    async def test_bad_cursor_is_rejected(self):
+        from fastapi import HTTPException
+        with pytest.raises(HTTPException):
+            await router_approval.get_pending_approvals(limit=2, after="bm90LWEtbGlzdA")
+
+    async def test_events_become_feed_deltas(self):
+        png = self.base / "luigi" / "images" / "gen_live.png"
+        png.write_bytes(b"\x89PNG_fake")
+        png.with_suffix(".meta.json").write_text(json.dumps({"checkpoint_model": "b.safetensors"}))
+        await router_approval._on_image_generated({"character_slug": "luigi", "image_name": "gen_live.png"})
+        await router_approval._on_image_reviewed({
+            "_event": IMAGE_APPROVED, "character_slug": "luigi",
+            "image_name": "gen_live.png", "project_name": "Mario Galaxy",
+        })
+
+        _, missed = self.feed.subscribe(f"{self.feed.epoch}-0")
+        pending, status = missed
+        assert pending["event"] == "pending"
+        assert pending["data"]["id"] == "luigi/gen_live.png"
+        assert pending["data"]["checkpoint_model"] == "b.safetensors"
+        assert status["event"] == "status" and status["data"]["status"] == "approved"
+
+
+@pytest.mark.unit
+def test_handlers_registered_on_event_bus():
+    assert router_approval._on_image_generated in event_bus._handlers[IMAGE_GENERATED]
+    assert router_approval._on_image_reviewed in event_bus._handlers[IMAGE_APPROVED]
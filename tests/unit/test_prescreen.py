@@ -0,0 +1,112 @@
+"""Unit tests for packages.visual_pipeline.prescreen — CPU checks ahead of vision review."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from packages.lora_training import dedup
+from packages.lora_training.approval_index import get_index
+from packages.visual_pipeline import prescreen
+from packages.visual_pipeline.prescreen import Screen, check_metrics, screen_image, screen_video_frames
+
+GOOD = {"quality_score": 0.6, "brightness": 0.5, "contrast": 0.25, "blur_score": 0.4}
+
+
+def _kinds(metrics: dict) -> list[str]:
+    screen = Screen()
+    check_metrics(metrics, screen)
+    return screen.kinds
+
+
+@pytest.mark.unit
+class TestMetrics:
+
+    def test_good_image_goes_to_review(self):
+        assert _kinds(GOOD) == []
+
+    def test_obvious_failures_rejected(self):
+        assert _kinds({**GOOD, "brightness": 0.01, "contrast": 0.005}) == ["dark", "blank"]
+        assert _kinds({**GOOD, "brightness": 0.99}) == ["bright"]
+        assert _kinds({**GOOD, "blur_score": 0.001}) == ["blurry"]
+
+    def test_missing_opencv_skips_checks(self):
+        assert _kinds({"quality_score": None, "error": "opencv not available"}) == []
+
+    def test_rejected_screen_reads_as_failing_review(self):
+        screen = Screen()
+        check_metrics({**GOOD, "blur_score": 0.001}, screen)
+        review = screen.as_review()
+        assert review["clarity"] == 0 and review["training_value"] == 0
+        assert review["issues"][0].startswith("blurry")
+        assert review["prescreen"]["verdict"] == "reject"
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """A luigi dataset with one rejected image; metrics always pass."""
+    monkeypatch.setattr(prescreen, "BASE_PATH", tmp_path)
+    monkeypatch.setattr(dedup, "BASE_PATH", tmp_path)
+    monkeypatch.setattr(prescreen, "_image_metrics", lambda _path: dict(GOOD))
+    monkeypatch.setattr(prescreen, "clip_available", lambda: False)
+    dedup.invalidate_cache()
+    images = tmp_path / "luigi" / "images"
+    images.mkdir(parents=True)
+    rng = np.random.default_rng(7)
+    pixels = rng.integers(0, 255, (64, 64), dtype=np.uint8)
+    Image.fromarray(pixels).save(images / "gen_bad.png")
+    get_index(tmp_path).set_status("luigi", "gen_bad.png", "rejected")
+    Image.fromarray(pixels).resize((128, 128)).save(images / "gen_again.png")
+    Image.fromarray(rng.integers(0, 255, (64, 64), dtype=np.uint8)).save(images / "gen_new.png")
+    yield images
+    dedup.invalidate_cache()
+
+
+@pytest.mark.unit
+class TestScreenImage:
+
+    def test_near_duplicate_of_rejected_image_is_rejected(self, dataset):
+        screen = screen_image(dataset / "gen_again.png", "luigi")
+        assert screen.rejected and screen.duplicate_of == "gen_bad.png"
+
+    def test_unrelated_image_goes_to_review(self, dataset):
+        assert not screen_image(dataset / "gen_new.png", "luigi").rejected
+
+    def test_clip_mismatch_rejected_and_routed(self, dataset, monkeypatch):
+        monkeypatch.setattr(prescreen, "clip_available", lambda: True)
+        monkeypatch.setattr(prescreen, "_clip_scores", lambda _p, _slugs: {"luigi": 0.41, "mario": 0.9})
+        screen = screen_image(dataset / "gen_new.png", "luigi", ["luigi", "mario"])
+        assert screen.kinds == ["wrong_character"] and screen.suggested_slug == "mario"
+
+    def test_stats_count_saved_calls(self, dataset, monkeypatch):
+        monkeypatch.setattr(prescreen, "_counters", {})
+        screen_image(dataset / "gen_again.png", "luigi")
+        screen_image(dataset / "gen_new.png", "luigi")
+        stage = prescreen.prescreen_stats()["stages"]["image_review"]
+        assert (stage["screened"], stage["rejected"], stage["sent_to_llm"], stage["llm_calls_saved"]) == (2, 1, 1, 1)
+        assert stage["reasons"] == {"reject_duplicate": 1}
+
+
+@pytest.mark.unit
+class TestScreenVideoFrames:
+
+    def test_one_black_frame_fails_the_attempt(self, monkeypatch):
+        monkeypatch.setattr(prescreen, "_counters", {})
+        monkeypatch.setattr(prescreen, "VIDEO_QC_REVIEW_MODE", "batch")
+        metrics = {"f0.png": GOOD, "f1.png": {**GOOD, "brightness": 0.01}, "f2.png": GOOD}
+        monkeypatch.setattr(prescreen, "_image_metrics", lambda p: metrics[p.name])
+        review = screen_video_frames(list(metrics))
+        assert review["overall_score"] == 0.0 and review["issues"] == ["poor_lighting"]
+        # Batch review would have been one request for all three frames
+        assert prescreen.prescreen_stats()["stages"]["video_qc"]["llm_calls_saved"] == 1
+
+    def test_per_frame_mode_counts_every_frame_saved(self, monkeypatch):
+        monkeypatch.setattr(prescreen, "_counters", {})
+        monkeypatch.setattr(prescreen, "VIDEO_QC_REVIEW_MODE", "per_frame")
+        metrics = {"f0.png": GOOD, "f1.png": {**GOOD, "brightness": 0.01}, "f2.png": GOOD}
+        monkeypatch.setattr(prescreen, "_image_metrics", lambda p: metrics[p.name])
+        screen_video_frames(list(metrics))
+        assert prescreen.prescreen_stats()["stages"]["video_qc"]["llm_calls_saved"] == 3
+
+    def test_clean_frames_go_to_the_vision_model(self, monkeypatch):
+        monkeypatch.setattr(prescreen, "_image_metrics", lambda _p: dict(GOOD))
+        assert screen_video_frames(["f0.png", "f1.png"]) is None
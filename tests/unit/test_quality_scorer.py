@@ -0,0 +1,105 @@
+"""Unit tests for server/quality_scorer.py — batch scoring and the content-hash score cache."""
+
+import json
+import os
+
+import pytest
+
+from packages.lora_training.approval_index import ApprovalIndex
+from server import quality_scorer
+from server.quality_scorer import SCORER_VERSION, batch_score_datasets, score_paths
+
+
+@pytest.fixture
+def scored_calls(monkeypatch):
+    """Replace the OpenCV scorer with one that records which files it decoded."""
+    calls = []
+
+    def fake_score_file(args):
+        path, _work_size = args
+        calls.append(os.path.basename(path))
+        return path, {
+            "quality_score": 0.5, "blur_score": 0.1, "contrast": 0.2,
+            "brightness": 0.5, "brightness_score": 1.0, "edge_density": 0.3,
+            "resolution": "8x8",
+        }
+
+    monkeypatch.setattr(quality_scorer, "_score_file", fake_score_file)
+    return calls
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = ApprovalIndex(tmp_path / "datasets", db_path=tmp_path / "index.sqlite3")
+    yield idx
+    idx.close()
+
+
+def _image(path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+@pytest.mark.unit
+class TestScorePaths:
+
+    def test_cached_scores_skip_decoding(self, tmp_path, index, scored_calls):
+        a = _image(tmp_path / "a.png", b"image-a")
+        b = _image(tmp_path / "b.png", b"image-b")
+
+        first = score_paths([a, b], workers=1, index=index)
+        assert scored_calls == ["a.png", "b.png"]
+
+        second = score_paths([a, b], workers=1, index=index)
+        assert scored_calls == ["a.png", "b.png"]
+        assert second == first
+
+    def test_moved_file_hits_by_content_hash(self, tmp_path, index, scored_calls):
+        a = _image(tmp_path / "_unclassified" / "a.png", b"image-a")
+        score_paths([a], workers=1, index=index)
+
+        moved = tmp_path / "luigi" / "a.png"
+        moved.parent.mkdir()
+        os.replace(a, moved)
+        result = score_paths([str(moved)], workers=1, index=index)
+
+        assert scored_calls == ["a.png"]
+        assert result[str(moved)]["quality_score"] == 0.5
+
+    def test_changed_content_is_rescored(self, tmp_path, index, scored_calls):
+        a = _image(tmp_path / "a.png", b"image-a")
+        score_paths([a], workers=1, index=index)
+        _image(tmp_path / "a.png", b"image-a-edited")
+        os.utime(a, ns=(0, 10**9))
+
+        score_paths([a], workers=1, index=index)
+        assert scored_calls == ["a.png", "a.png"]
+
+    def test_failed_scores_are_not_cached(self, tmp_path, index, monkeypatch):
+        a = _image(tmp_path / "a.png", b"not an image")
+        monkeypatch.setattr(
+            quality_scorer, "_score_file",
+            lambda args: (args[0], {"quality_score": None, "error": "failed to read image"}),
+        )
+        score_paths([a], workers=1, index=index)
+
+        h = index.content_hashes([(a, os.stat(a).st_mtime_ns, os.stat(a).st_size)])
+        assert h == {}
+        assert index.get_quality_scores(["anything"], SCORER_VERSION) == {}
+
+
+@pytest.mark.unit
+def test_batch_only_rewrites_changed_meta(tmp_path, index, scored_calls):
+    png = tmp_path / "datasets" / "luigi" / "images" / "gen_001.png"
+    _image(png, b"image-a")
+
+    stats = batch_score_datasets(str(tmp_path / "datasets"), write_to_meta=True, workers=1, index=index)
+    assert stats["scored"] == 1 and stats["meta_written"] == 1
+    meta = json.loads(png.with_suffix(".meta.json").read_text())
+    assert meta["quality_score"] == 0.5
+    assert meta["quality_breakdown"]["edge_density"] == 0.3
+
+    stats = batch_score_datasets(str(tmp_path / "datasets"), write_to_meta=True, workers=1, index=index)
+    assert stats["meta_written"] == 0
+    assert scored_calls == ["gen_001.png"]
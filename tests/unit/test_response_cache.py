@@ -0,0 +1,76 @@
+"""Unit tests for packages.core.response_cache — ETag list cache and invalidation races."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import Request
+
+from packages.core.response_cache import ResponseCache, decode_cursor, encode_cursor
+
+
+def _request(etag: str | None = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.unit
+class TestResponseCache:
+
+    async def test_second_request_is_cached_and_etag_gives_304(self):
+        cache = ResponseCache("scenes")
+        builds = []
+
+        async def build():
+            builds.append(1)
+            return {"items": [1, 2]}
+
+        first = await cache.respond(_request(), 7, ("a", 10), build)
+        assert json.loads(first.body) == {"items": [1, 2]}
+        second = await cache.respond(_request(first.headers["etag"]), 7, ("a", 10), build)
+        assert second.status_code == 304 and builds == [1]
+
+    async def test_invalidate_during_build_keeps_stale_body_out(self):
+        cache = ResponseCache("scenes")
+        building, release = asyncio.Event(), asyncio.Event()
+        version = {"n": 1}
+
+        async def slow_build():
+            body = {"version": version["n"]}  # read before the write lands
+            building.set()
+            await release.wait()
+            return body
+
+        task = asyncio.create_task(cache.respond(_request(), 7, "k", slow_build))
+        await building.wait()
+        version["n"] = 2
+        cache.invalidate(7)  # writer finishes while the stale body is being built
+        release.set()
+        stale = await task
+        assert json.loads(stale.body) == {"version": 1}
+        assert cache.get(7, "k") is None
+
+        async def build():
+            return {"version": version["n"]}
+
+        fresh = await cache.respond(_request(), 7, "k", build)
+        assert json.loads(fresh.body) == {"version": 2}
+        assert cache.get(7, "k") is not None
+
+    def test_invalidate_all_and_other_scopes(self):
+        cache = ResponseCache("scenes")
+        gen_7, gen_8 = cache.generation(7), cache.generation(8)
+        cache.invalidate(7)
+        cache.put(8, "k", {"ok": True}, gen_8)  # other scope unaffected
+        cache.put(7, "k", {"ok": True}, gen_7)
+        assert cache.get(8, "k") is not None and cache.get(7, "k") is None
+
+        gen_8 = cache.generation(8)
+        cache.invalidate()
+        cache.put(8, "k", {"ok": True}, gen_8)
+        assert cache.get(8, "k") is None
+
+
+@pytest.mark.unit
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([1.5, "luigi", "gen_001.png"])) == [1.5, "luigi", "gen_001.png"]
@@ -0,0 +1,91 @@
+"""Unit tests for packages.visual_pipeline.review_cache — keys, hits and invalidation."""
+
+import pytest
+
+from packages.lora_training.approval_index import ApprovalIndex
+from packages.visual_pipeline import review_cache as review_cache_mod
+from packages.visual_pipeline import vision
+from packages.visual_pipeline.review_cache import ReviewCache, review_key
+
+REVIEW_JSON = (
+    '{"character_match": 8, "is_human": true, "gender_match": true, "solo": true, "clarity": 9,'
+    ' "completeness": "full", "training_value": 8, "caption": "Luigi waving", "issues": []}'
+)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    index = ApprovalIndex(tmp_path)
+    monkeypatch.setattr(review_cache_mod, "get_index", lambda _root: index)
+    cache = ReviewCache(tmp_path)
+    monkeypatch.setattr(vision, "review_cache", cache)
+    yield cache
+    index.close()
+
+
+class _Calls(list):
+    """Model names the fake gateway was called with; `reply` is what it answers."""
+    reply = ""
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "gen_001.png"
+    path.write_bytes(b"\x89PNG_fake_one")
+    return path
+
+
+def _review(image, design_prompt="green cap, blue overalls, male"):
+    return vision.vision_review_image(image, "Luigi", design_prompt, character_slug="luigi")
+
+
+@pytest.mark.unit
+def test_key_depends_on_content_context_version_and_model():
+    base = review_key("image_review", [b"a"], 1, "m", design_prompt="x")
+    assert base == review_key("image_review", [b"a"], 1, "m", design_prompt="x")
+    assert base != review_key("image_review", [b"b"], 1, "m", design_prompt="x")
+    assert base != review_key("image_review", [b"a"], 2, "m", design_prompt="x")
+    assert base != review_key("image_review", [b"a"], 1, "n", design_prompt="x")
+    assert base != review_key("image_review", [b"a"], 1, "m", design_prompt="y")
+
+
+@pytest.mark.unit
+class TestVisionReviewCache:
+
+    @pytest.fixture(autouse=True)
+    def _calls(self, monkeypatch):
+        self.calls = _Calls()
+
+        def generate_sync(model, prompt, **kwargs):
+            self.calls.append(model)
+            return self.calls.reply
+
+        self.calls.reply = REVIEW_JSON
+        monkeypatch.setattr(vision.llm_gateway, "generate_sync", generate_sync)
+
+    def test_unchanged_image_is_reviewed_once(self, cache, image, tmp_path):
+        first = _review(image)
+        moved = tmp_path / "copy.png"
+        moved.write_bytes(image.read_bytes())
+        assert _review(moved) == first
+        assert len(self.calls) == 1
+        assert cache.stats()["kinds"]["image_review"] == {
+            "hits": 1, "misses": 1, "stored": 1, "hit_rate": 0.5,
+        }
+
+    def test_character_change_misses(self, cache, image):
+        _review(image)
+        _review(image, design_prompt="green cap, blue overalls, male, moustache")
+        assert len(self.calls) == 2
+
+    def test_invalidate_drops_character_entries(self, cache, image):
+        _review(image)
+        assert cache.invalidate("luigi") == 1
+        _review(image)
+        assert len(self.calls) == 2
+
+    def test_unparsed_answers_are_not_cached(self, cache, image):
+        self.calls.reply = "I cannot tell."
+        _review(image)
+        _review(image)
+        assert len(self.calls) == 2 and cache.stats()["entries"] == {}
@@ -0,0 +1,137 @@
+"""Unit tests for packages.interactive.session_store — LRU hot tier over SQLite."""
+
+import pytest
+
+from packages.interactive.session_store import SessionStore, SessionState
+
+
+def _kwargs():
+    return {
+        "project_id": 1,
+        "project_name": "Mario Galaxy",
+        "character_slugs": ["luigi"],
+        "characters": [{"name": "Luigi", "slug": "luigi"}],
+        "world_context": "Story: Mario Galaxy",
+        "checkpoint_model": "model.safetensors",
+        "generation_params": {"steps": 25},
+    }
+
+
+def _scene(i):
+    return {"scene_index": i, "narration": f"scene {i}", "choices": [{"text": "go"}]}
+
+
+@pytest.mark.unit
+class TestSessionStore:
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return tmp_path / "sessions.sqlite3"
+
+    def test_session_survives_restart(self, db_path):
+        store = SessionStore(db_path=db_path)
+        session = store.create(**_kwargs())
+        session.relationships["Luigi"] = 3
+        session.images[0] = {"status": "ready", "path": "/x.png"}
+        for i in range(3):
+            session.scenes.append(_scene(i))
+        store.save(session)
+
+        restarted = SessionStore(db_path=db_path)
+        loaded = restarted.get(session.session_id)
+        assert loaded is not session
+        assert loaded.relationships == {"Luigi": 3}
+        assert loaded.images == {0: {"status": "ready", "path": "/x.png"}}
+        assert loaded.scenes.to_list() == [_scene(0), _scene(1), _scene(2)]
+
+    def test_older_scenes_load_lazily(self, db_path):
+        store = SessionStore(db_path=db_path)
+        session = store.create(**_kwargs())
+        for i in range(20):
+            session.scenes.append(_scene(i))
+        store.save(session)
+
+        calls = []
+        loaded = SessionStore(db_path=db_path).get(session.session_id)
+        backend_load = loaded.scenes._loader
+        loaded.scenes._loader = lambda s, e: calls.append((s, e)) or backend_load(s, e)
+
+        assert len(loaded.scenes) == 20
+        assert loaded.scenes[-1] == _scene(19)
+        assert "scene 19" in loaded.story_summary
+        assert calls == []
+        assert loaded.scenes[0] == _scene(0)
+        assert calls == [(0, 12)]
+
+    def test_only_new_scenes_are_written(self, db_path):
+        store = SessionStore(db_path=db_path)
+        session = store.create(**_kwargs())
+        session.scenes.append(_scene(0))
+        store.save(session)
+        assert session.scenes.unsaved() == []
+        session.scenes.append(_scene(1))
+        assert session.scenes.unsaved() == [(1, _scene(1))]
+
+    def test_other_worker_changes_are_picked_up(self, db_path):
+        worker_a = SessionStore(db_path=db_path)
+        worker_b = SessionStore(db_path=db_path)
+        session = worker_a.create(**_kwargs())
+
+        other = worker_b.get(session.session_id)
+        other.scenes.append(_scene(0))
+        worker_b.save(other)
+        assert len(worker_a.get(session.session_id).scenes) == 1
+
+        worker_b.delete(session.session_id)
+        assert worker_a.get(session.session_id) is None
+
+    def test_image_status_does_not_clobber_newer_state(self, db_path):
+        worker_a = SessionStore(db_path=db_path)
+        worker_b = SessionStore(db_path=db_path)
+        held = worker_a.create(**_kwargs())  # object an image task keeps
+
+        other = worker_b.get(held.session_id)
+        other.scenes.append(_scene(0))
+        other.relationships["Luigi"] = 5
+        worker_b.save(other)
+
+        held.images[0] = {"status": "ready", "path": "/x.png"}
+        worker_a.save_image(held, 0)
+
+        fresh = SessionStore(db_path=db_path).get(held.session_id)
+        assert fresh.relationships == {"Luigi": 5}
+        assert len(fresh.scenes) == 1
+        assert fresh.images[0]["status"] == "ready"
+
+    def test_hot_tier_is_lru_bounded(self, db_path):
+        store = SessionStore(db_path=db_path, max_hot=2)
+        ids = [store.create(**_kwargs()).session_id for _ in range(3)]
+        assert list(store._sessions) == ids[1:]
+        assert store.get(ids[0]) is not None  # reloaded from the durable tier
+        assert len(store._sessions) == 2
+        assert len(store.list_sessions()) == 3
+
+    def test_evict_expired_removes_both_tiers(self, db_path):
+        store = SessionStore(db_path=db_path, ttl_seconds=60)
+        old = store.create(**_kwargs())
+        fresh = store.create(**_kwargs())
+        old.last_active -= 3600
+        store.save(old)
+
+        assert store.evict_expired() == 1
+        assert store.get(old.session_id) is None
+        assert SessionStore(db_path=db_path).get(fresh.session_id) is not None
+
+    def test_memory_only_store(self):
+        store = SessionStore(db_path=None)
+        session = store.create(**_kwargs())
+        assert store.get(session.session_id) is session
+        assert store.delete(session.session_id) is True
+        assert store.get(session.session_id) is None
+
+
+@pytest.mark.unit
+def test_session_state_accepts_plain_scene_list():
+    state = SessionState(session_id="abc", scenes=[_scene(0), _scene(1)], **_kwargs())
+    assert state.current_scene_index == 1
+    assert state.scenes[-5:] == [_scene(0), _scene(1)]
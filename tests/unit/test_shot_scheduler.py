@@ -0,0 +1,115 @@
+"""Unit tests for the scene shot DAG scheduler in packages.scene_generation.builder."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from packages.core.comfyui_client import backend_slot, inflight
+from packages.scene_generation.builder import (
+    _SceneContext,
+    _run_shot_dag,
+    _shot_dependencies,
+)
+
+
+def _shot(num, chars, engine="framepack", **extra):
+    shot = {
+        "id": f"shot-{num}",
+        "shot_number": num,
+        "characters_present": chars,
+        "video_engine": engine,
+        "status": "pending",
+        "output_video_path": None,
+        "last_frame_path": None,
+    }
+    shot.update(extra)
+    return shot
+
+
+def _scene():
+    return _SceneContext(
+        scene_id="scene-1", project_id=1, scene_number=1, episode_number=1,
+        project_slug="proj", project_video_lora=None, genre_profile={}, auto_approve=False,
+    )
+
+
+@pytest.mark.unit
+class TestShotDependencies:
+
+    def test_same_character_i2v_chains_to_previous(self):
+        shots = [_shot(1, ["luigi"]), _shot(2, ["luigi"]), _shot(3, ["mario"]), _shot(4, ["mario"])]
+        assert _shot_dependencies(shots) == {1: 0, 3: 2}
+
+    def test_text_only_and_multi_character_shots_are_independent(self):
+        shots = [
+            _shot(1, ["luigi"]),
+            _shot(2, ["luigi"], engine="wan"),
+            _shot(3, ["luigi", "mario"], engine="wan22"),
+            _shot(4, ["luigi"], engine="reference_v2v"),
+            _shot(5, ["luigi"], engine="wan22"),
+        ]
+        # Only the solo Wan 2.2 shot (I2V) chains from its predecessor
+        assert _shot_dependencies(shots) == {4: 3}
+
+    def test_no_characters_means_no_dependency(self):
+        assert _shot_dependencies([_shot(1, None), _shot(2, None)]) == {}
+
+
+@pytest.mark.unit
+class TestRunShotDag:
+
+    async def test_independent_shots_overlap_and_chains_wait(self):
+        shots = [_shot(1, ["luigi"]), _shot(2, ["luigi"]), _shot(3, ["mario"])]
+        running, peak, calls = 0, 0, []
+
+        async def _fake_generate(scene, shot, prev_frame, prev_char, url):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            calls.append((shot["id"], prev_frame))
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {"video_path": f"/v/{shot['id']}.mp4", "last_frame": f"/f/{shot['id']}.png",
+                    "character_slug": shot["characters_present"][0]}
+
+        conn = MagicMock()
+        conn.execute = AsyncMock()
+        with patch("packages.scene_generation.builder._generate_shot", side_effect=_fake_generate), \
+             patch("packages.scene_generation.builder.SCENE_SHOTS_PER_BACKEND", 4):
+            results = await _run_shot_dag(conn, _scene(), shots, _shot_dependencies(shots))
+
+        assert [r["video_path"] for r in results] == ["/v/shot-1.mp4", "/v/shot-2.mp4", "/v/shot-3.mp4"]
+        assert peak == 2  # shot 1 and shot 3 together; shot 2 waits for shot 1
+        assert ("shot-2", "/f/shot-1.png") in calls
+        assert conn.execute.await_count == 3
+
+    async def test_failed_predecessor_passes_on_inherited_continuity(self):
+        shots = [_shot(1, ["luigi"]), _shot(2, ["luigi"]), _shot(3, ["luigi"])]
+        seen = {}
+
+        async def _fake_generate(scene, shot, prev_frame, prev_char, url):
+            seen[shot["id"]] = prev_frame
+            if shot["id"] == "shot-2":
+                return None
+            return {"video_path": "v.mp4", "last_frame": f"{shot['id']}.png", "character_slug": "luigi"}
+
+        conn = MagicMock()
+        conn.execute = AsyncMock()
+        with patch("packages.scene_generation.builder._generate_shot", side_effect=_fake_generate):
+            results = await _run_shot_dag(conn, _scene(), shots, _shot_dependencies(shots))
+
+        assert results[1] is None
+        assert seen["shot-3"] == "shot-1.png"
+
+
+@pytest.mark.unit
+async def test_backend_slot_picks_least_loaded():
+    urls = ["http://gpu0:8188", "http://gpu1:8188"]
+    async with backend_slot(urls) as first:
+        async with backend_slot(urls) as second:
+            assert {first, second} == set(urls)
+
+    async with backend_slot() as default_url:
+        assert inflight()[default_url] == 1
+    assert inflight()[default_url] == 0
@@ -0,0 +1,110 @@
+"""Unit tests for packages.core.video_assembly — window maths and the segment cache."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from packages.core import video_assembly
+from packages.core.video_assembly import (
+    ClipInfo, Join, Pieces, assemble, clip_window, concat_order, crossfade,
+)
+
+
+@pytest.mark.unit
+class TestWindows:
+
+    def test_window_is_capped_at_forty_percent(self):
+        assert clip_window(10.0, 0.5) == 0.5
+        assert clip_window(1.0, 0.5) == 0.4
+
+    def test_crossfade_uses_shortest_window(self):
+        assert crossfade(0.5, 0.2, Join("fade", 0.5)) == (0.2, 0.3)
+        assert crossfade(0.5, 0.5, Join("fade", 0.3)) == (0.3, 0.2)
+
+    def test_concat_order(self):
+        a = Pieces("a", Path("a_head"), Path("a_body"), Path("a_tail"), {})
+        b = Pieces("b", Path("b_head"), Path("b_body"), Path("b_tail"), {})
+        order = concat_order([a, b], [[Path("t0")]])
+        assert [p.name for p in order] == ["a_head", "a_body", "t0", "b_body", "b_tail"]
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """Run assemble() against a fake ffmpeg that writes placeholder files."""
+    monkeypatch.setattr(video_assembly, "ASSEMBLY_CACHE_DIR", tmp_path / "cache")
+    commands = []
+
+    async def fake_run(cmd):
+        commands.append(cmd)
+        out = cmd[-1]
+        if out.endswith("part_%03d.mp4"):
+            for i in range(3):
+                Path(out % i).write_bytes(b"piece")
+        else:
+            Path(out).write_bytes(b"video")
+        return 0, ""
+
+    async def fake_probe_clip(path):
+        return ClipInfo(path, 10.0, False, 640, 360, "24/1")
+
+    async def fake_probe_duration(path):
+        return 0.5 if "body" not in path else 9.0
+
+    monkeypatch.setattr(video_assembly, "_run", fake_run)
+    monkeypatch.setattr(video_assembly, "probe_clip", fake_probe_clip)
+    monkeypatch.setattr(video_assembly, "_probe_duration", fake_probe_duration)
+    return commands
+
+
+def _scene(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+@pytest.mark.unit
+class TestAssemble:
+
+    async def test_reassembly_only_encodes_what_changed(self, tmp_path, fake_ffmpeg):
+        scenes = [_scene(tmp_path, f"s{i}.mp4", f"scene {i}".encode()) for i in range(3)]
+        joins = [Join("fadeblack", 0.5)] * 2
+        out = str(tmp_path / "episode.mp4")
+
+        first = await assemble(scenes, out, joins)
+        assert (first["clips_encoded"], first["transitions_encoded"]) == (3, 2)
+
+        _scene(tmp_path, "s2.mp4", b"scene 2, re-rendered")
+        os.utime(scenes[2], ns=(0, 10**9))
+        second = await assemble(scenes, out, joins)
+        assert (second["clips_encoded"], second["clips_reused"]) == (1, 2)
+        assert (second["transitions_encoded"], second["transitions_reused"]) == (1, 1)
+
+    async def test_cut_joins_are_stream_copied(self, tmp_path, fake_ffmpeg):
+        scenes = [_scene(tmp_path, f"s{i}.mp4", f"scene {i}".encode()) for i in range(2)]
+        stats = await assemble(scenes, str(tmp_path / "ep.mp4"), [Join("cut", 0.5)])
+        assert stats["transitions_encoded"] == 0
+        assert not any("xfade" in " ".join(cmd) for cmd in fake_ffmpeg)
+
+    async def test_failed_encode_raises(self, tmp_path, fake_ffmpeg, monkeypatch):
+        async def failing_run(cmd):
+            return 1, "Invalid data"
+
+        monkeypatch.setattr(video_assembly, "_run", failing_run)
+        scenes = [_scene(tmp_path, f"s{i}.mp4", f"scene {i}".encode()) for i in range(2)]
+        with pytest.raises(RuntimeError):
+            await assemble(scenes, str(tmp_path / "ep.mp4"), [Join("fade", 0.5)])
+        assert not any(p.name.startswith(".") for p in (tmp_path / "cache").iterdir())
+
+
+@pytest.mark.unit
+def test_prune_cache_drops_stale_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_assembly, "ASSEMBLY_CACHE_DIR", tmp_path)
+    stale, fresh = tmp_path / "old", tmp_path / "new"
+    for entry in (stale, fresh):
+        entry.mkdir()
+        (entry / video_assembly.MANIFEST).write_text("{}")
+    os.utime(stale / video_assembly.MANIFEST, (0, 0))
+
+    assert video_assembly.prune_cache(max_age_days=1) == 1
+    assert fresh.exists() and not stale.exists()
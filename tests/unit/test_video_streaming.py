@@ -0,0 +1,107 @@
+"""Unit tests for packages.core.video_streaming — ranges, path cache, HLS packaging."""
+
+import os
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from packages.core import video_streaming
+from packages.core.video_streaming import VideoPathCache, package_hls, parse_range, video_path_cache
+
+
+@pytest.mark.unit
+class TestParseRange:
+
+    def test_open_and_closed_ranges(self):
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+        assert parse_range("bytes=900-", 1000) == (900, 999)
+        assert parse_range("bytes=990-5000", 1000) == (990, 999)
+
+    def test_suffix_range(self):
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+
+    def test_ignored_headers_serve_full_file(self):
+        assert parse_range("bytes=0-1,5-9", 1000) is None
+        assert parse_range("items=0-1", 1000) is None
+
+    def test_unsatisfiable(self):
+        with pytest.raises(HTTPException) as exc:
+            parse_range("bytes=1000-", 1000)
+        assert exc.value.status_code == 416
+
+
+@pytest.mark.unit
+async def test_path_cache_skips_db_until_file_disappears(tmp_path):
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"x")
+    fetch = AsyncMock(return_value=str(video))
+    cache = VideoPathCache()
+
+    assert await cache.lookup("k", fetch) == str(video)
+    assert await cache.lookup("k", fetch) == str(video)
+    assert fetch.await_count == 1
+
+    video.unlink()
+    await cache.lookup("k", fetch)
+    assert fetch.await_count == 2
+
+
+@pytest.mark.unit
+async def test_scene_video_range_request(app_client, tmp_path):
+    video = tmp_path / "scene.mp4"
+    video.write_bytes(bytes(range(256)) * 4)
+    scene_id = str(uuid.uuid4())
+    conn = AsyncMock()
+    conn.fetchval = AsyncMock(return_value=str(video))
+    video_path_cache.invalidate()
+
+    with patch("packages.scene_generation.scene_crud.connect_pooled",
+               new_callable=AsyncMock, return_value=conn):
+        partial = await app_client.get(f"/api/scenes/{scene_id}/video", headers={"Range": "bytes=10-19"})
+        full = await app_client.get(f"/api/scenes/{scene_id}/video")
+        stale = await app_client.get(
+            f"/api/scenes/{scene_id}/video", headers={"Range": "bytes=0-1", "If-Range": '"old"'},
+        )
+
+    assert partial.status_code == 206
+    assert partial.content == bytes(range(10, 20))
+    assert partial.headers["content-range"] == "bytes 10-19/1024"
+    assert full.status_code == 200 and len(full.content) == 1024
+    assert full.headers["accept-ranges"] == "bytes"
+    assert stale.status_code == 200
+    assert conn.fetchval.await_count == 1  # later requests hit the path cache
+    video_path_cache.invalidate()
+
+
+@pytest.mark.unit
+async def test_package_hls_runs_ffmpeg_once_per_mtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_streaming, "HLS_CACHE_DIR", tmp_path / "hls")
+    video = tmp_path / "ep.mp4"
+    video.write_bytes(b"mp4")
+    calls = []
+
+    async def _fake_exec(*cmd, **kwargs):
+        calls.append(cmd)
+        out = cmd[-1]
+        with open(out, "w") as f:
+            f.write("#EXTM3U\nseg_00000.ts\n")
+        proc = AsyncMock()
+        proc.returncode = 0
+        proc.communicate = AsyncMock(return_value=(b"", b""))
+        return proc
+
+    with patch("packages.core.video_streaming.asyncio.create_subprocess_exec", _fake_exec):
+        first = await package_hls(str(video))
+        again = await package_hls(str(video))
+        assert first == again and len(calls) == 1
+        assert "-c" in calls[0] and calls[0][calls[0].index("-c") + 1] == "copy"
+
+        video.write_bytes(b"mp4 v2")
+        os.utime(video, ns=(1, 10**18))
+        second = await package_hls(str(video))
+
+    assert second != first and len(calls) == 2
+    assert not first.exists()  # stale package removed
+    assert (second / "index.m3u8").exists()
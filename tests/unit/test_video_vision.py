@@ -0,0 +1,125 @@
+"""Unit tests for packages.scene_generation.video_vision — one-pass extraction and multi-frame review."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from packages.lora_training.approval_index import ApprovalIndex
+from packages.scene_generation import video_vision
+from packages.visual_pipeline import review_cache as review_cache_mod
+from packages.visual_pipeline.review_cache import ReviewCache
+
+
+def _frame(entry: int) -> dict:
+    return {"frame": entry, "character_match": 8, "style_match": 7, "motion_execution": 6,
+            "technical_quality": 12, "issues": ["blurry", "not-an-issue"]}
+
+
+@pytest.fixture
+def frames(tmp_path, monkeypatch):
+    index = ApprovalIndex(tmp_path / "datasets")
+    monkeypatch.setattr(review_cache_mod, "get_index", lambda _root: index)
+    monkeypatch.setattr(video_vision, "review_cache", ReviewCache(tmp_path))
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"clip_qc_frame_{i}.png"
+        Image.new("RGB", (64, 48), (40 * i, 90, 120)).save(path)
+        paths.append(str(path))
+    yield paths
+    index.close()
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """Fake llm_gateway.generate: records image counts, answers from `replies`."""
+    calls, replies = [], []
+
+    async def generate(model, prompt, *, images=None, **kwargs):
+        calls.append(len(images or []))
+        return replies.pop(0) if replies else json.dumps({"character_match": 6})
+
+    monkeypatch.setattr(video_vision.llm_gateway, "generate", generate)
+    return calls, replies
+
+
+@pytest.mark.unit
+class TestMultiFrameReview:
+
+    async def test_all_frames_scored_in_one_request(self, frames, gateway):
+        calls, replies = gateway
+        replies.append("```json\n" + json.dumps({"frames": [_frame(i) for i in (1, 2, 3)]}) + "\n```")
+
+        review = await video_vision.review_video_frames(frames, "waves hello", "luigi")
+
+        assert calls == [3]
+        assert review["per_frame"][0] == {
+            "character_match": 8, "style_match": 7, "motion_execution": 6,
+            "technical_quality": 10, "issues": ["blurry"],
+        }
+        assert review["issues"] == ["blurry"]
+
+    async def test_repeat_review_is_served_from_cache(self, frames, gateway):
+        calls, replies = gateway
+        replies.append(json.dumps({"frames": [_frame(i) for i in (1, 2, 3)]}))
+        first = await video_vision.review_video_frames(frames, "waves hello", "luigi")
+        again = await video_vision.review_video_frames(frames, "waves hello", "luigi")
+        assert calls == [3] and again == first
+
+    async def test_wrong_frame_count_falls_back_to_per_frame(self, frames, gateway):
+        calls, replies = gateway
+        replies.append(json.dumps({"frames": [_frame(1)]}))
+
+        review = await video_vision.review_video_frames(frames, "waves hello")
+
+        assert calls == [3, 1, 1, 1]
+        assert [f["character_match"] for f in review["per_frame"]] == [6, 6, 6]
+
+    async def test_sheet_mode_sends_one_image(self, frames, gateway, monkeypatch):
+        monkeypatch.setattr(video_vision, "VIDEO_QC_REVIEW_MODE", "sheet")
+        calls, replies = gateway
+        replies.append(json.dumps({"frames": [_frame(i) for i in (1, 2, 3)]}))
+        await video_vision.review_video_frames(frames, "waves hello")
+        assert calls == [1]
+
+
+@pytest.mark.unit
+def test_contact_sheet_lays_frames_side_by_side(frames, tmp_path):
+    sheet = tmp_path / "sheet.png"
+    sheet.write_bytes(video_vision.contact_sheet(frames))
+    with Image.open(sheet) as img:
+        assert img.size == (3 * 64 + 2 * 8, 48)
+
+
+@pytest.mark.unit
+async def test_frames_extracted_by_one_ffmpeg_run(tmp_path, monkeypatch):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"mp4")
+    commands = []
+
+    class Proc:
+        returncode = 0
+
+        def __init__(self, cmd):
+            self.cmd = cmd
+
+        async def communicate(self):
+            if self.cmd[0] == "ffprobe":
+                return b"4.0\n", b""
+            for arg in self.cmd:
+                if arg.endswith(".png"):
+                    Path(arg).write_bytes(b"png")
+            return b"", b""
+
+    async def fake_exec(*cmd, **kwargs):
+        commands.append(cmd)
+        return Proc(cmd)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    paths = await video_vision.extract_review_frames(str(video))
+
+    assert [c[0] for c in commands] == ["ffprobe", "ffmpeg"]
+    assert [a for i, a in enumerate(commands[1]) if commands[1][i - 1] == "-ss"] == ["0.100", "2.000", "3.900"]
+    assert [Path(p).name for p in paths] == [f"clip_qc_frame_{i}.png" for i in range(3)]
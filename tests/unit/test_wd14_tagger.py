@@ -0,0 +1,100 @@
+"""Unit tests for server/wd14_tagger.py — batched tagging and sidecar skipping."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from server import wd14_tagger
+from server.wd14_tagger import WD14Tagger, batch_tag_datasets
+
+
+class _FakeSession:
+    def __init__(self):
+        self.batches = []
+
+    def run(self, _outputs, feeds):
+        batch = next(iter(feeds.values()))
+        self.batches.append(len(batch))
+        # Score tag i by the image's mean blue value so results differ per image
+        means = batch[:, :, :, 0].mean(axis=(1, 2)) / 255.0
+        return [np.stack([means, 1 - means, np.full_like(means, 0.9)], axis=1)]
+
+
+def _tagger(batch_size=2):
+    tagger = object.__new__(WD14Tagger)
+    tagger.model_name = "fake"
+    tagger.tags = ["blue", "not_blue", "1girl"]
+    tagger.session = _FakeSession()
+    tagger.input_name = "input"
+    tagger.target_size = 8
+    tagger.batch_size = batch_size
+    tagger.workers = 2
+    return tagger
+
+
+def _png(path, blue):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (16, 16), (0, 0, blue)).save(path)
+    return path
+
+
+@pytest.mark.unit
+def test_tag_paths_batches_in_order(tmp_path):
+    tagger = _tagger(batch_size=2)
+    paths = [_png(tmp_path / f"{i}.png", b) for i, b in enumerate((255, 0, 255))]
+    paths.insert(1, tmp_path / "missing.png")
+
+    results = list(tagger.tag_paths(paths, threshold=0.5))
+
+    assert [p.name for p, _ in results] == ["missing.png", "0.png", "1.png", "2.png"]
+    assert "error" in results[0][1]
+    assert results[1][1]["tag_string"] == "blue, 1girl"
+    assert results[2][1]["tag_string"] == "not_blue, 1girl"
+    assert tagger.session.batches == [2, 1]
+
+
+@pytest.mark.unit
+def test_batch_tag_datasets_skips_current_sidecars(tmp_path, monkeypatch):
+    tagger = _tagger()
+    monkeypatch.setattr(wd14_tagger, "get_tagger", lambda *a, **k: tagger)
+    first = _png(tmp_path / "luigi" / "images" / "a.png", 255)
+    _png(tmp_path / "luigi" / "images" / "b.png", 0)
+    first.with_suffix(".meta.json").write_text(json.dumps({"design_prompt": "luigi"}))
+
+    stats = batch_tag_datasets(str(tmp_path), threshold=0.5, write_captions=True,
+                               write_meta=True, model_name="fake")
+    assert stats["tagged"] == 2 and stats["skipped"] == 0
+    assert first.with_suffix(".txt").read_text() == "luigi, blue, 1girl"
+    assert json.loads(first.with_suffix(".meta.json").read_text())["wd14_tag_string"] == "blue, 1girl"
+
+    again = batch_tag_datasets(str(tmp_path), threshold=0.5, write_captions=True,
+                               write_meta=True, model_name="fake")
+    assert again["tagged"] == 0 and again["skipped"] == 2
+
+    _png(first, 0)  # pixels changed -> new mtime
+    os.utime(first, (first.stat().st_atime, first.stat().st_mtime + 5))
+    third = batch_tag_datasets(str(tmp_path), threshold=0.5, write_captions=True,
+                               write_meta=True, model_name="fake")
+    assert third["tagged"] == 1 and third["skipped"] == 1
+    assert "images_per_second" in third
+
+
+@pytest.mark.unit
+def test_meta_run_after_captions_only_run_retags(tmp_path, monkeypatch):
+    tagger = _tagger()
+    monkeypatch.setattr(wd14_tagger, "get_tagger", lambda *a, **k: tagger)
+    png = _png(tmp_path / "luigi" / "images" / "a.png", 255)
+
+    batch_tag_datasets(str(tmp_path), threshold=0.5, write_captions=True, model_name="fake")
+    assert "wd14_tags" not in json.loads(png.with_suffix(".meta.json").read_text())
+
+    stats = batch_tag_datasets(str(tmp_path), threshold=0.5, write_meta=True, model_name="fake")
+    assert stats["tagged"] == 1 and stats["skipped"] == 0
+    assert json.loads(png.with_suffix(".meta.json").read_text())["wd14_tag_string"] == "blue, 1girl"
+
+    both = batch_tag_datasets(str(tmp_path), threshold=0.5, write_captions=True,
+                              write_meta=True, model_name="fake")
+    assert both["skipped"] == 1